@@ -299,6 +299,22 @@ def update_row_from_details(controller, details_info):
         print(f"✅ Linha {selected_row_index} atualizada com os novos detalhes.")
 
 
+def update_rows_for_contracts(controller, contratos: dict) -> int:
+    """
+    Atualiza no lugar as linhas dos contratos informados ({id: dados novos}), sem
+    repopular a tabela. Retorna quantas linhas estavam na tabela e foram atualizadas.
+    """
+    atualizadas = 0
+    for row_index, contrato_data in enumerate(controller.current_data):
+        novo = contratos.get(str(contrato_data.get("id")))
+        if novo is None:
+            continue
+        controller.current_data[row_index] = novo
+        _update_row_content(controller, row_index, novo)
+        atualizadas += 1
+    return atualizadas
+
+
 def _update_row_content(controller, row_index: int, contrato: dict, new_status: str | None = None):
     """
     Atualiza o conteúdo de UMA ÚNICA linha da tabela.
@@ -388,12 +404,19 @@ def _populate_or_update_table(controller, data_source, repopulation: bool = True
     # --- 3. Preenchimento / Atualização dos Dados ---
     data_to_iterate = controller.current_data if repopulation else data_source
 
-    for row_index, contrato in enumerate(data_to_iterate):
-        contrato_id = contrato.get("id", "")
-        objeto_padrao = contrato.get("objeto", "Não informado")
-
-        status_text, objeto_text = _get_status_and_objeto_from_db(controller, contrato_id, objeto_padrao)
-        _fill_row(model, row_index, contrato, today, status_text, objeto_text)
+    # Cada setItem faz o proxy de busca reavaliar todas as linhas (custo quadrático).
+    # Silencia o model durante o preenchimento e refiltra uma única vez no final.
+    model.blockSignals(True)
+    try:
+        for row_index, contrato in enumerate(data_to_iterate):
+            contrato_id = contrato.get("id", "")
+            objeto_padrao = contrato.get("objeto", "Não informado")
+
+            status_text, objeto_text = _get_status_and_objeto_from_db(controller, contrato_id, objeto_padrao)
+            _fill_row(model, row_index, contrato, today, status_text, objeto_text)
+    finally:
+        model.blockSignals(False)
+        proxy_model.invalidate()
 
     if repopulation:
         print(f"✅ Tabela carregada com {len(controller.current_data)} contratos.")
@@ -26,6 +26,46 @@ class DashboardController(QObject):
             "SIGAD" : QColor(230, 180, 100)
         }
 
+        if hasattr(self.view, "execucao_button"):
+            self.view.execucao_button.clicked.connect(self.open_financial_execution)
+        if hasattr(self.view, "precos_itens_button"):
+            self.view.precos_itens_button.clicked.connect(self.open_item_prices)
+        if hasattr(self.view, "fornecedores_button"):
+            self.view.fornecedores_button.clicked.connect(self.open_suppliers)
+
+    def open_financial_execution(self):
+        """Abre a execução financeira (empenhado/liquidado/pago) calculada do banco offline."""
+        from PyQt6.QtWidgets import QMessageBox
+        from Contratos.controller.execucao_financeira_controller import ExecucaoFinanceiraController
+        try:
+            self.execucao_controller = ExecucaoFinanceiraController(self.model, self.view)
+        except RuntimeError as e:
+            QMessageBox.warning(self.view, "Execução Financeira", f"{e}\n\nCrie o banco offline antes de usar esta visão.")
+            return
+        self.execucao_controller.show()
+
+    def open_item_prices(self):
+        """Abre o histórico de preços dos itens de catálogo em todos os contratos offline."""
+        from PyQt6.QtWidgets import QMessageBox
+        from Contratos.controller.precos_itens_controller import PrecosItensController
+        try:
+            self.precos_controller = PrecosItensController(self.model, self.view)
+        except RuntimeError as e:
+            QMessageBox.warning(self.view, "Preços de Itens", f"{e}\n\nCrie o banco offline antes de usar esta visão.")
+            return
+        self.precos_controller.show()
+
+    def open_suppliers(self):
+        """Abre a consulta de fornecedores (CNPJ) com contratos, pagamentos e atas."""
+        from PyQt6.QtWidgets import QMessageBox
+        from Contratos.controller.fornecedores_controller import FornecedoresController
+        try:
+            self.fornecedores_controller = FornecedoresController(self.model, self.view)
+        except RuntimeError as e:
+            QMessageBox.warning(self.view, "Fornecedores", f"{e}\n\nCrie o banco offline antes de usar esta visão.")
+            return
+        self.fornecedores_controller.show()
+
     def clear_dashboard(self):
         """Limpa os dados do dashboard."""
         widgets = self.view.dashboard_widgets
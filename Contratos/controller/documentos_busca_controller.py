@@ -0,0 +1,126 @@
+# controller/documentos_busca_controller.py
+
+from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+
+from Contratos.view.documentos_busca_view import DocumentosBuscaDialog
+from Contratos.controller.documentos_cache_controller import open_local_file
+
+
+class IndexarDocumentosWorker(QThread):
+    progress = pyqtSignal(int, int)  # arquivos extraídos, total
+    finished = pyqtSignal(bool, str) # Sinais: Sucesso (True/False), Mensagem
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            stats = self.index.index_pending(progress_callback=self.progress.emit,
+                                             should_cancel=lambda: self._cancelled)
+            if self._cancelled:
+                self.finished.emit(False, f"Indexação cancelada após {stats['documentos']} documentos.")
+                return
+            if not stats["documentos"]:
+                self.finished.emit(True, "O índice já está atualizado.")
+                return
+            message = f"{stats['documentos']} documentos indexados em {stats['segundos']:.1f}s."
+            if stats["erros"]:
+                message += f"\n{len(stats['erros'])} sem texto extraído: " + "; ".join(stats["erros"][:3])
+            self.finished.emit(not stats["erros"], message)
+        except Exception as e:
+            self.finished.emit(False, f"Erro interno ao indexar documentos: {str(e)}")
+
+
+class DocumentosBuscaController:
+    """Busca por texto na cópia local dos documentos; atualiza o índice em segundo plano."""
+
+    def __init__(self, model, parent=None):
+        self.model = model
+        self.index = model.document_index
+        self.worker = None
+        self.results = []
+        self.view = DocumentosBuscaDialog(parent)
+
+        self.view.search_button.clicked.connect(self.search)
+        self.view.search_input.returnPressed.connect(self.search)
+        self.view.index_button.clicked.connect(self.update_index)
+        self.view.results_table.cellDoubleClicked.connect(self._open_result)
+        self._update_status()
+
+        # Arquivos baixados desde a última vez entram no índice ao abrir a janela
+        if self.index.stats()["pendentes"]:
+            self.update_index()
+
+    def show(self):
+        """Exibe a janela de diálogo."""
+        self.view.exec()
+
+    def _update_status(self):
+        stats = self.index.stats()
+        text = f"{stats['indexados']} documentos no índice"
+        if stats["com_erro"]:
+            text += f" ({stats['com_erro']} sem texto)"
+        if stats["pendentes"]:
+            text += f" • {stats['pendentes']} aguardando indexação"
+        self.view.status_label.setText(text)
+
+    def update_index(self):
+        self.worker = IndexarDocumentosWorker(self.index)
+        # O diálogo cancela e espera a thread (e o pool de extração) se for fechado no meio
+        self.view.track_worker(self.worker)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.finished.connect(self._on_index_finished)
+        self.view.set_indexing(True)
+        self.view.status_label.setText("Extraindo texto dos documentos...")
+        self.worker.start()
+
+    def _on_progress(self, done, total):
+        self.view.progress_bar.setRange(0, total)
+        self.view.progress_bar.setValue(done)
+
+    def _on_index_finished(self, success, message):
+        self.view.set_indexing(False)
+        self._update_status()
+        if not self.view.isVisible():
+            # Diálogo fechado no meio da indexação (a thread já foi cancelada e aguardada)
+            return
+        if not success:
+            QMessageBox.warning(self.view, "Índice de Documentos", message)
+        elif self.view.search_input.text().strip():
+            self.search()
+
+    def search(self):
+        text = self.view.search_input.text().strip()
+        if not text:
+            return
+        self.results = self.index.search(text)
+        table = self.view.results_table
+        table.setRowCount(len(self.results))
+        for row, result in enumerate(self.results):
+            values = [result["numero"] or result["contrato_id"], result["uasg"], result["fornecedor"],
+                      result["ocorrencias"], result["documentos"], result["trecho"]]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if isinstance(value, int):
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                table.setItem(row, column, item)
+        table.resizeRowsToContents()
+        self.view.status_label.setText(f"{len(self.results)} contratos encontrados para: {text}")
+
+    def _open_result(self, row, _column):
+        if not (0 <= row < len(self.results)):
+            return
+        path = self.model.document_cache.local_path(self.results[row]["url"])
+        if not path:
+            QMessageBox.warning(self.view, "Documento", "A cópia local deste documento não foi encontrada.")
+            return
+        try:
+            open_local_file(path)
+        except Exception as e:
+            QMessageBox.warning(self.view, "Erro ao Abrir", f"Não foi possível abrir o arquivo:\n{e}")
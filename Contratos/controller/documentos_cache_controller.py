@@ -0,0 +1,189 @@
+# controller/documentos_cache_controller.py
+
+import os
+import sys
+import subprocess
+from PyQt6.QtWidgets import QMessageBox
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from Contratos.view.documentos_cache_view import DocumentosCacheDialog
+from Contratos.model.mensagem_lote_model import list_selection_values
+from Contratos.model.documentos_cache_model import SELECAO_UASG, SELECAO_STATUS
+
+
+def open_local_file(path):
+    """Abre um arquivo (ou pasta) local com o programa padrão do sistema."""
+    if sys.platform == "win32":
+        os.startfile(path)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", path])
+    else:
+        subprocess.Popen(["xdg-open", path])
+
+
+class DocumentosCacheWorker(QThread):
+    progress = pyqtSignal(int, int)  # concluídos, total
+    finished = pyqtSignal(bool, str) # Sinais: Sucesso (True/False), Mensagem
+
+    def __init__(self, cache, fetch_arquivos, selecao, valor, index=None):
+        super().__init__()
+        self.cache = cache
+        self.index = index
+        self.fetch_arquivos = fetch_arquivos
+        self.selecao = selecao
+        self.valor = valor
+        self._cancelled = False
+        self.stats = {}
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            contrato_ids = self.cache.select_contracts(self.selecao, self.valor)
+            if not contrato_ids:
+                self.finished.emit(False, "Nenhum contrato encontrado para a seleção.")
+                return
+
+            documentos, erros = self.cache.collect_documents(
+                contrato_ids, self.fetch_arquivos, should_cancel=lambda: self._cancelled)
+            self.stats = self.cache.download_all(
+                documentos, progress_callback=self.progress.emit, should_cancel=lambda: self._cancelled)
+            self.stats["erros_consulta"] = erros
+            if self.index is not None and not self._cancelled:
+                # Indexação incremental: só os arquivos novos ou alterados
+                self.stats["indice"] = self.index.index_pending(should_cancel=lambda: self._cancelled)
+
+            mb = self.stats["bytes"] / (1024 * 1024)
+            message = (
+                f"{len(contrato_ids)} contratos, {self.stats['total']} documentos:\n"
+                f"• {self.stats['baixados']} baixados ({mb:.1f} MB)\n"
+                f"• {self.stats['em_cache']} já estavam na cópia local\n"
+                f"• {self.stats['erros']} com erro"
+            )
+            if self.stats.get("indice", {}).get("documentos"):
+                message += f"\n• {self.stats['indice']['documentos']} indexados para a busca por texto"
+            if self.stats["cancelados"] or self._cancelled:
+                message += f"\n• {self.stats['cancelados']} cancelados (serão retomados no próximo download)"
+            if erros:
+                message += f"\n\n{len(erros)} contratos sem lista de arquivos (API/banco indisponível)."
+            self.finished.emit(self.stats["erros"] == 0 and not erros and not self._cancelled, message)
+        except Exception as e:
+            self.finished.emit(False, f"Erro interno ao baixar documentos: {str(e)}")
+
+
+class DocumentoDownloadWorker(QThread):
+    """Baixa um único documento (botão da aba de links); a mensagem é o caminho local."""
+    finished = pyqtSignal(bool, str) # Sinais: Sucesso (True/False), Caminho ou erro
+
+    def __init__(self, cache, doc, index=None):
+        super().__init__()
+        self.cache = cache
+        self.doc = doc
+        self.index = index
+
+    def run(self):
+        try:
+            result = self.cache.download(self.doc)
+            if result["status"] == "baixado" and self.index is not None:
+                self.index.index_pending()
+            if result["caminho"]:
+                self.finished.emit(True, result["caminho"])
+            else:
+                self.finished.emit(False, result["erro"] or "Download não concluído.")
+        except Exception as e:
+            self.finished.emit(False, f"Erro interno ao baixar documento: {str(e)}")
+
+
+class DocumentosCacheController:
+    """Liga a janela de documentos locais ao download em lote (executado em segundo plano)."""
+
+    def __init__(self, model, parent=None):
+        self.model = model
+        self.worker = None
+        self.view = DocumentosCacheDialog(parent)
+
+        self.view.selection_combo.addItem("Por UASG", SELECAO_UASG)
+        self.view.selection_combo.addItem("Por Status", SELECAO_STATUS)
+
+        uasgs, statuses = list_selection_values(self.model.db_path)
+        self.view.uasg_combo.addItems([str(u) for u in uasgs])
+        self.view.status_combo.addItems(statuses)
+
+        self.view.open_folder_button.clicked.connect(self._open_folder)
+        self.view.download_button.clicked.connect(self._start_download)
+        self.view.cancel_button.clicked.connect(self._cancel_download)
+        self.view.search_button.clicked.connect(self._open_search)
+        self._update_info()
+
+    def show(self):
+        """Exibe a janela de diálogo."""
+        self.view.exec()
+
+    def _update_info(self):
+        cache = self.model.document_cache
+        stats = cache.stats()
+        self.view.info_label.setText(
+            f"Cópia local: {stats['urls']} links, {stats['arquivos']} arquivos distintos "
+            f"({stats['bytes'] / (1024 * 1024):.1f} MB) em {cache.store_dir}"
+        )
+
+    def _open_search(self):
+        from Contratos.controller.documentos_busca_controller import DocumentosBuscaController
+        DocumentosBuscaController(self.model, self.view).show()
+
+    def _open_folder(self):
+        store_dir = self.model.document_cache.store_dir
+        os.makedirs(store_dir, exist_ok=True)
+        try:
+            open_local_file(store_dir)
+        except Exception as e:
+            QMessageBox.critical(self.view, "Erro", f"Não foi possível abrir a pasta:\n{e}")
+
+    def _start_download(self):
+        selecao = self.view.selection_combo.currentData()
+        combo = self.view.uasg_combo if selecao == SELECAO_UASG else self.view.status_combo
+        valor = combo.currentText()
+        if not valor:
+            QMessageBox.warning(self.view, "Seleção", "Escolha um valor para a seleção.")
+            return
+
+        cache = self.model.document_cache
+        cache.max_workers = self.view.workers_spin.value()
+        self.worker = DocumentosCacheWorker(cache, self.model.get_sub_data_cached, selecao, valor,
+                                            index=self.model.document_index)
+        # O diálogo cancela e espera a thread se for fechado no meio do download
+        self.view.track_worker(self.worker)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.finished.connect(self._on_finished)
+        self.view.set_running(True)
+        self.view.progress_bar.setRange(0, 0)
+        self.view.status_label.setText("Consultando a lista de arquivos dos contratos...")
+        self.worker.start()
+
+    def _cancel_download(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.view.status_label.setText("Cancelando...")
+
+    def _on_progress(self, concluidos, total):
+        self.view.progress_bar.setRange(0, total)
+        self.view.progress_bar.setValue(concluidos)
+        self.view.status_label.setText(f"{concluidos}/{total} documentos processados...")
+
+    def _on_finished(self, success, message):
+        self.view.set_running(False)
+        self._update_info()
+        if not self.view.isVisible():
+            # Diálogo fechado no meio do download (a thread já foi cancelada e aguardada)
+            return
+        falhas = self.worker.stats.get("falhas", []) if self.worker else []
+        if falhas:
+            message += "\n\nFalhas:\n" + "\n".join(falhas[:5])
+            if len(falhas) > 5:
+                message += f"\n... e mais {len(falhas) - 5}"
+        self.view.status_label.setText(message)
+        if success:
+            QMessageBox.information(self.view, "Documentos Locais", message)
+        else:
+            QMessageBox.warning(self.view, "Documentos Locais", message)
@@ -1,16 +1,21 @@
 # controller/email_controller.py
 
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
 import os
+import tempfile
+import threading
+from pathlib import Path
 from dotenv import load_dotenv
+from PyQt6.QtCore import QThread, pyqtSignal
 from Contratos.model.uasg_model import resource_path
+from utils.email_outbox import EmailOutbox, compose_message_file, get_smtp_session
 
 dotenv_path = resource_path(os.path.join('config', '.env'))
 load_dotenv(dotenv_path=dotenv_path)
 
+# Intervalo máximo entre verificações da caixa de saída (segundos)
+OUTBOX_POLL_SECONDS = 60
+
+
 class EmailController:
     def __init__(self, parent_view=None):
         self.parent_view = parent_view
@@ -19,39 +24,140 @@ class EmailController:
         # Lê as variáveis do ambiente usando os.getenv()
         self.EMAIL_REMETENTE = os.getenv('EMAIL_REMETENTE')
         self.EMAIL_SENHA = os.getenv('EMAIL_SENHA')
-        self.SMTP_SERVER = 'smtp.gmail.com'
-        self.SMTP_PORT = 587
+        self.SMTP_SERVER = os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com')
+        self.SMTP_PORT = int(os.getenv('EMAIL_SMTP_PORT', '587'))
+        self.SMTP_STARTTLS = os.getenv('EMAIL_SMTP_STARTTLS', '1') != '0'
+
+    def _session(self):
+        """Sessão SMTP compartilhada (conecta e autentica só na primeira vez)."""
+        return get_smtp_session(self.SMTP_SERVER, self.SMTP_PORT, self.EMAIL_REMETENTE,
+                                self.EMAIL_SENHA, self.SMTP_STARTTLS)
 
     def send_email(self, recipient_email, subject, body, file_path):
-        """Envia um e-mail com um anexo."""
+        """Envia um e-mail com um anexo (imediatamente, pela sessão compartilhada)."""
         if not recipient_email or not file_path:
             return False, "E-mail do destinatário ou arquivo não fornecido."
 
+        spool_fd, spool_path = tempfile.mkstemp(suffix=".eml")
+        os.close(spool_fd)
         try:
-            # Configuração da mensagem
-            msg = MIMEMultipart()
-            msg['From'] = self.EMAIL_REMETENTE
-            msg['To'] = recipient_email
-            msg['Subject'] = subject
-
-            # Corpo do e-mail
-            msg.attach(MIMEText(body, 'plain'))
-
-            # Anexo
-            with open(file_path, 'rb') as f:
-                part = MIMEApplication(f.read(), Name=os.path.basename(file_path))
-            part['Content-Disposition'] = f'attachment; filename="{os.path.basename(file_path)}"'
-            msg.attach(part)
-
-            # Conexão e envio
-            with smtplib.SMTP(self.SMTP_SERVER, self.SMTP_PORT) as server:
-                server.starttls()
-                server.login(self.EMAIL_REMETENTE, self.EMAIL_SENHA)
-                server.send_message(msg)
+            # A mensagem é montada em disco e o anexo codificado em blocos
+            compose_message_file(spool_path, self.EMAIL_REMETENTE, [recipient_email], subject, body, [file_path])
+            self._session().send_file(self.EMAIL_REMETENTE, [recipient_email], spool_path)
             
             print(f"E-mail enviado com sucesso para {recipient_email}")
             return True, "E-mail enviado com sucesso!"
 
         except Exception as e:
             print(f"Erro ao enviar e-mail: {e}")
-            return False, f"Ocorreu um erro ao enviar o e-mail:\n{str(e)}"
\ No newline at end of file
+            return False, f"Ocorreu um erro ao enviar o e-mail:\n{str(e)}"
+        finally:
+            os.remove(spool_path)
+
+    def queue_email(self, recipient_email, subject, body, file_path=None, move_attachment=False):
+        """
+        Coloca o e-mail na caixa de saída; o envio acontece em segundo plano, com novas
+        tentativas se falhar. Anexos acima de 25 MB são divididos em partes.
+        Retorna (success, mensagem, ids).
+        """
+        if not recipient_email:
+            return False, "E-mail do destinatário não fornecido.", []
+        try:
+            outbox = get_outbox(self)
+            job_ids = outbox.enqueue(recipient_email, subject, body, file_path, move_attachment=move_attachment)
+            start_outbox_worker(outbox)
+        except OSError as e:
+            return False, f"Não foi possível colocar o e-mail na fila de envio:\n{e}", []
+
+        if len(job_ids) > 1:
+            return True, f"E-mail colocado na fila de envio em {len(job_ids)} partes.", job_ids
+        return True, "E-mail colocado na fila de envio.", job_ids
+
+
+# ==================================== Caixa de saída (singleton) ====================================
+
+_outbox = None
+_outbox_worker = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox_dir():
+    """
+    A caixa de saída é de cada máquina (pasta de dados local do usuário). O banco pode
+    ficar numa pasta compartilhada; se a fila ficasse ao lado dele, todas as máquinas
+    enviariam os mesmos e-mails.
+    """
+    base = (os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_DATA_HOME")
+            or os.path.join(os.path.expanduser("~"), ".local", "share"))
+    return Path(base) / "CA360" / "outbox"
+
+
+def get_outbox(controller=None):
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            controller = controller or EmailController()
+            _outbox = EmailOutbox(get_outbox_dir(), controller._session(), controller.EMAIL_REMETENTE)
+        return _outbox
+
+
+class OutboxWorker(QThread):
+    sent = pyqtSignal(str)          # assunto
+    failed = pyqtSignal(str, str)   # assunto, erro
+
+    def __init__(self, outbox):
+        super().__init__()
+        self.outbox = outbox
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+        self.outbox.wakeup.set()
+
+    def run(self):
+        while not self._stop:
+            self.outbox.wakeup.clear()
+            try:
+                sent, failed = self.outbox.drain()
+                for job in sent:
+                    self.sent.emit(job["subject"])
+                for job in failed:
+                    self.failed.emit(job["subject"], job["last_error"])
+            except Exception as e:
+                print(f"❌ Erro interno na caixa de saída: {e}")
+
+            due_in = self.outbox.next_due_in()
+            wait = OUTBOX_POLL_SECONDS if due_in is None else min(max(due_in, 0.5), OUTBOX_POLL_SECONDS)
+            self.outbox.wakeup.wait(wait)
+
+
+def start_outbox_worker(outbox=None):
+    """Inicia (uma vez) a thread que esvazia a caixa de saída."""
+    global _outbox_worker
+    outbox = outbox or get_outbox()
+    if _outbox_worker is not None and _outbox_worker.isRunning():
+        outbox.wakeup.set()
+        return _outbox_worker
+    _outbox_worker = OutboxWorker(outbox)
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance()
+    if app is not None:
+        app.aboutToQuit.connect(stop_outbox_worker)
+    _outbox_worker.start()
+    return _outbox_worker
+
+
+def stop_outbox_worker(timeout_ms=5000):
+    global _outbox_worker
+    if _outbox_worker is not None:
+        _outbox_worker.stop()
+        _outbox_worker.wait(timeout_ms)
+        _outbox_worker = None
+
+
+def resume_pending_outbox():
+    """Retoma, ao abrir o programa, os e-mails que ficaram na fila na última execução."""
+    pending_dir = get_outbox_dir() / "pendentes"
+    if pending_dir.is_dir() and any(name.endswith(".json") for name in os.listdir(pending_dir)):
+        print("📤 Retomando envio de e-mails pendentes da caixa de saída...")
+        start_outbox_worker()
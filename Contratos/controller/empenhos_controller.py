@@ -1,23 +1,22 @@
 # controller/empenhos_controller.py
 
-from PyQt6.QtWidgets import QMessageBox, QFileDialog
+from PyQt6.QtWidgets import QMessageBox, QFileDialog, QApplication
+from PyQt6.QtCore import Qt
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
-from datetime import datetime
 import re
 
+from Contratos.model.empenhos_relatorio_model import (
+    assign_empenhos, iter_uasg_financials, write_uasg_financial_workbook,
+)
+from utils.sql_profiler import sql_profiler
+
 class EmpenhoController:
     def __init__(self, model, parent_view=None):
         self.model = model
         self.parent_view = parent_view
 
-    @staticmethod
-    def _to_float(value_str):
-        if not isinstance(value_str, str):
-            return 0.0
-        return float(value_str.replace('.', '').replace(',', '.'))
-
     def generate_report_to_excel(self, contract_data):
         """
         Orquestra a busca de dados, o processamento e a criação do relatório Excel
@@ -26,8 +25,8 @@ class EmpenhoController:
         contrato_id = contract_data.get("id")
 
         # 1. Busca os dados necessários
-        empenhos, error_empenhos = self.model.get_sub_data_for_contract(contrato_id, "empenhos")
-        historico, error_historico = self.model.get_sub_data_for_contract(contrato_id, "historico")
+        empenhos, error_empenhos = self.model.get_sub_data_cached(contrato_id, "empenhos")
+        historico, error_historico = self.model.get_sub_data_cached(contrato_id, "historico")
 
         if error_empenhos or error_historico or not historico:
             QMessageBox.critical(self.parent_view, "Erro de Dados", "Não foi possível buscar o histórico ou os empenhos para gerar o relatório.")
@@ -56,48 +55,41 @@ class EmpenhoController:
 
     def _process_data_for_excel(self, historico, empenhos):
         """Prepara os dados para o relatório, incluindo a lógica de verificação."""
-        periodos = []
-        for item in sorted(historico, key=lambda x: x['vigencia_inicio']):
-            if item.get("codigo_tipo") in ["50", "55"]:
-                periodos.append({
-                    "titulo": f"{item['tipo']} {item['numero']}",
-                    "inicio": datetime.strptime(item['vigencia_inicio'], "%Y-%m-%d").date(),
-                    "fim": datetime.strptime(item['vigencia_fim'], "%Y-%m-%d").date(),
-                    "valor_global": self._to_float(item.get('valor_global', '0,00')), # <<< CORRIGIDO
-                    "empenhos_do_periodo": []
-                })
-
-        for empenho in empenhos:
-            try:
-                data_emissao = datetime.strptime(empenho['data_emissao'], "%Y-%m-%d").date()
-                for periodo in periodos:
-                    if periodo['inicio'] <= data_emissao <= periodo['fim']:
-                        periodo['empenhos_do_periodo'].append(empenho)
-                        break
-            except (ValueError, TypeError):
-                continue
-
-        report = []
-        for periodo in periodos:
-            total_empenhado = sum(self._to_float(e.get('empenhado', '0,00')) for e in periodo['empenhos_do_periodo']) # <<< CORRIGIDO
-            total_pago = sum(self._to_float(e.get('pago', '0,00')) for e in periodo['empenhos_do_periodo']) # <<< CORRIGIDO
-
-            obs = "OK"
-            if total_empenhado > periodo['valor_global'] or total_pago > periodo['valor_global']:
-                obs = "Sera??"
-
-            report.append({
-                "titulo": periodo['titulo'],
-                "inicio": periodo['inicio'].strftime("%d/%m/%Y"),
-                "fim": periodo['fim'].strftime("%d/%m/%Y"),
-                "valor_global": periodo['valor_global'],
-                "total_empenhado": total_empenhado,
-                "total_pago": total_pago,
-                "obs": obs,
-                "empenhos_detalhados": periodo['empenhos_do_periodo']
-            })
-        
-        return report
+        return assign_empenhos(historico, empenhos)
+
+    def generate_uasg_report_to_excel(self, uasg_code):
+        """
+        Relatório em lote: empenhado/pago por período de todos os contratos da UASG,
+        a partir das tabelas offline, em uma única planilha.
+        """
+        file_path, _ = QFileDialog.getSaveFileName(
+            self.parent_view,
+            "Salvar Relatório Financeiro da UASG",
+            f"Relatorio_Financeiro_UASG_{uasg_code}.xlsx",
+            "Excel Files (*.xlsx)"
+        )
+        if not file_path:
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            with sql_profiler.operation("relatorio_financeiro_uasg"):
+                stats = write_uasg_financial_workbook(
+                    file_path, uasg_code, iter_uasg_financials(self.model.db_path, uasg_code))
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self.parent_view, "Erro ao Gerar Excel", f"Ocorreu um erro ao criar a planilha:\n{str(e)}")
+            return
+        QApplication.restoreOverrideCursor()
+
+        if not stats["contratos"]:
+            QMessageBox.warning(self.parent_view, "Relatório Financeiro",
+                                f"Nenhum contrato da UASG {uasg_code} encontrado no banco offline.")
+            return
+        mensagem = f"{stats['contratos']} contratos processados em {stats['segundos']:.1f}s.\n"
+        if stats["excedentes"]:
+            mensagem += f"⚠️ {stats['excedentes']} com pagamentos acima do valor global.\n"
+        QMessageBox.information(self.parent_view, "Sucesso", f"{mensagem}\nRelatório salvo em:\n{file_path}")
 
     def _create_excel_file(self, file_path, report_data):
         """Cria e formata o arquivo .xlsx com a aba de resumo e as abas detalhadas."""
@@ -206,16 +198,18 @@ class EmpenhoController:
                 cell.alignment = center_align
 
             # Preenche com os empenhos detalhados
-            for empenho in periodo_data['empenhos_detalhados']:
+            # Valores já convertidos na distribuição por período
+            for empenho, valores in zip(periodo_data['empenhos_detalhados'], periodo_data['valores']):
                 doc_pagamento_url = empenho.get("links", {}).get("documento_pagamento")
                 numero_empenho = empenho.get('numero', 'N/A')
+                data_emissao, empenhado, aliquidar, pago = valores
                 
                 row_to_append = [
                     numero_empenho,
-                    datetime.strptime(empenho.get('data_emissao'), "%Y-%m-%d").date() if empenho.get('data_emissao') else "N/A",
-                    self._to_float(empenho.get('empenhado', '0,00')),
-                    self._to_float(empenho.get('aliquidar', '0,00')),
-                    self._to_float(empenho.get('pago', '0,00')),
+                    data_emissao or "N/A",
+                    empenhado,
+                    aliquidar,
+                    pago,
                     f'=HYPERLINK("{doc_pagamento_url}", "{numero_empenho}_linkdoc")' if doc_pagamento_url else "Sem link"
                 ]
                 ws_detalhe.append(row_to_append)
@@ -0,0 +1,109 @@
+# controller/execucao_financeira_controller.py
+
+from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem, QApplication
+from PyQt6.QtCore import Qt
+
+from Contratos.view.execucao_financeira_view import ExecucaoFinanceiraDialog
+from Contratos.model.execucao_financeira_model import ExecucaoFinanceira
+from utils.formatters import format_brl
+
+TODAS = "Todas"
+
+
+class NumericItem(QTableWidgetItem):
+    """Item que ordena pelo número, não pelo texto formatado."""
+
+    def __init__(self, text, value):
+        super().__init__(text)
+        self._value = value if value is not None else float("-inf")
+        self.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+    def __lt__(self, other):
+        if isinstance(other, NumericItem):
+            return self._value < other._value
+        return super().__lt__(other)
+
+
+class ExecucaoFinanceiraController:
+    """Abre a visão de execução financeira, atualizando antes só os contratos alterados."""
+
+    def __init__(self, model, parent=None):
+        self.model = model
+        self.view = ExecucaoFinanceiraDialog(parent)
+        self.execucao = ExecucaoFinanceira(self.model.db_path)
+
+        self.view.refresh_button.clicked.connect(self.refresh)
+        self.view.uasg_combo.currentIndexChanged.connect(self.load_tables)
+        self.refresh()
+
+    def show(self):
+        """Exibe a janela de diálogo."""
+        self.view.exec()
+
+    def refresh(self):
+        """Normaliza os contratos pendentes (incremental) e recarrega as tabelas."""
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            stats = self.execucao.refresh()
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.view.status_label.setText(
+            f"{stats['contratos']} contratos e {stats['empenhos']} empenhos atualizados em {stats['segundos']:.2f}s."
+            if stats["contratos"] else "Nenhuma alteração desde a última atualização."
+        )
+
+        atual = self.view.uasg_combo.currentText()
+        self.view.uasg_combo.blockSignals(True)
+        self.view.uasg_combo.clear()
+        self.view.uasg_combo.addItem(TODAS)
+        self.view.uasg_combo.addItems([str(u) for u in self.execucao.uasgs()])
+        index = self.view.uasg_combo.findText(atual)
+        self.view.uasg_combo.setCurrentIndex(max(index, 0))
+        self.view.uasg_combo.blockSignals(False)
+        self.load_tables()
+
+    def _selected_uasg(self):
+        text = self.view.uasg_combo.currentText()
+        return None if text in ("", TODAS) else text
+
+    def load_tables(self):
+        uasg = self._selected_uasg()
+        try:
+            for key, table in self.view.tables.items():
+                colunas, linhas = self.execucao.summary(key, uasg)
+                self._fill_table(table, colunas, linhas)
+            totals = self.execucao.totals(uasg)
+        except Exception as e:
+            QMessageBox.warning(self.view, "Execução Financeira", f"Erro ao consultar a execução financeira:\n{e}")
+            return
+
+        pct = lambda v: f"{100 * v / totals['valor_global']:.1f}%" if totals["valor_global"] else "-"
+        self.view.totals_label.setText(
+            f"<b>{totals['contratos']}</b> contratos • Valor global <b>{format_brl(totals['valor_global'])}</b> • "
+            f"Empenhado <b>{format_brl(totals['empenhado'])}</b> ({pct(totals['empenhado'])}) • "
+            f"Liquidado <b>{format_brl(totals['liquidado'])}</b> • "
+            f"Pago <b>{format_brl(totals['pago'])}</b> ({pct(totals['pago'])})"
+        )
+
+    @staticmethod
+    def _fill_table(table, colunas, linhas):
+        table.setSortingEnabled(False)
+        table.clear()
+        table.setColumnCount(len(colunas))
+        table.setHorizontalHeaderLabels(colunas)
+        table.setRowCount(len(linhas))
+        for row, valores in enumerate(linhas):
+            for column, valor in enumerate(valores):
+                titulo = colunas[column]
+                if titulo.startswith("%"):
+                    item = NumericItem(f"{valor:.1f}%" if valor is not None else "-", valor)
+                    if valor is not None and valor > 100:
+                        item.setForeground(Qt.GlobalColor.red)
+                elif isinstance(valor, float):
+                    item = NumericItem(format_brl(valor), valor)
+                elif isinstance(valor, int) and titulo != "Ano":
+                    item = NumericItem(str(valor), valor)
+                else:
+                    item = QTableWidgetItem("" if valor is None else str(valor))
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
@@ -2,16 +2,16 @@
 # Controlador para exportação e importação em massa da tabela de contratos.
 
 import os
-import re
 import json
 from datetime import datetime, date
 from PyQt6.QtWidgets import QMessageBox, QFileDialog
-from openpyxl import Workbook, load_workbook
+from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.drawing.image import Image
 import sqlite3
 
 from Contratos.view.menus.table_options_dialog import TableOptionsDialog
+from Contratos.model.link_import_model import ContractIndex, plan_link_import
 
 class ExpImpTableController:
     """
@@ -46,9 +46,22 @@ class ExpImpTableController:
         dialog.btn_export_excel.clicked.connect(self.export_table_to_excel)
         dialog.btn_import_links.clicked.connect(self.import_links_from_spreadsheet)
         dialog.btn_export_bi.clicked.connect(self.export_bi_data)
+        dialog.btn_financeiro_uasg.clicked.connect(self.export_uasg_financial_report)
         
         dialog.exec()
 
+    # =========================================================================
+    # RELATÓRIO FINANCEIRO DA UASG (EMPENHOS POR PERÍODO)
+    # =========================================================================
+    def export_uasg_financial_report(self):
+        """Gera o relatório de empenhos por período de todos os contratos da UASG exibida."""
+        uasg_text = self.view.uasg_info_label.text()
+        if "UASG: " not in uasg_text or uasg_text.split(" ")[1] == "-":
+            QMessageBox.information(self.view, "Relatório Financeiro", "Carregue uma UASG na tabela primeiro.")
+            return
+        from Contratos.controller.empenhos_controller import EmpenhoController
+        EmpenhoController(self.model, self.view).generate_uasg_report_to_excel(uasg_text.split(" ")[1])
+
     # =========================================================================
     # EXPORTAR TABELA (EXCEL)
     # =========================================================================
@@ -302,7 +315,8 @@ class ExpImpTableController:
     def import_links_from_spreadsheet(self):
         """
         Abre uma planilha Excel e importa os links para os contratos correspondentes,
-        aplicando filtros por UASG e vigência.
+        aplicando filtros por UASG e vigência. Antes de gravar mostra a prévia com
+        os contratos encontrados e as linhas que ficaram de fora.
         """
         file_path, _ = QFileDialog.getOpenFileName(
             self.view, "Selecionar Planilha de Links", "", "Planilhas Excel (*.xlsx)"
@@ -311,114 +325,65 @@ class ExpImpTableController:
             return
 
         try:
-            workbook = load_workbook(file_path, data_only=True)
-            sheet = workbook.active
-            
-            header_row = [cell.value for cell in sheet[1]]
-            expected_headers = ['link_contrato', 'termo_aditivo', 'portaria']
-            if not all(h in header_row for h in expected_headers):
-                QMessageBox.critical(self.view, "Erro de Formato", f"A planilha deve conter as colunas: {', '.join(expected_headers)}")
-                return
+            print("--- Iniciando Importação de Links ---")
+            plano = plan_link_import(file_path, ContractIndex(self.loaded_uasgs))
+        except ValueError as e:
+            QMessageBox.critical(self.view, "Erro de Formato", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self.view, "Erro ao Importar", f"Ocorreu um erro ao processar a planilha:\n{e}")
+            return
 
-            col_indices = {name: header_row.index(name) for name in expected_headers}
-            
-            sucesso_count = 0
-            falha_count = 0
-            
-            # --- LÓGICA DE FILTRAGEM E MAPEAMENTO DOS CONTRATOS DO PROGRAMA ---
-            program_contracts = {}
-            today = datetime.now().date()
-            for uasg_code, uasg_data in self.loaded_uasgs.items():
-                for contract in uasg_data:
-                    # Filtra por vigência: apenas contratos que não expiraram há mais de 40 dias
-                    vigencia_fim_str = contract.get("vigencia_fim")
-                    if vigencia_fim_str:
-                        try:
-                            termino_date = datetime.strptime(vigencia_fim_str, "%Y-%m-%d").date()
-                            dias_restantes = (termino_date - today).days
-                            if dias_restantes < -40:
-                                continue # Pula este contrato
-                        except (ValueError, TypeError):
-                            continue # Pula se a data for inválida
-                    
-                    # Cria a chave composta (UASG, NUMERO/ANO)
-                    numero_ano = self._normalize_contract_number(contract.get('numero', ''))
-                    if numero_ano:
-                        chave = (str(uasg_code), numero_ano)
-                        program_contracts[chave] = contract
+        resumo = plano.summary()
+        print(f"Prévia: {resumo['encontradas']} linhas encontradas ({resumo['contratos']} contratos), "
+              f"{resumo['nao_encontradas']} não encontradas, {resumo['invalidas']} inválidas.")
+        if not plano.itens:
+            QMessageBox.warning(self.view, "Importação de Links",
+                                f"Nenhum contrato da planilha foi encontrado no programa.\n\n"
+                                f"Não encontrados: {resumo['nao_encontradas']}\nFormato inválido: {resumo['invalidas']}")
+            return
 
-            print("--- Iniciando Importação de Links ---")
-            for row_idx, row in enumerate(sheet.iter_rows(min_row=2), start=2):
-                key_cell_obj = row[col_indices['link_contrato']]
-                key_cell_value = key_cell_obj.value
-                
-                if not key_cell_value:
-                    continue
-
-                # Extrai a chave (UASG, NUMERO/ANO) da planilha
-                chave_planilha = self._normalize_spreadsheet_key(key_cell_value)
-                if not chave_planilha:
-                    print(f"Linha {row_idx}: Formato inválido na coluna 'link_contrato' ('{key_cell_value}'), pulando.")
-                    falha_count += 1
-                    continue
-                
-                # --- NOVO CÓDIGO DE BUSCA ---
-                uasg_planilha, numero_ano_planilha = chave_planilha
-                contrato_id = None
-                
-                if uasg_planilha:
-                    # Busca exata com UASG (Ex: 787000 e 00140/2021)
-                    if chave_planilha in program_contracts:
-                        contrato_id = str(program_contracts[chave_planilha].get("id"))
-                else:
-                    # Busca ignorando a UASG (útil para formatos "001-2023")
-                    for (uasg_key, num_ano_key), contrato in program_contracts.items():
-                        if num_ano_key == numero_ano_planilha:
-                            contrato_id = str(contrato.get("id"))
-                            chave_planilha = (uasg_key, num_ano_key) # Atualiza a chave para o print final sair com a UASG correta
-                            break
-                            
-                if contrato_id:
-                    # Prepara os dados para salvar
-                    link_data = {
-                        'link_contrato': None,
-                        'link_ta': None,
-                        'link_portaria': None
-                    }
-
-                    if key_cell_obj.hyperlink:
-                        link_data['link_contrato'] = key_cell_obj.hyperlink.target
-                    else:
-                        link_data['link_contrato'] = key_cell_value
-
-                    # Lógica para Termo Aditivo e Portaria
-                    cell_obj_ta = row[col_indices['termo_aditivo']]
-                    termo_aditivo_text = cell_obj_ta.value
-                    if termo_aditivo_text and str(termo_aditivo_text).strip().upper() != 'XXX':
-                        if cell_obj_ta.hyperlink:
-                            link_data['link_ta'] = cell_obj_ta.hyperlink.target
-                        self.model.save_status_field(contrato_id, 'termo_aditivo_edit', str(termo_aditivo_text))
-
-                    cell_obj_portaria = row[col_indices['portaria']]
-                    portaria_text = cell_obj_portaria.value
-                    if portaria_text and str(portaria_text).strip().upper() != 'XXX':
-                        if cell_obj_portaria.hyperlink:
-                            link_data['link_portaria'] = cell_obj_portaria.hyperlink.target
-                        self.model.save_status_field(contrato_id, 'portaria_edit', str(portaria_text))
-                    
-                    self.model.save_contract_links(contrato_id, link_data)
-                    sucesso_count += 1
-                    print(f"Linha {row_idx}: Links para o contrato '{chave_planilha}' atualizados.")
-                else:
-                    print(f"Linha {row_idx}: Contrato '{chave_planilha}' não encontrado no programa (ou filtrado por vigência).")
-                    falha_count += 1
-            
-            print("--- Importação Finalizada ---")
-            QMessageBox.information(self.view, "Importação Concluída", f"Importação finalizada!\n\nSucessos: {sucesso_count}\nFalhas: {falha_count}")
-            self.main_ctrl.update_table(self.view.uasg_info_label.text().split(" ")[1])
+        # Prévia: nada é gravado até a confirmação
+        texto = (
+            f"Contratos encontrados: {resumo['contratos']} ({resumo['encontradas']} linhas)\n"
+            f"Não encontrados (ou filtrados por vigência): {resumo['nao_encontradas']}\n"
+            f"Formato inválido na coluna 'link_contrato': {resumo['invalidas']}"
+        )
+        if resumo['ambiguas']:
+            texto += f"\nNúmeros sem UASG presentes em mais de uma UASG: {resumo['ambiguas']} (usada a primeira)"
+        preview = QMessageBox(self.view)
+        preview.setIcon(QMessageBox.Icon.Question)
+        preview.setWindowTitle("Prévia da Importação de Links")
+        preview.setText(texto + "\n\nDeseja gravar os links dos contratos encontrados?")
+        preview.setDetailedText(self._link_import_report(plano))
+        preview.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if preview.exec() != QMessageBox.StandardButton.Yes:
+            return
 
+        try:
+            self.model.save_imported_links(plano)
         except Exception as e:
-            QMessageBox.critical(self.view, "Erro ao Importar", f"Ocorreu um erro ao processar a planilha:\n{e}")
+            QMessageBox.critical(self.view, "Erro ao Importar", f"Ocorreu um erro ao gravar os links:\n{e}")
+            return
+
+        print("--- Importação Finalizada ---")
+        QMessageBox.information(self.view, "Importação Concluída",
+                                f"Importação finalizada!\n\nSucessos: {resumo['encontradas']}\nFalhas: {len(plano.falhas)}")
+        self.main_ctrl.update_table(self.view.uasg_info_label.text().split(" ")[1])
+
+    def _link_import_report(self, plano, limite=500):
+        """Texto da prévia: uma linha por contrato encontrado ou linha ignorada da planilha."""
+        linhas = [f"Linha {item.linha}: {item.chave[0]} {item.chave[1]} -> contrato {item.contrato_id}"
+                  for item in plano.itens[:limite]]
+        for falha in plano.falhas[:limite]:
+            if falha.motivo == "invalida":
+                linhas.append(f"Linha {falha.linha}: formato inválido ('{falha.valor}')")
+            else:
+                linhas.append(f"Linha {falha.linha}: '{falha.valor}' não encontrado no programa (ou filtrado por vigência)")
+        excedente = max(0, len(plano.itens) - limite) + max(0, len(plano.falhas) - limite)
+        if excedente:
+            linhas.append(f"... e mais {excedente} linhas.")
+        return "\n".join(linhas)
 
     # =========================================================================
     # EXPORTAR DADOS BI
@@ -449,6 +414,7 @@ class ExpImpTableController:
             # 2. Conectar ao Banco
             if hasattr(self, 'model') and hasattr(self.model, '_get_db_connection'):
                 conn = self.model._get_db_connection()
+                db_path = self.model.db_path
             else:
                 root_dir = os.getcwd()
                 db_path = os.path.join(root_dir, "database", "gerenciador_uasg.db")
@@ -458,8 +424,19 @@ class ExpImpTableController:
                     raise FileNotFoundError("Banco de dados não encontrado.")
                 conn = sqlite3.connect(db_path)
 
+            # 2.1 Resumo dos termos aditivos (tabela pré-calculada, sem abrir o JSON do histórico)
+            aditivos_cols, aditivos_join = "", ""
+            try:
+                from Contratos.model.aditivos_model import AditivosTimeline
+                AditivosTimeline(db_path).refresh()
+                aditivos_cols = (", a.qtd_aditivos, a.crescimento_valor, a.crescimento_pct,"
+                                 " a.dias_prorrogados, a.ultimo_aditivo")
+                aditivos_join = "LEFT JOIN aditivos_resumo a ON a.contrato_id = c.id"
+            except Exception as e:
+                print(f"⚠ Resumo de aditivos fora do relatório BI: {e}")
+
             # 3. Query SQL (agora trazendo UASG nome + vigências)
-            query = """
+            query = f"""
             SELECT 
                 c.numero AS numero_contrato,
                 c.uasg_code AS uasg,
@@ -472,8 +449,10 @@ class ExpImpTableController:
                 s.radio_options_json,
                 c.vigencia_inicio,
                 c.vigencia_fim
+                {aditivos_cols}
             FROM contratos c
             LEFT JOIN status_contratos s ON c.id = s.contrato_id
+            {aditivos_join}
             """
 
             # 4. Carregar no Pandas
@@ -526,6 +505,8 @@ class ExpImpTableController:
             # Se preferir célula vazia ao invés de "NaT"
             df['vigencia_inicio_export'] = df['vigencia_inicio_export'].fillna("")
             df['vigencia_fim_export'] = df['vigencia_fim_export'].fillna("")
+            if 'ultimo_aditivo' in df.columns:
+                df['ultimo_aditivo'] = pd.to_datetime(df['ultimo_aditivo'], errors='coerce').dt.strftime('%d/%m/%Y').fillna("")
 
             hoje = date.today()
 
@@ -559,7 +540,12 @@ class ExpImpTableController:
                 'tipo',
                 'modalidade',
                 'vigencia_inicio_export',
-                'vigencia_fim_export'
+                'vigencia_fim_export',
+                'qtd_aditivos',
+                'crescimento_valor',
+                'crescimento_pct',
+                'dias_prorrogados',
+                'ultimo_aditivo'
             ]
 
             cols_to_export = [c for c in colunas_finais if c in df.columns]
@@ -577,6 +563,11 @@ class ExpImpTableController:
                     'modalidade': 'Modalidade',
                     'vigencia_inicio_export': 'Vigência Início',
                     'vigencia_fim_export': 'Vigência Fim',
+                    'qtd_aditivos': 'Qtd. Aditivos',
+                    'crescimento_valor': 'Crescimento do Valor',
+                    'crescimento_pct': '% Crescimento',
+                    'dias_prorrogados': 'Dias Prorrogados',
+                    'ultimo_aditivo': 'Último Aditivo',
                 }
                 out.rename(columns=rename_map, inplace=True)
                 return out
@@ -626,95 +617,3 @@ class ExpImpTableController:
         except sqlite3.Error as e:
             print(f"Erro ao buscar campo '{field_name}' do DB: {e}")
         return None
-
-    def _normalize_spreadsheet_key(self, key_string):
-        """Extrai (UASG, 'NUMERO/ANO') do formato da planilha 'UASG/ANO-NUM/00'."""
-        match = re.search(r'(\d{5})/(\d{2,4})-(\d+)/', key_string)
-        if match:
-            uasg = match.group(1)
-            year = match.group(2)
-            number = int(match.group(3))
-
-            # Mapeamento de UASG
-            if uasg == '87000': uasg = '787000'
-            elif uasg == '87010': uasg = '787010'
-            
-            # Converte ano de 2 dígitos para 4 dígitos
-            if len(year) == 2:
-                year = f"20{year}"
-            
-            numero_ano_formatado = f"{number:05d}/{year}" # Formato padronizado: 00001/2025
-            return (uasg, numero_ano_formatado)
-        return None
-    
-    def _normalize_contract_number(self, contract_string):
-        """Padroniza o número do contrato da base de dados para o formato 00000/AAAA."""
-        import re
-        if not contract_string:
-            return None
-        
-        numeros = re.findall(r'\d+', str(contract_string))
-        if len(numeros) >= 2:
-            numero = int(numeros[0])
-            ano = str(numeros[1])
-            if len(ano) == 2: 
-                ano = f"20{ano}"
-            return f"{numero:05d}/{ano}"
-            
-        return str(contract_string).strip()
-
-    # O método _normalize_contract_number permanece o mesmo.
-    def _normalize_spreadsheet_key(self, key_string):
-        """Extrai (UASG, 'NUMERO/ANO') ou (None, 'NUMERO/ANO') de formatos variados."""
-        key_string = str(key_string).strip()
-        
-        # Padrão 1: Com UASG (Ex: 87000/21-140/00, 87010/2024-015, 87400/...)
-        match_uasg = re.search(r'(\d{5})[-/](\d{2,4})[-/](\d+)', key_string)
-        if match_uasg:
-            uasg = match_uasg.group(1)
-            part2 = match_uasg.group(2)
-            part3 = match_uasg.group(3)
-            
-            # Descobre quem é o ano (part2 ou part3)
-            if len(part2) == 4 or (len(part2) == 2 and len(part3) >= 3):
-                year = part2
-                number = int(part3)
-            else:
-                year = part3
-                number = int(part2)
-            
-            # Ajuste dinâmico de UASG (Mapeia QUALQUER 87xxx -> 787xxx)
-            if len(uasg) == 5 and uasg.startswith('8'):
-                uasg = f"7{uasg}"
-            
-            if len(year) == 2:
-                year = f"20{year}"
-                
-            numero_ano_formatado = f"{number:05d}/{year}"
-            return (uasg, numero_ano_formatado)
-            
-        # Padrão 2: Sem UASG (Ex: 001-2023, 1531/2017, 2024-0027/00)
-        numeros = re.findall(r'\d+', key_string)
-        if len(numeros) >= 2:
-            n1, n2 = numeros[0], numeros[1]
-            
-            def is_year(s): return len(s) == 4 and 1990 <= int(s) <= 2100
-            
-            if is_year(n2):
-                year, number = n2, int(n1)
-            elif is_year(n1):
-                year, number = n1, int(n2)
-            else:
-                # Fallback para anos de 2 dígitos
-                if len(n2) == 2:
-                    year, number = n2, int(n1)
-                else:
-                    year, number = n1, int(n2)
-                    
-            if len(str(year)) == 2:
-                year = f"20{year}"
-                
-            numero_ano_formatado = f"{number:05d}/{year}"
-            return (None, numero_ano_formatado)
-            
-        return None
@@ -0,0 +1,111 @@
+# controller/fornecedores_controller.py
+
+from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem, QApplication
+from PyQt6.QtCore import Qt
+
+from Contratos.view.fornecedores_view import FornecedoresDialog
+from Contratos.model.fornecedores_model import FornecedoresIndex, format_cnpj
+from Contratos.controller.execucao_financeira_controller import NumericItem
+from utils.formatters import format_brl, format_iso_date
+
+
+def _atas_db_path():
+    """Banco do módulo de atas (se configurado); sem ele o índice considera só os contratos."""
+    try:
+        from atas.model.atas_model import get_db_path_from_config
+        return str(get_db_path_from_config())
+    except Exception as e:
+        print(f"⚠ Banco de atas indisponível para o índice de fornecedores: {e}")
+        return None
+
+
+class FornecedoresController:
+    """Consulta de fornecedores pelo resumo pré-calculado (abre na hora mesmo com muitos contratos)."""
+
+    def __init__(self, model, parent=None):
+        self.model = model
+        self.view = FornecedoresDialog(parent)
+        self.index = FornecedoresIndex(self.model.db_path, _atas_db_path())
+
+        self.view.search_button.clicked.connect(self.search)
+        self.view.search_input.returnPressed.connect(self.search)
+        self.view.suppliers_table.itemSelectionChanged.connect(self.show_selected_supplier)
+
+        self.refresh()
+        self.search()
+
+    def show(self):
+        """Exibe a janela de diálogo."""
+        self.view.exec()
+
+    def refresh(self):
+        """Atualiza só o que mudou desde a última consulta."""
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            stats = self.index.refresh()
+        finally:
+            QApplication.restoreOverrideCursor()
+        if stats["fornecedores"]:
+            self.view.status_label.setText(
+                f"Índice atualizado: {stats['fornecedores']} fornecedores recalculados "
+                f"({stats['contratos']} contratos, {stats['atas']} atas) em {stats['segundos']:.2f}s.")
+
+    def search(self):
+        try:
+            fornecedores = self.index.search(self.view.search_input.text())
+        except Exception as e:
+            QMessageBox.warning(self.view, "Fornecedores", f"Erro ao consultar o índice de fornecedores:\n{e}")
+            return
+
+        table = self.view.suppliers_table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(fornecedores))
+        for row, f in enumerate(fornecedores):
+            cnpj = QTableWidgetItem(format_cnpj(f["cnpj"]))
+            cnpj.setData(Qt.ItemDataRole.UserRole, f["cnpj"])
+            table.setItem(row, 0, cnpj)
+            table.setItem(row, 1, QTableWidgetItem(f["nome"] or ""))
+            for column, key in ((2, "uasgs"), (3, "contratos"), (4, "contratos_ativos"), (7, "atas")):
+                table.setItem(row, column, NumericItem(str(f[key]), f[key]))
+            for column, key in ((5, "valor_contratado"), (6, "total_pago")):
+                table.setItem(row, column, NumericItem(format_brl(f[key]), f[key]))
+            vencimento = QTableWidgetItem(format_iso_date(f["proximo_vencimento"]))
+            vencimento.setData(Qt.ItemDataRole.UserRole, f["proximo_vencimento"] or "")
+            table.setItem(row, 8, vencimento)
+        table.setSortingEnabled(True)
+
+        self.view.contracts_table.setRowCount(0)
+        self.view.atas_table.setRowCount(0)
+        if len(fornecedores) == 1:
+            table.selectRow(0)
+
+    def show_selected_supplier(self):
+        rows = self.view.suppliers_table.selectionModel().selectedRows()
+        if not rows:
+            return
+        cnpj = self.view.suppliers_table.item(rows[0].row(), 0).data(Qt.ItemDataRole.UserRole)
+
+        contratos = self.index.supplier_contracts(cnpj)
+        table = self.view.contracts_table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(contratos))
+        for row, c in enumerate(contratos):
+            table.setItem(row, 0, QTableWidgetItem(c["numero"] or ""))
+            table.setItem(row, 1, QTableWidgetItem(c["uasg_code"] or ""))
+            table.setItem(row, 2, NumericItem(format_brl(c["valor_global"]), c["valor_global"]))
+            table.setItem(row, 3, NumericItem(format_brl(c["pago"]), c["pago"]))
+            table.setItem(row, 4, QTableWidgetItem(format_iso_date(c["vigencia_fim"])))
+        table.setSortingEnabled(True)
+
+        atas = self.index.supplier_atas(cnpj)
+        table = self.view.atas_table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(atas))
+        for row, a in enumerate(atas):
+            table.setItem(row, 0, QTableWidgetItem(a["numero"] or ""))
+            table.setItem(row, 1, QTableWidgetItem(a["empresa"] or ""))
+            table.setItem(row, 2, NumericItem(format_brl(a["valor_global"]), a["valor_global"]))
+            table.setItem(row, 3, QTableWidgetItem(format_iso_date(a["termino"])))
+        table.setSortingEnabled(True)
+        self.view.detail_tabs.setTabText(0, f"Contratos ({len(contratos)})")
+        self.view.detail_tabs.setTabText(1, f"Atas ({len(atas)})")
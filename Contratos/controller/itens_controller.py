@@ -22,7 +22,7 @@ class ItensController:
         """
         contrato_id = contract_data.get("id")
 
-        itens, error_itens = self.model.get_sub_data_for_contract(contrato_id, "itens")
+        itens, error_itens = self.model.get_sub_data_cached(contrato_id, "itens")
 
         if error_itens or not itens:
             QMessageBox.critical(self.parent_view, "Erro de Dados", "Não foi possível buscar os itens para gerar o relatório.")
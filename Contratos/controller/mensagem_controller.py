@@ -3,24 +3,36 @@
 import os
 from PyQt6.QtWidgets import (QApplication, QPushButton, QMessageBox, 
                              QInputDialog, QDialog, QVBoxLayout, QTextEdit, QListWidgetItem)
-from PyQt6.QtCore import Qt # Certifique-se de que Qt está importado
+from PyQt6.QtCore import Qt, QTimer # Certifique-se de que Qt está importado
 
 from Contratos.view.mensagem_view import MensagemDialog
 from Contratos.model.uasg_model import UASGModel,resource_path
 from Contratos.model.models import RegistroMensagem
+from Contratos.model.mensagem_lote_model import build_contract_context, set_locale_pt_br
+from utils.template_engine import compile_template
 
 from datetime import datetime
-import locale
 import sqlite3
 
+# Espera após a última tecla antes de atualizar a pré-visualização
+PREVIEW_DEBOUNCE_MS = 200
+
 class MensagemController:
     def __init__(self, contract_data, model: UASGModel, parent=None):
         self.contract_data = contract_data
         self.model = model
         self.templates = self._load_templates()
         self.current_template_path = None
+        # Contexto de variáveis do contrato (montado uma vez; ver _get_context)
+        self._context = None
+        self._context_contract_id = None
         
         self.view = MensagemDialog(parent)
+
+        self._preview_timer = QTimer(self.view)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(PREVIEW_DEBOUNCE_MS)
+        self._preview_timer.timeout.connect(self._update_preview)
         
         self._populate_variables_list()
         self._create_template_buttons()
@@ -30,7 +42,8 @@ class MensagemController:
         # Conecta os sinais
         self.view.save_template_button.clicked.connect(self._save_current_template)
         self.view.copy_button.clicked.connect(self._copy_message_to_clipboard)
-        self.view.template_text_edit.textChanged.connect(self._update_preview)
+        self.view.batch_button.clicked.connect(self._open_batch_dialog)
+        self.view.template_text_edit.textChanged.connect(self._preview_timer.start)
 
         self.view.add_comment_button.clicked.connect(self._add_comment)
         self.view.delete_comment_button.clicked.connect(self._delete_comment)
@@ -52,57 +65,39 @@ class MensagemController:
                     templates[name] = os.path.join(template_dir, filename)
         return templates
 
-    def _populate_variables_list(self):
-        """Preenche a lista de variáveis com os dados do contrato e as novas variáveis dinâmicas."""
-        try:
-            locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-        except locale.Error:
-            print("Aviso: Locale 'pt_BR.UTF-8' não encontrado. Usando o padrão do sistema.")
+    def _get_context(self):
+        """
+        Monta o dicionário de variáveis do contrato uma única vez (locale, objeto editado no DB,
+        datas formatadas) e reaproveita até o contrato mudar.
+        """
+        contrato_id = self.contract_data.get('id')
+        if self._context is not None and self._context_contract_id == contrato_id:
+            return self._context
+
+        set_locale_pt_br()
 
-        self.view.variables_list.clear()
-        
-        hoje = datetime.now()
-        
-        # --- LÓGICA REPETIDA PARA CONSISTÊNCIA ---
         objeto_editado_db = ""
         conn = self.model._get_db_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute("SELECT objeto_editado FROM status_contratos WHERE contrato_id = ?", (self.contract_data.get('id'),))
+            cursor.execute("SELECT objeto_editado FROM status_contratos WHERE contrato_id = ?", (contrato_id,))
             result = cursor.fetchone()
             if result and result['objeto_editado']:
                 objeto_editado_db = result['objeto_editado']
         finally:
             conn.close()
-            
-        objeto_completo_original = self.contract_data.get('objeto', '')
-        objeto_editado_final = objeto_editado_db if objeto_editado_db else objeto_completo_original
-        
-        vigencia_fim_str = self.contract_data.get('vigencia_fim')
-        vigencia_fim_formatada = "N/A"
-        if vigencia_fim_str:
-            try:
-                dt_obj = datetime.strptime(vigencia_fim_str, "%Y-%m-%d")
-                vigencia_fim_formatada = dt_obj.strftime("%d%b%Y").upper()
-            except ValueError:
-                vigencia_fim_formatada = "Data Inválida"
-
-        all_data = {
-            **self.contract_data, 
-            **self.contract_data.get('fornecedor', {}),
-            'objeto_completo': objeto_completo_original,
-            'objeto_editado': objeto_editado_final,
-            'dia_hoje': hoje.strftime("%d"),
-            'mes_hoje': hoje.strftime("%b").upper(),
-            'vigencia_fim_formatada': vigencia_fim_formatada
-        }
-        
-        # REMOVIDA A LÓGICA QUE RENOMEAVA 'objeto' PARA 'objeto_editado'
-        for key, value in all_data.items():
-            if isinstance(value, (str, int, float)) and value:
-                # Oculta o 'objeto' original para não confundir, já que temos as duas novas variáveis
-                if key != 'objeto':
-                    self.view.variables_list.addItem(f"{{{{{key}}}}} : {value}")
+
+        self._context = build_contract_context(self.contract_data, objeto_editado_db)
+        self._context_contract_id = contrato_id
+        return self._context
+
+    def _populate_variables_list(self):
+        """Preenche a lista de variáveis com os dados do contrato e as novas variáveis dinâmicas."""
+        self.view.variables_list.clear()
+        for key, value in self._get_context().items():
+            # Oculta o 'objeto' original para não confundir, já que temos as duas novas variáveis
+            if value and key != 'objeto':
+                self.view.variables_list.addItem(f"{{{{{key}}}}} : {value}")
 
     def _create_template_buttons(self):
         """Cria um botão para cada template encontrado."""
@@ -119,7 +114,9 @@ class MensagemController:
                 template_content = f.read()
             
             self.view.template_text_edit.setPlainText(template_content)
-            # A pré-visualização será atualizada automaticamente pelo sinal textChanged
+            # Troca de modelo não precisa esperar o debounce
+            self._preview_timer.stop()
+            self._update_preview()
             
             template_name = os.path.basename(template_path)
             display_name = os.path.splitext(template_name)[0].replace('_', ' ').title()
@@ -130,63 +127,19 @@ class MensagemController:
             self.current_template_path = None
             self.view.current_template_label.setText("Erro ao carregar")
 
-    # --- NOVA FUNÇÃO DE ATUALIZAÇÃO ---
     def _update_preview(self):
         """Aplica as variáveis ao texto do editor e exibe na pré-visualização."""
-        try:
-            locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-        except locale.Error:
-            pass # Ignora o erro se o locale não estiver disponível
+        template = compile_template(self.view.template_text_edit.toPlainText())
+        context = self._get_context()
+        self.view.preview_text_edit.setPlainText(template.render(context))
 
-        current_text = self.view.template_text_edit.toPlainText()
-        
-        # --- LÓGICA DE CRIAÇÃO DE VARIÁVEIS ADICIONADA AQUI ---
-        hoje = datetime.now()
-        objeto_editado_db = ""
-        # Precisamos de uma instância do model para acessar o DB
-        conn = self.model._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT objeto_editado FROM status_contratos WHERE contrato_id = ?", (self.contract_data.get('id'),))
-            result = cursor.fetchone()
-            if result and result['objeto_editado']:
-                objeto_editado_db = result['objeto_editado']
-        finally:
-            conn.close()
+        unknown = template.unknown_variables(context)
+        if unknown:
+            self.view.unknown_variables_label.setText(
+                "Variáveis sem valor: " + ", ".join(f"{{{{{name}}}}}" for name in unknown)
+            )
+        self.view.unknown_variables_label.setVisible(bool(unknown))
 
-        # O objeto completo sempre virá do dado original do contrato
-        objeto_completo_original = self.contract_data.get('objeto', '')
-        # Se não houver objeto editado no DB, use o original como fallback
-        objeto_editado_final = objeto_editado_db if objeto_editado_db else objeto_completo_original
-        
-        vigencia_fim_str = self.contract_data.get('vigencia_fim')
-        vigencia_fim_formatada = "N/A"
-        if vigencia_fim_str:
-            try:
-                dt_obj = datetime.strptime(vigencia_fim_str, "%Y-%m-%d")
-                vigencia_fim_formatada = dt_obj.strftime("%d%b%Y").upper()
-            except ValueError:
-                vigencia_fim_formatada = "Data Inválida"
-
-        # ALTERADO: Dicionário de dados agora tem as duas versões do objeto
-        all_data = {
-            **self.contract_data, 
-            **self.contract_data.get('fornecedor', {}),
-            'objeto_completo': objeto_completo_original,
-            'objeto_editado': objeto_editado_final,
-            'dia_hoje': hoje.strftime("%d"),
-            'mes_hoje': hoje.strftime("%b").upper(),
-            'vigencia_fim_formatada': vigencia_fim_formatada
-        }
-        
-        # --- LÓGICA DE SUBSTITUIÇÃO SIMPLIFICADA E CORRIGIDA ---
-        message = current_text
-        for key, value in all_data.items():
-            # A verificação 'isinstance' previne erros com valores nulos ou de outros tipos
-            if isinstance(value, (str, int, float)):
-                message = message.replace(f"{{{{{key}}}}}", str(value))
-
-        self.view.preview_text_edit.setPlainText(message)
     def _save_current_template(self):
         """Salva o conteúdo atual do editor de texto."""
         # ... (código inalterado)
@@ -201,8 +154,17 @@ class MensagemController:
         except Exception as e:
             QMessageBox.critical(self.view, "Erro", f"Não foi possível salvar o modelo:\n{e}")
 
+    def _open_batch_dialog(self):
+        """Abre a geração em lote já com o modelo atual selecionado."""
+        from Contratos.controller.mensagem_lote_controller import MensagemLoteController
+        MensagemLoteController(self.model, parent=self.view, template_path=self.current_template_path).show()
+
     def _copy_message_to_clipboard(self):
         """Copia a MENSAGEM PRONTA (da pré-visualização) para a área de transferência."""
+        if self._preview_timer.isActive():
+            # Garante que a última digitação já esteja aplicada
+            self._preview_timer.stop()
+            self._update_preview()
         clipboard = QApplication.clipboard()
         # Copia o texto da PRÉ-VISUALIZAÇÃO, que já tem as variáveis aplicadas
         clipboard.setText(self.view.preview_text_edit.toPlainText())
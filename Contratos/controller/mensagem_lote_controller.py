@@ -0,0 +1,145 @@
+# controller/mensagem_lote_controller.py
+
+import os
+from PyQt6.QtWidgets import QFileDialog, QMessageBox
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from Contratos.view.mensagem_lote_view import MensagemLoteDialog
+from Contratos.model.mensagem_lote_model import (
+    list_templates, list_selection_values, generate_batch_messages,
+    SELECAO_UASG, SELECAO_STATUS, SELECAO_VENCENDO, SAIDA_ARQUIVOS, SAIDA_DOCUMENTO,
+)
+
+
+class MensagemLoteWorker(QThread):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool, str) # Sinais: Sucesso (True/False), Mensagem
+
+    def __init__(self, db_path, template_path, output_dir, selecao, valor, saida, formato):
+        super().__init__()
+        self.db_path = db_path
+        self.template_path = template_path
+        self.output_dir = output_dir
+        self.selecao = selecao
+        self.valor = valor
+        self.saida = saida
+        self.formato = formato
+        self._cancelled = False
+        self.stats = {}
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _report_progress(self, total):
+        # Emite a cada 50 mensagens para não inundar a fila de eventos da interface
+        if total % 50 == 0:
+            self.progress.emit(total)
+
+    def run(self):
+        try:
+            success, message, self.stats = generate_batch_messages(
+                self.db_path, self.template_path, self.output_dir,
+                selecao=self.selecao, valor=self.valor, saida=self.saida, formato=self.formato,
+                progress_callback=self._report_progress,
+                should_cancel=lambda: self._cancelled,
+            )
+            if self._cancelled:
+                message = f"Geração cancelada após {self.stats.get('total', 0)} mensagens."
+            self.finished.emit(success, message)
+        except Exception as e:
+            self.finished.emit(False, f"Erro interno na geração em lote: {str(e)}")
+
+
+class MensagemLoteController:
+    """Liga a janela de mensagens em lote ao gerador (executado em segundo plano)."""
+
+    def __init__(self, model, parent=None, template_path=None):
+        self.model = model
+        self.worker = None
+        self.view = MensagemLoteDialog(parent)
+
+        self.templates = list_templates()
+        for name, path in self.templates.items():
+            self.view.template_combo.addItem(name, path)
+        if template_path:
+            index = self.view.template_combo.findData(template_path)
+            if index >= 0:
+                self.view.template_combo.setCurrentIndex(index)
+
+        self.view.selection_combo.addItem("Por UASG", SELECAO_UASG)
+        self.view.selection_combo.addItem("Por Status", SELECAO_STATUS)
+        self.view.selection_combo.addItem("Vencendo em N dias", SELECAO_VENCENDO)
+
+        uasgs, statuses = list_selection_values(self.model.db_path)
+        self.view.uasg_combo.addItems([str(u) for u in uasgs])
+        self.view.status_combo.addItems(statuses)
+
+        self.view.output_combo.addItem("Um arquivo por contrato", SAIDA_ARQUIVOS)
+        self.view.output_combo.addItem("Documento único", SAIDA_DOCUMENTO)
+
+        self.view.folder_edit.setText(os.path.join(os.path.expanduser("~"), "Mensagens em Lote"))
+
+        self.view.folder_button.clicked.connect(self._choose_folder)
+        self.view.generate_button.clicked.connect(self._start_generation)
+        self.view.cancel_button.clicked.connect(self._cancel_generation)
+
+    def show(self):
+        """Exibe a janela de diálogo."""
+        self.view.exec()
+
+    def _choose_folder(self):
+        folder = QFileDialog.getExistingDirectory(self.view, "Pasta de saída", self.view.folder_edit.text())
+        if folder:
+            self.view.folder_edit.setText(folder)
+
+    def _selection_value(self, selecao):
+        if selecao == SELECAO_UASG:
+            return self.view.uasg_combo.currentText()
+        if selecao == SELECAO_STATUS:
+            return self.view.status_combo.currentText()
+        return self.view.dias_spin.value()
+
+    def _start_generation(self):
+        template_path = self.view.template_combo.currentData()
+        if not template_path:
+            QMessageBox.warning(self.view, "Modelo", "Nenhum modelo de mensagem disponível.")
+            return
+
+        selecao = self.view.selection_combo.currentData()
+        valor = self._selection_value(selecao)
+        if valor in (None, ""):
+            QMessageBox.warning(self.view, "Seleção", "Escolha um valor para a seleção.")
+            return
+
+        self.worker = MensagemLoteWorker(
+            self.model.db_path, template_path, self.view.folder_edit.text(), selecao, valor,
+            self.view.output_combo.currentData(), self.view.format_combo.currentData(),
+        )
+        # O diálogo cancela e espera a thread se for fechado no meio da geração
+        self.view.track_worker(self.worker)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.finished.connect(self._on_finished)
+        self.view.set_running(True)
+        self.view.status_label.setText("Gerando mensagens...")
+        self.worker.start()
+
+    def _cancel_generation(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def _on_progress(self, total):
+        self.view.status_label.setText(f"{total} mensagens geradas...")
+
+    def _on_finished(self, success, message):
+        self.view.set_running(False)
+        if not self.view.isVisible():
+            # Diálogo fechado no meio da geração (a thread já foi cancelada e aguardada)
+            return
+        stats = self.worker.stats if self.worker else {}
+        if stats.get("variaveis_sem_valor"):
+            message += "\n\nVariáveis sem valor: " + ", ".join("{{" + v + "}}" for v in stats["variaveis_sem_valor"])
+        self.view.status_label.setText(message)
+        if success:
+            QMessageBox.information(self.view, "Mensagens em Lote", message)
+        else:
+            QMessageBox.warning(self.view, "Mensagens em Lote", message)
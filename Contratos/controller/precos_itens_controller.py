@@ -0,0 +1,108 @@
+# controller/precos_itens_controller.py
+
+from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem, QApplication
+from PyQt6.QtCore import Qt
+
+from Contratos.view.precos_itens_view import PrecosItensDialog
+from Contratos.model.precos_itens_model import PrecosItens
+from Contratos.controller.execucao_financeira_controller import NumericItem
+from utils.formatters import format_brl, format_iso_date
+
+
+class PrecosItensController:
+    """Consulta o que já foi pago por um item de catálogo em todos os contratos offline."""
+
+    def __init__(self, model, parent=None, catmatseritem_id=None):
+        self.model = model
+        self.view = PrecosItensDialog(parent)
+        self.precos = PrecosItens(self.model.db_path)
+        self._resultados = []
+
+        self.view.search_button.clicked.connect(self.search)
+        self.view.search_input.returnPressed.connect(self.search)
+        self.view.catalog_table.itemSelectionChanged.connect(self.show_selected_history)
+
+        self.refresh()
+        if catmatseritem_id:
+            self.view.search_input.setText(str(catmatseritem_id))
+        self.search()
+
+    def show(self):
+        """Exibe a janela de diálogo."""
+        self.view.exec()
+
+    def refresh(self):
+        """Atualiza o índice só com os contratos alterados desde a última vez."""
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            stats = self.precos.refresh()
+        finally:
+            QApplication.restoreOverrideCursor()
+        if stats["contratos"]:
+            self.view.status_label.setText(
+                f"Índice atualizado: {stats['itens']} itens de {stats['contratos']} contratos "
+                f"({stats['catalogo']} itens de catálogo) em {stats['segundos']:.2f}s.")
+
+    def search(self):
+        try:
+            self._resultados = self.precos.search(self.view.search_input.text())
+        except Exception as e:
+            QMessageBox.warning(self.view, "Preços de Itens", f"Erro ao consultar o índice de preços:\n{e}")
+            return
+
+        table = self.view.catalog_table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(self._resultados))
+        for row, item in enumerate(self._resultados):
+            codigo = QTableWidgetItem(item["catmatseritem_id"])
+            codigo.setData(Qt.ItemDataRole.UserRole, item["catmatseritem_id"])
+            table.setItem(row, 0, codigo)
+            table.setItem(row, 1, QTableWidgetItem(item["descricao"] or ""))
+            for column, key in ((2, "ocorrencias"), (3, "contratos"), (4, "uasgs")):
+                table.setItem(row, column, NumericItem(str(item[key]), item[key]))
+            for column, key in ((5, "minimo"), (6, "mediana"), (7, "maximo"), (8, "ultimo_preco")):
+                table.setItem(row, column, NumericItem(format_brl(item[key]), item[key]))
+            table.setItem(row, 9, QTableWidgetItem(format_iso_date(item["ultima_data"])))
+        table.setSortingEnabled(True)
+
+        self.view.history_table.setRowCount(0)
+        if len(self._resultados) == 1:
+            table.selectRow(0)
+        elif not self._resultados:
+            self.view.history_label.setText("Nenhum item de catálogo encontrado.")
+
+    def show_selected_history(self):
+        rows = self.view.catalog_table.selectionModel().selectedRows()
+        if not rows:
+            return
+        catmat = self.view.catalog_table.item(rows[0].row(), 0).data(Qt.ItemDataRole.UserRole)
+        estat = self.precos.item_statistics(catmat)
+        historico = self.precos.price_history(catmat)
+
+        outliers = sum(1 for h in historico if h["outlier"])
+        texto = (f"<b>{catmat}</b> — mediana <b>{format_brl(estat['mediana'])}</b>, "
+                 f"de {format_brl(estat['minimo'])} a {format_brl(estat['maximo'])}")
+        if estat["limite_superior"] is not None:
+            texto += (f" • faixa esperada {format_brl(max(estat['limite_inferior'], 0))} a "
+                      f"{format_brl(estat['limite_superior'])} • <b>{outliers}</b> outlier(s)")
+        self.view.history_label.setText(texto)
+
+        table = self.view.history_table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(historico))
+        for row, h in enumerate(historico):
+            values = [
+                QTableWidgetItem(format_iso_date(h["data_referencia"])),
+                QTableWidgetItem(h["uasg_code"] or ""),
+                QTableWidgetItem(h["numero_contrato"] or ""),
+                QTableWidgetItem(h["fornecedor_nome"] or ""),
+                NumericItem(f"{h['quantidade']:g}", h["quantidade"]),
+                NumericItem(format_brl(h["valor_unitario"]), h["valor_unitario"]),
+                QTableWidgetItem("Sim" if h["outlier"] else ""),
+                QTableWidgetItem(h["descricao"] or ""),
+            ]
+            for column, item in enumerate(values):
+                if h["outlier"]:
+                    item.setForeground(Qt.GlobalColor.red)
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
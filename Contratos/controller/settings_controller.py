@@ -1,14 +1,75 @@
 # Contratos/controller/settings_controller.py
 
-from PyQt6.QtCore import pyqtSignal, QObject
-from PyQt6.QtWidgets import QMessageBox, QFileDialog
+from PyQt6.QtCore import pyqtSignal, QObject, QThread, Qt
+from PyQt6.QtWidgets import QMessageBox, QFileDialog, QProgressDialog
 from Contratos.view.settings_dialog import SettingsDialog
 from Contratos.model.offline_db_model import OfflineDBController
+from Contratos.model.offline_build_model import OfflineBuildJob
+from Contratos.model.change_feed_model import ChangeFeed, ChangeFeedClient
 from pathlib import Path
 import shutil
 import os
+import re
 import sys
 
+
+class OfflineBuildWorker(QThread):
+    progress = pyqtSignal(int, int)  # contratos concluídos, total
+    finished = pyqtSignal(bool, str) # Sinais: Sucesso (True/False), Mensagem
+
+    def __init__(self, job, uasgs):
+        super().__init__()
+        self.job = job
+        self.uasgs = uasgs
+        self._cancelled = False
+        self.stats = {}
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            self.stats = self.job.run(self.uasgs, progress_callback=self.progress.emit,
+                                      should_cancel=lambda: self._cancelled)
+            message = (
+                f"{self.stats['contratos']} contratos de {self.stats['uasgs']} UASG(s), "
+                f"{self.stats['alterados']} novos ou alterados:\n"
+                f"• {self.stats['baixados']} sub-recursos baixados\n"
+                f"• {self.stats['em_dia']} já estavam em dia\n"
+                f"• {self.stats['removidas']} registros que saíram da API removidos\n"
+                f"• {self.stats['erros']} com erro"
+            )
+            if self.stats["cancelado"]:
+                message += "\n\nCancelado: o que já foi baixado está salvo e será retomado na próxima execução."
+            if self.stats["falhas"]:
+                message += "\n\nFalhas:\n" + "\n".join(self.stats["falhas"][:5])
+            self.finished.emit(not self.stats["erros"] and not self.stats["cancelado"], message)
+        except Exception as e:
+            self.finished.emit(False, f"Erro interno ao montar o banco offline: {str(e)}")
+
+
+class ChangeFeedSyncWorker(QThread):
+    finished = pyqtSignal(bool, str) # Sinais: Sucesso (True/False), Mensagem
+
+    def __init__(self, db_path, server_url):
+        super().__init__()
+        self.db_path = db_path
+        self.server_url = server_url
+        self.stats = {}
+
+    def run(self):
+        try:
+            self.stats = ChangeFeedClient(ChangeFeed(self.db_path), self.server_url).sync()
+            self.finished.emit(True, (
+                f"• {self.stats['recebidas']} alterações recebidas ({self.stats['aplicadas']} aplicadas, "
+                f"{self.stats['ignoradas']} ignoradas: superadas por edições locais ou em conflito)\n"
+                f"• {self.stats['enviadas']} alterações enviadas\n\n"
+                f"Tempo: {self.stats['segundos']:.1f}s"
+            ))
+        except Exception as e:
+            self.finished.emit(False, f"Não foi possível sincronizar com {self.server_url}:\n{e}")
+
+
 class SettingsController(QObject):
     mode_changed = pyqtSignal(str)
     database_updated = pyqtSignal()
@@ -18,6 +79,8 @@ class SettingsController(QObject):
         self.model = model
         self.view = SettingsDialog(parent)
         self.offline_db_model = OfflineDBController(parent_view=self.view)
+        self.offline_worker = None
+        self.sync_worker = None
         
         # Conecta os botões
         self.view.close_button.clicked.connect(self.view.close)
@@ -26,6 +89,9 @@ class SettingsController(QObject):
         self.view.create_db_button.clicked.connect(self.run_create_offline_db)
         self.view.delete_db_button.clicked.connect(self.run_delete_offline_db)
         self.view.btn_abrir_local_db.clicked.connect(self.open_db_path)
+        self.view.documents_button.clicked.connect(self.open_documents_cache)
+        self.view.mirror_url_input.editingFinished.connect(self._save_mirror_url)
+        self.view.sync_status_button.clicked.connect(self.run_sync_status)
         
         self._load_initial_state()
     
@@ -39,6 +105,8 @@ class SettingsController(QObject):
         self._update_button_style()
         self.mode_changed.emit(self.current_mode)
         
+        self.view.mirror_url_input.setText(self.model.load_setting("mirror_url", ""))
+
         # ==================== ✅ CARREGA O CAMINHO ATUAL DO BANCO ====================
         current_db_path = self.model.get_current_db_path()
         self.view.db_path_label.setText(f"Caminho Atual: {current_db_path}")
@@ -148,8 +216,10 @@ class SettingsController(QObject):
             )
     
     def _toggle_data_mode(self):
-        """Alterna entre os modos Online e Offline e emite o sinal."""
+        """Alterna entre os modos Online, Híbrido e Offline (nessa ordem) e emite o sinal."""
         if self.current_mode == "Online":
+            self.current_mode = "Híbrido"
+        elif self.current_mode == "Híbrido":
             self.current_mode = "Offline"
         else:
             self.current_mode = "Online"
@@ -158,38 +228,128 @@ class SettingsController(QObject):
         self._update_button_style()
         self.mode_changed.emit(self.current_mode)
     
+    def _save_mirror_url(self):
+        """Salva o endereço do espelho da rede local (vazio = direto na API pública)."""
+        url = self.view.mirror_url_input.text().strip().rstrip("/")
+        if url and not url.startswith(("http://", "https://")):
+            url = f"http://{url}"
+        self.view.mirror_url_input.setText(url)
+        if url != self.model.load_setting("mirror_url", ""):
+            self.model.save_setting("mirror_url", url)
+            print(f"✅ Espelho da rede local: {url or 'desativado'}")
+
+    def run_sync_status(self):
+        """Troca com o servidor (app.py no endereço do espelho) as alterações de status desde a última vez."""
+        self._save_mirror_url()
+        server_url = self.model.load_setting("mirror_url", "")
+        if not server_url:
+            QMessageBox.warning(self.view, "Servidor não configurado",
+                                "Informe o endereço do servidor (app.py) no campo Servidor Espelho.")
+            return
+        if self.sync_worker is not None and self.sync_worker.isRunning():
+            return
+
+        self.view.sync_status_button.setEnabled(False)
+        self.sync_worker = ChangeFeedSyncWorker(self.model.get_current_db_path(), server_url)
+        self.view.track_worker(self.sync_worker)
+        self.sync_worker.finished.connect(self._on_sync_status_finished)
+        self.sync_worker.start()
+
+    def _on_sync_status_finished(self, success, message):
+        # 'finished' é emitido de dentro do run(): espera a thread terminar de fato
+        self.sync_worker.wait()
+        self.view.sync_status_button.setEnabled(True)
+        if self.sync_worker.stats.get("aplicadas"):
+            self.database_updated.emit()
+        if not self.view.isVisible():
+            return
+        if success:
+            QMessageBox.information(self.view, "Status Sincronizados", message)
+        else:
+            QMessageBox.critical(self.view, "Erro na Sincronização", message)
+
     def _update_button_style(self):
         """Atualiza o texto e a cor do botão com base no modo."""
         if self.current_mode == "Online":
             self.view.mode_button.setText("Online")
             self.view.mode_button.setChecked(True)
             self.view.mode_button.setStyleSheet("background-color: #2ECC71; color: white; font-weight: bold;")
+        elif self.current_mode == "Híbrido":
+            # Banco local na hora, revalidado pela API em segundo plano
+            self.view.mode_button.setText("Híbrido")
+            self.view.mode_button.setChecked(True)
+            self.view.mode_button.setStyleSheet("background-color: #F39C12; color: white; font-weight: bold;")
         else:
             self.view.mode_button.setText("Offline")
             self.view.mode_button.setChecked(False)
             self.view.mode_button.setStyleSheet("background-color: #E74C3C; color: white; font-weight: bold;")
     
     def run_create_offline_db(self):
-        """Inicia o processo de criação/atualização do banco de dados offline."""
-        uasg = self.view.offline_uasg_input.text().strip()
+        """
+        Cria/atualiza o banco offline para uma ou mais UASGs (separadas por vírgula ou
+        espaço; vazio = todas as UASGs salvas). Roda em segundo plano e pode ser retomado.
+        """
+        uasgs = [u for u in re.split(r"[\s,;]+", self.view.offline_uasg_input.text().strip()) if u]
         
-        if not uasg.isdigit():
-            QMessageBox.warning(self.view, "Entrada Inválida", "Por favor, insira um número de UASG válido.")
+        if not all(u.isdigit() for u in uasgs):
+            QMessageBox.warning(self.view, "Entrada Inválida", "Por favor, insira números de UASG válidos.")
             return
         
+        # Passa pelo espelho da rede local, se configurado
+        job = OfflineBuildJob(self.offline_db_model.db_path, fetch_json=self.model.fetch_json_with_retries)
+        alvo = ", ".join(uasgs) if uasgs else f"todas as UASGs salvas ({len(job.saved_uasgs())})"
         reply = QMessageBox.question(
             self.view, 
             "Confirmação", 
-            f"Deseja criar/atualizar o banco de dados offline para a UASG {uasg}?\n\n"
-            "Isso pode levar alguns minutos dependendo da quantidade de contratos.",
+            f"Deseja criar/atualizar o banco de dados offline para {alvo}?\n\n"
+            "Isso pode levar alguns minutos dependendo da quantidade de contratos. "
+            "Se for interrompido, a próxima execução continua de onde parou.",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No
         )
         
-        if reply == QMessageBox.StandardButton.Yes:
-            self.offline_db_model.process_and_save_all_data(uasg)
-            QMessageBox.information(self.view, "Concluído", f"Banco de dados offline para UASG {uasg} criado/atualizado com sucesso.")
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        self.offline_progress = QProgressDialog("Buscando a lista de contratos...", "Cancelar", 0, 0, self.view)
+        self.offline_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.offline_progress.setWindowTitle("Criando Banco de Dados Offline")
+        self.offline_progress.setMinimumDuration(0)
+        # O total cresce à medida que as listas das UASGs chegam
+        self.offline_progress.setAutoReset(False)
+        self.offline_progress.setAutoClose(False)
+
+        self.offline_worker = OfflineBuildWorker(job, uasgs)
+        # Fechar as Configurações no meio da montagem cancela e espera a thread
+        self.view.track_worker(self.offline_worker)
+        self.offline_worker.progress.connect(self._on_offline_progress)
+        self.offline_worker.finished.connect(self._on_offline_finished)
+        self.offline_progress.canceled.connect(self.offline_worker.cancel)
+        self.view.create_db_button.setEnabled(False)
+        self.offline_worker.start()
+
+    def _on_offline_progress(self, concluidos, total):
+        # setValue de um diálogo modal processa eventos: o término pode chegar antes dos últimos avisos
+        if self.offline_worker is None or self.offline_worker.stats:
+            return
+        self.offline_progress.setMaximum(total)
+        self.offline_progress.setValue(concluidos)
+        self.offline_progress.setLabelText(f"{concluidos}/{total} contratos processados...")
+
+    def _on_offline_finished(self, success, message):
+        # 'finished' é emitido de dentro do run(): espera a thread terminar antes de soltar a referência
+        self.offline_worker.wait()
+        self.offline_progress.canceled.disconnect()
+        self.offline_progress.close()
+        self.view.create_db_button.setEnabled(True)
+        if self.offline_worker.stats.get("contratos"):
             self.database_updated.emit()
+        if self.view.isVisible():
+            if success:
+                QMessageBox.information(self.view, "Concluído", message)
+            else:
+                QMessageBox.warning(self.view, "Banco de Dados Offline", message)
+        self.offline_worker = None
     
     def run_delete_offline_db(self):
         """Inicia o processo de exclusão de uma UASG do banco de dados offline."""
@@ -213,6 +373,11 @@ class SettingsController(QObject):
             QMessageBox.information(self.view, "Concluído", f"Os dados da UASG {uasg} foram removidos.")
             self.database_updated.emit()
 
+    def open_documents_cache(self):
+        """Abre a janela de download dos documentos dos contratos para uso local."""
+        from Contratos.controller.documentos_cache_controller import DocumentosCacheController
+        DocumentosCacheController(self.model, self.view).show()
+
     def open_db_path(self):
         """Abre a pasta onde o banco de dados está salvo no explorador de arquivos."""
         db_file_path = self.model.get_current_db_path()
@@ -3,19 +3,23 @@ from Contratos.view.main_window import MainWindow
 from Contratos.model.uasg_model import UASGModel
 from utils.utils import refresh_uasg_menu
 from utils.icon_loader import icon_manager
+from utils.sql_profiler import sql_profiler
 
 from Contratos.view.details_dialog import DetailsDialog
 from Contratos.view.menus.status_options_dialog import StatusOptionsDialog
 from Contratos.view.record_popup import RecordPopup
 
-from Contratos.controller.controller_table import populate_table, update_row_from_details
+from Contratos.controller.controller_table import populate_table, update_row_from_details, update_rows_for_contracts
 from Contratos.controller.mensagem_controller import MensagemController
 from Contratos.controller.settings_controller import SettingsController
 from Contratos.controller.manual_contract_controller import ManualContractController
+from Contratos.model.documentos_model import CONTRATO_DOCUMENTOS, contrato_document_jobs
+from utils.docx_engine import DOCUMENT_TEMPLATES
+from utils.docx_worker import run_document_generation
 
 from PyQt6.QtWidgets import QMessageBox, QMenu, QFileDialog, QApplication, QHeaderView
 from PyQt6.QtGui import QStandardItem, QFont, QColor, QBrush
-from PyQt6.QtCore import Qt, QSortFilterProxyModel, QRegularExpression
+from PyQt6.QtCore import Qt, QSortFilterProxyModel, QRegularExpression, QTimer
 import requests
 import sqlite3
 import json
@@ -23,6 +27,9 @@ from datetime import datetime
 import re
 import shutil
 
+# Tempo com o mouse parado sobre uma linha antes de pré-carregar os detalhes
+HOVER_PREFETCH_MS = 300
+
 class UASGController:
     def __init__(self, base_dir, parent_view=None): 
         from .dashboard_controller import DashboardController
@@ -53,10 +60,23 @@ class UASGController:
         self.view.settings_button.clicked.connect(self.show_settings_dialog)
         self.view.table.doubleClicked.connect(self._open_details_from_double_click)
 
+        # Pré-carrega as abas de detalhes do contrato selecionado ou sob o mouse
+        self._hovered_row = None
+        self._hover_prefetch_timer = QTimer(self.view)
+        self._hover_prefetch_timer.setSingleShot(True)
+        self._hover_prefetch_timer.setInterval(HOVER_PREFETCH_MS)
+        self._hover_prefetch_timer.timeout.connect(self._prefetch_hovered_contract)
+        self.view.table.setMouseTracking(True)
+        self.view.table.entered.connect(self._on_table_hover)
+        self.view.table.selectionModel().currentRowChanged.connect(self._on_current_row_changed)
+
         initial_mode = self.model.load_setting("data_mode", "Online")
         self.view.update_status_icon(initial_mode)
         self.view.update_clear_button_icon(initial_mode)
 
+        # Modo Híbrido: o que a revalidação em segundo plano trouxer da API atualiza a tabela aberta
+        self.model.revalidator.uasg_updated.connect(self._on_uasg_revalidated)
+
         if self.model.database_dir.exists():
             self.loaded_uasgs = self.model.load_saved_uasgs()
             print(f"📂 UASGs do módulo Contratos carregadas: {list(self.loaded_uasgs.keys())}")
@@ -88,6 +108,32 @@ class UASGController:
             contrato = self.current_data[row]
             self.show_details_dialog(contrato.copy())
 
+    # ==================== PRÉ-CARREGAMENTO DOS DETALHES ====================
+    def _contract_at_proxy_row(self, proxy_row):
+        proxy_model = self.view.table.model()
+        row = proxy_model.mapToSource(proxy_model.index(proxy_row, 0)).row()
+        if 0 <= row < len(self.current_data):
+            return self.current_data[row]
+        return None
+
+    def _prefetch_contract(self, contrato):
+        # Contratos manuais não têm dados na API
+        if contrato and not contrato.get("manual", False):
+            self.model.prefetcher.prefetch(contrato.get("id"))
+
+    def _on_current_row_changed(self, current, previous):
+        if current.isValid():
+            self._prefetch_contract(self._contract_at_proxy_row(current.row()))
+
+    def _on_table_hover(self, index):
+        if index.isValid() and index.row() != self._hovered_row:
+            self._hovered_row = index.row()
+            self._hover_prefetch_timer.start()
+
+    def _prefetch_hovered_contract(self):
+        if self._hovered_row is not None:
+            self._prefetch_contract(self._contract_at_proxy_row(self._hovered_row))
+
     # ==================== WRAPPER PARA A VIEW ====================
     def open_table_options(self):
         """A View chama este método, garantindo que o controller exista."""
@@ -200,36 +246,41 @@ class UASGController:
 
     def update_table(self, uasg):
         """Atualiza a tabela com os dados da UASG selecionada."""
-        if uasg in self.loaded_uasgs:
-            # Recarrega os dados do arquivo JSON para garantir que estão atualizados
-            self.loaded_uasgs = self.model.load_saved_uasgs()
-            
-            # Atualiza os dados atuais com os dados recarregados
+        with sql_profiler.operation("carregar_tabela"):
             if uasg in self.loaded_uasgs:
-                self.current_data = self.loaded_uasgs[uasg]
+                # Recarrega os dados do arquivo JSON para garantir que estão atualizados
+                self.loaded_uasgs = self.model.load_saved_uasgs()
+            
+                # Atualiza os dados atuais com os dados recarregados
+                if uasg in self.loaded_uasgs:
+                    self.current_data = self.loaded_uasgs[uasg]
                 
-                # Obter o nome resumido da UASG para mostrar no label
-                nome_resumido = ""
-                if self.current_data and len(self.current_data) > 0:
-                    contrato = self.current_data[0]
-                    nome_resumido = contrato.get("contratante", {}).get("orgao", {}).get("unidade_gestora", {}).get("nome_resumido", "")
+                    # Obter o nome resumido da UASG para mostrar no label
+                    nome_resumido = ""
+                    if self.current_data and len(self.current_data) > 0:
+                        contrato = self.current_data[0]
+                        nome_resumido = contrato.get("contratante", {}).get("orgao", {}).get("unidade_gestora", {}).get("nome_resumido", "")
                 
-                # Atualiza o label na interface
-                self.view.uasg_info_label.setText(f"UASG: {uasg} - {nome_resumido}")
+                    # Atualiza o label na interface
+                    self.view.uasg_info_label.setText(f"UASG: {uasg} - {nome_resumido}")
                 
-                # Popula a tabela com os dados usando a função do módulo controller_table
-                populate_table(self, self.current_data)
-                self.dashboard_controller.update_dashboard(self.current_data)
-                print(f"✅ Tabela atualizada com os dados da UASG {uasg}.")
+                    # Popula a tabela com os dados usando a função do módulo controller_table
+                    populate_table(self, self.current_data)
+                    self.dashboard_controller.update_dashboard(self.current_data)
+                    print(f"✅ Tabela atualizada com os dados da UASG {uasg}.")
+
+                    # Modo Híbrido: mostra o banco na hora e confere a API em segundo plano
+                    if self.model.load_setting("data_mode", "Online") == "Híbrido":
+                        self.model.revalidator.revalidate_uasg(uasg)
+                else:
+                    # Limpa o label se não houver dados
+                    self.view.uasg_info_label.setText(f"UASG: -")
+                    print(f"⚠ UASG {uasg} não encontrada nos dados recarregados(especifico).")
             else:
-                # Limpa o label se não houver dados
+                # Limpa o label se a UASG não for encontrada
                 self.view.uasg_info_label.setText(f"UASG: -")
-                print(f"⚠ UASG {uasg} não encontrada nos dados recarregados(especifico).")
-        else:
-            # Limpa o label se a UASG não for encontrada
-            self.view.uasg_info_label.setText(f"UASG: -")
-            print(f"⚠ UASG {uasg} não encontrada nos dados carregados(geral).")
-        self.load_saved_uasgs()
+                print(f"⚠ UASG {uasg} não encontrada nos dados carregados(geral).")
+            self.load_saved_uasgs()
 
     def clear_table(self):
         # Verifica se há dados carregados
@@ -303,6 +354,14 @@ class UASGController:
             details_action = menu.addAction(icon_manager.get_icon("init"), "Ver Detalhes") # ✅ Usei "detalhes" para o ícone, se "init" for um ícone válido, pode manter.
             details_action.triggered.connect(lambda: self.show_details_dialog(contrato.copy())) # ✅ Usando .copy() para segurança
 
+            # Documentos .docx: para o contrato clicado ou para todas as linhas selecionadas
+            contratos = self._selected_contracts() or [contrato]
+            rotulo = "Gerar Documento" if len(contratos) == 1 else f"Gerar Documentos ({len(contratos)} contratos)"
+            documentos_menu = menu.addMenu(icon_manager.get_icon("word"), rotulo)
+            for template_key in CONTRATO_DOCUMENTOS:
+                action = documentos_menu.addAction(DOCUMENT_TEMPLATES[template_key][1])
+                action.triggered.connect(lambda _=False, key=template_key: self.generate_documents(key, contratos))
+
             # ==================== ✅ ADICIONA OPÇÃO DE EXCLUIR SE FOR MANUAL ====================
             is_manual = contrato.get("manual", False)
             if is_manual:
@@ -316,6 +375,25 @@ class UASGController:
             # Não adicionamos deleteLater() ou WA_DeleteOnClose aqui,
             # confiando no comportamento padrão do QMenu.exec() e no gerenciamento de memória do Qt.
 
+    def _selected_contracts(self):
+        """Contratos das linhas selecionadas na tabela (na ordem exibida)."""
+        selection = self.view.table.selectionModel()
+        if selection is None:
+            return []
+        proxy = self.view.table.model()
+        rows = sorted({index.row() for index in selection.selectedIndexes()})
+        contratos = []
+        for row in rows:
+            source_row = proxy.mapToSource(proxy.index(row, 0)).row()
+            if 0 <= source_row < len(self.current_data):
+                contratos.append(self.current_data[source_row])
+        return contratos
+
+    def generate_documents(self, template_key, contratos):
+        """Gera o documento .docx escolhido para um ou vários contratos."""
+        jobs = contrato_document_jobs(self.model.db_path, contratos)
+        run_document_generation(self.view, template_key, jobs)
+
     def _delete_manual_contract(self, contrato_data, row):
         """
         ✅ NOVO MÉTODO: Exclui um contrato manual do banco de dados.
@@ -395,7 +473,9 @@ class UASGController:
 
     def show_details_dialog(self, contrato):
         """Exibe o diálogo de detalhes do contrato."""
-        details_dialog = DetailsDialog(contrato, self.model, self.view) # Passa self.model
+        self._prefetch_contract(contrato)
+        with sql_profiler.operation("abrir_detalhes"):
+            details_dialog = DetailsDialog(contrato, self.model, self.view) # Passa self.model
         details_dialog.data_saved.connect(self.update_table_from_details)
         details_dialog.exec()
 
@@ -413,7 +493,14 @@ class UASGController:
         selected_indexes = self.view.table.selectionModel().selectedIndexes()
         
         if not selected_indexes:
-            QMessageBox.warning(self.view, "Nenhum Contrato Selecionado", "Por favor, selecione um contrato na tabela antes de clicar em Mensagens.")
+            reply = QMessageBox.question(
+                self.view, "Nenhum Contrato Selecionado",
+                "Nenhum contrato selecionado.\n\nDeseja gerar mensagens em lote (por UASG, status ou vencimento)?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                from Contratos.controller.mensagem_lote_controller import MensagemLoteController
+                MensagemLoteController(self.model, parent=self.view).show()
             return
 
         # Pega o índice real da fonte de dados
@@ -440,7 +527,8 @@ class UASGController:
     # =========================================== Método para exportar e importar dados de status =================================================
     def export_status_data(self):
         """Exporta todos os dados de status para um arquivo JSON."""
-        all_status_data = self.model.get_all_status_data()
+        with sql_profiler.operation("exportar_status"):
+            all_status_data = self.model.get_all_status_data()
         if not all_status_data:
             QMessageBox.information(self.view, "Exportar Status", "Não há dados de status para exportar.")
             return
@@ -474,7 +562,8 @@ class UASGController:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data_to_import = json.load(f)
                 
-                self.model.import_statuses(data_to_import)
+                with sql_profiler.operation("importar_status"):
+                    self.model.import_statuses(data_to_import)
                 QMessageBox.information(self.view, "Importar Status", "Dados de status importados com sucesso!\nA tabela será atualizada.")
                 self.load_saved_uasgs() # Recarrega UASGs e atualiza o menu
                 # Força a atualização da tabela visível, se houver alguma UASG carregada
@@ -492,7 +581,8 @@ class UASGController:
 
     def export_status_to_path(self, file_path):
         """Exporta status para um caminho específico sem abrir diálogo."""
-        all_status_data = self.model.get_all_status_data()
+        with sql_profiler.operation("exportar_status"):
+            all_status_data = self.model.get_all_status_data()
         if all_status_data:
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(all_status_data, f, ensure_ascii=False, indent=4)
@@ -504,7 +594,8 @@ class UASGController:
         if os.path.exists(file_path):
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            self.model.import_statuses(data)
+            with sql_profiler.operation("importar_status"):
+                self.model.import_statuses(data)
             self.load_saved_uasgs()
             self.populate_previsualization_table()
             return True
@@ -623,6 +714,30 @@ class UASGController:
             """Abre a janela de contratos manuais"""
             self.manual_contract_ctrl.open_manual_contract_window()
 
+# ====================== Modo Híbrido ==========================
+
+    def _on_uasg_revalidated(self, uasg, resultado):
+        """
+        Chamado quando a revalidação do modo Híbrido gravou contratos novos ou alterados.
+        Alterados são atualizados linha a linha; contratos novos recarregam a tabela.
+        """
+        if uasg in self.loaded_uasgs:
+            self.loaded_uasgs = self.model.load_saved_uasgs()
+
+        uasg_exibida = ""
+        if self.current_data:
+            uasg_exibida = str(self.current_data[0].get("contratante", {}).get("orgao", {}).get("unidade_gestora", {}).get("codigo", ""))
+        if uasg_exibida != uasg:
+            return
+
+        if resultado.get("novos"):
+            self.update_table(uasg)
+            return
+        atualizadas = update_rows_for_contracts(self, resultado.get("contratos", {}))
+        if atualizadas:
+            self.dashboard_controller.update_dashboard(self.current_data)
+            print(f"🔄 {atualizadas} linha(s) da UASG {uasg} atualizadas pela API.")
+
 # ====================== Banco de Dados (settings) ==========================
 
     def _on_database_updated(self):
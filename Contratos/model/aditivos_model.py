@@ -0,0 +1,254 @@
+# Contratos/model/aditivos_model.py
+"""
+Linha do tempo dos termos aditivos, materializada a partir da tabela historico.
+
+Os eventos de cada contrato (o contrato em si e seus termos aditivos) são
+ordenados e comparados com funções de janela do SQLite (ROW_NUMBER, LAG,
+FIRST_VALUE, MAX ... ROWS PRECEDING, SUM acumulado): variação do valor em cada
+termo, crescimento acumulado e dias de prorrogação. O resumo por contrato fica
+em aditivos_resumo. Gatilhos na tabela historico marcam os contratos alterados
+e refresh() recalcula só esses.
+"""
+import time
+
+from utils.sql_profiler import sql_profiler
+from Contratos.model.empenhos_relatorio_model import parse_br_float
+from Contratos.model.execucao_financeira_model import campo_sql
+
+CODIGO_CONTRATO = "50"
+CODIGO_ADITIVO = "55"
+
+SCHEMA_SQL = (
+    '''CREATE TABLE IF NOT EXISTS aditivos_eventos (
+        historico_id INTEGER PRIMARY KEY,
+        contrato_id TEXT NOT NULL,
+        ordem INTEGER NOT NULL,
+        codigo_tipo TEXT,
+        tipo TEXT,
+        numero TEXT,
+        data_assinatura TEXT,
+        vigencia_inicio TEXT,
+        vigencia_fim TEXT,
+        valor_global REAL NOT NULL DEFAULT 0,
+        variacao_valor REAL NOT NULL DEFAULT 0,
+        variacao_acumulada REAL NOT NULL DEFAULT 0,
+        dias_prorrogados INTEGER NOT NULL DEFAULT 0
+    )''',
+    '''CREATE TABLE IF NOT EXISTS aditivos_resumo (
+        contrato_id TEXT PRIMARY KEY,
+        qtd_aditivos INTEGER NOT NULL DEFAULT 0,
+        valor_inicial REAL,
+        valor_atual REAL,
+        crescimento_valor REAL NOT NULL DEFAULT 0,
+        crescimento_pct REAL,
+        dias_prorrogados INTEGER NOT NULL DEFAULT 0,
+        ultimo_aditivo TEXT,
+        vigencia_final TEXT
+    )''',
+    "CREATE TABLE IF NOT EXISTS aditivos_pendentes (contrato_id TEXT PRIMARY KEY)",
+    "CREATE INDEX IF NOT EXISTS idx_aditivos_eventos_contrato ON aditivos_eventos (contrato_id, ordem)",
+    "CREATE INDEX IF NOT EXISTS idx_historico_contrato_id ON historico (contrato_id)",
+    '''CREATE TRIGGER IF NOT EXISTS trg_aditivos_hist_ins AFTER INSERT ON historico BEGIN
+        INSERT OR IGNORE INTO aditivos_pendentes (contrato_id) VALUES (NEW.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_aditivos_hist_upd AFTER UPDATE ON historico BEGIN
+        INSERT OR IGNORE INTO aditivos_pendentes (contrato_id) VALUES (NEW.contrato_id);
+        INSERT OR IGNORE INTO aditivos_pendentes (contrato_id) VALUES (OLD.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_aditivos_hist_del AFTER DELETE ON historico BEGIN
+        INSERT OR IGNORE INTO aditivos_pendentes (contrato_id) VALUES (OLD.contrato_id); END''',
+)
+
+_BATCH = 500
+
+# Os campos são trocados pelas expressões de campo_sql; {marks} pelos ids do lote
+EVENTOS_SQL = f'''
+    WITH h AS (
+        SELECT h.id, h.contrato_id,
+               CAST({{codigo_tipo}} AS TEXT) AS codigo_tipo, {{tipo}} AS tipo, {{numero}} AS numero,
+               {{data_assinatura}} AS data_assinatura, {{vigencia_inicio}} AS vigencia_inicio,
+               {{vigencia_fim}} AS vigencia_fim, br_real({{valor_global}}) AS valor
+        FROM historico h
+        WHERE h.contrato_id IN ({{marks}})
+    ),
+    ordenados AS (
+        SELECT h.*,
+               ROW_NUMBER() OVER w - 1 AS ordem,
+               MAX(vigencia_fim) OVER (w ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS fim_anterior,
+               -- Cada termo com valor abre um grupo; os termos só de prazo herdam o valor do grupo
+               SUM(valor > 0) OVER (w ROWS UNBOUNDED PRECEDING) AS grupo_valor
+        FROM h
+        WHERE codigo_tipo IN ('{CODIGO_CONTRATO}', '{CODIGO_ADITIVO}')
+        WINDOW w AS (PARTITION BY contrato_id
+                     ORDER BY codigo_tipo != '{CODIGO_CONTRATO}', COALESCE(data_assinatura, vigencia_inicio), id)
+    ),
+    vigentes AS (
+        SELECT o.*,
+               CASE WHEN grupo_valor > 0
+                    THEN FIRST_VALUE(valor) OVER (PARTITION BY contrato_id, grupo_valor ORDER BY ordem) END AS valor_vigente
+        FROM ordenados o
+    ),
+    anteriores AS (
+        SELECT v.*, LAG(valor_vigente) OVER (PARTITION BY contrato_id ORDER BY ordem) AS valor_anterior
+        FROM vigentes v
+    ),
+    variacoes AS (
+        SELECT a.*,
+               -- Termo sem valor (só prazo) não altera o valor do contrato
+               CASE WHEN valor > 0 AND valor_anterior > 0 THEN valor - valor_anterior ELSE 0 END AS variacao,
+               CASE WHEN fim_anterior IS NOT NULL AND vigencia_fim > fim_anterior
+                    THEN CAST(julianday(vigencia_fim) - julianday(fim_anterior) AS INTEGER) ELSE 0 END AS dias
+        FROM anteriores a
+    )
+    INSERT INTO aditivos_eventos (historico_id, contrato_id, ordem, codigo_tipo, tipo, numero, data_assinatura,
+                                  vigencia_inicio, vigencia_fim, valor_global, variacao_valor,
+                                  variacao_acumulada, dias_prorrogados)
+    SELECT id, contrato_id, ordem, codigo_tipo, tipo, numero, data_assinatura, vigencia_inicio, vigencia_fim,
+           valor, variacao,
+           SUM(variacao) OVER (PARTITION BY contrato_id ORDER BY ordem ROWS UNBOUNDED PRECEDING),
+           dias
+    FROM variacoes
+'''
+
+RESUMO_SQL = f'''
+    INSERT INTO aditivos_resumo (contrato_id, qtd_aditivos, valor_inicial, valor_atual, crescimento_valor,
+                                 crescimento_pct, dias_prorrogados, ultimo_aditivo, vigencia_final)
+    SELECT contrato_id,
+           SUM(codigo_tipo = '{CODIGO_ADITIVO}'),
+           MAX(CASE WHEN ordem = 0 THEN valor_global END),
+           MAX(CASE WHEN ordem = 0 THEN valor_global END) + SUM(variacao_valor),
+           SUM(variacao_valor),
+           CASE WHEN MAX(CASE WHEN ordem = 0 THEN valor_global END) > 0
+                THEN ROUND(100.0 * SUM(variacao_valor) / MAX(CASE WHEN ordem = 0 THEN valor_global END), 2) END,
+           SUM(dias_prorrogados),
+           MAX(CASE WHEN codigo_tipo = '{CODIGO_ADITIVO}' THEN COALESCE(data_assinatura, vigencia_inicio) END),
+           MAX(vigencia_fim)
+    FROM aditivos_eventos
+    WHERE contrato_id IN ({{marks}})
+    GROUP BY contrato_id
+'''
+
+COLUNAS_RESUMO = ("contrato_id", "qtd_aditivos", "valor_inicial", "valor_atual", "crescimento_valor",
+                  "crescimento_pct", "dias_prorrogados", "ultimo_aditivo", "vigencia_final")
+COLUNAS_EVENTO = ("historico_id", "ordem", "codigo_tipo", "tipo", "numero", "data_assinatura", "vigencia_inicio",
+                  "vigencia_fim", "valor_global", "variacao_valor", "variacao_acumulada", "dias_prorrogados")
+
+# Bancos cujo esquema já foi conferido neste processo (a DDL roda uma vez só)
+_esquemas_prontos = set()
+
+
+class AditivosTimeline:
+    """Linha do tempo dos termos aditivos no banco offline de contratos."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._ensure_schema()
+
+    def _connect(self):
+        conn = sql_profiler.connect(self.db_path)
+        conn.create_function("br_real", 1, parse_br_float, deterministic=True)
+        return conn
+
+    def _ensure_schema(self):
+        if self.db_path in _esquemas_prontos:
+            return
+        conn = self._connect()
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'historico'").fetchone() is None:
+                raise RuntimeError("O banco não possui a tabela offline de histórico.")
+            novo = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'aditivos_resumo'").fetchone() is None
+            for sql in SCHEMA_SQL:
+                conn.execute(sql)
+            if novo:
+                conn.execute("INSERT OR IGNORE INTO aditivos_pendentes (contrato_id) "
+                             "SELECT DISTINCT contrato_id FROM historico")
+            conn.commit()
+        finally:
+            conn.close()
+        _esquemas_prontos.add(self.db_path)
+
+    def pending_count(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM aditivos_pendentes").fetchone()[0]
+        finally:
+            conn.close()
+
+    def refresh(self, contrato_ids=None):
+        """
+        Recalcula os contratos marcados pelos gatilhos (ou só os informados, se
+        estiverem pendentes). Retorna {contratos, eventos, segundos}.
+        """
+        inicio = time.perf_counter()
+        stats = {"contratos": 0, "eventos": 0}
+        conn = self._connect()
+        try:
+            with sql_profiler.operation("aditivos_refresh"):
+                if contrato_ids is None:
+                    pendentes = [row[0] for row in conn.execute("SELECT contrato_id FROM aditivos_pendentes")]
+                else:
+                    ids = [str(c) for c in contrato_ids]
+                    pendentes = [row[0] for row in conn.execute(
+                        f"SELECT contrato_id FROM aditivos_pendentes WHERE contrato_id IN ({','.join('?' * len(ids))})",
+                        ids)] if ids else []
+
+                if pendentes:
+                    colunas = {row[1] for row in conn.execute("PRAGMA table_info(historico)")}
+                    campos = {nome: campo_sql(colunas, nome, "h") for nome in (
+                        "codigo_tipo", "tipo", "numero", "data_assinatura", "vigencia_inicio", "vigencia_fim",
+                        "valor_global")}
+
+                for start in range(0, len(pendentes), _BATCH):
+                    lote = pendentes[start:start + _BATCH]
+                    marks = ",".join("?" * len(lote))
+                    conn.execute(f"DELETE FROM aditivos_eventos WHERE contrato_id IN ({marks})", lote)
+                    conn.execute(f"DELETE FROM aditivos_resumo WHERE contrato_id IN ({marks})", lote)
+                    # INSERT iniciado por WITH não informa rowcount; conta pelas alterações da conexão
+                    antes = conn.total_changes
+                    conn.execute(EVENTOS_SQL.format(marks=marks, **campos), lote)
+                    stats["eventos"] += conn.total_changes - antes
+                    cursor = conn.execute(RESUMO_SQL.format(marks=marks), lote)
+                    stats["contratos"] += cursor.rowcount
+                    conn.execute(f"DELETE FROM aditivos_pendentes WHERE contrato_id IN ({marks})", lote)
+                if pendentes:
+                    conn.commit()
+        finally:
+            conn.close()
+        stats["segundos"] = round(time.perf_counter() - inicio, 3)
+        return stats
+
+    def _summary_row(self, conn, contrato_id):
+        row = conn.execute(f"SELECT {', '.join(COLUNAS_RESUMO)} FROM aditivos_resumo WHERE contrato_id = ?",
+                           (str(contrato_id),)).fetchone()
+        return dict(zip(COLUNAS_RESUMO, row)) if row else None
+
+    def _event_rows(self, conn, contrato_id):
+        rows = conn.execute(f"SELECT {', '.join(COLUNAS_EVENTO)} FROM aditivos_eventos "
+                            "WHERE contrato_id = ? ORDER BY ordem", (str(contrato_id),)).fetchall()
+        return [dict(zip(COLUNAS_EVENTO, row)) for row in rows]
+
+    def summary(self, contrato_id):
+        """Resumo dos aditivos de um contrato (atualizando-o antes, se mudou), ou None."""
+        self.refresh([contrato_id])
+        conn = self._connect()
+        try:
+            return self._summary_row(conn, contrato_id)
+        finally:
+            conn.close()
+
+    def timeline(self, contrato_id):
+        """Eventos do contrato em ordem (o contrato e depois cada termo aditivo)."""
+        self.refresh([contrato_id])
+        conn = self._connect()
+        try:
+            return self._event_rows(conn, contrato_id)
+        finally:
+            conn.close()
+
+    def details(self, contrato_id):
+        """(resumo, eventos) do contrato com uma única atualização; (None, []) sem histórico."""
+        self.refresh([contrato_id])
+        conn = self._connect()
+        try:
+            resumo = self._summary_row(conn, contrato_id)
+            return resumo, self._event_rows(conn, contrato_id) if resumo else []
+        finally:
+            conn.close()
@@ -0,0 +1,357 @@
+# Contratos/model/change_feed_model.py
+"""
+Change feed para sincronizar status entre várias máquinas.
+
+Triggers em status_contratos, registros_status, links_contratos e fiscalizacao
+gravam cada alteração numa tabela só de inserção (change_log) com número de
+sequência crescente. A sincronização troca apenas as alterações posteriores à
+última sequência vista, então o custo acompanha o número de edições e não o
+tamanho do banco.
+
+Conflitos:
+- status_contratos, links_contratos e fiscalizacao (uma linha por contrato):
+  vence a alteração mais recente (alterado_em, com a origem como desempate).
+- registros_status: mesclados pelo UUID; registros criados em máquinas
+  diferentes se somam e uma exclusão remove só aquele UUID.
+
+Exclusões de status/links/fiscalização não são propagadas (vêm de limpezas
+locais, como excluir uma UASG); exclusões locais de registros podem ser
+marcadas com PAUSAR_SQL/RETOMAR_SQL na mesma transação para não se espalharem.
+
+O app.py é o ponto central (GET/POST /api/sync/changes); ChangeFeedClient
+envia e recebe as alterações de uma máquina.
+"""
+import json
+import time
+import uuid
+
+import requests
+
+from utils.sql_profiler import sql_profiler
+
+# tabela -> coluna que identifica a linha em todas as máquinas
+TABELAS_SINCRONIZADAS = {
+    "status_contratos": "contrato_id",
+    "registros_status": "uuid",
+    "links_contratos": "contrato_id",
+    "fiscalizacao": "contrato_id",
+}
+# Mesclados por UUID (sem "último vence") e com exclusões propagadas
+TABELAS_POR_UUID = ("registros_status",)
+
+LOTE_PADRAO = 500
+
+ESTADO_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS change_feed_estado (
+        chave TEXT PRIMARY KEY,
+        valor TEXT
+    )'''
+CHANGE_LOG_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabela TEXT NOT NULL,
+        chave TEXT NOT NULL,
+        contrato_id TEXT,
+        operacao TEXT NOT NULL,
+        dados TEXT,
+        alterado_em TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+        origem TEXT
+    )'''
+
+# Alterações feitas entre os dois comandos (na mesma transação) não entram no change_log
+PAUSAR_SQL = "INSERT OR REPLACE INTO change_feed_estado (chave, valor) VALUES ('pausado', '1')"
+RETOMAR_SQL = "DELETE FROM change_feed_estado WHERE chave = 'pausado'"
+
+_ORIGEM_SQL = "(SELECT valor FROM change_feed_estado WHERE chave = 'no')"
+_NAO_PAUSADO_SQL = "NOT EXISTS (SELECT 1 FROM change_feed_estado WHERE chave = 'pausado')"
+
+
+def _iso_de_data_br(coluna):
+    """
+    Expressão SQL: 'dd/mm/aaaa hh:mm:ss' (hora local) -> 'aaaa-mm-ddThh:mm:ss.sssZ' em UTC,
+    no mesmo formato dos triggers (vazio se fora do formato).
+    """
+    local = (f"substr({coluna}, 7, 4) || '-' || substr({coluna}, 4, 2) || '-' || substr({coluna}, 1, 2) || "
+             f"' ' || substr({coluna}, 12)")
+    return (f"CASE WHEN {coluna} LIKE '__/__/____ __:__:__' "
+            f"THEN COALESCE(strftime('%Y-%m-%dT%H:%M:%fZ', {local}, 'utc'), '') ELSE '' END")
+
+
+# Data da última alteração conhecida, para as linhas que já existiam quando o feed foi instalado
+_DATA_INICIAL = {
+    "status_contratos": _iso_de_data_br("data_registro"),
+    "fiscalizacao": _iso_de_data_br("data_atualizacao"),
+}
+
+
+class ChangeFeed:
+    """Change log de um banco: instalação dos triggers, leitura por sequência e aplicação de alterações."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._instalado = False
+        self._colunas = {}
+
+    def _connect(self):
+        conn = sql_profiler.connect(self.db_path, check_same_thread=False)
+        if not self._instalado:
+            self._install(conn)
+        return conn
+
+    def install(self):
+        """Cria as tabelas e (re)cria os triggers. Na primeira vez registra o estado atual."""
+        conn = self._connect()
+        conn.close()
+
+    def _table_columns(self, conn, tabela):
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({tabela})")]
+
+    def _install(self, conn):
+        conn.execute(ESTADO_TABLE_SQL)
+        novo = not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'").fetchone()
+        conn.execute(CHANGE_LOG_TABLE_SQL)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_change_log_chave ON change_log (tabela, chave, seq)")
+        conn.execute("INSERT OR IGNORE INTO change_feed_estado (chave, valor) VALUES ('no', ?)", (uuid.uuid4().hex,))
+
+        existentes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for tabela, chave in TABELAS_SINCRONIZADAS.items():
+            if tabela not in existentes:
+                continue
+            colunas = self._table_columns(conn, tabela)
+            if chave == "uuid":
+                self._ensure_uuid(conn, colunas)
+                colunas = self._table_columns(conn, tabela)
+            # O id local (autoincremento) é diferente em cada máquina
+            colunas = [c for c in colunas if c != "id"]
+            self._colunas[tabela] = colunas
+            self._create_triggers(conn, tabela, chave, colunas)
+            if novo:
+                self._seed(conn, tabela, chave, colunas)
+        conn.commit()
+        self._instalado = True
+
+    def _ensure_uuid(self, conn, colunas):
+        # Bancos criados antes dos UUIDs (ver scripts/add_uuid_migration.py)
+        if "uuid" not in colunas:
+            conn.execute("ALTER TABLE registros_status ADD COLUMN uuid TEXT")
+        sem_uuid = conn.execute("SELECT id FROM registros_status WHERE uuid IS NULL OR uuid = ''").fetchall()
+        conn.executemany("UPDATE registros_status SET uuid = ? WHERE id = ?",
+                         [(str(uuid.uuid4()), registro_id) for (registro_id,) in sem_uuid])
+
+    def _create_triggers(self, conn, tabela, chave, colunas):
+        dados = ", ".join(f"'{c}', NEW.{c}" for c in colunas)
+        for evento in ("insert", "update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_change_log_{tabela}_{evento}")
+            conn.execute(f'''
+                CREATE TRIGGER trg_change_log_{tabela}_{evento} AFTER {evento.upper()} ON {tabela}
+                WHEN {_NAO_PAUSADO_SQL}
+                BEGIN
+                    INSERT INTO change_log (tabela, chave, contrato_id, operacao, dados, origem)
+                    VALUES ('{tabela}', NEW.{chave}, NEW.contrato_id, 'upsert', json_object({dados}), {_ORIGEM_SQL});
+                END''')
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_change_log_{tabela}_delete")
+        if tabela in TABELAS_POR_UUID:
+            conn.execute(f'''
+                CREATE TRIGGER trg_change_log_{tabela}_delete AFTER DELETE ON {tabela}
+                WHEN {_NAO_PAUSADO_SQL}
+                BEGIN
+                    INSERT INTO change_log (tabela, chave, contrato_id, operacao, origem)
+                    VALUES ('{tabela}', OLD.{chave}, OLD.contrato_id, 'delete', {_ORIGEM_SQL});
+                END''')
+
+    def _seed(self, conn, tabela, chave, colunas):
+        dados = ", ".join(f"'{c}', {c}" for c in colunas)
+        alterado_em = _DATA_INICIAL.get(tabela, "''")
+        conn.execute(f'''
+            INSERT INTO change_log (tabela, chave, contrato_id, operacao, dados, alterado_em, origem)
+            SELECT '{tabela}', {chave}, contrato_id, 'upsert', json_object({dados}), {alterado_em}, {_ORIGEM_SQL}
+            FROM {tabela} WHERE {chave} IS NOT NULL''')
+
+    # ==================== Leitura ====================
+    @property
+    def node_id(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT valor FROM change_feed_estado WHERE chave = 'no'").fetchone()[0]
+        finally:
+            conn.close()
+
+    def get_state(self, chave, default=None):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT valor FROM change_feed_estado WHERE chave = ?", (chave,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else default
+
+    def set_state(self, chave, valor):
+        conn = self._connect()
+        try:
+            conn.execute("INSERT OR REPLACE INTO change_feed_estado (chave, valor) VALUES (?, ?)", (chave, str(valor)))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def last_seq(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+        finally:
+            conn.close()
+
+    def changes_since(self, desde=0, limite=LOTE_PADRAO, origem=None, excluir_origem=None):
+        """
+        Alterações com seq > desde, em ordem. origem filtra as de uma máquina;
+        excluir_origem descarta as de uma máquina (o ultimo_seq avança mesmo assim).
+        Retorna {changes, ultimo_seq, mais}.
+        """
+        sql = ("SELECT seq, tabela, chave, contrato_id, operacao, dados, alterado_em, origem "
+               "FROM change_log WHERE seq > ?")
+        params = [int(desde)]
+        if origem is not None:
+            sql += " AND origem = ?"
+            params.append(origem)
+        sql += " ORDER BY seq LIMIT ?"
+        params.append(int(limite))
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        changes = [
+            {"seq": seq, "tabela": tabela, "chave": chave, "contrato_id": contrato_id, "operacao": operacao,
+             "dados": json.loads(dados) if dados else None, "alterado_em": alterado_em, "origem": origem_row}
+            for seq, tabela, chave, contrato_id, operacao, dados, alterado_em, origem_row in rows
+            if excluir_origem is None or origem_row != excluir_origem
+        ]
+        return {"changes": changes, "ultimo_seq": rows[-1][0] if rows else int(desde), "mais": len(rows) == int(limite)}
+
+    # ==================== Aplicação ====================
+    def _mais_recente(self, conn, change):
+        row = conn.execute("SELECT alterado_em, origem FROM change_log WHERE tabela = ? AND chave = ? "
+                           "ORDER BY seq DESC LIMIT 1", (change["tabela"], change["chave"])).fetchone()
+        if row is None:
+            return True
+        return (change["alterado_em"], change["origem"] or "") > (row[0], row[1] or "")
+
+    def _upsert(self, conn, tabela, chave, dados):
+        """Grava a linha; retorna False se nada foi gravado (ex: texto único já existente sob outro UUID)."""
+        colunas = [c for c in self._colunas.get(tabela, []) if c in dados and c != chave]
+        valores = [dados[c] for c in colunas]
+        cursor = conn.execute(
+            f"UPDATE OR IGNORE {tabela} SET {', '.join(f'{c} = ?' for c in colunas)} WHERE {chave} = ?",
+            valores + [dados[chave]]) if colunas else None
+        if cursor is not None and cursor.rowcount:
+            return True
+        nomes = colunas + [chave]
+        cursor = conn.execute(
+            f"INSERT OR IGNORE INTO {tabela} ({', '.join(nomes)}) VALUES ({', '.join('?' * len(nomes))})",
+            valores + [dados[chave]])
+        return cursor.rowcount > 0
+
+    def apply(self, changes):
+        """
+        Aplica alterações vindas de outra máquina. No change_log local elas ficam com
+        a origem e a data originais (não voltam a ser enviadas por esta máquina).
+        Retorna {aplicadas, ignoradas}; ignoradas são as superadas por edições locais
+        e as que não puderam ser gravadas (ex: texto de registro que já existe aqui sob outro UUID).
+        """
+        # Só a última alteração de cada linha importa (ex: registros apagados e regravados ao salvar)
+        ultimas = {}
+        for change in changes:
+            chave = (change["tabela"], change["chave"])
+            ultimas.pop(chave, None)
+            ultimas[chave] = change
+
+        stats = {"aplicadas": 0, "ignoradas": 0}
+        conn = self._connect()
+        try:
+            for change in ultimas.values():
+                tabela = change["tabela"]
+                chave = TABELAS_SINCRONIZADAS.get(tabela)
+                if chave is None or tabela not in self._colunas:
+                    stats["ignoradas"] += 1
+                    continue
+                if tabela not in TABELAS_POR_UUID and not self._mais_recente(conn, change):
+                    stats["ignoradas"] += 1
+                    continue
+                antes = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+                if change["operacao"] == "delete":
+                    conn.execute(f"DELETE FROM {tabela} WHERE {chave} = ?", (change["chave"],))
+                elif not self._upsert(conn, tabela, chave, dict(change["dados"] or {}, **{chave: change["chave"]})):
+                    print(f"⚠ Change feed: {tabela} {change['chave']} não aplicado (conflito com um registro local).")
+                    stats["ignoradas"] += 1
+                    continue
+                conn.execute("UPDATE change_log SET origem = ?, alterado_em = ? WHERE seq > ?",
+                             (change["origem"], change["alterado_em"], antes))
+                stats["aplicadas"] += 1
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return stats
+
+
+class ChangeFeedClient:
+    """Envia e recebe as alterações desta máquina pelo servidor central (app.py)."""
+
+    def __init__(self, feed, server_url, session=None, timeout=15, lote=LOTE_PADRAO):
+        self.feed = feed
+        self.server_url = server_url.strip().rstrip("/")
+        self.session = session or requests
+        self.timeout = timeout
+        self.lote = lote
+
+    @property
+    def _url(self):
+        return f"{self.server_url}/api/sync/changes"
+
+    def _estado(self, nome):
+        return f"{nome}:{self.server_url}"
+
+    def pull(self):
+        """Baixa as alterações das outras máquinas desde a última sincronização."""
+        stats = {"recebidas": 0, "aplicadas": 0, "ignoradas": 0}
+        node = self.feed.node_id
+        desde = int(self.feed.get_state(self._estado("ultimo_pull"), 0))
+        while True:
+            response = self.session.get(self._url, params={"desde": desde, "limite": self.lote, "excluir_origem": node},
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            pagina = response.json()
+            if pagina["changes"]:
+                aplicado = self.feed.apply(pagina["changes"])
+                stats["recebidas"] += len(pagina["changes"])
+                stats["aplicadas"] += aplicado["aplicadas"]
+                stats["ignoradas"] += aplicado["ignoradas"]
+            desde = pagina["ultimo_seq"]
+            self.feed.set_state(self._estado("ultimo_pull"), desde)
+            if not pagina["mais"]:
+                return stats
+
+    def push(self):
+        """Envia as alterações feitas nesta máquina desde o último envio."""
+        stats = {"enviadas": 0}
+        node = self.feed.node_id
+        desde = int(self.feed.get_state(self._estado("ultimo_push"), 0))
+        while True:
+            pagina = self.feed.changes_since(desde, self.lote, origem=node)
+            if pagina["changes"]:
+                response = self.session.post(self._url, json={"origem": node, "changes": pagina["changes"]},
+                                             timeout=self.timeout)
+                response.raise_for_status()
+                stats["enviadas"] += len(pagina["changes"])
+            desde = pagina["ultimo_seq"]
+            self.feed.set_state(self._estado("ultimo_push"), desde)
+            if not pagina["mais"]:
+                return stats
+
+    def sync(self):
+        """Recebe e depois envia. Retorna {recebidas, aplicadas, ignoradas, enviadas, segundos}."""
+        inicio = time.perf_counter()
+        stats = self.pull()
+        stats.update(self.push())
+        stats["segundos"] = round(time.perf_counter() - inicio, 3)
+        return stats
@@ -0,0 +1,317 @@
+# Contratos/model/documentos_cache_model.py
+"""
+Cópia local dos documentos dos contratos (campo path_arquivo da aba 'arquivos').
+
+Os arquivos são baixados em paralelo (pool limitado), com retomada de downloads
+interrompidos (cabeçalho Range) e guardados por conteúdo (SHA-256) numa pasta
+"documentos" ao lado do banco: o mesmo PDF publicado em vários contratos ocupa
+espaço uma única vez. A tabela documentos_cache liga cada URL ao arquivo local.
+"""
+import os
+import time
+import shutil
+import hashlib
+import mimetypes
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from utils.sql_profiler import sql_profiler
+
+STATUS_PADRAO = "SEÇÃO CONTRATOS"
+
+SELECAO_UASG = "uasg"
+SELECAO_STATUS = "status"
+
+# Resultado de cada download
+BAIXADO = "baixado"
+EM_CACHE = "em_cache"
+ERRO = "erro"
+CANCELADO = "cancelado"
+
+CHUNK_SIZE = 256 * 1024
+
+CREATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS documentos_cache (
+        url TEXT PRIMARY KEY,
+        contrato_id TEXT,
+        tipo TEXT,
+        descricao TEXT,
+        sha256 TEXT NOT NULL,
+        tamanho INTEGER,
+        content_type TEXT,
+        caminho TEXT NOT NULL,
+        baixado_em TEXT
+    )'''
+
+
+def default_store_dir(db_path):
+    """Pasta 'documentos' ao lado do banco de dados."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "documentos")
+
+
+def _extension_for(url, content_type):
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    if ext and len(ext) <= 6 and ext[1:].isalnum():
+        return ext
+    if content_type:
+        guessed = mimetypes.guess_extension(content_type.split(";")[0].strip())
+        if guessed:
+            return guessed
+    return ".bin"
+
+
+def _sha256_of(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """
+    Repositório local de documentos endereçado por conteúdo.
+
+    objetos/ab/<sha256>.<ext>   -> conteúdo (um arquivo por hash)
+    parciais/<sha1 da url>.part -> downloads em andamento (retomados no próximo pedido)
+    """
+
+    def __init__(self, db_path, store_dir=None, max_workers=4, timeout=30, session_factory=requests.Session):
+        self.db_path = db_path
+        self.store_dir = store_dir or default_store_dir(db_path)
+        self.objects_dir = os.path.join(self.store_dir, "objetos")
+        self.partial_dir = os.path.join(self.store_dir, "parciais")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._session_factory = session_factory
+        self._local = threading.local()
+        self._db_lock = threading.Lock()
+        self._url_locks = {}
+        self._ensure_table()
+
+    # ==================== Banco ====================
+    def _connect(self):
+        return sql_profiler.connect(self.db_path)
+
+    def _ensure_table(self):
+        conn = self._connect()
+        try:
+            conn.execute(CREATE_TABLE_SQL)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documentos_cache_contrato ON documentos_cache (contrato_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_documentos_cache_sha256 ON documentos_cache (sha256)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _record(self, doc, sha256, tamanho, content_type, caminho):
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO documentos_cache "
+                    "(url, contrato_id, tipo, descricao, sha256, tamanho, content_type, caminho, baixado_em) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (doc["url"], str(doc.get("contrato_id") or ""), doc.get("tipo"), doc.get("descricao"),
+                     sha256, tamanho, content_type, caminho, datetime.now().isoformat(timespec="seconds")),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+    def local_path(self, url):
+        """Caminho absoluto da cópia local da URL, ou None se ainda não foi baixada."""
+        if not url:
+            return None
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT caminho FROM documentos_cache WHERE url = ?", (url,)).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        path = os.path.join(self.store_dir, row[0])
+        return path if os.path.isfile(path) else None
+
+    def local_paths_for_contract(self, contrato_id):
+        """{url: caminho local} dos documentos já baixados de um contrato."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT url, caminho FROM documentos_cache WHERE contrato_id = ?", (str(contrato_id),)
+            ).fetchall()
+        finally:
+            conn.close()
+        paths = {}
+        for url, caminho in rows:
+            path = os.path.join(self.store_dir, caminho)
+            if os.path.isfile(path):
+                paths[url] = path
+        return paths
+
+    def stats(self):
+        """Quantidade de URLs, de arquivos distintos e bytes ocupados no repositório."""
+        conn = self._connect()
+        try:
+            urls, arquivos = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT sha256) FROM documentos_cache").fetchone()
+            tamanho = conn.execute(
+                "SELECT COALESCE(SUM(tamanho), 0) FROM "
+                "(SELECT sha256, MAX(tamanho) AS tamanho FROM documentos_cache GROUP BY sha256)").fetchone()[0]
+        finally:
+            conn.close()
+        return {"urls": urls, "arquivos": arquivos, "bytes": tamanho}
+
+    # ==================== Seleção ====================
+    def select_contracts(self, selecao, valor):
+        """IDs dos contratos de uma UASG ou com um determinado status."""
+        if selecao == SELECAO_UASG:
+            sql = "SELECT id FROM contratos WHERE uasg_code = ? ORDER BY id"
+        elif selecao == SELECAO_STATUS:
+            sql = (
+                "SELECT c.id FROM contratos c LEFT JOIN status_contratos s ON s.contrato_id = c.id "
+                f"WHERE COALESCE(NULLIF(s.status, ''), '{STATUS_PADRAO}') = ? ORDER BY c.id"
+            )
+        else:
+            raise ValueError(f"Tipo de seleção desconhecido: {selecao}")
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute(sql, (str(valor),))]
+        finally:
+            conn.close()
+
+    def collect_documents(self, contrato_ids, fetch_arquivos, should_cancel=None):
+        """
+        Monta a lista de documentos a baixar a partir da aba 'arquivos' de cada contrato.
+        fetch_arquivos(contrato_id) -> (lista, erro), como UASGModel.get_sub_data_cached;
+        as consultas rodam no mesmo pool limitado dos downloads.
+        Retorna (documentos, erros); URLs repetidas aparecem uma única vez.
+        """
+        def _fetch(contrato_id):
+            if should_cancel and should_cancel():
+                return contrato_id, [], None
+            return (contrato_id, *fetch_arquivos(contrato_id))
+
+        documentos, erros, vistos = [], [], set()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="documentos") as executor:
+            # map preserva a ordem dos contratos
+            for contrato_id, arquivos, error in executor.map(_fetch, contrato_ids):
+                if error:
+                    erros.append(f"{contrato_id}: {error}")
+                    continue
+                for arquivo in arquivos or []:
+                    url = (arquivo.get("path_arquivo") or "").strip()
+                    if not url.startswith(("http://", "https://")) or url in vistos:
+                        continue
+                    vistos.add(url)
+                    documentos.append({
+                        "url": url,
+                        "contrato_id": str(contrato_id),
+                        "tipo": arquivo.get("tipo"),
+                        "descricao": arquivo.get("descricao"),
+                    })
+        return documentos, erros
+
+    # ==================== Download ====================
+    def _session(self):
+        # requests.Session não é thread-safe: uma por thread do pool
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._session_factory()
+            self._local.session = session
+        return session
+
+    def _url_lock(self, url):
+        with self._db_lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _partial_path(self, url):
+        return os.path.join(self.partial_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+
+    def download(self, doc, force=False, should_cancel=None):
+        """
+        Baixa um documento (retomando um download parcial, se houver).
+        Retorna {"url", "status", "caminho", "sha256", "bytes", "erro"}.
+        """
+        url = doc["url"]
+        result = {"url": url, "status": ERRO, "caminho": None, "sha256": None, "bytes": 0, "erro": ""}
+        with self._url_lock(url):
+            if not force:
+                existing = self.local_path(url)
+                if existing:
+                    result.update(status=EM_CACHE, caminho=existing)
+                    return result
+
+            os.makedirs(self.partial_dir, exist_ok=True)
+            part_path = self._partial_path(url)
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+            try:
+                with self._session().get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    if response.status_code == 416 and offset:
+                        # O parcial já tem o arquivo inteiro: só falta finalizar
+                        content_type = None
+                    else:
+                        response.raise_for_status()
+                        content_type = response.headers.get("Content-Type")
+                        # 206 = servidor aceitou a retomada; 200 = recomeça do zero
+                        mode = "ab" if response.status_code == 206 and offset else "wb"
+                        with open(part_path, mode) as f:
+                            for chunk in response.iter_content(CHUNK_SIZE):
+                                if should_cancel and should_cancel():
+                                    result.update(status=CANCELADO, erro="Download interrompido")
+                                    return result
+                                f.write(chunk)
+                                result["bytes"] += len(chunk)
+            except (requests.RequestException, OSError) as e:
+                result["erro"] = str(e)
+                return result
+
+            sha256 = _sha256_of(part_path)
+            tamanho = os.path.getsize(part_path)
+            relative = os.path.join("objetos", sha256[:2], sha256 + _extension_for(url, content_type))
+            final_path = os.path.join(self.store_dir, relative)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if os.path.exists(final_path):
+                # Mesmo conteúdo já guardado por outra URL
+                os.remove(part_path)
+            else:
+                shutil.move(part_path, final_path)
+
+            self._record(doc, sha256, tamanho, content_type, relative)
+            result.update(status=BAIXADO, caminho=final_path, sha256=sha256)
+            return result
+
+    def download_all(self, documentos, progress_callback=None, should_cancel=None, force=False):
+        """
+        Baixa a lista de documentos com no máximo max_workers downloads simultâneos.
+        Retorna as estatísticas {total, baixados, em_cache, erros, cancelados, bytes, segundos, falhas}.
+        """
+        inicio = time.perf_counter()
+        stats = {"total": len(documentos), BAIXADO: 0, EM_CACHE: 0, ERRO: 0, CANCELADO: 0, "bytes": 0, "falhas": []}
+        concluidos = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="documentos") as executor:
+            futures = [executor.submit(self.download, doc, force, should_cancel) for doc in documentos]
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                result = future.result()
+                stats[result["status"]] += 1
+                stats["bytes"] += result["bytes"]
+                if result["status"] == ERRO:
+                    stats["falhas"].append(f"{result['url']}: {result['erro']}")
+                concluidos += 1
+                if progress_callback:
+                    progress_callback(concluidos, len(documentos))
+                if should_cancel and should_cancel():
+                    for pending in futures:
+                        pending.cancel()
+        stats["cancelados"] = stats.pop(CANCELADO) + sum(1 for f in futures if f.cancelled())
+        stats["baixados"] = stats.pop(BAIXADO)
+        stats["erros"] = stats.pop(ERRO)
+        stats["segundos"] = round(time.perf_counter() - inicio, 3)
+        return stats
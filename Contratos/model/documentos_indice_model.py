@@ -0,0 +1,279 @@
+# Contratos/model/documentos_indice_model.py
+"""
+Índice de texto completo (SQLite FTS5) dos documentos baixados para a cópia local.
+
+O texto de cada arquivo de documentos_cache é extraído num pool de processos e
+gravado na tabela virtual documentos_fts, uma linha por (contrato_id, url). A
+tabela documentos_indexados guarda o hash indexado de cada URL: arquivos que não
+mudaram são pulados e cada conteúdo distinto é extraído uma única vez, então a
+indexação pode ser chamada após cada download sem refazer o trabalho.
+"""
+import os
+import re
+import time
+import zipfile
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.sql_profiler import sql_profiler
+
+PARALLEL_THRESHOLD = 8
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"[ \t\r\f\v]+")
+
+# Marcadores usados por highlight() para contar ocorrências (não aparecem em texto extraído)
+_HIT_START, _HIT_END = "\x02", "\x03"
+
+CREATE_SQL = (
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS documentos_fts USING fts5(
+        texto, contrato_id UNINDEXED, url UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )''',
+    '''CREATE TABLE IF NOT EXISTS documentos_indexados (
+        url TEXT PRIMARY KEY,
+        contrato_id TEXT,
+        sha256 TEXT,
+        caracteres INTEGER,
+        erro TEXT,
+        indexado_em TEXT
+    )''',
+)
+
+
+# ==================== Extração (executada nos processos do pool) ====================
+def _extract_pdf(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("Extração de PDF requer o pacote 'pypdf' (pip install pypdf).")
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _extract_docx(path):
+    from docx import Document
+    document = Document(path)
+    parts = [p.text for p in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            parts.append(" | ".join(cell.text for cell in row.cells))
+    return "\n".join(parts)
+
+
+def _extract_plain(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        text = raw.decode("latin-1")
+    if path.lower().endswith((".htm", ".html")):
+        text = _TAG_RE.sub(" ", text)
+    return text
+
+
+_EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".docx": _extract_docx,
+    ".txt": _extract_plain,
+    ".htm": _extract_plain,
+    ".html": _extract_plain,
+}
+
+
+def extract_text(path):
+    """
+    Extrai o texto de um documento local. Retorna (texto, erro).
+    Função de módulo para poder ser enviada aos processos do pool.
+    """
+    extractor = _EXTRACTORS.get(os.path.splitext(path)[1].lower())
+    if extractor is None:
+        return "", f"Formato não suportado: {os.path.basename(path)}"
+    try:
+        text = extractor(path)
+    except (OSError, RuntimeError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        return "", str(e)
+    except Exception as e:  # PDFs corrompidos geram exceções variadas no leitor
+        return "", f"Falha ao ler o documento: {e}"
+    return _SPACE_RE.sub(" ", text).strip(), None
+
+
+def _extract_job(job):
+    sha256, path = job
+    return (sha256, *extract_text(path))
+
+
+# ==================== Consulta ====================
+def build_fts_query(text):
+    """
+    Converte o texto digitado numa consulta FTS5 segura: cada palavra (ou trecho
+    entre aspas) vira um termo entre aspas, todos obrigatórios. 'palavra*' busca prefixo.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text or ""):
+        term = (phrase or word).replace('"', "")
+        prefix = term.endswith("*") and not phrase
+        term = term.rstrip("*").strip()
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class DocumentIndex:
+    """Índice FTS5 dos documentos da cópia local (mesmo banco de documentos_cache)."""
+
+    def __init__(self, document_cache, workers=None):
+        self.cache = document_cache
+        self.db_path = document_cache.db_path
+        self.workers = workers if workers is not None else min(os.cpu_count() or 1, 4)
+        self._ensure_tables()
+
+    def _connect(self):
+        return sql_profiler.connect(self.db_path)
+
+    def _ensure_tables(self):
+        conn = self._connect()
+        try:
+            for sql in CREATE_SQL:
+                conn.execute(sql)
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ==================== Indexação ====================
+    def pending(self):
+        """
+        Documentos baixados cujo conteúdo ainda não foi indexado (URL nova ou arquivo alterado).
+        Retorna [(url, contrato_id, sha256, caminho_absoluto), ...].
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT c.url, c.contrato_id, c.sha256, c.caminho FROM documentos_cache c "
+                "LEFT JOIN documentos_indexados i ON i.url = c.url "
+                "WHERE i.sha256 IS NULL OR i.sha256 <> c.sha256 "
+                "ORDER BY c.sha256"
+            ).fetchall()
+        finally:
+            conn.close()
+        return [(url, contrato_id, sha256, os.path.join(self.cache.store_dir, caminho))
+                for url, contrato_id, sha256, caminho in rows]
+
+    def _extract_all(self, jobs, progress_callback, should_cancel):
+        """Extrai o texto de cada conteúdo distinto; gera (sha256, texto, erro)."""
+        if len(jobs) >= PARALLEL_THRESHOLD and self.workers > 1:
+            # 'spawn' em todas as plataformas: o processo principal tem threads do Qt
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx) as executor:
+                for done, result in enumerate(executor.map(_extract_job, jobs), start=1):
+                    yield result
+                    if progress_callback:
+                        progress_callback(done, len(jobs))
+                    if should_cancel and should_cancel():
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        return
+        else:
+            for done, job in enumerate(jobs, start=1):
+                if should_cancel and should_cancel():
+                    return
+                yield _extract_job(job)
+                if progress_callback:
+                    progress_callback(done, len(jobs))
+
+    def index_pending(self, progress_callback=None, should_cancel=None):
+        """
+        Indexa o que está pendente e retorna {documentos, arquivos, erros, segundos}.
+        Cada resultado é gravado assim que chega; um cancelamento preserva o que já foi feito.
+        """
+        inicio = time.perf_counter()
+        pendentes = self.pending()
+        by_sha = {}
+        for url, contrato_id, sha256, path in pendentes:
+            by_sha.setdefault(sha256, {"path": path, "docs": []})["docs"].append((url, contrato_id))
+        jobs = [(sha256, info["path"]) for sha256, info in by_sha.items()]
+
+        stats = {"documentos": 0, "arquivos": 0, "erros": []}
+        conn = self._connect()
+        try:
+            with sql_profiler.operation("indexar_documentos"):
+                for sha256, texto, erro in self._extract_all(jobs, progress_callback, should_cancel):
+                    agora = datetime.now().isoformat(timespec="seconds")
+                    for url, contrato_id in by_sha[sha256]["docs"]:
+                        conn.execute("DELETE FROM documentos_fts WHERE url = ?", (url,))
+                        if texto:
+                            conn.execute(
+                                "INSERT INTO documentos_fts (texto, contrato_id, url) VALUES (?, ?, ?)",
+                                (texto, contrato_id, url),
+                            )
+                        conn.execute(
+                            "INSERT OR REPLACE INTO documentos_indexados "
+                            "(url, contrato_id, sha256, caracteres, erro, indexado_em) VALUES (?, ?, ?, ?, ?, ?)",
+                            (url, contrato_id, sha256, len(texto), erro, agora),
+                        )
+                        stats["documentos"] += 1
+                    conn.commit()
+                    stats["arquivos"] += 1
+                    if erro:
+                        stats["erros"].append(f"{os.path.basename(by_sha[sha256]['path'])}: {erro}")
+        finally:
+            conn.close()
+        stats["segundos"] = round(time.perf_counter() - inicio, 3)
+        return stats
+
+    def stats(self):
+        conn = self._connect()
+        try:
+            indexados, com_erro = conn.execute(
+                "SELECT COUNT(*), COUNT(erro) FROM documentos_indexados").fetchone()
+        finally:
+            conn.close()
+        return {"indexados": indexados, "com_erro": com_erro, "pendentes": len(self.pending())}
+
+    # ==================== Busca ====================
+    def search(self, text, limit=50):
+        """
+        Procura o texto nos documentos indexados e agrupa por contrato, do que tem
+        mais ocorrências para o que tem menos. Retorna uma lista de dicionários
+        {contrato_id, numero, uasg, fornecedor, ocorrencias, documentos, trecho, url}.
+        """
+        query = build_fts_query(text)
+        if not query:
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT f.contrato_id, f.url, bm25(documentos_fts), "
+                f"highlight(documentos_fts, 0, '{_HIT_START}', '{_HIT_END}'), "
+                "snippet(documentos_fts, 0, '[', ']', ' … ', 16) "
+                "FROM documentos_fts f WHERE documentos_fts MATCH ? ORDER BY bm25(documentos_fts)",
+                (query,),
+            ).fetchall()
+
+            contratos = {}
+            for contrato_id, url, rank, marcado, trecho in rows:
+                item = contratos.setdefault(contrato_id, {
+                    "contrato_id": contrato_id, "ocorrencias": 0, "documentos": 0,
+                    "rank": rank, "trecho": trecho, "url": url,
+                })
+                item["ocorrencias"] += marcado.count(_HIT_START)
+                item["documentos"] += 1
+
+            resultados = sorted(contratos.values(), key=lambda r: (-r["ocorrencias"], r["rank"]))[:limit]
+            ids = [r["contrato_id"] for r in resultados]
+            info = {}
+            if ids:
+                placeholders = ",".join("?" * len(ids))
+                for contrato_id, numero, uasg, fornecedor in conn.execute(
+                    f"SELECT id, numero, uasg_code, fornecedor_nome FROM contratos WHERE id IN ({placeholders})", ids
+                ):
+                    info[str(contrato_id)] = (numero, uasg, fornecedor)
+        finally:
+            conn.close()
+
+        for r in resultados:
+            numero, uasg, fornecedor = info.get(str(r["contrato_id"]), ("", "", ""))
+            r.update(numero=numero or "", uasg=uasg or "", fornecedor=fornecedor or "")
+            del r["rank"]
+        return resultados
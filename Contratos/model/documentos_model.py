@@ -0,0 +1,82 @@
+# Contratos/model/documentos_model.py
+"""
+Mapeamento dos placeholders dos modelos .docx (utils/template) para os campos do
+contrato (formato da API do Comprasnet + objeto editado no banco).
+"""
+from datetime import datetime
+
+from utils.sql_profiler import sql_profiler
+from utils.docx_engine import apply_field_map, formatar_valor, valor_por_extenso
+from utils.template_engine import build_context
+
+# Modelos que fazem sentido para um contrato
+CONTRATO_DOCUMENTOS = ("autuacao", "checklist", "nota_tecnica", "cp_encaminhamento_agu")
+
+
+def _ug(contrato):
+    return contrato["contratante"]["orgao"]["unidade_gestora"]
+
+
+def _parte(numero, indice):
+    """'00012/2024' -> '00012' (0) ou '2024' (1)."""
+    return str(numero).split("/")[indice]
+
+
+def _eh_compra(contrato):
+    return (contrato.get("categoria") or "").lower().startswith("compra")
+
+
+CONTRATO_FIELD_MAP = {
+    "nup": lambda c: c.get("processo"),
+    "objeto": lambda c: c.get("objeto_editado") or c.get("objeto"),
+    "objeto_completo": lambda c: c.get("objeto_editado") or c.get("objeto"),
+    "tipo": lambda c: c.get("tipo"),
+    "numero": lambda c: _parte(c["numero"], 0),
+    "ano": lambda c: _parte(c["numero"], 1),
+    "num_pregao": lambda c: _parte(c["licitacao_numero"], 0),
+    "ano_pregao": lambda c: _parte(c["licitacao_numero"], 1),
+    "valor_total": lambda c: formatar_valor(c.get("valor_global")),
+    "valor_total_extenso": lambda c: valor_por_extenso(c.get("valor_global")),
+    "descricao_servico": lambda c: "aquisição de" if _eh_compra(c) else "contratação de serviço de",
+    "x_material": lambda c: "X" if _eh_compra(c) else " ",
+    "x_servico": lambda c: " " if _eh_compra(c) else "X",
+    "organizacao": lambda c: _ug(c).get("nome_resumido"),
+    "dados_ug_contratante": lambda c: f"{_ug(c)['nome']} - UASG {_ug(c)['codigo']}",
+    "empresa": lambda c: c["fornecedor"]["nome"],
+    "cnpj": lambda c: c["fornecedor"]["cnpj_cpf_idgener"],
+    "hoje": lambda c: datetime.now().strftime("%d/%m/%Y"),
+}
+
+
+def contrato_document_context(contract_data, objeto_editado=""):
+    """Contexto do documento: campos simples do contrato + placeholders mapeados."""
+    source = dict(contract_data, objeto_editado=objeto_editado or "")
+    base = build_context(contract_data, contract_data.get("fornecedor") or {})
+    return apply_field_map(CONTRATO_FIELD_MAP, source, base)
+
+
+def contrato_record_key(contract_data):
+    """Chave estável do contrato para o nome do arquivo: <uasg>_<numero>_<id>."""
+    try:
+        uasg = _ug(contract_data).get("codigo", "")
+    except (KeyError, TypeError):
+        uasg = ""
+    return f"{uasg}_{contract_data.get('numero', '')}_{contract_data.get('id', '')}"
+
+
+def contrato_document_jobs(db_path, contracts):
+    """[(chave, contexto)] para vários contratos, com o objeto editado lido em uma única consulta."""
+    ids = [str(c.get("id")) for c in contracts if c.get("id") is not None]
+    editados = {}
+    if ids:
+        conn = sql_profiler.connect(db_path)
+        try:
+            placeholders = ",".join("?" * len(ids))
+            for contrato_id, objeto_editado in conn.execute(
+                f"SELECT contrato_id, objeto_editado FROM status_contratos WHERE contrato_id IN ({placeholders})", ids
+            ):
+                editados[str(contrato_id)] = objeto_editado
+        finally:
+            conn.close()
+    return [(contrato_record_key(c), contrato_document_context(c, editados.get(str(c.get("id")), "")))
+            for c in contracts]
@@ -0,0 +1,270 @@
+# Contratos/model/empenhos_relatorio_model.py
+"""
+Distribuição dos empenhos pelos períodos de vigência (contrato e termos aditivos).
+
+Os períodos de um contrato viram intervalos disjuntos ordenados e cada empenho é
+localizado por busca binária (bisect), com os valores em formato brasileiro
+convertidos uma única vez. O relatório em lote percorre as tabelas offline
+(contratos, historico, empenhos) de uma UASG em uma única passada ordenada.
+"""
+import json
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from utils.sql_profiler import sql_profiler
+
+# Tipos do histórico que abrem um período de vigência (contrato e termo aditivo)
+CODIGOS_PERIODO = ("50", "55")
+
+OBS_OK = "OK"
+OBS_VERIFICAR = "Sera??"
+
+
+def parse_br_float(value):
+    """'1.234,56' -> 1234.56. Aceita números; vazio ou inválido vira 0.0."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return 0.0
+    text = value.replace("R$", "").strip().replace(".", "").replace(",", ".")
+    try:
+        return float(text) if text else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_empenho(empenho):
+    """Converte o empenho uma vez: (data_emissao, empenhado, aliquidar, pago)."""
+    return (
+        _parse_date(empenho.get("data_emissao")),
+        parse_br_float(empenho.get("empenhado", "0,00")),
+        parse_br_float(empenho.get("aliquidar", "0,00")),
+        parse_br_float(empenho.get("pago", "0,00")),
+    )
+
+
+def build_periods(historico):
+    """Períodos de vigência do histórico, em ordem de início."""
+    periodos = []
+    for item in sorted(historico, key=lambda x: x.get('vigencia_inicio') or ''):
+        if item.get("codigo_tipo") not in CODIGOS_PERIODO:
+            continue
+        inicio, fim = _parse_date(item.get('vigencia_inicio')), _parse_date(item.get('vigencia_fim'))
+        if inicio is None or fim is None:
+            continue
+        periodos.append({
+            "titulo": f"{item.get('tipo')} {item.get('numero')}",
+            "inicio": inicio,
+            "fim": fim,
+            "valor_global": parse_br_float(item.get('valor_global', '0,00')),
+            "empenhos_do_periodo": [],
+            "valores_do_periodo": [],
+        })
+    return periodos
+
+
+class PeriodMatcher:
+    """
+    Localiza o período de uma data em O(log n).
+
+    Os períodos podem se sobrepor (aditivo que começa antes do fim do anterior);
+    como na regra original, vale o primeiro período (por data de início) que contém
+    a data. Para isso os limites são quebrados em segmentos disjuntos, cada um já
+    apontando para o período vencedor.
+    """
+
+    def __init__(self, periodos):
+        limites = sorted({p["inicio"] for p in periodos} | {p["fim"] + timedelta(days=1) for p in periodos})
+        self._starts, self._owners = [], []
+        for inicio in limites:
+            owner = next((i for i, p in enumerate(periodos) if p["inicio"] <= inicio <= p["fim"]), None)
+            # Segmentos vizinhos do mesmo período são unidos
+            if self._owners and self._owners[-1] == owner:
+                continue
+            self._starts.append(inicio)
+            self._owners.append(owner)
+
+    def find(self, data):
+        """Índice do período que contém a data, ou None."""
+        if data is None:
+            return None
+        pos = bisect_right(self._starts, data) - 1
+        return self._owners[pos] if pos >= 0 else None
+
+
+def assign_empenhos(historico, empenhos):
+    """
+    Relatório por período: totais empenhado/pago e os empenhos de cada período.
+    Mesmo formato usado pelo EmpenhoController; 'valores' traz os números já convertidos.
+    """
+    periodos = build_periods(historico)
+    matcher = PeriodMatcher(periodos)
+    for empenho in empenhos or []:
+        valores = parse_empenho(empenho)
+        index = matcher.find(valores[0])
+        if index is not None:
+            periodos[index]["empenhos_do_periodo"].append(empenho)
+            periodos[index]["valores_do_periodo"].append(valores)
+
+    report = []
+    for periodo in periodos:
+        valores = periodo["valores_do_periodo"]
+        total_empenhado = sum(v[1] for v in valores)
+        total_pago = sum(v[3] for v in valores)
+        obs = OBS_OK
+        if total_empenhado > periodo['valor_global'] or total_pago > periodo['valor_global']:
+            obs = OBS_VERIFICAR
+        report.append({
+            "titulo": periodo['titulo'],
+            "inicio": periodo['inicio'].strftime("%d/%m/%Y"),
+            "fim": periodo['fim'].strftime("%d/%m/%Y"),
+            "valor_global": periodo['valor_global'],
+            "total_empenhado": total_empenhado,
+            "total_pago": total_pago,
+            "obs": obs,
+            "empenhos_detalhados": periodo['empenhos_do_periodo'],
+            "valores": valores,
+        })
+    return report
+
+
+# ==================== Relatório em lote (UASG) ====================
+def _grouped(cursor):
+    """Agrupa (contrato_id, raw_json) ordenados por contrato_id em listas de dicionários."""
+    for contrato_id, rows in groupby(cursor, key=itemgetter(0)):
+        itens = []
+        for _, raw_json in rows:
+            try:
+                itens.append(json.loads(raw_json) if raw_json else {})
+            except json.JSONDecodeError:
+                continue
+        yield contrato_id, itens
+
+
+def iter_uasg_financials(db_path, uasg_code):
+    """
+    Percorre os contratos da UASG em uma única passada: três consultas ordenadas por
+    contrato (contratos, historico, empenhos) são intercaladas como num merge.
+    Gera um dicionário por contrato com os períodos e os totais.
+    """
+    filtro = "FROM {t} x JOIN contratos c ON c.id = x.contrato_id WHERE c.uasg_code = ? ORDER BY x.contrato_id"
+    conn = sql_profiler.connect(db_path)
+    try:
+        contratos = conn.execute(
+            "SELECT id, numero, fornecedor_nome, valor_global FROM contratos WHERE uasg_code = ? ORDER BY id",
+            (str(uasg_code),),
+        )
+        historicos = _grouped(conn.execute(
+            "SELECT x.contrato_id, x.raw_json " + filtro.format(t="historico"), (str(uasg_code),)))
+        empenhos = _grouped(conn.execute(
+            "SELECT x.contrato_id, x.raw_json " + filtro.format(t="empenhos"), (str(uasg_code),)))
+        proximo_hist = next(historicos, None)
+        proximo_emp = next(empenhos, None)
+
+        for contrato_id, numero, fornecedor, valor_global in contratos:
+            historico, lista_empenhos = [], []
+            # Os cursores andam juntos: descarta grupos órfãos e pega o do contrato atual
+            while proximo_hist is not None and proximo_hist[0] < contrato_id:
+                proximo_hist = next(historicos, None)
+            if proximo_hist is not None and proximo_hist[0] == contrato_id:
+                historico = proximo_hist[1]
+                proximo_hist = next(historicos, None)
+            while proximo_emp is not None and proximo_emp[0] < contrato_id:
+                proximo_emp = next(empenhos, None)
+            if proximo_emp is not None and proximo_emp[0] == contrato_id:
+                lista_empenhos = proximo_emp[1]
+                proximo_emp = next(empenhos, None)
+
+            periodos = assign_empenhos(historico, lista_empenhos)
+            total_empenhado = sum(p["total_empenhado"] for p in periodos)
+            total_pago = sum(p["total_pago"] for p in periodos)
+            valor = parse_br_float(valor_global)
+            yield {
+                "contrato_id": contrato_id,
+                "numero": numero or "",
+                "fornecedor": fornecedor or "",
+                "valor_global": valor,
+                "total_empenhado": total_empenhado,
+                "total_pago": total_pago,
+                "qtd_empenhos": len(lista_empenhos),
+                "periodos": periodos,
+                # Pagamentos acima do valor global do contrato
+                "excede_valor_global": total_pago > valor,
+                "periodos_verificar": sum(1 for p in periodos if p["obs"] == OBS_VERIFICAR),
+            }
+    finally:
+        conn.close()
+
+
+def write_uasg_financial_workbook(file_path, uasg_code, contratos):
+    """
+    Grava o relatório em lote (um único arquivo): aba de resumo por contrato e
+    aba com o empenhado/pago de cada período. Retorna as estatísticas.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    inicio = time.perf_counter()
+    workbook = Workbook(write_only=True)
+    ws_resumo = workbook.create_sheet(f"Resumo UASG {uasg_code}"[:31])
+    ws_periodos = workbook.create_sheet("Períodos")
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+    alerta_font = Font(bold=True, color="FF0000")
+    moeda = '"R$" #,##0.00'
+
+    def header(ws, titles, widths):
+        for index, width in enumerate(widths):
+            ws.column_dimensions[chr(ord("A") + index)].width = width
+        cells = []
+        for title in titles:
+            cell = WriteOnlyCell(ws, value=title)
+            cell.font, cell.fill = header_font, header_fill
+            cells.append(cell)
+        ws.append(cells)
+
+    def row(ws, values, money_columns, alert_column=None):
+        cells = []
+        for index, value in enumerate(values):
+            cell = WriteOnlyCell(ws, value=value)
+            if index in money_columns:
+                cell.number_format = moeda
+            if index == alert_column and value not in (OBS_OK, "Não", ""):
+                cell.font = alerta_font
+            cells.append(cell)
+        ws.append(cells)
+
+    header(ws_resumo, ["Contrato", "Fornecedor", "Valor Global", "Total Empenhado", "Total Pago",
+                       "Empenhos", "Períodos a Verificar", "Pago > Valor Global"],
+           [16, 45, 18, 18, 18, 11, 20, 20])
+    header(ws_periodos, ["Contrato", "Período", "Vigência", "Valor Global do Período",
+                         "Total Empenhado", "Total Pago", "Empenhos", "OBS"],
+           [16, 28, 26, 22, 18, 18, 11, 10])
+
+    total = excedentes = 0
+    for contrato in contratos:
+        total += 1
+        excede = "Sim" if contrato["excede_valor_global"] else "Não"
+        excedentes += contrato["excede_valor_global"]
+        row(ws_resumo, [contrato["numero"], contrato["fornecedor"], contrato["valor_global"],
+                        contrato["total_empenhado"], contrato["total_pago"], contrato["qtd_empenhos"],
+                        contrato["periodos_verificar"], excede], {2, 3, 4}, alert_column=7)
+        for periodo in contrato["periodos"]:
+            row(ws_periodos, [contrato["numero"], periodo["titulo"], f"{periodo['inicio']} a {periodo['fim']}",
+                              periodo["valor_global"], periodo["total_empenhado"], periodo["total_pago"],
+                              len(periodo["valores"]), periodo["obs"]], {3, 4, 5}, alert_column=7)
+
+    workbook.save(file_path)
+    return {"contratos": total, "excedentes": excedentes, "segundos": round(time.perf_counter() - inicio, 3)}
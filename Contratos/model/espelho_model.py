@@ -0,0 +1,300 @@
+# Contratos/model/espelho_model.py
+"""
+Espelho do comprasnet na rede local.
+
+Uma máquina roda o app.py (uvicorn app:app --host 0.0.0.0) e guarda as respostas
+da API pública numa tabela do próprio banco (espelho_cache). As demais máquinas
+configuram o endereço do espelho ("mirror_url" no config.json) e passam a buscar
+primeiro nele, voltando para a API pública se o espelho não responder.
+
+- MirrorCache (servidor): serve do cache enquanto a cópia estiver na validade;
+  na falta dela busca no comprasnet uma única vez, mesmo com vários clientes
+  pedindo a mesma UASG ao mesmo tempo (as requisições concorrentes esperam a
+  mesma busca). Se o comprasnet falhar, serve a cópia vencida. Pode atualizar
+  as cópias vencidas periodicamente em segundo plano.
+- MirrorClient (cliente): troca a URL pública pela do espelho, usa GET
+  condicional (If-None-Match/ETag) e recorre à API pública quando o espelho cai.
+"""
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+
+import requests
+
+from utils.sql_profiler import sql_profiler
+
+URL_API_BASE = "https://contratos.comprasnet.gov.br/api"
+# Prefixo das rotas do espelho no app.py (o restante do caminho é o mesmo da API pública)
+PREFIXO_ESPELHO = "/api/espelho"
+
+VALIDADE_ESPELHO_SEGUNDOS = 15 * 60
+# Tempo máximo do espelho esperando o comprasnet
+TIMEOUT_COMPRASNET = 20
+# (conexão, leitura) do cliente para o espelho: só um espelho inalcançável cai na API pública;
+# a leitura cobre a busca no comprasnet que o espelho faz quando não tem a cópia
+TIMEOUT_ESPELHO = (3, TIMEOUT_COMPRASNET + 10)
+# Cópias que a atualização não consegue renovar por tanto tempo (em validades) são apagadas
+LIMPAR_APOS_VALIDADES = 96
+
+# Sub-recursos do contrato (chaves de "links" na API) que o espelho repassa ao comprasnet
+RECURSOS_CONTRATO = (
+    "historico", "empenhos", "itens", "arquivos", "cronograma", "garantias", "prepostos",
+    "responsaveis", "despesas_acessorias", "faturas", "ocorrencias", "terceirizados",
+)
+
+# Caminhos que o espelho aceita repassar ao comprasnet
+_CAMINHO_VALIDO = re.compile(r"^contrato/(ug/\d+|\d+/(%s))$" % "|".join(RECURSOS_CONTRATO))
+
+CREATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS espelho_cache (
+        caminho TEXT PRIMARY KEY,
+        corpo BLOB NOT NULL,
+        etag TEXT NOT NULL,
+        buscado_em REAL NOT NULL
+    )'''
+
+# origem: "cache" (na validade), "upstream" (acabou de vir do comprasnet) ou "vencido" (comprasnet falhou)
+MirrorEntry = namedtuple("MirrorEntry", "corpo etag buscado_em origem")
+
+
+def caminho_valido(caminho):
+    return bool(_CAMINHO_VALIDO.match(caminho))
+
+
+def _fetch_upstream(url):
+    response = requests.get(url, timeout=TIMEOUT_COMPRASNET)
+    response.raise_for_status()
+    return response.content
+
+
+def _etag(corpo):
+    return '"' + hashlib.sha1(corpo).hexdigest() + '"'
+
+
+class MirrorCache:
+    """Cache das respostas do comprasnet no banco, com busca única por caminho."""
+
+    def __init__(self, db_path, fetch_bytes=_fetch_upstream, base_url=URL_API_BASE,
+                 validade_segundos=VALIDADE_ESPELHO_SEGUNDOS, clock=time.time):
+        self.db_path = db_path
+        self.fetch_bytes = fetch_bytes
+        self.base_url = base_url.rstrip("/")
+        self.validade_segundos = validade_segundos
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._inflight = {}   # caminho -> Future da busca em andamento
+        self._parar = threading.Event()
+        self._agendador = None
+        self.contadores = {"cache": 0, "upstream": 0, "vencido": 0, "agrupadas": 0, "falhas": 0}
+        self._tabela_criada = False
+
+    def _connect(self):
+        conn = sql_profiler.connect(self.db_path, check_same_thread=False)
+        if not self._tabela_criada:
+            # Criada no primeiro uso: importar o app.py não mexe no banco
+            conn.execute(CREATE_TABLE_SQL)
+            conn.commit()
+            self._tabela_criada = True
+        return conn
+
+    def _contar(self, chave):
+        with self._lock:
+            self.contadores[chave] += 1
+
+    def _ler(self, caminho):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT corpo, etag, buscado_em FROM espelho_cache WHERE caminho = ?",
+                               (caminho,)).fetchone()
+        finally:
+            conn.close()
+        return row
+
+    def get(self, caminho, forcar=False):
+        """MirrorEntry do caminho (ex: 'contrato/ug/787010'); busca no comprasnet se preciso."""
+        if not caminho_valido(caminho):
+            raise ValueError(f"Caminho não suportado pelo espelho: {caminho}")
+        row = self._ler(caminho)
+        if row and not forcar and self.clock() - row[2] < self.validade_segundos:
+            self._contar("cache")
+            return MirrorEntry(bytes(row[0]), row[1], row[2], "cache")
+        try:
+            return self._buscar_agrupado(caminho)
+        except Exception as e:
+            self._contar("falhas")
+            if row:
+                print(f"⚠ Espelho: comprasnet falhou para {caminho} ({e}); servindo a cópia vencida.")
+                self._contar("vencido")
+                return MirrorEntry(bytes(row[0]), row[1], row[2], "vencido")
+            raise
+
+    def _buscar_agrupado(self, caminho):
+        with self._lock:
+            future = self._inflight.get(caminho)
+            lider = future is None
+            if lider:
+                future = self._inflight[caminho] = Future()
+            else:
+                self.contadores["agrupadas"] += 1
+        if not lider:
+            # Outra requisição já está buscando este caminho: espera o mesmo resultado
+            return future.result()
+        try:
+            entrada = self._buscar(caminho)
+            future.set_result(entrada)
+            return entrada
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(caminho, None)
+
+    def _buscar(self, caminho):
+        corpo = self.fetch_bytes(f"{self.base_url}/{caminho}")
+        json.loads(corpo)  # não guarda páginas de erro que não sejam JSON
+        entrada = MirrorEntry(corpo, _etag(corpo), self.clock(), "upstream")
+        conn = self._connect()
+        try:
+            conn.execute("INSERT OR REPLACE INTO espelho_cache (caminho, corpo, etag, buscado_em) VALUES (?, ?, ?, ?)",
+                         (caminho, corpo, entrada.etag, entrada.buscado_em))
+            conn.commit()
+        finally:
+            conn.close()
+        self._contar("upstream")
+        return entrada
+
+    # ==================== Atualização agendada ====================
+    def refresh_stale(self):
+        """
+        Apaga as cópias antigas demais (LIMPAR_APOS_VALIDADES) e busca de novo as
+        demais cópias vencidas. Retorna {atualizados, erros, removidos}.
+        """
+        agora = self.clock()
+        limite = agora - self.validade_segundos
+        conn = self._connect()
+        try:
+            removidos = conn.execute("DELETE FROM espelho_cache WHERE buscado_em < ?",
+                                     (agora - LIMPAR_APOS_VALIDADES * self.validade_segundos,)).rowcount
+            conn.commit()
+            caminhos = [row[0] for row in conn.execute(
+                "SELECT caminho FROM espelho_cache WHERE buscado_em < ? ORDER BY buscado_em", (limite,))]
+        finally:
+            conn.close()
+        stats = {"atualizados": 0, "erros": 0, "removidos": removidos}
+        for caminho in caminhos:
+            if self._parar.is_set():
+                break
+            try:
+                self._buscar_agrupado(caminho)
+                stats["atualizados"] += 1
+            except Exception as e:
+                print(f"⚠ Espelho: não foi possível atualizar {caminho}: {e}")
+                stats["erros"] += 1
+        return stats
+
+    def start_scheduler(self, intervalo_segundos):
+        """Atualiza as cópias vencidas a cada 'intervalo_segundos' numa thread própria."""
+        if self._agendador is not None and self._agendador.is_alive():
+            return
+
+        def _loop():
+            while not self._parar.wait(intervalo_segundos):
+                stats = self.refresh_stale()
+                if stats["atualizados"] or stats["erros"] or stats["removidos"]:
+                    print(f"🔄 Espelho: {stats['atualizados']} cópias atualizadas, {stats['erros']} erros, "
+                          f"{stats['removidos']} antigas removidas.")
+
+        self._parar.clear()
+        self._agendador = threading.Thread(target=_loop, name="espelho_agendador", daemon=True)
+        self._agendador.start()
+
+    def stop_scheduler(self):
+        self._parar.set()
+
+    def stats(self):
+        conn = self._connect()
+        try:
+            copias = conn.execute("SELECT COUNT(*) FROM espelho_cache").fetchone()[0]
+        finally:
+            conn.close()
+        with self._lock:
+            return dict(self.contadores, copias=copias, em_andamento=len(self._inflight))
+
+
+class MirrorClient:
+    """
+    Busca JSON do comprasnet passando primeiro pelo espelho da rede local (se
+    configurado). Depois de uma falha o espelho é evitado por 'pausa_segundos'
+    para não somar o timeout dele a cada requisição.
+    """
+
+    def __init__(self, mirror_url="", session=None, timeout_espelho=TIMEOUT_ESPELHO, pausa_segundos=60,
+                 max_etags=256, base_publica=URL_API_BASE, clock=time.monotonic):
+        self.mirror_url = mirror_url
+        self.base_publica = base_publica.rstrip("/")
+        self.session = session or requests
+        self.timeout_espelho = timeout_espelho
+        self.pausa_segundos = pausa_segundos
+        self.max_etags = max_etags
+        self.clock = clock
+        self._etags = OrderedDict()   # url -> (etag, corpo)
+        self._espelho_falhou_em = None
+        self._lock = threading.Lock()
+        self.ultima_origem = None
+
+    def mirror_url_for(self, url):
+        """URL equivalente no espelho, ou None se não houver espelho (ou a URL não for da API pública)."""
+        base = (self.mirror_url or "").strip().rstrip("/")
+        if not base or not url.startswith(self.base_publica + "/"):
+            return None
+        caminho = url[len(self.base_publica) + 1:]
+        if not caminho_valido(caminho):
+            return None
+        return f"{base}{PREFIXO_ESPELHO}/{caminho}"
+
+    def _espelho_disponivel(self):
+        with self._lock:
+            falhou_em = self._espelho_falhou_em
+        return falhou_em is None or self.clock() - falhou_em >= self.pausa_segundos
+
+    def get_json(self, url, timeout=10):
+        """JSON da URL pública, pelo espelho quando possível. Falhas levantam requests.RequestException."""
+        url_espelho = self.mirror_url_for(url)
+        if url_espelho and self._espelho_disponivel():
+            try:
+                data = self._get(url_espelho, self.timeout_espelho)
+                with self._lock:
+                    self._espelho_falhou_em = None
+                self.ultima_origem = "espelho"
+                return data
+            except requests.exceptions.RequestException as e:
+                print(f"⚠ Espelho indisponível ({e}); usando a API pública.")
+                with self._lock:
+                    self._espelho_falhou_em = self.clock()
+        data = self._get(url, timeout)
+        self.ultima_origem = "publica"
+        return data
+
+    def _get(self, url, timeout):
+        with self._lock:
+            guardado = self._etags.get(url)
+        headers = {"If-None-Match": guardado[0]} if guardado else {}
+        response = self.session.get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and guardado:
+            # Nada mudou: reaproveita o corpo já recebido
+            return json.loads(guardado[1])
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._etags[url] = (etag, response.content)
+                self._etags.move_to_end(url)
+                while len(self._etags) > self.max_etags:
+                    self._etags.popitem(last=False)
+        return data
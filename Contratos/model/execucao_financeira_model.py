@@ -0,0 +1,225 @@
+# Contratos/model/execucao_financeira_model.py
+"""
+Execução financeira (empenhado, liquidado, pago) agregada por contrato, UASG,
+fornecedor e ano a partir da tabela offline de empenhos.
+
+Os valores (texto em formato brasileiro dentro do raw_json) são normalizados uma
+vez em colunas REAL nas tabelas execucao_contratos/execucao_empenhos. Gatilhos
+nas tabelas contratos e empenhos marcam em execucao_pendentes os contratos que
+mudaram; refresh() renormaliza só esses, e as consultas são GROUP BY indexados.
+"""
+import time
+
+from utils.sql_profiler import sql_profiler
+from Contratos.model.empenhos_relatorio_model import parse_br_float
+
+SCHEMA_SQL = (
+    '''CREATE TABLE IF NOT EXISTS execucao_contratos (
+        contrato_id TEXT PRIMARY KEY,
+        uasg_code TEXT,
+        numero TEXT,
+        fornecedor_cnpj TEXT,
+        fornecedor_nome TEXT,
+        valor_global REAL NOT NULL DEFAULT 0
+    )''',
+    '''CREATE TABLE IF NOT EXISTS execucao_empenhos (
+        empenho_id INTEGER PRIMARY KEY,
+        contrato_id TEXT NOT NULL,
+        uasg_code TEXT,
+        ano INTEGER,
+        empenhado REAL NOT NULL DEFAULT 0,
+        liquidado REAL NOT NULL DEFAULT 0,
+        pago REAL NOT NULL DEFAULT 0
+    )''',
+    "CREATE TABLE IF NOT EXISTS execucao_pendentes (contrato_id TEXT PRIMARY KEY)",
+    # Índices de cobertura: os GROUP BY leem só o índice
+    "CREATE INDEX IF NOT EXISTS idx_execucao_emp_contrato ON execucao_empenhos (contrato_id, empenhado, liquidado, pago)",
+    "CREATE INDEX IF NOT EXISTS idx_execucao_emp_ano ON execucao_empenhos (uasg_code, ano, empenhado, liquidado, pago)",
+    "CREATE INDEX IF NOT EXISTS idx_execucao_ctr_uasg ON execucao_contratos (uasg_code)",
+    "CREATE INDEX IF NOT EXISTS idx_execucao_ctr_fornecedor ON execucao_contratos (fornecedor_cnpj)",
+    # Totais por contrato (base das visões por UASG e por fornecedor)
+    '''CREATE VIEW IF NOT EXISTS execucao_por_contrato AS
+        SELECT c.contrato_id, c.uasg_code, c.numero, c.fornecedor_cnpj, c.fornecedor_nome, c.valor_global,
+               COALESCE(e.empenhado, 0) AS empenhado, COALESCE(e.liquidado, 0) AS liquidado,
+               COALESCE(e.pago, 0) AS pago, COALESCE(e.qtd, 0) AS empenhos
+        FROM execucao_contratos c
+        LEFT JOIN (
+            SELECT contrato_id, SUM(empenhado) AS empenhado, SUM(liquidado) AS liquidado,
+                   SUM(pago) AS pago, COUNT(*) AS qtd
+            FROM execucao_empenhos GROUP BY contrato_id
+        ) e ON e.contrato_id = c.contrato_id''',
+    # Gatilhos: qualquer alteração marca o contrato para renormalização
+    '''CREATE TRIGGER IF NOT EXISTS trg_execucao_emp_ins AFTER INSERT ON empenhos BEGIN
+        INSERT OR IGNORE INTO execucao_pendentes (contrato_id) VALUES (NEW.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_execucao_emp_upd AFTER UPDATE ON empenhos BEGIN
+        INSERT OR IGNORE INTO execucao_pendentes (contrato_id) VALUES (NEW.contrato_id);
+        INSERT OR IGNORE INTO execucao_pendentes (contrato_id) VALUES (OLD.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_execucao_emp_del AFTER DELETE ON empenhos BEGIN
+        INSERT OR IGNORE INTO execucao_pendentes (contrato_id) VALUES (OLD.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_execucao_ctr_ins AFTER INSERT ON contratos BEGIN
+        INSERT OR IGNORE INTO execucao_pendentes (contrato_id) VALUES (NEW.id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_execucao_ctr_upd AFTER UPDATE ON contratos BEGIN
+        INSERT OR IGNORE INTO execucao_pendentes (contrato_id) VALUES (NEW.id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_execucao_ctr_del AFTER DELETE ON contratos BEGIN
+        INSERT OR IGNORE INTO execucao_pendentes (contrato_id) VALUES (OLD.id); END''',
+)
+
+_BATCH = 500
+
+
+def campo_sql(colunas, nome, alias):
+    """
+    Expressão SQL de um campo do sub-recurso: as tabelas criadas pelo OfflineDBController
+    têm colunas próprias (empenhado, pago...); as do SQLAlchemy só têm o raw_json.
+    Usa a coluna quando existir e estiver preenchida.
+    """
+    expr = f"json_extract({alias}.raw_json, '$.{nome}')"
+    return f"COALESCE({alias}.{nome}, {expr})" if nome in colunas else expr
+
+# Agrupamentos disponíveis: chave -> (colunas exibidas, SQL)
+_PCT = "CASE WHEN {base} > 0 THEN ROUND(100.0 * {valor} / {base}, 1) END"
+
+AGRUPAMENTOS = {
+    "contrato": (
+        ["Contrato", "UASG", "Fornecedor", "Valor Global", "Empenhado", "Liquidado", "Pago",
+         "% Empenhado", "% Pago"],
+        "SELECT numero, uasg_code, fornecedor_nome, valor_global, empenhado, liquidado, pago, "
+        f"{_PCT.format(valor='empenhado', base='valor_global')}, {_PCT.format(valor='pago', base='valor_global')} "
+        "FROM execucao_por_contrato {where} ORDER BY pago DESC, numero",
+    ),
+    "uasg": (
+        ["UASG", "Contratos", "Valor Global", "Empenhado", "Liquidado", "Pago", "% Empenhado", "% Pago"],
+        "SELECT uasg_code, COUNT(*), SUM(valor_global), SUM(empenhado), SUM(liquidado), SUM(pago), "
+        f"{_PCT.format(valor='SUM(empenhado)', base='SUM(valor_global)')}, "
+        f"{_PCT.format(valor='SUM(pago)', base='SUM(valor_global)')} "
+        "FROM execucao_por_contrato {where} GROUP BY uasg_code ORDER BY uasg_code",
+    ),
+    "fornecedor": (
+        ["Fornecedor", "CNPJ/CPF", "Contratos", "Valor Global", "Empenhado", "Liquidado", "Pago",
+         "% Empenhado", "% Pago"],
+        "SELECT MAX(fornecedor_nome), fornecedor_cnpj, COUNT(*), SUM(valor_global), SUM(empenhado), "
+        "SUM(liquidado), SUM(pago), "
+        f"{_PCT.format(valor='SUM(empenhado)', base='SUM(valor_global)')}, "
+        f"{_PCT.format(valor='SUM(pago)', base='SUM(valor_global)')} "
+        "FROM execucao_por_contrato {where} GROUP BY fornecedor_cnpj ORDER BY SUM(pago) DESC",
+    ),
+    # Por ano de emissão do empenho: o percentual é do pago sobre o empenhado no ano
+    "ano": (
+        ["Ano", "Empenhos", "Empenhado", "Liquidado", "Pago", "% Liquidado", "% Pago"],
+        "SELECT ano, COUNT(*), SUM(empenhado), SUM(liquidado), SUM(pago), "
+        f"{_PCT.format(valor='SUM(liquidado)', base='SUM(empenhado)')}, "
+        f"{_PCT.format(valor='SUM(pago)', base='SUM(empenhado)')} "
+        "FROM execucao_empenhos {where} GROUP BY ano ORDER BY ano",
+    ),
+}
+
+
+class ExecucaoFinanceira:
+    """Tabelas normalizadas de execução financeira no banco offline de contratos."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._ensure_schema()
+
+    def _connect(self):
+        conn = sql_profiler.connect(self.db_path)
+        conn.create_function("br_real", 1, parse_br_float, deterministic=True)
+        return conn
+
+    def _ensure_schema(self):
+        conn = self._connect()
+        try:
+            has_tables = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('contratos', 'empenhos')")}
+            if has_tables != {"contratos", "empenhos"}:
+                raise RuntimeError("O banco não possui as tabelas offline de contratos e empenhos.")
+            novo = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'execucao_contratos'").fetchone() is None
+            for sql in SCHEMA_SQL:
+                conn.execute(sql)
+            if novo:
+                # Primeira vez: todos os contratos existentes entram na fila
+                conn.execute("INSERT OR IGNORE INTO execucao_pendentes (contrato_id) SELECT id FROM contratos")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def pending_count(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM execucao_pendentes").fetchone()[0]
+        finally:
+            conn.close()
+
+    def refresh(self):
+        """
+        Renormaliza apenas os contratos marcados pelos gatilhos.
+        Retorna {contratos, empenhos, segundos}.
+        """
+        inicio = time.perf_counter()
+        stats = {"contratos": 0, "empenhos": 0}
+        conn = self._connect()
+        try:
+            with sql_profiler.operation("execucao_financeira_refresh"):
+                pendentes = [row[0] for row in conn.execute("SELECT contrato_id FROM execucao_pendentes")]
+                colunas = {row[1] for row in conn.execute("PRAGMA table_info(empenhos)")}
+                campo = lambda nome: campo_sql(colunas, nome, "e")
+
+                for start in range(0, len(pendentes), _BATCH):
+                    lote = pendentes[start:start + _BATCH]
+                    marks = ",".join("?" * len(lote))
+                    conn.execute(f"DELETE FROM execucao_empenhos WHERE contrato_id IN ({marks})", lote)
+                    conn.execute(f"DELETE FROM execucao_contratos WHERE contrato_id IN ({marks})", lote)
+                    conn.execute(
+                        "INSERT INTO execucao_contratos "
+                        "(contrato_id, uasg_code, numero, fornecedor_cnpj, fornecedor_nome, valor_global) "
+                        "SELECT id, uasg_code, numero, fornecedor_cnpj, fornecedor_nome, br_real(valor_global) "
+                        f"FROM contratos WHERE id IN ({marks})", lote)
+                    cursor = conn.execute(
+                        "INSERT INTO execucao_empenhos "
+                        "(empenho_id, contrato_id, uasg_code, ano, empenhado, liquidado, pago) "
+                        f"SELECT e.id, e.contrato_id, c.uasg_code, CAST(substr({campo('data_emissao')}, 1, 4) AS INTEGER), "
+                        f"br_real({campo('empenhado')}), br_real({campo('liquidado')}), br_real({campo('pago')}) "
+                        "FROM empenhos e JOIN contratos c ON c.id = e.contrato_id "
+                        f"WHERE e.contrato_id IN ({marks})", lote)
+                    stats["empenhos"] += cursor.rowcount
+                    stats["contratos"] += conn.execute(
+                        f"SELECT COUNT(*) FROM execucao_contratos WHERE contrato_id IN ({marks})", lote).fetchone()[0]
+                    conn.execute(f"DELETE FROM execucao_pendentes WHERE contrato_id IN ({marks})", lote)
+                conn.commit()
+        finally:
+            conn.close()
+        stats["segundos"] = round(time.perf_counter() - inicio, 3)
+        return stats
+
+    def uasgs(self):
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT uasg_code FROM execucao_contratos ORDER BY uasg_code")]
+        finally:
+            conn.close()
+
+    def summary(self, agrupamento, uasg_code=None):
+        """(colunas, linhas) do agrupamento pedido, opcionalmente filtrado por UASG."""
+        colunas, sql = AGRUPAMENTOS[agrupamento]
+        where, params = "", ()
+        if uasg_code:
+            where, params = "WHERE uasg_code = ?", (str(uasg_code),)
+        conn = self._connect()
+        try:
+            return colunas, conn.execute(sql.format(where=where), params).fetchall()
+        finally:
+            conn.close()
+
+    def totals(self, uasg_code=None):
+        """Totais gerais: {valor_global, empenhado, liquidado, pago, contratos}."""
+        _, rows = self.summary("uasg", uasg_code)
+        totals = {"contratos": 0, "valor_global": 0.0, "empenhado": 0.0, "liquidado": 0.0, "pago": 0.0}
+        for _, contratos, valor, empenhado, liquidado, pago, *_ in rows:
+            totals["contratos"] += contratos
+            totals["valor_global"] += valor or 0.0
+            totals["empenhado"] += empenhado or 0.0
+            totals["liquidado"] += liquidado or 0.0
+            totals["pago"] += pago or 0.0
+        return totals
@@ -0,0 +1,342 @@
+# Contratos/model/fornecedores_model.py
+"""
+Índice de fornecedores por CNPJ (só dígitos) sobre contratos, empenhos e atas.
+
+Contratos e empenhos do banco offline são copiados, já com o CNPJ normalizado,
+para tabelas indexadas por CNPJ; gatilhos marcam os contratos alterados e
+refresh() só retrabalha esses. As atas ficam em outro banco (atas_controle.db):
+são relidas apenas quando o arquivo muda. O resumo por fornecedor (contratos
+ativos, valor contratado, total pago, vencimento mais próximo) é recalculado só
+para os CNPJs afetados — inclusive os que tiveram contrato vencido desde a
+última atualização.
+"""
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import date
+
+from utils.sql_profiler import sql_profiler
+from Contratos.model.empenhos_relatorio_model import parse_br_float
+from Contratos.model.execucao_financeira_model import campo_sql
+
+SCHEMA_SQL = (
+    '''CREATE TABLE IF NOT EXISTS fornecedor_contratos (
+        contrato_id TEXT PRIMARY KEY,
+        cnpj TEXT NOT NULL,
+        nome TEXT,
+        uasg_code TEXT,
+        numero TEXT,
+        valor_global REAL NOT NULL DEFAULT 0,
+        vigencia_fim TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS fornecedor_empenhos (
+        empenho_id INTEGER PRIMARY KEY,
+        contrato_id TEXT NOT NULL,
+        cnpj TEXT NOT NULL,
+        pago REAL NOT NULL DEFAULT 0
+    )''',
+    '''CREATE TABLE IF NOT EXISTS fornecedor_atas (
+        ata_id INTEGER PRIMARY KEY,
+        cnpj TEXT NOT NULL,
+        empresa TEXT,
+        numero TEXT,
+        termino TEXT,
+        valor_global REAL NOT NULL DEFAULT 0
+    )''',
+    '''CREATE TABLE IF NOT EXISTS fornecedores (
+        cnpj TEXT PRIMARY KEY,
+        nome TEXT,
+        uasgs INTEGER NOT NULL DEFAULT 0,
+        contratos INTEGER NOT NULL DEFAULT 0,
+        contratos_ativos INTEGER NOT NULL DEFAULT 0,
+        valor_contratado REAL NOT NULL DEFAULT 0,
+        total_pago REAL NOT NULL DEFAULT 0,
+        atas INTEGER NOT NULL DEFAULT 0,
+        proximo_vencimento TEXT
+    )''',
+    "CREATE TABLE IF NOT EXISTS fornecedores_pendentes (contrato_id TEXT PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS fornecedores_meta (chave TEXT PRIMARY KEY, valor TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_forn_contratos_cnpj ON fornecedor_contratos (cnpj, vigencia_fim)",
+    "CREATE INDEX IF NOT EXISTS idx_forn_contratos_fim ON fornecedor_contratos (vigencia_fim)",
+    "CREATE INDEX IF NOT EXISTS idx_forn_empenhos_cnpj ON fornecedor_empenhos (cnpj, pago)",
+    "CREATE INDEX IF NOT EXISTS idx_forn_empenhos_contrato ON fornecedor_empenhos (contrato_id)",
+    "CREATE INDEX IF NOT EXISTS idx_forn_atas_cnpj ON fornecedor_atas (cnpj)",
+    "CREATE INDEX IF NOT EXISTS idx_fornecedores_nome ON fornecedores (nome)",
+    '''CREATE TRIGGER IF NOT EXISTS trg_forn_ctr_ins AFTER INSERT ON contratos BEGIN
+        INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) VALUES (NEW.id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_forn_ctr_upd AFTER UPDATE ON contratos BEGIN
+        INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) VALUES (NEW.id);
+        INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) VALUES (OLD.id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_forn_ctr_del AFTER DELETE ON contratos BEGIN
+        INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) VALUES (OLD.id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_forn_emp_ins AFTER INSERT ON empenhos BEGIN
+        INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) VALUES (NEW.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_forn_emp_upd AFTER UPDATE ON empenhos BEGIN
+        INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) VALUES (NEW.contrato_id);
+        INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) VALUES (OLD.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_forn_emp_del AFTER DELETE ON empenhos BEGIN
+        INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) VALUES (OLD.contrato_id); END''',
+)
+
+_BATCH = 500
+_NAO_DIGITOS = re.compile(r"\D")
+
+COLUNAS_FORNECEDOR = ("cnpj", "nome", "uasgs", "contratos", "contratos_ativos", "valor_contratado",
+                      "total_pago", "atas", "proximo_vencimento")
+
+
+def normalize_cnpj(value):
+    """'12.345.678/0001-90' -> '12345678000190'. Vazio vira ''."""
+    return _NAO_DIGITOS.sub("", value) if isinstance(value, str) else ("" if value is None else str(value))
+
+
+def format_cnpj(digits):
+    """Formata 14 dígitos como CNPJ e 11 como CPF; outros tamanhos voltam como estão."""
+    if len(digits) == 14:
+        return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+    if len(digits) == 11:
+        return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+    return digits
+
+
+def _iso_date(value):
+    """Datas das atas podem vir como AAAA-MM-DD ou DD/MM/AAAA; normaliza para ISO."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}.*", value):
+        return value[:10]
+    match = re.fullmatch(r"(\d{2})/(\d{2})/(\d{4})", value)
+    return f"{match.group(3)}-{match.group(2)}-{match.group(1)}" if match else None
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return ""
+    return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+
+class FornecedoresIndex:
+    """Resumo por fornecedor (CNPJ) mantido de forma incremental no banco offline de contratos."""
+
+    def __init__(self, db_path, atas_db_path=None):
+        self.db_path = db_path
+        self.atas_db_path = atas_db_path
+        self._ensure_schema()
+
+    def _connect(self):
+        conn = sql_profiler.connect(self.db_path)
+        conn.create_function("br_real", 1, parse_br_float, deterministic=True)
+        conn.create_function("so_digitos", 1, normalize_cnpj, deterministic=True)
+        return conn
+
+    def _ensure_schema(self):
+        conn = self._connect()
+        try:
+            has_tables = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('contratos', 'empenhos')")}
+            if has_tables != {"contratos", "empenhos"}:
+                raise RuntimeError("O banco não possui as tabelas offline de contratos e empenhos.")
+            novo = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fornecedores'").fetchone() is None
+            for sql in SCHEMA_SQL:
+                conn.execute(sql)
+            if novo:
+                conn.execute("INSERT OR IGNORE INTO fornecedores_pendentes (contrato_id) SELECT id FROM contratos")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def pending_count(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM fornecedores_pendentes").fetchone()[0]
+        finally:
+            conn.close()
+
+    # ==================== Atualização incremental ====================
+    def refresh(self, today=None):
+        """
+        Atualiza o índice: contratos/empenhos marcados pelos gatilhos, atas se o
+        banco delas mudou e contratos que venceram desde a última atualização.
+        Retorna {contratos, atas, fornecedores, segundos}.
+        """
+        inicio = time.perf_counter()
+        hoje = (today or date.today()).isoformat()
+        stats = {"contratos": 0, "atas": 0, "fornecedores": 0}
+        afetados = set()
+        conn = self._connect()
+        try:
+            with sql_profiler.operation("fornecedores_refresh"):
+                meta = dict(conn.execute("SELECT chave, valor FROM fornecedores_meta"))
+                stats["contratos"] = self._refresh_contracts(conn, afetados)
+                stats["atas"] = self._refresh_atas(conn, meta.get("atas_assinatura"), afetados)
+
+                # "Ativo" depende da data: quem venceu desde a última atualização muda de situação
+                ultima = meta.get("data_referencia")
+                if ultima and ultima != hoje:
+                    afetados.update(row[0] for row in conn.execute(
+                        "SELECT cnpj FROM fornecedor_contratos WHERE vigencia_fim >= ?1 AND vigencia_fim < ?2 "
+                        "UNION SELECT cnpj FROM fornecedor_atas WHERE termino >= ?1 AND termino < ?2",
+                        (min(ultima, hoje), max(ultima, hoje))))
+                conn.execute("INSERT OR REPLACE INTO fornecedores_meta VALUES ('data_referencia', ?)", (hoje,))
+
+                afetados.discard("")
+                afetados = sorted(afetados)
+                for start in range(0, len(afetados), _BATCH):
+                    self._update_summary(conn, afetados[start:start + _BATCH], hoje)
+                stats["fornecedores"] = len(afetados)
+                conn.commit()
+        finally:
+            conn.close()
+        stats["segundos"] = round(time.perf_counter() - inicio, 3)
+        return stats
+
+    @staticmethod
+    def _refresh_contracts(conn, afetados):
+        pendentes = [row[0] for row in conn.execute("SELECT contrato_id FROM fornecedores_pendentes")]
+        colunas = {row[1] for row in conn.execute("PRAGMA table_info(empenhos)")}
+        campo = lambda nome: campo_sql(colunas, nome, "e")
+        processados = 0
+        for start in range(0, len(pendentes), _BATCH):
+            lote = pendentes[start:start + _BATCH]
+            marks = ",".join("?" * len(lote))
+            for tabela in ("fornecedor_contratos", "fornecedor_empenhos"):
+                afetados.update(row[0] for row in conn.execute(
+                    f"SELECT DISTINCT cnpj FROM {tabela} WHERE contrato_id IN ({marks})", lote))
+                conn.execute(f"DELETE FROM {tabela} WHERE contrato_id IN ({marks})", lote)
+            conn.execute(
+                "INSERT INTO fornecedor_contratos (contrato_id, cnpj, nome, uasg_code, numero, valor_global, vigencia_fim) "
+                "SELECT id, so_digitos(fornecedor_cnpj), fornecedor_nome, uasg_code, numero, br_real(valor_global), "
+                f"vigencia_fim FROM contratos WHERE id IN ({marks})", lote)
+            # O credor do empenho prevalece; sem ele, vale o fornecedor do contrato
+            conn.execute(
+                "INSERT INTO fornecedor_empenhos (empenho_id, contrato_id, cnpj, pago) "
+                f"SELECT e.id, e.contrato_id, COALESCE(NULLIF(so_digitos({campo('credor_cnpj')}), ''), "
+                f"so_digitos(c.fornecedor_cnpj)), br_real({campo('pago')}) "
+                f"FROM empenhos e JOIN contratos c ON c.id = e.contrato_id WHERE e.contrato_id IN ({marks})", lote)
+            for tabela in ("fornecedor_contratos", "fornecedor_empenhos"):
+                afetados.update(row[0] for row in conn.execute(
+                    f"SELECT DISTINCT cnpj FROM {tabela} WHERE contrato_id IN ({marks})", lote))
+            processados += conn.execute(
+                f"SELECT COUNT(*) FROM fornecedor_contratos WHERE contrato_id IN ({marks})", lote).fetchone()[0]
+            conn.execute(f"DELETE FROM fornecedores_pendentes WHERE contrato_id IN ({marks})", lote)
+        return processados
+
+    def _refresh_atas(self, conn, assinatura_anterior, afetados):
+        """Relê as atas só quando o arquivo do banco de atas mudou (sem caminho, mantém as atuais)."""
+        if self.atas_db_path is None:
+            return 0
+        assinatura = _file_signature(self.atas_db_path)
+        if assinatura == (assinatura_anterior or ""):
+            return 0
+
+        novas = []
+        if assinatura:
+            origem = sqlite3.connect(f"file:{self.atas_db_path}?mode=ro", uri=True)
+            try:
+                if origem.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'atas'").fetchone():
+                    novas = [
+                        (ata_id, normalize_cnpj(cnpj), empresa, numero, _iso_date(termino), parse_br_float(valor))
+                        for ata_id, cnpj, empresa, numero, termino, valor in origem.execute(
+                            "SELECT id, cnpj, empresa, numero, termino, valor_global FROM atas")
+                    ]
+            finally:
+                origem.close()
+        novas = [ata for ata in novas if ata[1]]
+
+        antigas = {row[0]: row for row in conn.execute(
+            "SELECT ata_id, cnpj, empresa, numero, termino, valor_global FROM fornecedor_atas")}
+        atuais = {ata[0]: ata for ata in novas}
+        alteradas = 0
+        for ata_id in antigas.keys() | atuais.keys():
+            antiga, atual = antigas.get(ata_id), atuais.get(ata_id)
+            if antiga != atual:
+                alteradas += 1
+                afetados.update(a[1] for a in (antiga, atual) if a)
+        conn.execute("DELETE FROM fornecedor_atas")
+        conn.executemany("INSERT INTO fornecedor_atas VALUES (?, ?, ?, ?, ?, ?)", novas)
+        conn.execute("INSERT OR REPLACE INTO fornecedores_meta VALUES ('atas_assinatura', ?)", (assinatura,))
+        return alteradas
+
+    @staticmethod
+    def _update_summary(conn, cnpjs, hoje):
+        params = {"hoje": hoje, "cnpjs": json.dumps(cnpjs)}
+        lista = "(SELECT value FROM json_each(:cnpjs))"
+        conn.execute(f"DELETE FROM fornecedores WHERE cnpj IN {lista}", params)
+        conn.execute(
+            "INSERT INTO fornecedores (cnpj, nome, uasgs, contratos, contratos_ativos, valor_contratado, "
+            "total_pago, atas, proximo_vencimento) "
+            "SELECT k.value, COALESCE(c.nome, a.empresa), COALESCE(c.uasgs, 0), COALESCE(c.contratos, 0), "
+            "       COALESCE(c.ativos, 0), COALESCE(c.valor, 0), COALESCE(e.pago, 0), COALESCE(a.atas, 0), "
+            "       CASE WHEN c.vencimento IS NULL THEN a.vencimento WHEN a.vencimento IS NULL THEN c.vencimento "
+            "            ELSE MIN(c.vencimento, a.vencimento) END "
+            "FROM json_each(:cnpjs) k "
+            "LEFT JOIN (SELECT cnpj, MAX(nome) AS nome, COUNT(DISTINCT uasg_code) AS uasgs, COUNT(*) AS contratos, "
+            "                  SUM(vigencia_fim >= :hoje) AS ativos, SUM(valor_global) AS valor, "
+            "                  MIN(CASE WHEN vigencia_fim >= :hoje THEN vigencia_fim END) AS vencimento "
+            f"           FROM fornecedor_contratos WHERE cnpj IN {lista} GROUP BY cnpj) c ON c.cnpj = k.value "
+            "LEFT JOIN (SELECT cnpj, SUM(pago) AS pago FROM fornecedor_empenhos "
+            f"           WHERE cnpj IN {lista} GROUP BY cnpj) e ON e.cnpj = k.value "
+            "LEFT JOIN (SELECT cnpj, MAX(empresa) AS empresa, COUNT(*) AS atas, "
+            "                  MIN(CASE WHEN termino >= :hoje THEN termino END) AS vencimento "
+            f"           FROM fornecedor_atas WHERE cnpj IN {lista} GROUP BY cnpj) a ON a.cnpj = k.value "
+            "WHERE c.cnpj IS NOT NULL OR e.cnpj IS NOT NULL OR a.cnpj IS NOT NULL",
+            params)
+
+    # ==================== Consultas ====================
+    def search(self, texto="", limit=500):
+        """Fornecedores por parte do nome ou do CNPJ (com ou sem pontuação)."""
+        texto = (texto or "").strip()
+        sql = f"SELECT {', '.join(COLUNAS_FORNECEDOR)} FROM fornecedores"
+        params = []
+        if texto and re.fullmatch(r"[\d./\-\s]+", texto):
+            sql += " WHERE cnpj LIKE ?"
+            params.append(normalize_cnpj(texto) + "%")
+        elif texto:
+            sql += " WHERE nome LIKE ?"
+            params.append(f"%{texto}%")
+        sql += " ORDER BY contratos_ativos DESC, valor_contratado DESC LIMIT ?"
+        params.append(limit)
+        conn = self._connect()
+        try:
+            return [dict(zip(COLUNAS_FORNECEDOR, row)) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def supplier(self, cnpj):
+        conn = self._connect()
+        try:
+            row = conn.execute(f"SELECT {', '.join(COLUNAS_FORNECEDOR)} FROM fornecedores WHERE cnpj = ?",
+                               (normalize_cnpj(cnpj),)).fetchone()
+            return dict(zip(COLUNAS_FORNECEDOR, row)) if row else None
+        finally:
+            conn.close()
+
+    def supplier_contracts(self, cnpj):
+        """Contratos do fornecedor com o total pago de cada um (join pelos índices de CNPJ e contrato)."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT c.contrato_id, c.uasg_code, c.numero, c.valor_global, c.vigencia_fim, "
+                "       (SELECT COALESCE(SUM(e.pago), 0) FROM fornecedor_empenhos e WHERE e.contrato_id = c.contrato_id) "
+                "FROM fornecedor_contratos c WHERE c.cnpj = ? ORDER BY c.vigencia_fim DESC",
+                (normalize_cnpj(cnpj),)).fetchall()
+        finally:
+            conn.close()
+        chaves = ("contrato_id", "uasg_code", "numero", "valor_global", "vigencia_fim", "pago")
+        return [dict(zip(chaves, row)) for row in rows]
+
+    def supplier_atas(self, cnpj):
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT ata_id, numero, empresa, termino, valor_global FROM fornecedor_atas "
+                "WHERE cnpj = ? ORDER BY termino DESC", (normalize_cnpj(cnpj),)).fetchall()
+        finally:
+            conn.close()
+        chaves = ("ata_id", "numero", "empresa", "termino", "valor_global")
+        return [dict(zip(chaves, row)) for row in rows]
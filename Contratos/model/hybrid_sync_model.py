@@ -0,0 +1,190 @@
+# Contratos/model/hybrid_sync_model.py
+"""
+Revalidação em segundo plano do modo Híbrido.
+
+No modo Híbrido a interface recebe na hora o que está no banco local e, em
+paralelo, a lista da UASG ou o sub-recurso do contrato é consultado na API.
+Só o que mudou é gravado de volta (contratos com JSON diferente, sub-recursos
+cujo conjunto de registros mudou) e um sinal avisa a tabela ou o diálogo
+aberto para se atualizar no lugar. A mesma chave não é consultada de novo
+dentro de 'intervalo_segundos', então abrir e fechar um diálogo não repete
+as requisições.
+"""
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from utils.sql_profiler import sql_profiler
+from Contratos.model.offline_db_model import (
+    SUB_RECURSOS, URL_API_UASG, SubTableWriter, create_offline_tables, fetch_api_data,
+    refresh_derived_tables, save_contract_row,
+)
+from Contratos.model.offline_build_model import payload_hash
+
+MODO_HIBRIDO = "Híbrido"
+URL_API_SUB_RECURSO = "https://contratos.comprasnet.gov.br/api/contrato/{contrato_id}/{data_type}"
+
+# Tempo mínimo entre duas revalidações da mesma UASG / sub-recurso
+INTERVALO_REVALIDACAO_SEGUNDOS = 300
+
+
+def _fetch_or_raise(url):
+    return fetch_api_data(url, raise_errors=True)
+
+
+def _hash_registro(raw_json):
+    try:
+        return payload_hash(json.loads(raw_json))
+    except (TypeError, ValueError):
+        return None
+
+
+class HybridRevalidator(QObject):
+    # uasg, {"novos": [ids], "alterados": [ids], "ausentes": [ids], "contratos": {id: dados}}
+    uasg_updated = pyqtSignal(str, object)
+    # contrato_id, data_type, lista nova (já gravada no banco)
+    sub_data_updated = pyqtSignal(str, str, object)
+    # chave ("uasg:787010" ou "contrato:123/empenhos"), mensagem de erro
+    revalidation_failed = pyqtSignal(str, str)
+
+    def __init__(self, db_path, fetch_json=_fetch_or_raise, max_workers=2,
+                 intervalo_segundos=INTERVALO_REVALIDACAO_SEGUNDOS, clock=time.monotonic):
+        super().__init__()
+        self.db_path = db_path
+        self.fetch_json = fetch_json
+        self.intervalo_segundos = intervalo_segundos
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hibrido")
+        self._ultima = {}     # chave -> instante da última revalidação agendada
+        self._inflight = {}   # chave -> Future
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sql_profiler.connect(self.db_path)
+        create_offline_tables(conn)
+        return conn
+
+    # ==================== Sincronização (síncrona) ====================
+    def sync_uasg(self, uasg):
+        """Compara a lista da API com o banco e grava só os contratos novos ou alterados."""
+        uasg = str(uasg)
+        data = self.fetch_json(URL_API_UASG.format(uasg=uasg)) or []
+        conn = self._connect()
+        try:
+            salvos = {row[0]: _hash_registro(row[1]) for row in conn.execute(
+                "SELECT id, raw_json FROM contratos WHERE uasg_code = ?", (uasg,))}
+            resultado = {"uasg": uasg, "novos": [], "alterados": [], "ausentes": [], "contratos": {}}
+            for contrato_data in data:
+                contrato_id = str(contrato_data.get("id"))
+                if contrato_id not in salvos:
+                    resultado["novos"].append(contrato_id)
+                elif salvos[contrato_id] != payload_hash(contrato_data):
+                    resultado["alterados"].append(contrato_id)
+                else:
+                    continue
+                save_contract_row(conn, uasg, contrato_data)
+                resultado["contratos"][contrato_id] = contrato_data
+            if resultado["contratos"]:
+                conn.commit()
+        finally:
+            conn.close()
+        # Contratos que sumiram da API não são apagados aqui (status e registros do usuário);
+        # a atualização explícita da UASG e o arquivamento de vencidos cuidam deles
+        ids_api = {str(c.get("id")) for c in data}
+        resultado["ausentes"] = sorted(set(salvos) - ids_api)
+        return resultado
+
+    def sync_sub_data(self, contrato_id, data_type):
+        """
+        Busca o sub-recurso na API e, se o conjunto de registros mudou, substitui as
+        linhas do contrato no banco. Retorna a lista nova ou None se nada mudou.
+        """
+        if data_type not in SUB_RECURSOS:
+            raise ValueError(f"Sub-recurso sem tabela local: {data_type}")
+        contrato_id = str(contrato_id)
+        data = self.fetch_json(URL_API_SUB_RECURSO.format(contrato_id=contrato_id, data_type=data_type)) or []
+        conn = self._connect()
+        try:
+            locais = sorted(_hash_registro(row[0]) or "" for row in conn.execute(
+                f"SELECT raw_json FROM {data_type} WHERE contrato_id = ?", (contrato_id,)))
+            if locais == sorted(payload_hash(item) for item in data):
+                return None
+            self._write_sub_data(conn, contrato_id, data_type, data)
+        finally:
+            conn.close()
+        return data
+
+    def store_sub_data(self, contrato_id, data_type, data):
+        """Grava um sub-recurso já buscado (primeira consulta de um contrato sem cópia local)."""
+        if data_type not in SUB_RECURSOS or data is None:
+            return
+        conn = self._connect()
+        try:
+            self._write_sub_data(conn, str(contrato_id), data_type, data)
+        finally:
+            conn.close()
+
+    def _write_sub_data(self, conn, contrato_id, data_type, data):
+        writer = SubTableWriter(conn)
+        writer.add(data_type, contrato_id, data, replace=True)
+        writer.flush()
+        conn.commit()
+        refresh_derived_tables(self.db_path)
+
+    # ==================== Agendamento (segundo plano) ====================
+    def _schedule(self, chave, func, *args):
+        with self._lock:
+            future = self._inflight.get(chave)
+            if future is not None and not future.done():
+                return future
+            ultima = self._ultima.get(chave)
+            if ultima is not None and self.clock() - ultima < self.intervalo_segundos:
+                return None
+            self._ultima[chave] = self.clock()
+            future = self._inflight[chave] = self._executor.submit(self._run, chave, func, *args)
+            return future
+
+    def _run(self, chave, func, *args):
+        try:
+            return func(*args)
+        except Exception as e:
+            print(f"⚠ Revalidação híbrida de {chave} falhou: {e}")
+            with self._lock:
+                # Falhou: a próxima consulta pode tentar de novo
+                self._ultima.pop(chave, None)
+            self.revalidation_failed.emit(chave, str(e))
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(chave, None)
+
+    def _revalidate_uasg(self, uasg):
+        resultado = self.sync_uasg(uasg)
+        if resultado["novos"] or resultado["alterados"]:
+            print(f"🔄 UASG {uasg}: {len(resultado['novos'])} novos e "
+                  f"{len(resultado['alterados'])} alterados gravados a partir da API.")
+            self.uasg_updated.emit(resultado["uasg"], resultado)
+        return resultado
+
+    def _revalidate_sub_data(self, contrato_id, data_type):
+        data = self.sync_sub_data(contrato_id, data_type)
+        if data is not None:
+            print(f"🔄 '{data_type}' do contrato {contrato_id} mudou na API e foi atualizado no banco.")
+            self.sub_data_updated.emit(contrato_id, data_type, data)
+        return data
+
+    def revalidate_uasg(self, uasg):
+        """Agenda a revalidação da lista de contratos da UASG (None se ainda estiver em dia)."""
+        return self._schedule(f"uasg:{uasg}", self._revalidate_uasg, str(uasg))
+
+    def revalidate_sub_data(self, contrato_id, data_type):
+        """Agenda a revalidação de um sub-recurso do contrato (None se ainda estiver em dia)."""
+        contrato_id = str(contrato_id)
+        return self._schedule(f"contrato:{contrato_id}/{data_type}", self._revalidate_sub_data,
+                              contrato_id, data_type)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,309 @@
+# Contratos/model/link_import_model.py
+"""
+Importação de links de contratos a partir de planilha (colunas link_contrato,
+termo_aditivo e portaria).
+
+- A planilha é lida em modo read_only (linha a linha, sem montar todas as
+  células na memória). Como nesse modo as células não trazem hyperlink, os
+  links são lidos direto do XML da aba (<hyperlinks> + relacionamentos).
+- Os contratos carregados ficam num índice por (UASG, NUMERO/ANO) e outro só
+  por NUMERO/ANO (chaves da planilha sem UASG), então cada linha é uma busca
+  em dicionário.
+- plan_link_import monta a prévia (encontrados, não encontrados, inválidos)
+  sem gravar nada; apply_link_import grava tudo numa única sessão.
+"""
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime
+
+from openpyxl import load_workbook
+from openpyxl.packaging.relationship import get_dependents, get_rels_path
+from openpyxl.utils.cell import range_boundaries
+
+COLUNAS_PLANILHA = ['link_contrato', 'termo_aditivo', 'portaria']
+# Contratos vencidos há mais que isso ficam fora da importação
+DIAS_TOLERANCIA_VIGENCIA = 40
+
+_SHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# Linha da planilha que casou com um contrato
+LinkImportItem = namedtuple("LinkImportItem", "linha chave contrato_id uasg_code link_data termo_aditivo portaria")
+# Linha que não pôde ser importada: motivo 'invalida' ou 'nao_encontrado'
+LinkImportMiss = namedtuple("LinkImportMiss", "linha valor chave motivo")
+
+
+class LinkImportPlan:
+    """Resultado da leitura da planilha, antes de gravar (prévia da importação)."""
+
+    def __init__(self):
+        self.itens = []
+        self.falhas = []
+        self.ambiguas = 0   # chaves sem UASG que existem em mais de uma UASG (usa a primeira)
+
+    @property
+    def contratos(self):
+        """IDs dos contratos encontrados, sem repetição."""
+        return list(dict.fromkeys(item.contrato_id for item in self.itens))
+
+    def summary(self):
+        invalidas = sum(1 for f in self.falhas if f.motivo == "invalida")
+        return {
+            "encontradas": len(self.itens),
+            "contratos": len(self.contratos),
+            "nao_encontradas": len(self.falhas) - invalidas,
+            "invalidas": invalidas,
+            "ambiguas": self.ambiguas,
+        }
+
+
+# ==================== Normalização das chaves ====================
+def normalize_contract_number(contract_string):
+    """Padroniza o número do contrato da base de dados para o formato 00000/AAAA."""
+    if not contract_string:
+        return None
+
+    numeros = re.findall(r'\d+', str(contract_string))
+    if len(numeros) >= 2:
+        numero = int(numeros[0])
+        ano = str(numeros[1])
+        if len(ano) == 2:
+            ano = f"20{ano}"
+        return f"{numero:05d}/{ano}"
+
+    return str(contract_string).strip()
+
+
+def normalize_spreadsheet_key(key_string):
+    """Extrai (UASG, 'NUMERO/ANO') ou (None, 'NUMERO/ANO') de formatos variados."""
+    key_string = str(key_string).strip()
+
+    # Padrão 1: Com UASG (Ex: 87000/21-140/00, 87010/2024-015, 87400/...)
+    match_uasg = re.search(r'(\d{5})[-/](\d{2,4})[-/](\d+)', key_string)
+    if match_uasg:
+        uasg = match_uasg.group(1)
+        part2 = match_uasg.group(2)
+        part3 = match_uasg.group(3)
+
+        # Descobre quem é o ano (part2 ou part3)
+        if len(part2) == 4 or (len(part2) == 2 and len(part3) >= 3):
+            year = part2
+            number = int(part3)
+        else:
+            year = part3
+            number = int(part2)
+
+        # Ajuste dinâmico de UASG (Mapeia QUALQUER 87xxx -> 787xxx)
+        if len(uasg) == 5 and uasg.startswith('8'):
+            uasg = f"7{uasg}"
+
+        if len(year) == 2:
+            year = f"20{year}"
+
+        return (uasg, f"{number:05d}/{year}")
+
+    # Padrão 2: Sem UASG (Ex: 001-2023, 1531/2017, 2024-0027/00)
+    numeros = re.findall(r'\d+', key_string)
+    if len(numeros) >= 2:
+        n1, n2 = numeros[0], numeros[1]
+
+        def is_year(s): return len(s) == 4 and 1990 <= int(s) <= 2100
+
+        if is_year(n2):
+            year, number = n2, int(n1)
+        elif is_year(n1):
+            year, number = n1, int(n2)
+        else:
+            # Fallback para anos de 2 dígitos
+            if len(n2) == 2:
+                year, number = n2, int(n1)
+            else:
+                year, number = n1, int(n2)
+
+        if len(str(year)) == 2:
+            year = f"20{year}"
+
+        return (None, f"{number:05d}/{year}")
+
+    return None
+
+
+# ==================== Índice dos contratos ====================
+class ContractIndex:
+    """Contratos carregados indexados por (UASG, NUMERO/ANO) e por NUMERO/ANO."""
+
+    def __init__(self, contracts_by_uasg, today=None):
+        today = today or datetime.now().date()
+        self.por_chave = {}
+        self.por_numero = {}   # NUMERO/ANO -> chaves (UASG, NUMERO/ANO), na ordem de carregamento
+        for uasg_code, contratos in contracts_by_uasg.items():
+            for contract in contratos:
+                # Filtra por vigência: apenas contratos que não expiraram há mais de 40 dias
+                vigencia_fim_str = contract.get("vigencia_fim")
+                if vigencia_fim_str:
+                    try:
+                        termino_date = datetime.strptime(vigencia_fim_str, "%Y-%m-%d").date()
+                    except (ValueError, TypeError):
+                        continue  # Pula se a data for inválida
+                    if (termino_date - today).days < -DIAS_TOLERANCIA_VIGENCIA:
+                        continue
+
+                numero_ano = normalize_contract_number(contract.get('numero', ''))
+                if numero_ano:
+                    chave = (str(uasg_code), numero_ano)
+                    if chave not in self.por_chave:
+                        self.por_numero.setdefault(numero_ano, []).append(chave)
+                    self.por_chave[chave] = contract
+
+    def __len__(self):
+        return len(self.por_chave)
+
+    def find(self, chave_planilha):
+        """(chave, contrato, ambigua) para a chave da planilha; contrato None se não achar."""
+        uasg, numero_ano = chave_planilha
+        if uasg:
+            return chave_planilha, self.por_chave.get(chave_planilha), False
+        # Sem UASG: primeira UASG carregada que tenha esse número
+        chaves = self.por_numero.get(numero_ano)
+        if not chaves:
+            return chave_planilha, None, False
+        return chaves[0], self.por_chave[chaves[0]], len(chaves) > 1
+
+
+# ==================== Leitura da planilha ====================
+def read_sheet_hyperlinks(file_path, worksheet_path):
+    """{(linha, coluna): url} dos hyperlinks de uma aba do .xlsx (coluna começando em 1)."""
+    links = {}
+    with zipfile.ZipFile(file_path) as archive:
+        rels = {}
+        rels_path = get_rels_path(worksheet_path)
+        if rels_path in archive.namelist():
+            rels = {rel.Id: rel.Target for rel in get_dependents(archive, rels_path)}
+        with archive.open(worksheet_path) as src:
+            for _, elem in ET.iterparse(src):
+                if elem.tag == f"{{{_SHEET_NS}}}hyperlink":
+                    target = rels.get(elem.get(f"{{{_REL_NS}}}id"))
+                    ref = elem.get("ref")
+                    if target and ref:
+                        min_col, min_row, max_col, max_row = range_boundaries(ref)
+                        for linha in range(min_row, max_row + 1):
+                            for coluna in range(min_col, max_col + 1):
+                                links[(linha, coluna)] = target
+                elif elem.tag == f"{{{_SHEET_NS}}}row":
+                    elem.clear()  # as células não são usadas aqui
+    return links
+
+
+def iter_link_rows(file_path):
+    """
+    Lê a aba ativa em modo streaming. Levanta ValueError se faltar alguma coluna;
+    depois gera (linha, {coluna: (valor, hyperlink)}) para cada linha de dados.
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header_row = list(next(rows, ()) or ())
+        if not all(h in header_row for h in COLUNAS_PLANILHA):
+            raise ValueError(f"A planilha deve conter as colunas: {', '.join(COLUNAS_PLANILHA)}")
+        col_indices = {name: header_row.index(name) for name in COLUNAS_PLANILHA}
+        worksheet_path = getattr(sheet, "_worksheet_path", None)
+        links = read_sheet_hyperlinks(file_path, worksheet_path) if worksheet_path else {}
+
+        for row_idx, row in enumerate(rows, start=2):
+            yield row_idx, {
+                nome: (row[indice] if indice < len(row) else None, links.get((row_idx, indice + 1)))
+                for nome, indice in col_indices.items()
+            }
+    finally:
+        workbook.close()
+
+
+def _texto_valido(valor):
+    return bool(valor) and str(valor).strip().upper() != 'XXX'
+
+
+def plan_link_import(file_path, index):
+    """Prévia da importação: casa cada linha da planilha com um contrato do índice, sem gravar."""
+    plano = LinkImportPlan()
+    for row_idx, celulas in iter_link_rows(file_path):
+        key_cell_value, key_link = celulas['link_contrato']
+        if not key_cell_value:
+            continue
+
+        chave_planilha = normalize_spreadsheet_key(key_cell_value)
+        if not chave_planilha:
+            plano.falhas.append(LinkImportMiss(row_idx, key_cell_value, None, "invalida"))
+            continue
+
+        chave, contrato, ambigua = index.find(chave_planilha)
+        if contrato is None:
+            plano.falhas.append(LinkImportMiss(row_idx, key_cell_value, chave, "nao_encontrado"))
+            continue
+        plano.ambiguas += ambigua
+
+        termo_aditivo, link_ta = celulas['termo_aditivo']
+        portaria, link_portaria = celulas['portaria']
+        link_data = {'link_contrato': key_link or key_cell_value, 'link_ta': None, 'link_portaria': None}
+        if _texto_valido(termo_aditivo):
+            link_data['link_ta'] = link_ta
+        if _texto_valido(portaria):
+            link_data['link_portaria'] = link_portaria
+
+        plano.itens.append(LinkImportItem(
+            row_idx, chave, str(contrato.get("id")), chave[0], link_data,
+            str(termo_aditivo) if _texto_valido(termo_aditivo) else None,
+            str(portaria) if _texto_valido(portaria) else None,
+        ))
+    return plano
+
+
+# ==================== Gravação ====================
+def apply_link_import(db, plano, lote=500):
+    """
+    Grava os links e os campos de termo aditivo/portaria de todos os contratos do
+    plano na sessão 'db' (um commit só). Os links de PNCP e Portal Marinha, que
+    não vêm da planilha, são mantidos. Retorna o número de contratos gravados.
+    """
+    from .models import LinksContrato, StatusContrato
+
+    ids = plano.contratos
+    links_existentes, status_existentes = {}, {}
+    for inicio in range(0, len(ids), lote):
+        parte = ids[inicio:inicio + lote]
+        links_existentes.update(
+            (links.contrato_id, links)
+            for links in db.query(LinksContrato).filter(LinksContrato.contrato_id.in_(parte)))
+        status_existentes.update(
+            (status.contrato_id, status)
+            for status in db.query(StatusContrato).filter(StatusContrato.contrato_id.in_(parte)))
+
+    try:
+        # Linha a linha, na ordem da planilha: se um contrato se repete, a última linha vence
+        for item in plano.itens:
+            links = links_existentes.get(item.contrato_id)
+            if links is None:
+                links = links_existentes[item.contrato_id] = LinksContrato(contrato_id=item.contrato_id)
+                db.add(links)
+            links.link_contrato = item.link_data['link_contrato']
+            links.link_ta = item.link_data['link_ta']
+            links.link_portaria = item.link_data['link_portaria']
+
+            if item.termo_aditivo or item.portaria:
+                status = status_existentes.get(item.contrato_id)
+                if status is None:
+                    # Se não existir, cria um novo status para não perder a informação
+                    status = status_existentes[item.contrato_id] = StatusContrato(
+                        contrato_id=item.contrato_id, uasg_code=item.uasg_code)
+                    db.add(status)
+                if item.termo_aditivo:
+                    status.termo_aditivo_edit = item.termo_aditivo
+                if item.portaria:
+                    status.portaria_edit = item.portaria
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(ids)
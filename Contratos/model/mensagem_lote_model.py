@@ -0,0 +1,225 @@
+# Contratos/model/mensagem_lote_model.py
+"""
+Geração de mensagens em lote (mala direta) a partir dos modelos de utils/msg.
+
+Uma única consulta traz contrato + status + objeto editado de todos os contratos
+selecionados; o modelo é compilado uma vez e cada mensagem é gravada assim que
+renderizada (arquivos individuais ou um documento único), sem acumular tudo em memória.
+"""
+import os
+import re
+import json
+import time
+import locale
+from datetime import date, datetime, timedelta
+
+from utils.utils import resource_path
+from utils.sql_profiler import sql_profiler
+from utils.template_engine import build_context, compile_template
+
+STATUS_PADRAO = "SEÇÃO CONTRATOS"
+
+# Pastas de modelos e o prefixo exibido para cada uma
+TEMPLATE_DIRS = {
+    "Contratos": "utils/msg/contratos",
+    "IRP": "utils/msg/irp",
+}
+
+# Tipos de seleção
+SELECAO_UASG = "uasg"
+SELECAO_STATUS = "status"
+SELECAO_VENCENDO = "vencendo"
+
+# Saída
+SAIDA_ARQUIVOS = "arquivos"    # um arquivo por contrato
+SAIDA_DOCUMENTO = "documento"  # todas as mensagens em um único arquivo
+
+_FETCH_SIZE = 500
+
+
+def set_locale_pt_br():
+    """Meses abreviados em português para as variáveis de data (chamar uma vez por uso)."""
+    try:
+        locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
+    except locale.Error:
+        print("Aviso: Locale 'pt_BR.UTF-8' não encontrado. Usando o padrão do sistema.")
+
+
+def list_templates():
+    """Retorna {nome exibido: caminho} dos modelos .txt de contratos e IRP."""
+    templates = {}
+    for prefix, relative_dir in TEMPLATE_DIRS.items():
+        template_dir = resource_path(relative_dir)
+        if not os.path.isdir(template_dir):
+            continue
+        for filename in sorted(os.listdir(template_dir)):
+            if filename.endswith(".txt"):
+                name = os.path.splitext(filename)[0].replace('_', ' ').title()
+                templates[f"{prefix} - {name}"] = os.path.join(template_dir, filename)
+    return templates
+
+
+def build_contract_context(contract_data, objeto_editado_db="", hoje=None):
+    """Variáveis disponíveis nos modelos para um contrato (mesmas do gerador individual)."""
+    hoje = hoje or datetime.now()
+
+    # O objeto completo sempre virá do dado original do contrato
+    objeto_completo_original = contract_data.get('objeto', '')
+    # Se não houver objeto editado no DB, use o original como fallback
+    objeto_editado_final = objeto_editado_db if objeto_editado_db else objeto_completo_original
+
+    vigencia_fim_str = contract_data.get('vigencia_fim')
+    vigencia_fim_formatada = "N/A"
+    if vigencia_fim_str:
+        try:
+            dt_obj = datetime.strptime(vigencia_fim_str, "%Y-%m-%d")
+            vigencia_fim_formatada = dt_obj.strftime("%d%b%Y").upper()
+        except ValueError:
+            vigencia_fim_formatada = "Data Inválida"
+
+    return build_context(
+        contract_data,
+        contract_data.get('fornecedor') or {},
+        objeto_completo=objeto_completo_original,
+        objeto_editado=objeto_editado_final,
+        dia_hoje=hoje.strftime("%d"),
+        mes_hoje=hoje.strftime("%b").upper(),
+        vigencia_fim_formatada=vigencia_fim_formatada,
+    )
+
+
+def _build_query(selecao, valor, today):
+    sql = (
+        "SELECT c.id, c.uasg_code, c.numero, c.raw_json, "
+        f"COALESCE(NULLIF(s.status, ''), '{STATUS_PADRAO}') AS status, s.objeto_editado "
+        "FROM contratos c LEFT JOIN status_contratos s ON s.contrato_id = c.id"
+    )
+    params = []
+    if selecao == SELECAO_UASG:
+        sql += " WHERE c.uasg_code = ?"
+        params.append(str(valor))
+    elif selecao == SELECAO_STATUS:
+        sql += f" WHERE COALESCE(NULLIF(s.status, ''), '{STATUS_PADRAO}') = ?"
+        params.append(str(valor))
+    elif selecao == SELECAO_VENCENDO:
+        # Datas ISO (AAAA-MM-DD) comparam corretamente como texto
+        sql += " WHERE c.vigencia_fim BETWEEN ? AND ?"
+        params.extend([today.isoformat(), (today + timedelta(days=int(valor))).isoformat()])
+    elif selecao is not None:
+        raise ValueError(f"Tipo de seleção desconhecido: {selecao}")
+    sql += " ORDER BY c.uasg_code, c.vigencia_fim, c.id"
+    return sql, params
+
+
+def iter_contract_contexts(db_path, selecao=None, valor=None, today=None, hoje=None):
+    """
+    Percorre os contratos selecionados em uma única consulta.
+    Gera (linha, contexto) em blocos, sem carregar tudo de uma vez.
+    """
+    sql, params = _build_query(selecao, valor, today or date.today())
+    hoje = hoje or datetime.now()
+    conn = sql_profiler.connect(db_path)
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(_FETCH_SIZE)
+            if not rows:
+                break
+            for contrato_id, uasg_code, numero, raw_json, status, objeto_editado in rows:
+                try:
+                    contract_data = json.loads(raw_json) if raw_json else {}
+                except json.JSONDecodeError:
+                    contract_data = {}
+                contract_data.setdefault("id", contrato_id)
+                context = build_contract_context(contract_data, objeto_editado or "", hoje)
+                context.setdefault("status", status)
+                info = {"id": contrato_id, "uasg": uasg_code, "numero": numero or contract_data.get("numero", "")}
+                yield info, context
+    finally:
+        conn.close()
+
+
+def output_file_name(info, extension):
+    """Nome determinístico por contrato: <uasg>_<numero>_<id>.<ext>."""
+    numero = re.sub(r"[^0-9A-Za-z]+", "-", str(info.get("numero") or "")).strip("-") or "sem-numero"
+    contrato_id = re.sub(r"[^0-9A-Za-z]+", "-", str(info.get("id") or "")).strip("-")
+    return f"{info.get('uasg') or 'uasg'}_{numero}_{contrato_id}.{extension}"
+
+
+def generate_batch_messages(db_path, template_path, output_dir, selecao=None, valor=None,
+                            saida=SAIDA_ARQUIVOS, formato="txt", progress_callback=None,
+                            should_cancel=None, today=None):
+    """
+    Gera uma mensagem por contrato selecionado.
+    Retorna (success, mensagem, estatisticas).
+    """
+    inicio = time.perf_counter()
+    try:
+        with open(template_path, "r", encoding="utf-8") as f:
+            template = compile_template(f.read())
+    except OSError as e:
+        return False, f"Não foi possível ler o modelo: {e}", {}
+
+    set_locale_pt_br()
+    os.makedirs(output_dir, exist_ok=True)
+    extension = "md" if formato == "md" else "txt"
+    template_name = os.path.splitext(os.path.basename(template_path))[0]
+
+    total = 0
+    unknown = set()
+    documento = None
+    try:
+        if saida == SAIDA_DOCUMENTO:
+            documento_path = os.path.join(output_dir, f"{template_name}_lote.{extension}")
+            documento = open(documento_path, "w", encoding="utf-8")
+
+        with sql_profiler.operation("mensagens_lote"):
+            for info, context in iter_contract_contexts(db_path, selecao, valor, today=today):
+                if should_cancel and should_cancel():
+                    break
+                message = template.render(context)
+                unknown.update(template.unknown_variables(context))
+
+                if documento is not None:
+                    if formato == "md":
+                        documento.write(f"## Contrato {info['numero']} (UASG {info['uasg']})\n\n{message}\n\n---\n\n")
+                    else:
+                        documento.write(f"===== Contrato {info['numero']} (UASG {info['uasg']}) =====\n{message}\n\n")
+                else:
+                    file_path = os.path.join(output_dir, output_file_name(info, extension))
+                    with open(file_path, "w", encoding="utf-8") as f:
+                        f.write(message)
+
+                total += 1
+                if progress_callback:
+                    progress_callback(total)
+    except (OSError, ValueError) as e:
+        return False, f"Erro ao gerar mensagens: {e}", {"total": total}
+    finally:
+        if documento is not None:
+            documento.close()
+
+    elapsed = time.perf_counter() - inicio
+    stats = {
+        "total": total,
+        "segundos": round(elapsed, 3),
+        "por_segundo": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "variaveis_sem_valor": sorted(unknown),
+    }
+    if total == 0:
+        return False, "Nenhum contrato encontrado para a seleção.", stats
+    return True, f"{total} mensagens geradas em {elapsed:.1f}s em:\n{output_dir}", stats
+
+
+def list_selection_values(db_path):
+    """UASGs e status existentes no banco, para preencher os filtros da tela."""
+    conn = sql_profiler.connect(db_path)
+    try:
+        uasgs = [row[0] for row in conn.execute("SELECT DISTINCT uasg_code FROM contratos ORDER BY uasg_code")]
+        statuses = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT COALESCE(NULLIF(s.status, ''), '{STATUS_PADRAO}') FROM contratos c "
+            "LEFT JOIN status_contratos s ON s.contrato_id = c.id ORDER BY 1"
+        )]
+        return uasgs, statuses
+    finally:
+        conn.close()
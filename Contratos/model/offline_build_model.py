@@ -0,0 +1,260 @@
+# Contratos/model/offline_build_model.py
+"""
+Montagem do banco offline para várias UASGs, retomável.
+
+Cada sub-recurso baixado (histórico, empenhos, itens, arquivos de um contrato)
+fica registrado em offline_build_checkpoint no mesmo commit dos seus dados,
+junto com o hash do JSON do contrato na lista da UASG. Uma nova execução só
+baixa de novo os sub-recursos de contratos cujo JSON mudou ou que passaram da
+validade; os demais nem são regravados, então o tempo de atualização acompanha
+o volume de mudanças. Um cancelamento ou queda de rede recomeça exatamente de
+onde parou. As UASGs são buscadas em paralelo (a API responde por UASG); a
+gravação passa por uma única conexão protegida por lock.
+
+Uso sem interface (UASGs salvas no banco, se nenhuma for informada):
+    python -m Contratos.model.offline_build_model [UASG ...] [--workers 3] [--validade-horas 168] [--completo]
+"""
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.sql_profiler import sql_profiler
+from Contratos.model.offline_db_model import (
+    CHECKPOINT_CONTRATOS, SUB_RECURSOS, URL_API_UASG, SubTableWriter, create_offline_tables,
+    fetch_api_data, filter_contracts, refresh_derived_tables, save_contract_row,
+)
+
+# Sub-recursos de contratos sem mudança são baixados de novo depois disso
+VALIDADE_HORAS_PADRAO = 24 * 7
+
+CREATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS offline_build_checkpoint (
+        contrato_id TEXT NOT NULL,
+        recurso TEXT NOT NULL,
+        uasg_code TEXT,
+        buscado_em TEXT NOT NULL,
+        hash_contrato TEXT,
+        PRIMARY KEY (contrato_id, recurso)
+    )'''
+
+
+def _fetch_or_raise(url):
+    return fetch_api_data(url, raise_errors=True)
+
+
+def payload_hash(contrato_data):
+    """Hash do JSON do contrato (independente da ordem das chaves)."""
+    texto = json.dumps(contrato_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+class OfflineBuildJob:
+    """Baixa e grava as UASGs informadas, pulando o que ainda está dentro da validade."""
+
+    def __init__(self, db_path, fetch_json=_fetch_or_raise, max_workers=3, validade_horas=VALIDADE_HORAS_PADRAO,
+                 clock=datetime.now):
+        self.db_path = db_path
+        self.fetch_json = fetch_json
+        self.max_workers = max_workers
+        self.validade_horas = validade_horas
+        self._clock = clock
+        self._db_lock = threading.Lock()
+
+    def _connect(self):
+        return sql_profiler.connect(self.db_path, check_same_thread=False)
+
+    def saved_uasgs(self):
+        """UASGs já presentes no banco (para 'atualizar todas')."""
+        conn = self._connect()
+        try:
+            create_offline_tables(conn)
+            return [row[0] for row in conn.execute("SELECT uasg_code FROM uasgs ORDER BY uasg_code")]
+        finally:
+            conn.close()
+
+    def fetched_resources(self, uasg, conn=None):
+        """
+        {contrato_id: {recurso: (buscado_em, hash_contrato)}} já concluídos (e ainda
+        com o contrato no banco) da UASG.
+        """
+        proprio = conn is None
+        conn = conn or self._connect()
+        try:
+            conn.execute(CREATE_TABLE_SQL)
+            rows = conn.execute(
+                "SELECT k.contrato_id, k.recurso, k.buscado_em, k.hash_contrato FROM offline_build_checkpoint k "
+                "JOIN contratos c ON c.id = k.contrato_id WHERE k.uasg_code = ?", (str(uasg),)).fetchall()
+        finally:
+            if proprio:
+                conn.close()
+        estado = {}
+        for contrato_id, recurso, buscado_em, hash_contrato in rows:
+            estado.setdefault(contrato_id, {})[recurso] = (buscado_em, hash_contrato)
+        return estado
+
+    def run(self, uasgs=None, progress_callback=None, should_cancel=None):
+        """
+        Executa a montagem. progress_callback(concluidos, total) recebe os contratos
+        processados (o total cresce à medida que as listas das UASGs chegam).
+        Retorna {uasgs, contratos, alterados, baixados, em_dia, erros, falhas, linhas,
+        removidas, cancelado, segundos}.
+        """
+        inicio = time.perf_counter()
+        self._conn = self._connect()
+        create_offline_tables(self._conn)
+        self._conn.execute(CREATE_TABLE_SQL)
+        # Checkpoints de contratos removidos do banco não valem mais
+        self._conn.execute("DELETE FROM offline_build_checkpoint WHERE contrato_id NOT IN (SELECT id FROM contratos)")
+        self._conn.commit()
+        uasgs = [str(u) for u in (uasgs if uasgs else self.saved_uasgs())]
+
+        self._writer = SubTableWriter(self._conn)
+        self._nao_salvos = 0
+        self._stats = {"uasgs": len(uasgs), "contratos": 0, "alterados": 0, "baixados": 0, "em_dia": 0,
+                       "erros": 0, "falhas": []}
+        self._progresso = {"concluidos": 0, "total": 0}
+        self._progress_callback = progress_callback
+        self._should_cancel = should_cancel or (lambda: False)
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="offline_build") as executor:
+                futures = {executor.submit(self._build_uasg, uasg): uasg for uasg in uasgs}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self._registrar_falha(f"UASG {futures[future]}: {e}")
+        finally:
+            with self._db_lock:
+                self._writer.flush()
+                self._conn.commit()
+                self._conn.close()
+
+        stats = self._stats
+        gravacao = self._writer.stats()
+        stats["linhas"], stats["removidas"] = gravacao["linhas"], gravacao["removidas"]
+        stats["cancelado"] = bool(self._should_cancel())
+        if stats["alterados"] or stats["baixados"]:
+            refresh_derived_tables(self.db_path)
+        stats["segundos"] = round(time.perf_counter() - inicio, 3)
+        return stats
+
+    def _registrar_falha(self, mensagem):
+        print(f"⚠ {mensagem}")
+        with self._db_lock:
+            self._stats["erros"] += 1
+            self._stats["falhas"].append(mensagem)
+
+    def _avancar(self, total=0, concluidos=0):
+        with self._db_lock:
+            self._progresso["total"] += total
+            self._progresso["concluidos"] += concluidos
+            atual = (self._progresso["concluidos"], self._progresso["total"])
+        if self._progress_callback:
+            self._progress_callback(*atual)
+
+    def _build_uasg(self, uasg):
+        if self._should_cancel():
+            return
+        main_data = self.fetch_json(URL_API_UASG.format(uasg=uasg))
+        if not main_data:
+            self._registrar_falha(f"UASG {uasg}: nenhum contrato retornado pela API.")
+            return
+        contratos = filter_contracts(main_data)
+        if self.validade_horas > 0:
+            limite = (self._clock() - timedelta(hours=self.validade_horas)).isoformat(timespec="seconds")
+        else:
+            limite = "9999"  # atualização completa: nada está em dia
+        nome_resumido = main_data[0].get("contratante", {}).get("orgao", {}).get("unidade_gestora", {}).get("nome_resumido", "")
+        with self._db_lock:
+            estado = self.fetched_resources(uasg, self._conn)
+            self._conn.execute("INSERT OR IGNORE INTO uasgs (uasg_code, nome_resumido) VALUES (?, ?)", (uasg, nome_resumido))
+        self._avancar(total=len(contratos))
+
+        for contrato_data in contratos:
+            if self._should_cancel():
+                return
+            contrato_id = str(contrato_data.get("id"))
+            links = contrato_data.get("links", {})
+            feitos = estado.get(contrato_id, {})
+            hash_atual = payload_hash(contrato_data)
+            # A linha do contrato já foi gravada com este mesmo JSON
+            inalterado = any(h == hash_atual for _, h in feitos.values())
+
+            # A rede fica fora do lock: as UASGs baixam em paralelo
+            baixados, em_dia = {}, 0
+            for recurso in SUB_RECURSOS:
+                if recurso not in links:
+                    continue
+                buscado_em, hash_salvo = feitos.get(recurso, ("", None))
+                if hash_salvo == hash_atual and buscado_em >= limite:
+                    em_dia += 1
+                    continue
+                try:
+                    baixados[recurso] = self.fetch_json(links[recurso]) or []
+                except Exception as e:
+                    self._registrar_falha(f"Contrato {contrato_id} ({recurso}): {e}")
+
+            agora = self._clock().isoformat(timespec="seconds")
+            with self._db_lock:
+                if not inalterado:
+                    save_contract_row(self._conn, uasg, contrato_data)
+                    self._stats["alterados"] += 1
+                for recurso, data in baixados.items():
+                    # Substitui as linhas do contrato: o que sumiu da API é apagado
+                    self._writer.add(recurso, contrato_id, data, replace=True)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO offline_build_checkpoint "
+                    "(contrato_id, recurso, uasg_code, buscado_em, hash_contrato) VALUES (?, ?, ?, ?, ?)",
+                    [(contrato_id, recurso, uasg, agora, hash_atual) for recurso in baixados])
+                self._stats["contratos"] += 1
+                self._stats["baixados"] += len(baixados)
+                self._stats["em_dia"] += em_dia
+                # Dados e checkpoint entram no mesmo commit
+                self._nao_salvos += 1
+                if self._nao_salvos >= CHECKPOINT_CONTRATOS:
+                    self._writer.flush()
+                    self._conn.commit()
+                    self._nao_salvos = 0
+            self._avancar(concluidos=1)
+
+
+def main(argv=None):
+    import argparse
+
+    from Contratos.model.uasg_model import get_db_path_from_config
+
+    parser = argparse.ArgumentParser(description="Monta/atualiza o banco offline de contratos (retomável).")
+    parser.add_argument("uasgs", nargs="*", help="UASGs a baixar (padrão: todas as salvas no banco)")
+    parser.add_argument("--workers", type=int, default=3, help="UASGs baixadas em paralelo")
+    parser.add_argument("--validade-horas", type=float, default=VALIDADE_HORAS_PADRAO,
+                        help="Contratos sem mudança só são baixados de novo depois disso")
+    parser.add_argument("--completo", action="store_true", help="Baixa tudo de novo, mesmo o que não mudou")
+    parser.add_argument("--db", default=None, help="Banco de dados (padrão: o do config.json)")
+    args = parser.parse_args(argv)
+
+    job = OfflineBuildJob(args.db or str(get_db_path_from_config()), max_workers=args.workers,
+                          validade_horas=0 if args.completo else args.validade_horas)
+    cancelar = threading.Event()
+    resultado = {}
+    thread = threading.Thread(target=lambda: resultado.update(job.run(args.uasgs, should_cancel=cancelar.is_set)))
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.5)
+    except KeyboardInterrupt:
+        print("⏹ Interrompendo... o que já foi baixado fica salvo.")
+        cancelar.set()
+        thread.join()
+
+    if resultado:
+        print(f"✅ {resultado['contratos']} contratos de {resultado['uasgs']} UASGs ({resultado['alterados']} alterados): "
+              f"{resultado['baixados']} sub-recursos baixados, {resultado['em_dia']} em dia, "
+              f"{resultado['removidas']} linhas obsoletas removidas, {resultado['erros']} erros em {resultado['segundos']}s.")
+    return 0 if resultado and not resultado["erros"] and not resultado["cancelado"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,11 +6,306 @@ import requests
 import time
 import json
 from datetime import datetime
-from PyQt6.QtWidgets import QProgressDialog, QApplication
-from PyQt6.QtCore import Qt
+from operator import itemgetter
 
 # Importa o UASGModel para descobrir o caminho correto do banco de dados
 from .uasg_model import UASGModel
+from utils.sql_profiler import sql_profiler
+
+# Contratos processados entre um commit e outro (o que já foi salvo sobrevive a cancelamento/queda)
+CHECKPOINT_CONTRATOS = 25
+# Linhas acumuladas por grupo de colunas antes de descarregar com executemany
+_LOTE_LINHAS = 1000
+
+URL_API_UASG = "https://contratos.comprasnet.gov.br/api/contrato/ug/{uasg}"
+SUB_RECURSOS = ("historico", "empenhos", "itens", "arquivos")
+# Contratos vencidos há mais que isso não entram no banco offline
+DIAS_APOS_VENCIMENTO = 100
+
+
+def create_offline_tables(conn):
+    """
+    Cria todas as tabelas no banco de dados SQLite, se não existirem,
+    e garante que os índices essenciais para performance sejam criados.
+    """
+    cursor = conn.cursor()
+
+    # Tabelas principais
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS uasgs (
+        uasg_code TEXT PRIMARY KEY, nome_resumido TEXT
+        )''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contratos (
+            id TEXT PRIMARY KEY, uasg_code TEXT NOT NULL, numero TEXT, licitacao_numero TEXT,
+            processo TEXT, fornecedor_nome TEXT, fornecedor_cnpj TEXT, objeto TEXT,
+            valor_global TEXT, vigencia_inicio TEXT, vigencia_fim TEXT, tipo TEXT,
+            modalidade TEXT, contratante_orgao_unidade_gestora_codigo TEXT,
+            contratante_orgao_unidade_gestora_nome_resumido TEXT, raw_json TEXT,
+            FOREIGN KEY (uasg_code) REFERENCES uasgs (uasg_code)
+        )''')
+
+    # Tabelas de detalhes (histórico, empenhos, etc.)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS historico (
+            id INTEGER PRIMARY KEY, contrato_id TEXT NOT NULL, receita_despesa TEXT,
+            numero TEXT, observacao TEXT, ug TEXT, gestao TEXT, fornecedor_cnpj TEXT,
+            fornecedor_nome TEXT, tipo TEXT, categoria TEXT, processo TEXT, objeto TEXT,
+            modalidade TEXT, licitacao_numero TEXT, data_assinatura TEXT,
+            data_publicacao TEXT, vigencia_inicio TEXT, vigencia_fim TEXT,
+            valor_global TEXT, raw_json TEXT,
+            FOREIGN KEY (contrato_id) REFERENCES contratos (id)
+        )''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS empenhos (
+            id INTEGER PRIMARY KEY, contrato_id TEXT NOT NULL, unidade_gestora TEXT,
+            gestao TEXT, numero TEXT, data_emissao TEXT, credor_cnpj TEXT,
+            credor_nome TEXT, empenhado TEXT, liquidado TEXT, pago TEXT,
+            informacao_complementar TEXT, raw_json TEXT,
+            FOREIGN KEY (contrato_id) REFERENCES contratos (id)
+        )''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS itens (
+            id INTEGER PRIMARY KEY, contrato_id TEXT NOT NULL, tipo_id TEXT, tipo_material TEXT,
+            grupo_id TEXT, catmatseritem_id TEXT, descricao_complementar TEXT, quantidade TEXT,
+            valorunitario TEXT, valortotal TEXT, numero_item_compra TEXT, raw_json TEXT,
+            FOREIGN KEY (contrato_id) REFERENCES contratos (id)
+        )''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS arquivos (
+            id INTEGER PRIMARY KEY, contrato_id TEXT NOT NULL, tipo TEXT, descricao TEXT,
+            path_arquivo TEXT, origem TEXT, link_sei TEXT, raw_json TEXT,
+            FOREIGN KEY (contrato_id) REFERENCES contratos (id)
+        )''')
+
+    # --- MELHORIA: Adicionando as tabelas de status que estavam faltando ---
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS status_contratos (
+            contrato_id TEXT PRIMARY KEY, uasg_code TEXT, status TEXT, 
+            objeto_editado TEXT, portaria_edit TEXT, radio_options_json TEXT, data_registro TEXT,
+            FOREIGN KEY (contrato_id) REFERENCES contratos (id)
+        )''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS registros_status (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, contrato_id TEXT NOT NULL,
+            uasg_code TEXT, texto TEXT UNIQUE,
+            FOREIGN KEY (contrato_id) REFERENCES contratos (id)
+        )''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS links_contratos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            contrato_id TEXT NOT NULL UNIQUE,
+            link_contrato TEXT,
+            link_ta TEXT,
+            link_portaria TEXT,
+            link_pncp_espc TEXT,
+            link_portal_marinha TEXT,
+            FOREIGN KEY (contrato_id) REFERENCES contratos (id)
+        )''')
+
+    # --- PONTO CHAVE: Criação dos índices para otimizar as buscas ---
+    # Este é o índice principal que você solicitou para a tabela de registros.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_registros_contrato_id ON registros_status (contrato_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_historico_contrato_id ON historico (contrato_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_empenhos_contrato_id ON empenhos (contrato_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_itens_contrato_id ON itens (contrato_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_arquivos_contrato_id ON arquivos (contrato_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_links_contrato_id ON links_contratos (contrato_id)')
+
+    conn.commit()
+
+
+def _get_json(url, timeout=20):
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_api_data(url, tentativas_maximas=3, raise_errors=False, get_json=_get_json):
+    """
+    Busca dados de uma API com retentativas. Esgotadas as tentativas devolve []
+    ou, com raise_errors=True, relança o erro (para não confundir falha com lista vazia).
+    get_json permite passar pelo espelho da rede local (MirrorClient.get_json).
+    """
+    for tentativa in range(1, tentativas_maximas + 1):
+        try:
+            print(f" - Buscando dados em {url} (Tentativa {tentativa}/{tentativas_maximas})")
+            return get_json(url, timeout=20)
+        except requests.exceptions.RequestException as e:
+            print(f"   ⚠ Erro na requisição: {e}")
+            if tentativa < tentativas_maximas: time.sleep(2)
+            elif raise_errors: raise
+            else: return []
+    return []
+
+
+def filter_contracts(main_data, hoje=None):
+    """Contratos sem vigência final ou vencidos há no máximo DIAS_APOS_VENCIMENTO dias."""
+    hoje = hoje or datetime.now()
+    contratos_a_processar = []
+    for contrato_data in main_data:
+        vigencia_fim_str = contrato_data.get("vigencia_fim")
+
+        # Se não há data de fim, o contrato é válido e deve ser incluído
+        if not vigencia_fim_str:
+            contratos_a_processar.append(contrato_data)
+            continue
+
+        try:
+            vigencia_fim = datetime.strptime(vigencia_fim_str, '%Y-%m-%d')
+            # Se tem data, verifica se venceu há menos de 100 dias
+            if (hoje - vigencia_fim).days <= DIAS_APOS_VENCIMENTO:
+                contratos_a_processar.append(contrato_data)
+        except (ValueError, TypeError):
+            print(f"⚠ Aviso: Data de vigência inválida para o contrato {contrato_data.get('id')}. Será ignorado.")
+    return contratos_a_processar
+
+
+def save_contract_row(cursor, uasg, contrato_data):
+    """Grava (ou substitui) a linha do contrato com os campos principais e o JSON completo."""
+    unidade_gestora = contrato_data.get("contratante", {}).get("orgao", {}).get("unidade_gestora", {})
+    cursor.execute('''
+        INSERT OR REPLACE INTO contratos (id, uasg_code, numero, licitacao_numero, processo, 
+        fornecedor_nome, fornecedor_cnpj, objeto, valor_global, vigencia_inicio, vigencia_fim, 
+        tipo, modalidade, contratante_orgao_unidade_gestora_codigo, 
+        contratante_orgao_unidade_gestora_nome_resumido, raw_json) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        str(contrato_data.get("id")), uasg, contrato_data.get("numero"), contrato_data.get("licitacao_numero"),
+        contrato_data.get("processo"), contrato_data.get("fornecedor", {}).get("nome"),
+        contrato_data.get("fornecedor", {}).get("cnpj_cpf_idgener"), contrato_data.get("objeto"),
+        contrato_data.get("valor_global"), contrato_data.get("vigencia_inicio"),
+        contrato_data.get("vigencia_fim"), contrato_data.get("tipo"), contrato_data.get("modalidade"),
+        unidade_gestora.get("codigo"), unidade_gestora.get("nome_resumido"),
+        json.dumps(contrato_data)
+    ))
+
+
+def refresh_derived_tables(db_path):
+    """Atualiza a execução financeira, os índices de preços e fornecedores e os aditivos só com os contratos alterados."""
+    try:
+        from .execucao_financeira_model import ExecucaoFinanceira
+        stats = ExecucaoFinanceira(db_path).refresh()
+        print(f"📊 Execução financeira atualizada: {stats['contratos']} contratos em {stats['segundos']}s.")
+    except Exception as e:
+        print(f"⚠ Não foi possível atualizar a execução financeira: {e}")
+    try:
+        from .precos_itens_model import PrecosItens
+        stats = PrecosItens(db_path).refresh()
+        print(f"📊 Índice de preços atualizado: {stats['catalogo']} itens de catálogo em {stats['segundos']}s.")
+    except Exception as e:
+        print(f"⚠ Não foi possível atualizar o índice de preços: {e}")
+    try:
+        from .fornecedores_model import FornecedoresIndex
+        stats = FornecedoresIndex(db_path).refresh()
+        print(f"📊 Índice de fornecedores atualizado: {stats['fornecedores']} fornecedores em {stats['segundos']}s.")
+    except Exception as e:
+        print(f"⚠ Não foi possível atualizar o índice de fornecedores: {e}")
+    try:
+        from .aditivos_model import AditivosTimeline
+        stats = AditivosTimeline(db_path).refresh()
+        print(f"📊 Linha do tempo de aditivos atualizada: {stats['contratos']} contratos em {stats['segundos']}s.")
+    except Exception as e:
+        print(f"⚠ Não foi possível atualizar a linha do tempo de aditivos: {e}")
+
+
+def _extrator(colunas):
+    """Função que devolve a tupla de valores das colunas de um registro."""
+    if len(colunas) > 1:
+        return itemgetter(*colunas)
+    if colunas:
+        coluna = colunas[0]
+        return lambda item: (item[coluna],)
+    return lambda item: ()
+
+
+class SubTableWriter:
+    """
+    Grava os sub-recursos (histórico, empenhos, itens, arquivos) em lote.
+
+    As colunas de cada tabela são lidas uma única vez; as linhas são agrupadas
+    pelo conjunto de colunas presentes e inseridas com executemany. O commit
+    fica a cargo de quem chama (checkpoints em OfflineBuildJob).
+
+    Com replace=True as linhas antigas do contrato naquela tabela são apagadas
+    (um DELETE por tabela para todos os contratos do lote) antes da primeira
+    gravação, eliminando os registros que sumiram da API.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._colunas = {}
+        self._assinaturas = {}
+        self._pendentes = {}
+        self._substituir = {}
+        self.linhas = 0
+        self.removidas = 0
+        self._segundos = 0.0
+
+    def _table_columns(self, table_name):
+        if table_name not in self._colunas:
+            colunas = [row[1] for row in self.conn.execute(f"PRAGMA table_info({table_name})")]
+            self._colunas[table_name] = [c for c in colunas if c not in ("contrato_id", "raw_json")]
+        return self._colunas[table_name]
+
+    def add(self, table_name, contrato_id, data_list, replace=False):
+        """Enfileira os registros da API de um contrato; descarrega os grupos que enchem."""
+        if replace:
+            self._substituir.setdefault(table_name, set()).add(contrato_id)
+        if not data_list:
+            return
+        inicio = time.perf_counter()
+        colunas_tabela = self._table_columns(table_name)
+        assinaturas = self._assinaturas.setdefault(table_name, {})
+        for item_data in data_list:
+            # Registros da API com as mesmas chaves reaproveitam o grupo (colunas + extrator)
+            grupo = assinaturas.get(tuple(item_data))
+            if grupo is None:
+                # Só as colunas existentes na tabela, mais as fixas contrato_id e raw_json
+                colunas = tuple(c for c in colunas_tabela if c in item_data)
+                grupo = assinaturas[tuple(item_data)] = ((table_name, colunas), _extrator(colunas))
+            chave, extrator = grupo
+            linhas = self._pendentes.setdefault(chave, [])
+            linhas.append((*extrator(item_data), contrato_id, json.dumps(item_data)))
+            if len(linhas) >= _LOTE_LINHAS:
+                self._flush_group(chave)
+        self._segundos += time.perf_counter() - inicio
+
+    def _delete_replaced(self, table_name):
+        contrato_ids = self._substituir.pop(table_name, None)
+        if contrato_ids:
+            cursor = self.conn.execute(
+                f"DELETE FROM {table_name} WHERE contrato_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(sorted(contrato_ids)),))
+            self.removidas += cursor.rowcount
+
+    def _flush_group(self, chave):
+        linhas = self._pendentes.pop(chave, None)
+        if not linhas:
+            return
+        table_name, colunas = chave
+        # Apaga as linhas antigas dos contratos substituídos antes das novas entrarem
+        self._delete_replaced(table_name)
+        nomes = colunas + ("contrato_id", "raw_json")
+        query = f"INSERT OR REPLACE INTO {table_name} ({', '.join(nomes)}) VALUES ({', '.join('?' * len(nomes))})"
+        self.conn.executemany(query, linhas)
+        self.linhas += len(linhas)
+
+    def flush(self):
+        """Grava tudo o que está pendente (sem commit)."""
+        inicio = time.perf_counter()
+        for chave in list(self._pendentes):
+            self._flush_group(chave)
+        # Contratos cuja lista nova veio vazia
+        for table_name in list(self._substituir):
+            self._delete_replaced(table_name)
+        self._segundos += time.perf_counter() - inicio
+
+    def stats(self):
+        """{linhas, removidas, segundos, linhas_por_segundo} do que já foi gravado."""
+        return {"linhas": self.linhas, "removidas": self.removidas, "segundos": round(self._segundos, 3),
+                "linhas_por_segundo": round(self.linhas / self._segundos) if self._segundos else 0}
+
 
 class OfflineDBController:
     """
@@ -27,232 +322,22 @@ class OfflineDBController:
 
     def _get_db_connection(self):
         """Cria e retorna uma conexão com o banco de dados."""
-        conn = sqlite3.connect(self.db_path)
+        conn = sql_profiler.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
     def _create_tables(self):
-        """
-        Cria todas as tabelas no banco de dados SQLite, se não existirem,
-        e garante que os índices essenciais para performance sejam criados.
-        """
+        """Cria as tabelas e índices do banco offline, se não existirem."""
         conn = self._get_db_connection()
-        cursor = conn.cursor()
-
-        # Tabelas principais
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS uasgs (
-            uasg_code TEXT PRIMARY KEY, nome_resumido TEXT
-            )''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS contratos (
-                id TEXT PRIMARY KEY, uasg_code TEXT NOT NULL, numero TEXT, licitacao_numero TEXT,
-                processo TEXT, fornecedor_nome TEXT, fornecedor_cnpj TEXT, objeto TEXT,
-                valor_global TEXT, vigencia_inicio TEXT, vigencia_fim TEXT, tipo TEXT,
-                modalidade TEXT, contratante_orgao_unidade_gestora_codigo TEXT,
-                contratante_orgao_unidade_gestora_nome_resumido TEXT, raw_json TEXT,
-                FOREIGN KEY (uasg_code) REFERENCES uasgs (uasg_code)
-            )''')
-
-        # Tabelas de detalhes (histórico, empenhos, etc.)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS historico (
-                id INTEGER PRIMARY KEY, contrato_id TEXT NOT NULL, receita_despesa TEXT,
-                numero TEXT, observacao TEXT, ug TEXT, gestao TEXT, fornecedor_cnpj TEXT,
-                fornecedor_nome TEXT, tipo TEXT, categoria TEXT, processo TEXT, objeto TEXT,
-                modalidade TEXT, licitacao_numero TEXT, data_assinatura TEXT,
-                data_publicacao TEXT, vigencia_inicio TEXT, vigencia_fim TEXT,
-                valor_global TEXT, raw_json TEXT,
-                FOREIGN KEY (contrato_id) REFERENCES contratos (id)
-            )''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS empenhos (
-                id INTEGER PRIMARY KEY, contrato_id TEXT NOT NULL, unidade_gestora TEXT,
-                gestao TEXT, numero TEXT, data_emissao TEXT, credor_cnpj TEXT,
-                credor_nome TEXT, empenhado TEXT, liquidado TEXT, pago TEXT,
-                informacao_complementar TEXT, raw_json TEXT,
-                FOREIGN KEY (contrato_id) REFERENCES contratos (id)
-            )''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS itens (
-                id INTEGER PRIMARY KEY, contrato_id TEXT NOT NULL, tipo_id TEXT, tipo_material TEXT,
-                grupo_id TEXT, catmatseritem_id TEXT, descricao_complementar TEXT, quantidade TEXT,
-                valorunitario TEXT, valortotal TEXT, numero_item_compra TEXT, raw_json TEXT,
-                FOREIGN KEY (contrato_id) REFERENCES contratos (id)
-            )''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS arquivos (
-                id INTEGER PRIMARY KEY, contrato_id TEXT NOT NULL, tipo TEXT, descricao TEXT,
-                path_arquivo TEXT, origem TEXT, link_sei TEXT, raw_json TEXT,
-                FOREIGN KEY (contrato_id) REFERENCES contratos (id)
-            )''')
-
-        # --- MELHORIA: Adicionando as tabelas de status que estavam faltando ---
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS status_contratos (
-                contrato_id TEXT PRIMARY KEY, uasg_code TEXT, status TEXT, 
-                objeto_editado TEXT, portaria_edit TEXT, radio_options_json TEXT, data_registro TEXT,
-                FOREIGN KEY (contrato_id) REFERENCES contratos (id)
-            )''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS registros_status (
-                id INTEGER PRIMARY KEY AUTOINCREMENT, contrato_id TEXT NOT NULL,
-                uasg_code TEXT, texto TEXT UNIQUE,
-                FOREIGN KEY (contrato_id) REFERENCES contratos (id)
-            )''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS links_contratos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                contrato_id TEXT NOT NULL UNIQUE,
-                link_contrato TEXT,
-                link_ta TEXT,
-                link_portaria TEXT,
-                link_pncp_espc TEXT,
-                link_portal_marinha TEXT,
-                FOREIGN KEY (contrato_id) REFERENCES contratos (id)
-            )''')
-
-        # --- PONTO CHAVE: Criação dos índices para otimizar as buscas ---
-        # Este é o índice principal que você solicitou para a tabela de registros.
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_registros_contrato_id ON registros_status (contrato_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_historico_contrato_id ON historico (contrato_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_empenhos_contrato_id ON empenhos (contrato_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_itens_contrato_id ON itens (contrato_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_arquivos_contrato_id ON arquivos (contrato_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_links_contrato_id ON links_contratos (contrato_id)')
-
-        conn.commit()
-        conn.close()
-        print("✅ Tabelas e índices do banco de dados offline foram verificados e criados com sucesso.")
-
-    def _fetch_api_data(self, url, tentativas_maximas=3):
-        """Busca dados de uma API com retentativas."""
-        for tentativa in range(1, tentativas_maximas + 1):
-            try:
-                print(f" - Buscando dados em {url} (Tentativa {tentativa}/{tentativas_maximas})")
-                response = requests.get(url, timeout=20)
-                response.raise_for_status()
-                return response.json()
-            except requests.exceptions.RequestException as e:
-                print(f"   ⚠ Erro na requisição: {e}")
-                if tentativa < tentativas_maximas: time.sleep(2)
-                else: return []
-        return []
-
-    def _save_sub_table_data(self, conn, table_name, contrato_id, data_list):
-        """
-        PONTO CHAVE 2: Função genérica refatorada para salvar todos os dados
-        recebidos da API em tabelas de sub-itens.
-        """
-        if not data_list: return
-
-        cursor = conn.cursor()
-        
-        # Pega as colunas da tabela no banco de dados para garantir que só tentemos
-        # inserir dados que correspondam a colunas existentes.
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        table_columns = {row['name'] for row in cursor.fetchall()}
-
-        for item_data in data_list:
-            # Prepara um dicionário apenas com os dados que têm uma coluna correspondente na tabela
-            values_to_insert = {key: value for key, value in item_data.items() if key in table_columns}
-            
-            # Adiciona as colunas fixas
-            values_to_insert['contrato_id'] = contrato_id
-            values_to_insert['raw_json'] = json.dumps(item_data)
-            
-            columns = ', '.join(values_to_insert.keys())
-            placeholders = ', '.join('?' for _ in values_to_insert)
-            
-            query = f"INSERT OR REPLACE INTO {table_name} ({columns}) VALUES ({placeholders})"
-            cursor.execute(query, list(values_to_insert.values()))
-
-    def process_and_save_all_data(self, uasg):
-        """
-        Processo principal: busca, filtra por vigência e salva todos os dados de uma UASG.
-        """
-        self._create_tables()
-        conn = self._get_db_connection()
-        cursor = conn.cursor()
-
-        url_publica = f"https://contratos.comprasnet.gov.br/api/contrato/ug/{uasg}"
-        main_data = self._fetch_api_data(url_publica)
-        
-        if not main_data:
-            print(f"⚠ Não foi possível obter dados para a UASG {uasg}. Operação cancelada.")
+        try:
+            create_offline_tables(conn)
+        finally:
             conn.close()
-            return
-
-        # Salva info da UASG
-        nome_resumido = main_data[0].get("contratante", {}).get("orgao", {}).get("unidade_gestora", {}).get("nome_resumido", "")
-        cursor.execute("INSERT OR IGNORE INTO uasgs (uasg_code, nome_resumido) VALUES (?, ?)", (uasg, nome_resumido))
-
-        # --- LÓGICA DE FILTRAGEM CORRIGIDA ---
-        hoje = datetime.now()
-        contratos_a_processar = []
-        print(f"Iniciando filtro de {len(main_data)} contratos da UASG {uasg}...")
-        for contrato_data in main_data:
-            vigencia_fim_str = contrato_data.get("vigencia_fim")
-            
-            # Se não há data de fim, o contrato é válido e deve ser incluído
-            if not vigencia_fim_str:
-                contratos_a_processar.append(contrato_data)
-                continue
-
-            try:
-                vigencia_fim = datetime.strptime(vigencia_fim_str, '%Y-%m-%d')
-                # Se tem data, verifica se venceu há menos de 100 dias
-                if (hoje - vigencia_fim).days <= 100:
-                    contratos_a_processar.append(contrato_data)
-            except (ValueError, TypeError):
-                print(f"⚠ Aviso: Data de vigência inválida para o contrato {contrato_data.get('id')}. Será ignorado.")
-        
-        print(f"Filtro concluído. Serão processados {len(contratos_a_processar)} contratos.")
-        if not contratos_a_processar:
-            conn.close()
-            return
+        print("✅ Tabelas e índices do banco de dados offline foram verificados e criados com sucesso.")
 
-        progress = QProgressDialog("Buscando e salvando dados...", "Cancelar", 0, len(contratos_a_processar), self.parent_view)
-        progress.setWindowModality(Qt.WindowModality.WindowModal)
-        progress.setWindowTitle("Criando Banco de Dados Offline")
-
-        # O resto da função continua igual, salvando os contratos filtrados...
-        for i, contrato_data in enumerate(contratos_a_processar):
-            progress.setValue(i)
-            if progress.wasCanceled():
-                break
-
-            contrato_id = str(contrato_data.get("id"))
-            progress.setLabelText(f"Processando Contrato: {contrato_data.get('numero', contrato_id)}")
-            QApplication.processEvents()
-
-            cursor.execute('''
-                INSERT OR REPLACE INTO contratos (id, uasg_code, numero, licitacao_numero, processo, 
-                fornecedor_nome, fornecedor_cnpj, objeto, valor_global, vigencia_inicio, vigencia_fim, 
-                tipo, modalidade, contratante_orgao_unidade_gestora_codigo, 
-                contratante_orgao_unidade_gestora_nome_resumido, raw_json) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                contrato_id, uasg, contrato_data.get("numero"), contrato_data.get("licitacao_numero"),
-                contrato_data.get("processo"), contrato_data.get("fornecedor", {}).get("nome"),
-                contrato_data.get("fornecedor", {}).get("cnpj_cpf_idgener"), contrato_data.get("objeto"),
-                contrato_data.get("valor_global"), contrato_data.get("vigencia_inicio"),
-                contrato_data.get("vigencia_fim"), contrato_data.get("tipo"), contrato_data.get("modalidade"),
-                contrato_data.get("contratante", {}).get("orgao", {}).get("unidade_gestora", {}).get("codigo"),
-                contrato_data.get("contratante", {}).get("orgao", {}).get("unidade_gestora", {}).get("nome_resumido"),
-                json.dumps(contrato_data)
-            ))
-
-            links = contrato_data.get("links", {})
-            if "historico" in links: self._save_sub_table_data(conn, 'historico', contrato_id, self._fetch_api_data(links["historico"]))
-            if "empenhos" in links: self._save_sub_table_data(conn, 'empenhos', contrato_id, self._fetch_api_data(links["empenhos"]))
-            if "itens" in links: self._save_sub_table_data(conn, 'itens', contrato_id, self._fetch_api_data(links["itens"]))
-            if "arquivos" in links: self._save_sub_table_data(conn, 'arquivos', contrato_id, self._fetch_api_data(links["arquivos"]))
-
-        progress.setValue(len(contratos_a_processar))
-        conn.commit()
-        conn.close()
-        print(f"✅ Dados da UASG {uasg} salvos com sucesso no banco de dados offline.")
+    def _refresh_derived_tables(self):
+        """Atualiza as tabelas derivadas (execução financeira, preços, fornecedores, aditivos)."""
+        refresh_derived_tables(self.db_path)
 
     def delete_uasg_from_db(self, uasg):
         """Remove todos os dados de uma UASG específica do banco de dados offline."""
@@ -273,4 +358,5 @@ class OfflineDBController:
         
         conn.commit()
         conn.close()
+        self._refresh_derived_tables()
         print(f"✅ Dados da UASG {uasg} removidos com sucesso.")
\ No newline at end of file
@@ -0,0 +1,268 @@
+# Contratos/model/precos_itens_model.py
+"""
+Índice de preços dos itens de todos os contratos offline, por CATMAT/CATSER.
+
+Cada item vira uma linha em precos_itens com o valor unitário já numérico; as
+estatísticas por item de catálogo (mínimo, mediana, máximo, último preço e os
+limites para outliers pelo intervalo interquartil) ficam pré-calculadas em
+precos_estatisticas. Gatilhos nas tabelas itens e contratos marcam os contratos
+alterados e refresh() recalcula só os itens de catálogo afetados.
+"""
+import time
+from statistics import median, quantiles
+
+from utils.sql_profiler import sql_profiler
+from Contratos.model.empenhos_relatorio_model import parse_br_float
+from Contratos.model.execucao_financeira_model import campo_sql
+
+SCHEMA_SQL = (
+    '''CREATE TABLE IF NOT EXISTS precos_itens (
+        item_id INTEGER PRIMARY KEY,
+        contrato_id TEXT NOT NULL,
+        uasg_code TEXT,
+        numero_contrato TEXT,
+        fornecedor_nome TEXT,
+        catmatseritem_id TEXT NOT NULL,
+        descricao TEXT,
+        quantidade REAL NOT NULL DEFAULT 0,
+        valor_unitario REAL NOT NULL,
+        data_referencia TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS precos_estatisticas (
+        catmatseritem_id TEXT PRIMARY KEY,
+        descricao TEXT,
+        ocorrencias INTEGER NOT NULL,
+        contratos INTEGER NOT NULL,
+        uasgs INTEGER NOT NULL,
+        minimo REAL, mediana REAL, maximo REAL,
+        ultimo_preco REAL, ultima_data TEXT,
+        limite_inferior REAL, limite_superior REAL
+    )''',
+    "CREATE TABLE IF NOT EXISTS precos_pendentes (contrato_id TEXT PRIMARY KEY)",
+    "CREATE INDEX IF NOT EXISTS idx_precos_catmat ON precos_itens (catmatseritem_id, data_referencia, valor_unitario)",
+    "CREATE INDEX IF NOT EXISTS idx_precos_contrato ON precos_itens (contrato_id, catmatseritem_id)",
+    '''CREATE TRIGGER IF NOT EXISTS trg_precos_itens_ins AFTER INSERT ON itens BEGIN
+        INSERT OR IGNORE INTO precos_pendentes (contrato_id) VALUES (NEW.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_precos_itens_upd AFTER UPDATE ON itens BEGIN
+        INSERT OR IGNORE INTO precos_pendentes (contrato_id) VALUES (NEW.contrato_id);
+        INSERT OR IGNORE INTO precos_pendentes (contrato_id) VALUES (OLD.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_precos_itens_del AFTER DELETE ON itens BEGIN
+        INSERT OR IGNORE INTO precos_pendentes (contrato_id) VALUES (OLD.contrato_id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_precos_ctr_upd AFTER UPDATE ON contratos BEGIN
+        INSERT OR IGNORE INTO precos_pendentes (contrato_id) VALUES (NEW.id); END''',
+    '''CREATE TRIGGER IF NOT EXISTS trg_precos_ctr_del AFTER DELETE ON contratos BEGIN
+        INSERT OR IGNORE INTO precos_pendentes (contrato_id) VALUES (OLD.id); END''',
+)
+
+_BATCH = 500
+
+# Regra de Tukey: fora de [Q1 - 1,5*IQR, Q3 + 1,5*IQR] é outlier
+IQR_FATOR = 1.5
+# Com poucas ocorrências os quartis não dizem nada; não marca outliers
+MIN_OCORRENCIAS_OUTLIER = 4
+
+COLUNAS_ESTATISTICAS = ("catmatseritem_id", "descricao", "ocorrencias", "contratos", "uasgs", "minimo",
+                        "mediana", "maximo", "ultimo_preco", "ultima_data", "limite_inferior", "limite_superior")
+
+
+def price_statistics(precos):
+    """
+    Estatísticas de uma lista de (valor_unitario, data_referencia) já ordenada por data.
+    O último preço é o da data mais recente.
+    """
+    valores = sorted(p[0] for p in precos)
+    stats = {
+        "minimo": valores[0],
+        "mediana": median(valores),
+        "maximo": valores[-1],
+        "ultimo_preco": precos[-1][0],
+        "ultima_data": precos[-1][1],
+        "limite_inferior": None,
+        "limite_superior": None,
+    }
+    if len(valores) >= MIN_OCORRENCIAS_OUTLIER:
+        q1, _, q3 = quantiles(valores, n=4, method="inclusive")
+        stats["limite_inferior"] = q1 - IQR_FATOR * (q3 - q1)
+        stats["limite_superior"] = q3 + IQR_FATOR * (q3 - q1)
+    return stats
+
+
+def is_outlier(valor, limite_inferior, limite_superior):
+    if limite_inferior is None or limite_superior is None:
+        return False
+    return valor < limite_inferior or valor > limite_superior
+
+
+class PrecosItens:
+    """Índice de preços praticados por item de catálogo no banco offline de contratos."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._ensure_schema()
+
+    def _connect(self):
+        conn = sql_profiler.connect(self.db_path)
+        conn.create_function("br_real", 1, parse_br_float, deterministic=True)
+        return conn
+
+    def _ensure_schema(self):
+        conn = self._connect()
+        try:
+            has_tables = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('contratos', 'itens')")}
+            if has_tables != {"contratos", "itens"}:
+                raise RuntimeError("O banco não possui as tabelas offline de contratos e itens.")
+            novo = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'precos_itens'").fetchone() is None
+            for sql in SCHEMA_SQL:
+                conn.execute(sql)
+            if novo:
+                conn.execute("INSERT OR IGNORE INTO precos_pendentes (contrato_id) SELECT id FROM contratos")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def pending_count(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM precos_pendentes").fetchone()[0]
+        finally:
+            conn.close()
+
+    def refresh(self):
+        """
+        Renormaliza os itens dos contratos marcados e recalcula as estatísticas
+        apenas dos itens de catálogo que eles tinham ou passaram a ter.
+        Retorna {contratos, itens, catalogo, segundos}.
+        """
+        inicio = time.perf_counter()
+        stats = {"contratos": 0, "itens": 0, "catalogo": 0}
+        conn = self._connect()
+        try:
+            with sql_profiler.operation("precos_itens_refresh"):
+                pendentes = [row[0] for row in conn.execute("SELECT contrato_id FROM precos_pendentes")]
+                colunas = {row[1] for row in conn.execute("PRAGMA table_info(itens)")}
+                campo = lambda nome: campo_sql(colunas, nome, "i")
+                afetados = set()
+
+                for start in range(0, len(pendentes), _BATCH):
+                    lote = pendentes[start:start + _BATCH]
+                    marks = ",".join("?" * len(lote))
+                    afetados.update(row[0] for row in conn.execute(
+                        f"SELECT DISTINCT catmatseritem_id FROM precos_itens WHERE contrato_id IN ({marks})", lote))
+                    conn.execute(f"DELETE FROM precos_itens WHERE contrato_id IN ({marks})", lote)
+                    cursor = conn.execute(
+                        "INSERT INTO precos_itens (item_id, contrato_id, uasg_code, numero_contrato, fornecedor_nome, "
+                        "catmatseritem_id, descricao, quantidade, valor_unitario, data_referencia) "
+                        "SELECT * FROM ("
+                        f"  SELECT i.id, i.contrato_id, c.uasg_code, c.numero, c.fornecedor_nome, "
+                        f"         CAST({campo('catmatseritem_id')} AS TEXT) AS catmat, {campo('descricao_complementar')}, "
+                        f"         br_real({campo('quantidade')}), br_real({campo('valorunitario')}) AS valor, "
+                        "          c.vigencia_inicio "
+                        "  FROM itens i JOIN contratos c ON c.id = i.contrato_id "
+                        f"  WHERE i.contrato_id IN ({marks})"
+                        ") WHERE catmat IS NOT NULL AND catmat != '' AND valor > 0", lote)
+                    stats["itens"] += cursor.rowcount
+                    afetados.update(row[0] for row in conn.execute(
+                        f"SELECT DISTINCT catmatseritem_id FROM precos_itens WHERE contrato_id IN ({marks})", lote))
+                    stats["contratos"] += conn.execute(
+                        f"SELECT COUNT(*) FROM contratos WHERE id IN ({marks})", lote).fetchone()[0]
+                    conn.execute(f"DELETE FROM precos_pendentes WHERE contrato_id IN ({marks})", lote)
+
+                afetados = sorted(afetados)
+                for start in range(0, len(afetados), _BATCH):
+                    self._update_statistics(conn, afetados[start:start + _BATCH])
+                stats["catalogo"] = len(afetados)
+                conn.commit()
+        finally:
+            conn.close()
+        stats["segundos"] = round(time.perf_counter() - inicio, 3)
+        return stats
+
+    @staticmethod
+    def _update_statistics(conn, catmats):
+        marks = ",".join("?" * len(catmats))
+        conn.execute(f"DELETE FROM precos_estatisticas WHERE catmatseritem_id IN ({marks})", catmats)
+        rows = conn.execute(
+            "SELECT catmatseritem_id, valor_unitario, data_referencia, descricao, contrato_id, uasg_code "
+            f"FROM precos_itens WHERE catmatseritem_id IN ({marks}) "
+            "ORDER BY catmatseritem_id, COALESCE(data_referencia, ''), item_id", catmats)
+
+        novas = []
+        atual, grupo = None, []
+
+        def fechar():
+            precos = [(g[1], g[2]) for g in grupo]
+            estat = price_statistics(precos)
+            descricao = next((g[3] for g in reversed(grupo) if g[3]), "")
+            novas.append((atual, descricao, len(grupo), len({g[4] for g in grupo}), len({g[5] for g in grupo}),
+                          estat["minimo"], estat["mediana"], estat["maximo"], estat["ultimo_preco"],
+                          estat["ultima_data"], estat["limite_inferior"], estat["limite_superior"]))
+
+        for row in rows:
+            if row[0] != atual and grupo:
+                fechar()
+                grupo = []
+            atual = row[0]
+            grupo.append(row)
+        if grupo:
+            fechar()
+        conn.executemany(
+            f"INSERT INTO precos_estatisticas ({', '.join(COLUNAS_ESTATISTICAS)}) "
+            f"VALUES ({', '.join('?' * len(COLUNAS_ESTATISTICAS))})", novas)
+
+    # ==================== Consultas ====================
+    def search(self, texto, limit=200):
+        """
+        Itens de catálogo pelo código (prefixo) ou por parte da descrição,
+        com as estatísticas pré-calculadas. Retorna uma lista de dicionários.
+        """
+        texto = (texto or "").strip()
+        sql = f"SELECT {', '.join(COLUNAS_ESTATISTICAS)} FROM precos_estatisticas"
+        params = ()
+        if texto.isdigit():
+            sql += " WHERE catmatseritem_id LIKE ?"
+            params = (texto + "%",)
+        elif texto:
+            sql += " WHERE descricao LIKE ?"
+            params = (f"%{texto}%",)
+        sql += " ORDER BY ocorrencias DESC, catmatseritem_id LIMIT ?"
+        conn = self._connect()
+        try:
+            return [dict(zip(COLUNAS_ESTATISTICAS, row)) for row in conn.execute(sql, params + (limit,))]
+        finally:
+            conn.close()
+
+    def item_statistics(self, catmatseritem_id):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"SELECT {', '.join(COLUNAS_ESTATISTICAS)} FROM precos_estatisticas WHERE catmatseritem_id = ?",
+                (str(catmatseritem_id),)).fetchone()
+            return dict(zip(COLUNAS_ESTATISTICAS, row)) if row else None
+        finally:
+            conn.close()
+
+    def price_history(self, catmatseritem_id):
+        """O que já foi pago pelo item em todas as UASGs, do mais recente ao mais antigo."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT p.uasg_code, p.numero_contrato, p.fornecedor_nome, p.data_referencia, p.quantidade, "
+                "       p.valor_unitario, p.descricao, p.contrato_id, "
+                "       CASE WHEN p.valor_unitario < s.limite_inferior OR p.valor_unitario > s.limite_superior "
+                "            THEN 1 ELSE 0 END "
+                "FROM precos_itens p JOIN precos_estatisticas s ON s.catmatseritem_id = p.catmatseritem_id "
+                "WHERE p.catmatseritem_id = ? ORDER BY p.data_referencia DESC, p.item_id DESC",
+                (str(catmatseritem_id),)).fetchall()
+        finally:
+            conn.close()
+        chaves = ("uasg_code", "numero_contrato", "fornecedor_nome", "data_referencia", "quantidade",
+                  "valor_unitario", "descricao", "contrato_id", "outlier")
+        return [dict(zip(chaves, row), outlier=bool(row[-1])) for row in rows]
+
+    def check_price(self, catmatseritem_id, valor_unitario):
+        """(estatísticas, é_outlier) de um preço em relação ao histórico do item."""
+        estat = self.item_statistics(catmatseritem_id)
+        if estat is None:
+            return None, False
+        return estat, is_outlier(parse_br_float(valor_unitario), estat["limite_inferior"], estat["limite_superior"])
@@ -0,0 +1,172 @@
+# Contratos/model/sub_data_prefetch.py
+"""
+Pré-carregamento dos dados das abas de detalhes (historico, empenhos, itens, arquivos).
+
+Quando um contrato é selecionado (ou o mouse passa sobre ele) na tabela, os quatro
+recursos são buscados em paralelo num pool de threads e guardados num cache LRU
+por contrato. As abas do DetailsDialog leem do cache na hora; se a busca ainda
+estiver em andamento, recebem o resultado pelo sinal data_ready.
+"""
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+SUB_RESOURCES = ("historico", "empenhos", "itens", "arquivos")
+
+
+class SubDataPrefetcher(QObject):
+    # contrato_id, data_type, dados (lista ou None), mensagem de erro ("" se ok)
+    data_ready = pyqtSignal(str, str, object, str)
+
+    def __init__(self, fetch_function, max_workers=4, max_contracts=32, ttl_seconds=300, clock=time.monotonic):
+        super().__init__()
+        self._fetch = fetch_function
+        self.max_contracts = max_contracts
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._cache = OrderedDict()   # contrato_id -> {data_type: (instante, dados)}
+        self._inflight = {}           # (contrato_id, data_type) -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ==================== Cache ====================
+    def _cached_locked(self, contrato_id, data_type):
+        entry = self._cache.get(contrato_id, {}).get(data_type)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if self.clock() - stored_at > self.ttl_seconds:
+            del self._cache[contrato_id][data_type]
+            return None
+        self._cache.move_to_end(contrato_id)
+        return data
+
+    def cached(self, contrato_id, data_type):
+        """Dados em cache (ou None). Só resultados bem-sucedidos ficam guardados."""
+        with self._lock:
+            return self._cached_locked(str(contrato_id), data_type)
+
+    def _store(self, contrato_id, data_type, data):
+        with self._lock:
+            self._cache.setdefault(contrato_id, {})[data_type] = (self.clock(), data)
+            self._cache.move_to_end(contrato_id)
+            while len(self._cache) > self.max_contracts:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, contrato_id=None):
+        with self._lock:
+            if contrato_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(str(contrato_id), None)
+
+    def publish(self, contrato_id, data_type, data):
+        """Substitui o que está em cache por dados mais novos e avisa quem está observando."""
+        contrato_id = str(contrato_id)
+        self._store(contrato_id, data_type, data)
+        self.data_ready.emit(contrato_id, data_type, data, "")
+
+    def is_pending(self, contrato_id, data_type):
+        with self._lock:
+            future = self._inflight.get((str(contrato_id), data_type))
+            return future is not None and not future.done()
+
+    # ==================== Busca ====================
+    def _run(self, contrato_id, data_type):
+        try:
+            data, error = self._fetch(contrato_id, data_type)
+        except Exception as e:
+            data, error = None, f"Erro ao buscar '{data_type}': {e}"
+        if not error and data is not None:
+            self._store(contrato_id, data_type, data)
+        with self._lock:
+            self._inflight.pop((contrato_id, data_type), None)
+        self.data_ready.emit(contrato_id, data_type, data, error or "")
+        return data, error
+
+    def _submit_locked(self, contrato_id, data_type):
+        key = (contrato_id, data_type)
+        future = self._inflight.get(key)
+        if future is None or future.done():
+            future = self._executor.submit(self._run, contrato_id, data_type)
+            self._inflight[key] = future
+        return future
+
+    def prefetch(self, contrato_id, data_types=SUB_RESOURCES):
+        """Agenda a busca do que ainda não está em cache nem a caminho."""
+        if contrato_id is None:
+            return
+        contrato_id = str(contrato_id)
+        with self._lock:
+            for data_type in data_types:
+                if self._cached_locked(contrato_id, data_type) is None:
+                    self._submit_locked(contrato_id, data_type)
+
+    def request(self, contrato_id, data_type, force=False):
+        """
+        Versão assíncrona para a interface: devolve os dados se já estiverem em cache;
+        senão agenda a busca e devolve None (o resultado chega por data_ready).
+        """
+        contrato_id = str(contrato_id)
+        with self._lock:
+            if force:
+                self._cache.get(contrato_id, {}).pop(data_type, None)
+            else:
+                data = self._cached_locked(contrato_id, data_type)
+                if data is not None:
+                    self.hits += 1
+                    return data
+            self.misses += 1
+            self._submit_locked(contrato_id, data_type)
+        return None
+
+    def get(self, contrato_id, data_type, force=False):
+        """Versão síncrona (relatórios): usa o cache, aguarda uma busca em andamento ou busca agora."""
+        contrato_id = str(contrato_id)
+        with self._lock:
+            if not force:
+                data = self._cached_locked(contrato_id, data_type)
+                if data is not None:
+                    self.hits += 1
+                    return data, None
+            self.misses += 1
+            future = self._inflight.get((contrato_id, data_type))
+        if future is not None:
+            return future.result()
+        return self._run(contrato_id, data_type)
+
+    def watch(self, owner, contrato_id, data_type, callback):
+        """
+        Chama callback(dados, erro) quando chegar o resultado desse contrato/tipo.
+        A ligação é desfeita quando o 'owner' (diálogo) é fechado ou destruído.
+        """
+        contrato_id = str(contrato_id)
+
+        def _handler(cid, dtype, data, error):
+            if cid == contrato_id and dtype == data_type:
+                callback(data, error)
+
+        def _disconnect(*_):
+            try:
+                self.data_ready.disconnect(_handler)
+            except (TypeError, RuntimeError):
+                pass
+
+        self.data_ready.connect(_handler)
+        owner.destroyed.connect(_disconnect)
+        if hasattr(owner, "finished"):
+            owner.finished.connect(_disconnect)
+        return _handler
+
+    def stats(self):
+        with self._lock:
+            return {"contratos": len(self._cache), "em_andamento": len(self._inflight),
+                    "hits": self.hits, "misses": self.misses}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
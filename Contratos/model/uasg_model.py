@@ -8,9 +8,12 @@ import requests
 import sqlite3
 from pathlib import Path
 from utils.utils import resource_path
+from utils.sql_profiler import sql_profiler
 from datetime import date, datetime, timedelta
+from sqlalchemy import text
 
 from .database import init_database
+from .change_feed_model import ESTADO_TABLE_SQL, PAUSAR_SQL, RETOMAR_SQL
 from .models import Base, Contrato, StatusContrato, RegistroStatus, RegistroMensagem, Uasg
 
 # Define o caminho base
@@ -22,6 +25,9 @@ except Exception:
 # Arquivo de configuração
 CONFIG_FILE = base_dir / "utils" / "json" / "config.json"
 
+# Sub-recursos com tabela no banco local (o modo Híbrido só revalida estes)
+SUB_RECURSOS_LOCAIS = ("historico", "empenhos", "itens", "arquivos")
+
 def load_config():
     """Carrega as configurações do arquivo JSON."""
     if CONFIG_FILE.exists():
@@ -80,7 +86,7 @@ class UASGModel:
         print(f"✅ Banco de dados de Contratos inicializado em: {self.db_path}")
     
     def _get_db_connection(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = sql_profiler.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -157,58 +163,47 @@ class UASGModel:
             db.close()
         return uasgs
 
-    def fetch_uasg_data(self, uasg, local_api_host="http://192.168.0.10:8000"):
+    def fetch_uasg_data(self, uasg, local_api_host=None, ignorar_copia_local=False):
         """
         Busca os dados de contratos de uma UASG.
-        1. Primeiro tenta usar a API local (sua API FastAPI).
-        2. Se a API local não responder ou não tiver dados, faz a requisição para a API pública.
+        1. Primeiro tenta o espelho da rede local (app.py), se configurado em "mirror_url"
+           ou informado em local_api_host.
+        2. Se o espelho não responder, faz a requisição para a API pública.
+
+        No modo Híbrido devolve na hora o que está no banco e revalida na API em segundo
+        plano (ver hybrid_sync_model); ignorar_copia_local=True força a busca na API.
         """
         mode = self.load_setting("data_mode", "Online")
+        if mode == "Híbrido" and ignorar_copia_local:
+            mode = "Online"
 
-        # URL da sua API local
-        url_local = f"{local_api_host}/api/contratos/raw/{uasg}"
-        # URL da API pública original
+        # URL da API pública original (o cliente troca pela do espelho quando houver)
         url_publica = f"https://contratos.comprasnet.gov.br/api/contrato/ug/{uasg}"
+        cliente = self.mirror_client
+        if local_api_host:
+            from .espelho_model import MirrorClient
+            cliente = MirrorClient(local_api_host)
 
         tentativas_maximas = 3
 
-        """# ------------- 1️⃣ Tentar API Local -------------
-        for tentativa in range(1, tentativas_maximas + 1):
-            try:
-                print(f"Tentativa {tentativa}/{tentativas_maximas} - Buscando dados da UASG {uasg} via API LOCAL...")
-                response = requests.get(url_local, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data:  # Se tiver dados no seu servidor local
-                        print("✅ Dados obtidos da API local com sucesso!")
-                        return data
-                    else:
-                        print("⚠ API local respondeu, mas sem dados para essa UASG.")
-                        break
-                else:
-                    print(f"⚠ API local retornou status {response.status_code}")
-            except requests.exceptions.RequestException as e:
-                print(f"⚠ Falha ao conectar à API local: {e}")
-                time.sleep(2)"""
-
         # ------------- 2️⃣ Se falhar, tentar API Pública -------------
+        contratos_locais = self._load_local_contracts(uasg) if mode in ("Offline", "Híbrido") else []
         if mode == "Offline":
             print(f"🔄 Modo Offline: Carregando contratos da UASG {uasg} do banco de dados.")
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT raw_json FROM contratos WHERE uasg_code = ?", (uasg,))
-            contratos_raw = cursor.fetchall()
-            conn.close()
-            return [json.loads(row['raw_json']) for row in contratos_raw]
+            return contratos_locais
+        elif mode == "Híbrido" and contratos_locais:
+            print(f"⚡ Modo Híbrido: contratos da UASG {uasg} do banco; revalidando na API em segundo plano.")
+            self.revalidator.revalidate_uasg(uasg)
+            return contratos_locais
         else:
             print(f"☁️ Modo Online: Buscando contratos da UASG {uasg} via API.")
             for tentativa in range(1, tentativas_maximas + 1):
                 try:
-                    print(f"Tentativa {tentativa}/{tentativas_maximas} - Buscando dados da UASG {uasg} via API PÚBLICA...")
-                    response = requests.get(url_publica, timeout=10)
-                    response.raise_for_status()
-                    print("✅ Dados obtidos da API pública com sucesso!")
-                    return response.json()
+                    print(f"Tentativa {tentativa}/{tentativas_maximas} - Buscando dados da UASG {uasg}...")
+                    data = cliente.get_json(url_publica, timeout=10)
+                    origem = "do espelho local" if cliente.ultima_origem == "espelho" else "da API pública"
+                    print(f"✅ Dados obtidos {origem} com sucesso!")
+                    return data
                 except requests.exceptions.RequestException as e:
                     print(f"⚠ Erro na tentativa {tentativa}/{tentativas_maximas} ao buscar dados da UASG {uasg} na API pública: {e}")
                     if tentativa < tentativas_maximas:
@@ -225,30 +220,120 @@ class UASGModel:
         
         if mode == "Offline":
             print(f"🔄 Modo Offline: Carregando '{data_type}' do contrato {contrato_id} do DB.")
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-            try:
-                # O nome da tabela é o mesmo que o 'data_type'
-                cursor.execute(f"SELECT raw_json FROM {data_type} WHERE contrato_id = ?", (str(contrato_id),))
-                data_raw = cursor.fetchall()
-                conn.close()
-                return [json.loads(row['raw_json']) for row in data_raw], None
-            except sqlite3.Error as e:
-                print(f"❌ Erro ao consultar a tabela '{data_type}' no modo offline: {e}")
-                conn.close()
-                return None, f"Tabela '{data_type}' não encontrada ou erro no DB."
+            return self._load_local_sub_data(contrato_id, data_type)
+        elif mode == "Híbrido" and data_type in SUB_RECURSOS_LOCAIS:
+            data, error = self._load_local_sub_data(contrato_id, data_type)
+            if data:
+                print(f"⚡ Modo Híbrido: '{data_type}' do contrato {contrato_id} do DB; revalidando na API.")
+                self.revalidator.revalidate_sub_data(contrato_id, data_type)
+                return data, None
+            # Sem cópia local: busca na API e grava para as próximas consultas
+            data, error = self._fetch_sub_data_online(contrato_id, data_type)
+            if not error:
+                try:
+                    self.revalidator.store_sub_data(contrato_id, data_type, data)
+                except sqlite3.Error as e:
+                    print(f"⚠ Não foi possível gravar '{data_type}' do contrato {contrato_id} no banco: {e}")
+            return data, error
         else:
-            print(f"☁️ Modo Online: Buscando '{data_type}' do contrato {contrato_id} via API.")
-            api_url = f"https://contratos.comprasnet.gov.br/api/contrato/{contrato_id}/{data_type}"
-            try:
-                response = requests.get(api_url, timeout=10)
-                if response.status_code == 200:
-                    return response.json(), None
-                else:
-                    return None, f"Erro na API: Status {response.status_code}"
-            except requests.RequestException as e:
-                return None, f"Erro de rede: {e}"
-        
+            return self._fetch_sub_data_online(contrato_id, data_type)
+
+    def _load_local_contracts(self, uasg):
+        conn = self._get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT raw_json FROM contratos WHERE uasg_code = ?", (uasg,))
+        contratos_raw = cursor.fetchall()
+        conn.close()
+        return [json.loads(row['raw_json']) for row in contratos_raw]
+
+    def _load_local_sub_data(self, contrato_id, data_type):
+        conn = self._get_db_connection()
+        cursor = conn.cursor()
+        try:
+            # O nome da tabela é o mesmo que o 'data_type'
+            cursor.execute(f"SELECT raw_json FROM {data_type} WHERE contrato_id = ?", (str(contrato_id),))
+            data_raw = cursor.fetchall()
+            conn.close()
+            return [json.loads(row['raw_json']) for row in data_raw], None
+        except sqlite3.Error as e:
+            print(f"❌ Erro ao consultar a tabela '{data_type}' no banco local: {e}")
+            conn.close()
+            return None, f"Tabela '{data_type}' não encontrada ou erro no DB."
+
+    def _fetch_sub_data_online(self, contrato_id, data_type):
+        print(f"☁️ Modo Online: Buscando '{data_type}' do contrato {contrato_id} via API.")
+        api_url = f"https://contratos.comprasnet.gov.br/api/contrato/{contrato_id}/{data_type}"
+        try:
+            return self.mirror_client.get_json(api_url, timeout=10), None
+        except requests.HTTPError as e:
+            return None, f"Erro na API: Status {e.response.status_code}"
+        except requests.RequestException as e:
+            return None, f"Erro de rede: {e}"
+
+    @property
+    def mirror_client(self):
+        """Cliente da API pública que passa primeiro pelo espelho da rede local ("mirror_url")."""
+        if getattr(self, "_mirror_client", None) is None:
+            from .espelho_model import MirrorClient
+            self._mirror_client = MirrorClient()
+        self._mirror_client.mirror_url = self.load_setting("mirror_url", "")
+        return self._mirror_client
+
+    def fetch_json_with_retries(self, url):
+        """Busca com retentativas (espelho primeiro); levanta o erro se todas falharem."""
+        from .offline_db_model import fetch_api_data
+        return fetch_api_data(url, raise_errors=True, get_json=self.mirror_client.get_json)
+
+    @property
+    def revalidator(self):
+        """Revalidação em segundo plano do modo Híbrido (criada no primeiro uso)."""
+        if getattr(self, "_revalidator", None) is None:
+            from PyQt6.QtCore import QCoreApplication
+            from .hybrid_sync_model import HybridRevalidator
+            self._revalidator = HybridRevalidator(self.db_path, fetch_json=self.fetch_json_with_retries)
+            # Dados novos substituem o cache das abas e chegam aos diálogos abertos pelo data_ready
+            self._revalidator.sub_data_updated.connect(self.prefetcher.publish)
+            app = QCoreApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(self._revalidator.shutdown)
+        # Acompanha a troca do local do banco
+        self._revalidator.db_path = self.db_path
+        return self._revalidator
+
+    @property
+    def prefetcher(self):
+        """Serviço de pré-carregamento das abas de detalhes (criado no primeiro uso)."""
+        if getattr(self, "_prefetcher", None) is None:
+            from .sub_data_prefetch import SubDataPrefetcher
+            self._prefetcher = SubDataPrefetcher(self.get_sub_data_for_contract)
+            from PyQt6.QtCore import QCoreApplication
+            app = QCoreApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(self._prefetcher.shutdown)
+        return self._prefetcher
+
+    def get_sub_data_cached(self, contrato_id, data_type, force=False):
+        """Como get_sub_data_for_contract, mas reaproveita o que já foi pré-carregado."""
+        return self.prefetcher.get(contrato_id, data_type, force=force)
+
+    @property
+    def document_cache(self):
+        """Cópias locais dos documentos (pasta 'documentos' ao lado do banco atual)."""
+        cache = getattr(self, "_document_cache", None)
+        if cache is None or cache.db_path != self.db_path:
+            from .documentos_cache_model import DocumentCache
+            cache = self._document_cache = DocumentCache(self.db_path)
+        return cache
+
+    @property
+    def document_index(self):
+        """Índice de texto completo da cópia local dos documentos."""
+        index = getattr(self, "_document_index", None)
+        if index is None or index.cache is not self.document_cache:
+            from .documentos_indice_model import DocumentIndex
+            index = self._document_index = DocumentIndex(self.document_cache)
+        return index
+
     def save_uasg_data(self, uasg, data):
         db = self._get_db_session()
         try:
@@ -297,7 +382,7 @@ class UASGModel:
     def update_uasg_data(self, uasg):
         """Atualiza os dados da UASG no banco de dados, comparando com os dados antigos."""
         # Buscar novos dados da API
-        new_data = self.fetch_uasg_data(uasg)
+        new_data = self.fetch_uasg_data(uasg, ignorar_copia_local=True)
         if new_data is None:
             print(f"⚠ Não foi possível buscar novos dados da UASG {uasg}.")
             return 0, 0
@@ -344,7 +429,9 @@ class UASGModel:
                 json.dumps(contrato_data)
             ))
 
-        # Remover contratos que não existem mais
+        # Remover contratos que não existem mais (limpeza local: não vai para o change feed)
+        cursor.execute(ESTADO_TABLE_SQL)
+        cursor.execute(PAUSAR_SQL)
         for old_id in old_contract_ids:
             # A comparação agora funciona porque é string vs string
             if old_id not in new_contract_ids:
@@ -354,6 +441,7 @@ class UASGModel:
                 cursor.execute("DELETE FROM registros_status WHERE contrato_id = ?", (old_id,))
                 cursor.execute("DELETE FROM comentarios_status WHERE contrato_id = ?", (old_id,))
                 contracts_to_remove_count += 1
+        cursor.execute(RETOMAR_SQL)
         
         conn.commit()
         conn.close()
@@ -371,7 +459,12 @@ class UASGModel:
                 
                 # Graças ao 'cascade' que definimos nos modelos, o SQLAlchemy irá deletar
                 # automaticamente todos os contratos e seus dados relacionados.
+                # Remover a UASG desta máquina não remove os status das outras (change feed pausado)
+                db.execute(text(ESTADO_TABLE_SQL))
+                db.execute(text(PAUSAR_SQL))
                 db.delete(uasg_to_delete)
+                db.flush()
+                db.execute(text(RETOMAR_SQL))
                 db.commit()
                 print(f"✅ Dados da UASG {uasg_code} removidos com sucesso.")
             else:
@@ -602,6 +695,10 @@ class UASGModel:
         with open(self.config_path, 'w', encoding='utf-8') as f:
             json.dump(config_data, f, indent=4)
 
+        # Trocar entre Online/Offline/Híbrido muda a origem dos dados das abas de detalhes
+        if key == "data_mode" and getattr(self, "_prefetcher", None) is not None:
+            self._prefetcher.invalidate()
+
     def load_setting(self, key, default_value=None):
         """Carrega uma configuração do arquivo config.json."""
         if not self.config_path.exists():
@@ -703,6 +800,15 @@ class UASGModel:
             if not db_session:
                 db.close()
 
+    def save_imported_links(self, plano):
+        """Grava numa única sessão os links importados da planilha (ver link_import_model)."""
+        from .link_import_model import apply_link_import
+        db = self._get_db_session()
+        try:
+            return apply_link_import(db, plano)
+        finally:
+            db.close()
+
     def get_contract_links(self, contrato_id):
         """Busca os links de um contrato específico."""
         from .models import LinksContrato # Importação local
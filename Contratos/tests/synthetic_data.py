@@ -0,0 +1,475 @@
+# tests/synthetic_data.py
+# Gerador de massa de dados sintética para testes e benchmarks.
+#
+# Usa os formatos reais de jsons/GERAL.json (exportação de status),
+# jsons/atas_principais-submend.json e jsons/atas_complementares-submend.json
+# como "molde" (textos, status, registros) e multiplica para N UASGs/contratos/atas.
+#
+# Uso em testes:
+#   from Contratos.tests.synthetic_data import SyntheticDataset
+#   ds = SyntheticDataset(n_uasgs=3, contratos_por_uasg=200, seed=42)
+#   ds.build_contratos_db(tmp_dir / "gerenciador_uasg.db")
+#   ds.build_atas_db(tmp_dir / "atas_controle.db")
+#
+# Uso pela linha de comando (gera bancos e JSONs numa pasta):
+#   python -m Contratos.tests.synthetic_data --uasgs 5 --contratos 300 --atas 500 --saida /tmp/massa
+
+import os
+import json
+import random
+import sqlite3
+import argparse
+from pathlib import Path
+from datetime import date, timedelta
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+JSONS_DIR = ROOT_DIR / "jsons"
+
+STATUS_CONTRATOS = [
+    "SEÇÃO CONTRATOS", "PORTARIA", "EMPRESA", "SIGDEM", "ASSINADO", "PUBLICADO",
+    "ALERTA PRAZO", "NOTA TÉCNICA", "AGU", "PRORROGADO", "SIGAD",
+]
+STATUS_ATAS = ["SEÇÃO ATAS", "ATA GERADA", "EMPRESA", "SIGDEM", "ASSINADO", "PUBLICADO", "ALERTA PRAZO"]
+SUB_RESOURCES = ("historico", "empenhos", "itens", "arquivos")
+
+
+def _load_json(name, default):
+    try:
+        with open(JSONS_DIR / name, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return default
+
+
+def _br_money(value):
+    """Formata 1234.5 -> '1.234,50' (formato devolvido pela API do Comprasnet)."""
+    return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+class SyntheticDataset:
+    """Gera payloads no formato real e grava em bancos SQLite temporários."""
+
+    def __init__(self, n_uasgs=3, contratos_por_uasg=100, n_atas=200,
+                 empenhos_por_contrato=4, registros_por_contrato=3,
+                 fracao_com_status=0.6, seed=42, today=None):
+        self.n_uasgs = n_uasgs
+        self.contratos_por_uasg = contratos_por_uasg
+        self.n_atas = n_atas
+        self.empenhos_por_contrato = empenhos_por_contrato
+        self.registros_por_contrato = registros_por_contrato
+        self.fracao_com_status = fracao_com_status
+        self.seed = seed
+        self.today = today or date.today()
+
+        # Moldes reais (se os arquivos não existirem, usa listas mínimas)
+        status_sample = _load_json("GERAL.json", [])
+        atas_sample = _load_json("atas_principais-submend.json", [])
+        compl_sample = _load_json("atas_complementares-submend.json", {})
+
+        self._objetos = [s["objeto_editado"] for s in status_sample if s.get("objeto_editado")] or ["AQUISIÇÃO DE MATERIAL"]
+        self._registros = [r for s in status_sample for r in s.get("registros", [])] or ["01/01/2025 - Registro - SEÇÃO CONTRATOS"]
+        self._radio_options = [s["radio_options_json"] for s in status_sample if s.get("radio_options_json")] or ["{}"]
+        self._empresas = [a["empresa"] for a in atas_sample if a.get("empresa")] or ["EMPRESA LTDA"]
+        self._objetos_atas = [a["objeto"] for a in atas_sample if a.get("objeto")] or ["Gêneros"]
+        self._setores = sorted({a["setor"] for a in atas_sample if a.get("setor")}) or ["CEIMBRA"]
+        self._registros_atas = [r["texto"] for r in compl_sample.get("registros_atas", [])] or ["[01/01/2025] - Registro"]
+
+        self._contracts = None
+        self._atas = None
+
+    # ==================== CONTRATOS ====================
+    def uasg_codes(self):
+        return [str(787000 + 10 * i) for i in range(self.n_uasgs)]
+
+    def contracts_by_uasg(self):
+        """{uasg: [contrato no formato da API /contrato/ug/{uasg}]} (determinístico pela seed)."""
+        if self._contracts is not None:
+            return self._contracts
+        rng = random.Random(self.seed)
+        result = {}
+        next_id = 100000
+        for uasg in self.uasg_codes():
+            nome_resumido = f"OM{uasg[-3:]}"
+            contratos = []
+            for n in range(1, self.contratos_por_uasg + 1):
+                next_id += 1
+                ano = rng.choice([2021, 2022, 2023, 2024, 2025])
+                inicio = self.today - timedelta(days=rng.randint(30, 1500))
+                # Mistura de vencidos, vencendo em breve e longos
+                fim = self.today + timedelta(days=rng.randint(-150, 900))
+                valor = rng.uniform(5_000, 5_000_000)
+                cnpj = f"{rng.randint(10, 99)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}/0001-{rng.randint(10, 99)}"
+                links = {
+                    res: f"https://contratos.comprasnet.gov.br/api/contrato/{next_id}/{res}"
+                    for res in SUB_RESOURCES
+                }
+                contratos.append({
+                    "id": str(next_id),
+                    "receita_despesa": "Despesa",
+                    "numero": f"{n:05d}/{ano}",
+                    "contratante": {
+                        "orgao": {
+                            "codigo": "52131",
+                            "nome": "COMANDO DA MARINHA",
+                            "unidade_gestora": {
+                                "codigo": uasg,
+                                "nome_resumido": nome_resumido,
+                                "nome": f"ORGANIZAÇÃO MILITAR {uasg}",
+                            },
+                        }
+                    },
+                    "fornecedor": {
+                        "tipo": "JURIDICA",
+                        "cnpj_cpf_idgener": cnpj,
+                        "nome": rng.choice(self._empresas).upper(),
+                    },
+                    "codigo_tipo": "50",
+                    "tipo": "Contrato",
+                    "categoria": rng.choice(["Serviços", "Compras", "Obras"]),
+                    "processo": f"63402.{rng.randint(1, 9999):06d}/{ano}-{rng.randint(10, 99)}",
+                    "objeto": rng.choice(self._objetos),
+                    "modalidade": "Pregão",
+                    "licitacao_numero": f"{rng.randint(1, 150):05d}/{ano}",
+                    "data_assinatura": inicio.isoformat(),
+                    "data_publicacao": (inicio + timedelta(days=3)).isoformat(),
+                    "vigencia_inicio": inicio.isoformat(),
+                    "vigencia_fim": fim.isoformat(),
+                    "valor_inicial": _br_money(valor),
+                    "valor_global": _br_money(valor),
+                    "num_parcelas": 12,
+                    "valor_parcela": _br_money(valor / 12),
+                    "valor_acumulado": _br_money(valor),
+                    "links": links,
+                })
+            result[uasg] = contratos
+        self._contracts = result
+        return result
+
+    def all_contracts(self):
+        return [c for lista in self.contracts_by_uasg().values() for c in lista]
+
+    def sub_resources(self, contrato):
+        """Gera historico/empenhos/itens/arquivos para um contrato (formato da API)."""
+        rng = random.Random(f"{self.seed}-{contrato['id']}")
+        inicio = date.fromisoformat(contrato["vigencia_inicio"])
+        fim = date.fromisoformat(contrato["vigencia_fim"])
+        valor = float(contrato["valor_global"].replace(".", "").replace(",", "."))
+
+        historico = [{
+            "id": int(contrato["id"]) * 10,
+            "receita_despesa": "Despesa",
+            "numero": contrato["numero"],
+            "codigo_tipo": "50",
+            "tipo": "Contrato",
+            "fornecedor_cnpj": contrato["fornecedor"]["cnpj_cpf_idgener"],
+            "fornecedor_nome": contrato["fornecedor"]["nome"],
+            "data_assinatura": inicio.isoformat(),
+            "vigencia_inicio": inicio.isoformat(),
+            "vigencia_fim": fim.isoformat(),
+            "valor_global": contrato["valor_global"],
+        }]
+        # Termo aditivo prorrogando a vigência em metade dos contratos
+        if rng.random() < 0.5:
+            novo_fim = fim + timedelta(days=365)
+            historico.append({
+                "id": int(contrato["id"]) * 10 + 1,
+                "receita_despesa": "Despesa",
+                "numero": f"{rng.randint(1, 5):05d}/{novo_fim.year}",
+                "codigo_tipo": "55",
+                "tipo": "Termo Aditivo",
+                "fornecedor_cnpj": contrato["fornecedor"]["cnpj_cpf_idgener"],
+                "fornecedor_nome": contrato["fornecedor"]["nome"],
+                "data_assinatura": fim.isoformat(),
+                "vigencia_inicio": fim.isoformat(),
+                "vigencia_fim": novo_fim.isoformat(),
+                "valor_global": _br_money(valor * 1.1),
+            })
+
+        empenhos = []
+        for i in range(self.empenhos_por_contrato):
+            emissao = inicio + timedelta(days=rng.randint(0, max(1, (fim - inicio).days)))
+            empenhado = valor / max(1, self.empenhos_por_contrato) * rng.uniform(0.7, 1.2)
+            pago = empenhado * rng.uniform(0.3, 1.0)
+            empenhos.append({
+                "id": int(contrato["id"]) * 100 + i,
+                "unidade_gestora": contrato["contratante"]["orgao"]["unidade_gestora"]["codigo"],
+                "gestao": "00001",
+                "numero": f"{emissao.year}NE{rng.randint(1, 999999):06d}",
+                "data_emissao": emissao.isoformat(),
+                "credor": contrato["fornecedor"]["nome"],
+                "naturezadespesa": rng.choice(["339039", "339030", "449052"]),
+                "empenhado": _br_money(empenhado),
+                "aliquidar": _br_money(empenhado - pago),
+                "liquidado": _br_money(pago),
+                "pago": _br_money(pago),
+                "links": {"documento_pagamento": f"https://contratos.comprasnet.gov.br/api/empenho/{contrato['id']}{i}/pagamentos"},
+            })
+
+        itens = []
+        for i in range(rng.randint(1, 4)):
+            unit = rng.uniform(1, 5000)
+            qtd = rng.randint(1, 500)
+            itens.append({
+                "id": int(contrato["id"]) * 100 + i,
+                "tipo_id": "Material",
+                "tipo_material": "Consumo",
+                "grupo_id": str(rng.randint(10, 99)),
+                "catmatseritem_id": str(rng.randint(100000, 100050)),
+                "descricao_complementar": rng.choice(self._objetos_atas),
+                "quantidade": str(qtd),
+                "valorunitario": _br_money(unit),
+                "valortotal": _br_money(unit * qtd),
+                "numero_item_compra": f"{i + 1:05d}",
+            })
+
+        arquivos = [{
+            "id": int(contrato["id"]) * 10 + i,
+            "tipo": rng.choice(["Contrato", "Termo Aditivo", "Portaria"]),
+            "descricao": f"Documento {i + 1}",
+            "path_arquivo": f"https://contratos.comprasnet.gov.br/storage/{contrato['id']}/{i + 1}.pdf",
+            "origem": "0",
+            "link_sei": "",
+        } for i in range(rng.randint(0, 3))]
+
+        return {"historico": historico, "empenhos": empenhos, "itens": itens, "arquivos": arquivos}
+
+    def status_entries(self):
+        """Lista no formato de jsons/GERAL.json (export_status_data / import_statuses)."""
+        rng = random.Random(f"{self.seed}-status")
+        entries = []
+        for contrato in self.all_contracts():
+            if rng.random() >= self.fracao_com_status:
+                continue
+            uasg = contrato["contratante"]["orgao"]["unidade_gestora"]["codigo"]
+            dia = self.today - timedelta(days=rng.randint(0, 300))
+            registros = [
+                f"{(dia - timedelta(days=k)).strftime('%d/%m/%Y')} - {rng.choice(self._registros)[13:80]} #{contrato['id']}-{k}"
+                for k in range(self.registros_por_contrato)
+            ]
+            entries.append({
+                "contrato_id": contrato["id"],
+                "uasg_code": uasg,
+                "status": rng.choice(STATUS_CONTRATOS),
+                "objeto_editado": contrato["objeto"],
+                "portaria_edit": f"Portaria nº {rng.randint(1, 300)}/{dia.year}" if rng.random() < 0.5 else "",
+                "termo_aditivo_edit": "",
+                "radio_options_json": rng.choice(self._radio_options),
+                "data_registro": dia.strftime("%d/%m/%Y %H:%M:%S"),
+                "registros": registros,
+                "registros_mensagem": [],
+                "link_contrato": f"https://pncp.gov.br/app/contratos/{contrato['id']}" if rng.random() < 0.7 else "",
+                "link_ta": "",
+                "link_portaria": "",
+                "link_pncp_espc": "",
+                "link_portal_marinha": "",
+                "fiscal_gestor": "CT Fulano" if rng.random() < 0.3 else "",
+                "fiscal_gestor_substituto": "",
+                "fiscalizacao_tecnico": "",
+                "fiscalizacao_tec_substituto": "",
+                "fiscalizacao_administrativo": "",
+                "fiscalizacao_admin_substituto": "",
+                "fiscal_observacoes": "",
+                "fiscal_data_criacao": "",
+                "fiscal_data_atualizacao": "",
+            })
+        return entries
+
+    def build_contratos_db(self, db_path, with_status=True, with_sub_resources=True):
+        """Cria o banco de Contratos (schema do ORM) e grava a massa sintética."""
+        from Contratos.model.models import Base
+        from sqlalchemy import create_engine
+
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+        conn = sqlite3.connect(db_path)
+        try:
+            contracts = self.contracts_by_uasg()
+            conn.executemany(
+                "INSERT OR REPLACE INTO uasgs (uasg_code, nome_resumido) VALUES (?, ?)",
+                [(uasg, lista[0]["contratante"]["orgao"]["unidade_gestora"]["nome_resumido"]) for uasg, lista in contracts.items() if lista],
+            )
+            conn.executemany(
+                """INSERT OR REPLACE INTO contratos (
+                    id, uasg_code, numero, licitacao_numero, processo, fornecedor_nome, fornecedor_cnpj,
+                    objeto, valor_global, vigencia_inicio, vigencia_fim, tipo, modalidade,
+                    contratante_orgao_unidade_gestora_codigo, contratante_orgao_unidade_gestora_nome_resumido,
+                    manual, raw_json
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(
+                    c["id"], uasg, c["numero"], c["licitacao_numero"], c["processo"],
+                    c["fornecedor"]["nome"], c["fornecedor"]["cnpj_cpf_idgener"], c["objeto"],
+                    c["valor_global"], c["vigencia_inicio"], c["vigencia_fim"], c["tipo"], c["modalidade"],
+                    uasg, c["contratante"]["orgao"]["unidade_gestora"]["nome_resumido"], False, json.dumps(c),
+                ) for uasg, lista in contracts.items() for c in lista],
+            )
+
+            if with_sub_resources:
+                for contrato in self.all_contracts():
+                    for table, rows in self.sub_resources(contrato).items():
+                        conn.executemany(
+                            f"INSERT OR REPLACE INTO {table} (id, contrato_id, raw_json) VALUES (?, ?, ?)",
+                            [(row["id"], contrato["id"], json.dumps(row)) for row in rows],
+                        )
+
+            if with_status:
+                self._write_status(conn, self.status_entries())
+            conn.commit()
+        finally:
+            conn.close()
+        return db_path
+
+    @staticmethod
+    def _write_status(conn, entries):
+        conn.executemany(
+            """INSERT OR REPLACE INTO status_contratos (
+                contrato_id, uasg_code, status, objeto_editado, portaria_edit, termo_aditivo_edit,
+                radio_options_json, data_registro
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(e["contrato_id"], e["uasg_code"], e["status"], e["objeto_editado"], e["portaria_edit"],
+              e["termo_aditivo_edit"], e["radio_options_json"], e["data_registro"]) for e in entries],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO registros_status (uuid, contrato_id, uasg_code, texto) VALUES (?, ?, ?, ?)",
+            [(f"{e['contrato_id']}-{i}", e["contrato_id"], e["uasg_code"], texto)
+             for e in entries for i, texto in enumerate(e["registros"])],
+        )
+        conn.executemany(
+            """INSERT OR REPLACE INTO links_contratos (
+                contrato_id, link_contrato, link_ta, link_portaria, link_pncp_espc, link_portal_marinha
+            ) VALUES (?, ?, ?, ?, ?, ?)""",
+            [(e["contrato_id"], e["link_contrato"], e["link_ta"], e["link_portaria"],
+              e["link_pncp_espc"], e["link_portal_marinha"]) for e in entries if e["link_contrato"]],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO fiscalizacao (contrato_id, gestor) VALUES (?, ?)",
+            [(e["contrato_id"], e["fiscal_gestor"]) for e in entries if e["fiscal_gestor"]],
+        )
+
+    # ==================== ATAS ====================
+    def atas(self):
+        """Lista no formato de jsons/atas_principais-submend.json."""
+        if self._atas is not None:
+            return self._atas
+        rng = random.Random(f"{self.seed}-atas")
+        atas = []
+        for i in range(1, self.n_atas + 1):
+            ano = rng.choice([2023, 2024, 2025])
+            celebracao = self.today - timedelta(days=rng.randint(0, 700))
+            termino = celebracao + timedelta(days=365)
+            atas.append({
+                "id": i,
+                "setor": rng.choice(self._setores),
+                "modalidade": "Pregão Eletrônico",
+                "numero": f"{rng.randint(1, 99):02d}",
+                "ano": str(ano),
+                "empresa": rng.choice(self._empresas),
+                "contrato_ata_parecer": f"87000/{str(ano)[-2:]}-{i:04d}/00",
+                "objeto": rng.choice(self._objetos_atas),
+                "celebracao": celebracao.isoformat(),
+                "termino": termino.isoformat(),
+                "observacoes": "",
+                "termo_aditivo": "XXX",
+                "portaria_fiscalizacao": f"N° {rng.randint(1, 99)}/{ano}",
+                "nup": f"63402.{rng.randint(1, 9999):06d}/{ano}-{rng.randint(10, 99)}",
+                "cnpj": "",
+                "valor_global": _br_money(rng.uniform(1_000, 900_000)),
+            })
+        self._atas = atas
+        return atas
+
+    def atas_complementares(self):
+        """Dicionário no formato de jsons/atas_complementares-submend.json."""
+        rng = random.Random(f"{self.seed}-atas-compl")
+        status, registros, links = [], [], []
+        for ata in self.atas():
+            parecer = ata["contrato_ata_parecer"]
+            status.append({"ata_parecer": parecer, "status": rng.choice(STATUS_ATAS)})
+            for k in range(rng.randint(0, 3)):
+                registros.append({"ata_parecer": parecer, "texto": f"{rng.choice(self._registros_atas)} ({k})"})
+            if rng.random() < 0.7:
+                links.append({
+                    "ata_parecer": parecer,
+                    "serie_ata_link": f"https://pncp.gov.br/app/atas/{ata['id']}",
+                    "portaria_link": "",
+                    "ta_link": "",
+                    "portal_licitacoes_link": "",
+                })
+        return {"status_atas": status, "registros_atas": registros, "links_ata": links, "fiscalizacao_atas": []}
+
+    def build_atas_db(self, db_path):
+        """Cria o banco de Atas (schema do ORM de atas) e grava a massa sintética."""
+        from atas.model.atas_model import Base as AtasBase
+        from sqlalchemy import create_engine
+
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        engine = create_engine(f"sqlite:///{db_path}")
+        AtasBase.metadata.create_all(bind=engine)
+        engine.dispose()
+
+        atas = self.atas()
+        compl = self.atas_complementares()
+        cols = list(atas[0].keys()) if atas else []
+        conn = sqlite3.connect(db_path)
+        try:
+            if atas:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO atas ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                    [tuple(a[c] for c in cols) for a in atas],
+                )
+            conn.executemany("INSERT OR REPLACE INTO status_atas (ata_parecer, status) VALUES (?, ?)",
+                             [(s["ata_parecer"], s["status"]) for s in compl["status_atas"]])
+            conn.executemany("INSERT INTO registros_atas (uuid, ata_parecer, texto) VALUES (?, ?, ?)",
+                             [(f"r-{i}", r["ata_parecer"], r["texto"]) for i, r in enumerate(compl["registros_atas"])])
+            conn.executemany(
+                "INSERT OR REPLACE INTO links_ata (ata_parecer, serie_ata_link, portaria_link, ta_link, portal_licitacoes_link) VALUES (?, ?, ?, ?, ?)",
+                [(l["ata_parecer"], l["serie_ata_link"], l["portaria_link"], l["ta_link"], l["portal_licitacoes_link"]) for l in compl["links_ata"]],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return db_path
+
+    # ==================== ARQUIVOS JSON ====================
+    def write_json_files(self, out_dir):
+        """Grava os JSONs nos mesmos formatos da pasta jsons/ (para importações)."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "status": out_dir / "status_sintetico.json",
+            "atas_principais": out_dir / "atas_principais_sintetico.json",
+            "atas_complementares": out_dir / "atas_complementares_sintetico.json",
+        }
+        for key, data in (("status", self.status_entries()),
+                          ("atas_principais", self.atas()),
+                          ("atas_complementares", self.atas_complementares())):
+            with open(paths[key], "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera massa de dados sintética para Contratos e Atas.")
+    parser.add_argument("--uasgs", type=int, default=3)
+    parser.add_argument("--contratos", type=int, default=100, help="Contratos por UASG")
+    parser.add_argument("--atas", type=int, default=200)
+    parser.add_argument("--empenhos", type=int, default=4, help="Empenhos por contrato")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", default=os.path.join("database", "sintetico"))
+    args = parser.parse_args(argv)
+
+    ds = SyntheticDataset(n_uasgs=args.uasgs, contratos_por_uasg=args.contratos, n_atas=args.atas,
+                          empenhos_por_contrato=args.empenhos, seed=args.seed)
+    out = Path(args.saida)
+    ds.build_contratos_db(out / "gerenciador_uasg.db")
+    ds.build_atas_db(out / "atas_controle.db")
+    ds.write_json_files(out)
+    print(f"✅ Massa sintética gerada em: {out.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# tests/test_aditivos.py
+import unittest
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+from datetime import date
+from unittest.mock import patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.model.aditivos_model import AditivosTimeline
+from Contratos.model.empenhos_relatorio_model import parse_br_float
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+
+class TestAditivosTimeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dataset = SyntheticDataset(n_uasgs=2, contratos_por_uasg=25, seed=5, today=date(2025, 6, 1))
+        self.db_path = str(self.dataset.build_contratos_db(os.path.join(self.tmp.name, "gerenciador_uasg.db")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _insert_historico(self, historico_id, contrato_id, registro):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO historico (id, contrato_id, raw_json) VALUES (?, ?, ?)",
+                     (historico_id, contrato_id, json.dumps(registro)))
+        conn.commit()
+        conn.close()
+
+    def test_summary_matches_historico(self):
+        timeline = AditivosTimeline(self.db_path)
+        stats = timeline.refresh()
+        self.assertEqual(stats["contratos"], 50)
+        self.assertEqual(timeline.pending_count(), 0)
+
+        for contrato in self.dataset.all_contracts():
+            historico = self.dataset.sub_resources(contrato)["historico"]
+            resumo = timeline.summary(contrato["id"])
+            inicial = parse_br_float(historico[0]["valor_global"])
+            atual = parse_br_float(historico[-1]["valor_global"])
+            self.assertEqual(resumo["qtd_aditivos"], len(historico) - 1)
+            self.assertAlmostEqual(resumo["valor_inicial"], inicial, places=2)
+            self.assertAlmostEqual(resumo["crescimento_valor"], atual - inicial, places=2)
+            self.assertEqual(resumo["vigencia_final"], historico[-1]["vigencia_fim"])
+            if len(historico) > 1:
+                self.assertEqual(resumo["dias_prorrogados"], 365)
+                self.assertAlmostEqual(resumo["crescimento_pct"], 10.0, places=1)
+                self.assertEqual(resumo["ultimo_aditivo"], historico[-1]["data_assinatura"])
+            else:
+                self.assertEqual((resumo["dias_prorrogados"], resumo["ultimo_aditivo"]), (0, None))
+
+    def test_incremental_refresh_and_timeline(self):
+        timeline = AditivosTimeline(self.db_path)
+        timeline.refresh()
+        self.assertEqual(timeline.refresh()["contratos"], 0)
+
+        contrato = next(c for c in self.dataset.all_contracts()
+                        if len(self.dataset.sub_resources(c)["historico"]) == 1)
+        fim = self.dataset.sub_resources(contrato)["historico"][0]["vigencia_fim"]
+        # Aditivo só de prazo (sem valor) seguido de um de valor
+        self._insert_historico(9000001, contrato["id"], {
+            "codigo_tipo": "55", "tipo": "Termo Aditivo", "numero": "00001/2026",
+            "data_assinatura": fim, "vigencia_inicio": fim, "vigencia_fim": "2099-12-31", "valor_global": None})
+        self._insert_historico(9000002, contrato["id"], {
+            "codigo_tipo": "55", "tipo": "Termo Aditivo", "numero": "00002/2026",
+            "data_assinatura": "2099-01-01", "vigencia_inicio": "2099-01-01", "vigencia_fim": "2099-12-31",
+            "valor_global": "1.000.000,00"})
+        self.assertEqual(timeline.pending_count(), 1)
+
+        eventos = timeline.timeline(contrato["id"])
+        self.assertEqual([e["ordem"] for e in eventos], [0, 1, 2])
+        self.assertEqual([e["numero"] for e in eventos[1:]], ["00001/2026", "00002/2026"])
+        self.assertEqual(eventos[1]["variacao_valor"], 0)
+        self.assertEqual(eventos[2]["dias_prorrogados"], 0)
+        inicial = parse_br_float(contrato["valor_global"])
+        self.assertAlmostEqual(eventos[2]["variacao_acumulada"], 1000000.0 - inicial, places=2)
+        self.assertEqual(timeline.pending_count(), 0)
+
+        resumo = timeline.summary(contrato["id"])
+        self.assertEqual(resumo["qtd_aditivos"], 2)
+        # A janela de detalhes lê os dois de uma vez; o esquema não é conferido de novo no mesmo processo
+        with patch("Contratos.model.aditivos_model.sql_profiler.connect", side_effect=AssertionError):
+            AditivosTimeline(self.db_path)
+        self.assertEqual(timeline.details(contrato["id"]), (resumo, eventos))
+        self.assertEqual(resumo["ultimo_aditivo"], "2099-01-01")
+        self.assertEqual(resumo["dias_prorrogados"], (date(2099, 12, 31) - date.fromisoformat(fim)).days)
+
+        # Exclusão do histórico remove o contrato do resumo
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM historico WHERE contrato_id = ?", (contrato["id"],))
+        conn.commit()
+        conn.close()
+        self.assertEqual(timeline.refresh()["contratos"], 0)
+        self.assertIsNone(timeline.summary(contrato["id"]))
+        self.assertEqual(timeline.timeline(contrato["id"]), [])
+
+    def test_requires_historico_table(self):
+        db_path = os.path.join(self.tmp.name, "vazio.db")
+        sqlite3.connect(db_path).close()
+        with self.assertRaises(RuntimeError):
+            AditivosTimeline(db_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# tests/test_atas_model.py
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import atas.model.atas_model as atas_model_module
+from atas.model.atas_model import Ata, StatusAta, LinksAta, RegistroAta, FiscalizacaoAta, Base
+from utils.sql_profiler import sql_profiler
+
+
+class TestAtasReadPath(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = Path(self.tmp.name) / "atas_controle.db"
+        self.engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=self.engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        self.patches = [
+            patch.object(atas_model_module, "DB_PATH", db_path),
+            patch.object(atas_model_module, "engine", self.engine),
+            patch.object(atas_model_module, "SessionLocal", session_factory),
+        ]
+        for p in self.patches:
+            p.start()
+
+        session = session_factory()
+        session.add_all([
+            Ata(contrato_ata_parecer="A-2026", empresa="ALFA", termino="2026-05-01"),
+            Ata(contrato_ata_parecer="B-VAZIA", empresa="BETA", termino=""),
+            Ata(contrato_ata_parecer="C-2025", empresa="GAMA", termino="2025-01-31"),
+            Ata(contrato_ata_parecer="D-INVALIDA", empresa="DELTA", termino="31/12/2024"),
+            StatusAta(ata_parecer="A-2026", status="PUBLICADO"),
+            LinksAta(ata_parecer="A-2026", serie_ata_link="http://serie", portaria_link="http://portaria"),
+            RegistroAta(ata_parecer="A-2026", texto="primeiro"),
+            RegistroAta(ata_parecer="A-2026", texto="segundo"),
+            FiscalizacaoAta(ata_parecer="A-2026", gestor="Fulano"),
+        ])
+        session.commit()
+        session.close()
+
+        self.model = atas_model_module.AtasModel()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_orders_by_normalized_termino_in_sql(self):
+        pareceres = [ata.contrato_ata_parecer for ata in self.model.get_all_atas()]
+        # Vazias e fora do padrão primeiro (na ordem de inserção), depois por data
+        self.assertEqual(pareceres, ["B-VAZIA", "D-INVALIDA", "C-2025", "A-2026"])
+
+    def test_ata_data_is_slotted_and_complete(self):
+        ata = self.model.get_all_atas()[-1]
+        self.assertFalse(hasattr(ata, "__dict__"))
+        self.assertEqual(ata.status, "PUBLICADO")
+        self.assertEqual(ata.serie_ata_link, "http://serie")
+        self.assertEqual(ata.ta_link, None)
+        self.assertEqual(ata.registros, ["primeiro", "segundo"])
+        self.assertEqual(ata.fiscalizacao["gestor"], "Fulano")
+
+        sem_status = self.model.get_all_atas()[0]
+        self.assertEqual((sem_status.status, sem_status.serie_ata_link, sem_status.registros), ("SEÇÃO ATAS", "", []))
+
+        detalhe = self.model.get_ata_by_parecer("A-2026")
+        self.assertEqual((detalhe.status, detalhe.registros, detalhe.fiscalizacao["gestor"]),
+                         ("PUBLICADO", ["primeiro", "segundo"], "Fulano"))
+
+    def test_snapshot_is_shared_and_invalidated_on_write(self):
+        was_enabled = sql_profiler.enabled
+        sql_profiler.enable(slow_query_ms=10_000)
+        try:
+            with sql_profiler.operation("primeira") as first:
+                atas = self.model.get_all_atas()
+            with sql_profiler.operation("segunda") as second:
+                self.assertIs(self.model.get_all_atas()[0], atas[0])
+                self.assertEqual([a.contrato_ata_parecer for a in self.model.get_atas_with_status_not_default()],
+                                 ["A-2026"])
+            self.assertEqual(first.count, 3)
+            self.assertEqual(second.count, 0)
+        finally:
+            if not was_enabled:
+                sql_profiler.disable()
+            sql_profiler.reset()
+
+        self.assertTrue(self.model.update_ata("C-2025", {"status": "ASSINADO"}, []))
+        status = {a.contrato_ata_parecer: a.status for a in self.model.get_atas_with_status_not_default()}
+        self.assertEqual(status, {"C-2025": "ASSINADO", "A-2026": "PUBLICADO"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_atas_table_model.py
+import unittest
+import os
+import sys
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import Qt, QRegularExpression
+from PyQt6.QtWidgets import QApplication
+from atas.model.atas_table_model import AtasTableModel, COL_DIAS, COL_VENCIMENTO, COL_PARECER, COL_STATUS
+from utils.utils import MultiColumnFilterProxyModel
+
+
+def _ata(parecer, termino, status="SEÇÃO ATAS", empresa="EMPRESA X"):
+    # Mesmo formato do AtaData (status já resolvido)
+    return SimpleNamespace(
+        contrato_ata_parecer=parecer, termino=termino, celebracao="2024-01-10",
+        numero="90001", ano="2024", empresa=empresa, objeto="MATERIAL", status=status,
+    )
+
+
+class TestAtasTableModel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.termino = (date.today() + timedelta(days=30)).isoformat()
+        self.model = AtasTableModel()
+        self.model.set_atas([
+            _ata("787010/24-001", self.termino),
+            _ata("787010/24-002", "2000-01-01", status="PUBLICADO"),
+            _ata("787010/24-003", None),
+        ])
+
+    def _text(self, row, column):
+        return self.model.data(self.model.index(row, column))
+
+    def test_formats_cells_on_demand(self):
+        self.assertEqual(self.model.rowCount(), 3)
+        self.assertEqual(self._text(0, COL_DIAS), "30")
+        self.assertEqual(self._text(1, COL_DIAS), "AD")
+        self.assertEqual(self._text(1, COL_VENCIMENTO), "01/01/2000")
+        self.assertEqual(self._text(2, COL_DIAS), "N/A")
+        self.assertEqual(self._text(1, COL_STATUS), "PUBLICADO")
+        self.assertEqual(self.model.headerData(COL_PARECER, Qt.Orientation.Horizontal), "Ata")
+
+    def test_update_emits_data_changed_for_single_row(self):
+        emitted = []
+        resets = []
+        self.model.dataChanged.connect(lambda tl, br, roles=None: emitted.append((tl.row(), br.row())))
+        self.model.modelReset.connect(lambda: resets.append(True))
+
+        self.assertEqual(self.model.row_for_parecer("787010/24-002"), 1)
+        self.assertTrue(self.model.update_ata(_ata("787010/24-002", self.termino, status="ASSINADO")))
+
+        self.assertEqual(emitted, [(1, 1)])
+        self.assertFalse(resets)
+        self.assertEqual(self._text(1, COL_STATUS), "ASSINADO")
+        self.assertEqual(self._text(1, COL_DIAS), "30")
+
+    def test_update_unknown_parecer_returns_false(self):
+        self.assertFalse(self.model.update_ata(_ata("000000/00-000", self.termino)))
+        self.assertEqual(self.model.row_for_parecer("000000/00-000"), -1)
+        self.assertIsNone(self.model.parecer_at(99))
+
+    def test_search_proxy_filters_virtual_model(self):
+        proxy = MultiColumnFilterProxyModel()
+        proxy.setSourceModel(self.model)
+        proxy.setFilterRegularExpression(QRegularExpression("24-003"))
+        self.assertEqual(proxy.rowCount(), 1)
+        self.assertEqual(self.model.parecer_at(proxy.mapToSource(proxy.index(0, 0)).row()), "787010/24-003")
+
+
+if __name__ == '__main__':
+    unittest.main()
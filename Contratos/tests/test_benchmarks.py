@@ -0,0 +1,332 @@
+# tests/test_benchmarks.py
+# Benchmarks dos caminhos críticos de Contratos e Atas sobre massa sintética.
+#
+# Não rodam no "pytest" normal. Para executar (headless):
+#   CA360_BENCH=1 python -m pytest -q Contratos/tests/test_benchmarks.py -s
+#
+# Variáveis:
+#   CA360_BENCH_SCALE      multiplica o tamanho da massa (padrão 1 = 3 UASGs x 300 contratos, 600 atas)
+#   CA360_BENCH_TOLERANCE  folga permitida sobre o baseline (padrão 0.5 = +50%)
+#   CA360_BENCH_NOISE_MS   folga absoluta mínima, para medições de poucos ms (padrão 25)
+#   CA360_BENCH_UPDATE=1   regrava o baseline com os tempos desta execução
+#   CA360_BENCH_RESULTS    arquivo do resultado (padrão ca360_bench_results.json na pasta temporária)
+#
+# O baseline fica em tests/benchmarks_baseline.json; o resultado da última
+# execução não é versionado.
+import unittest
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import statistics
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT_DIR))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BENCH_ENABLED = os.environ.get("CA360_BENCH", "").strip() == "1"
+SCALE = float(os.environ.get("CA360_BENCH_SCALE", "1"))
+TOLERANCE = float(os.environ.get("CA360_BENCH_TOLERANCE", "0.5"))
+NOISE_MS = float(os.environ.get("CA360_BENCH_NOISE_MS", "25"))
+UPDATE_BASELINE = os.environ.get("CA360_BENCH_UPDATE", "").strip() == "1"
+BASELINE_FILE = Path(__file__).with_name("benchmarks_baseline.json")
+RESULTS_FILE = Path(os.environ.get("CA360_BENCH_RESULTS", "").strip()
+                    or Path(tempfile.gettempdir()) / "ca360_bench_results.json")
+REPEAT = 5
+
+
+def _load_baseline():
+    try:
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+@unittest.skipUnless(BENCH_ENABLED, "Benchmarks desativados (use CA360_BENCH=1).")
+class TestBenchmarks(unittest.TestCase):
+
+    results = {}
+
+    @classmethod
+    def setUpClass(cls):
+        from PyQt6.QtWidgets import QApplication
+        from Contratos.tests.synthetic_data import SyntheticDataset
+
+        cls.app = QApplication.instance() or QApplication([])
+        cls.tmp = Path(tempfile.mkdtemp(prefix="ca360_bench_"))
+        cls.dataset = SyntheticDataset(
+            n_uasgs=3,
+            contratos_por_uasg=int(300 * SCALE),
+            n_atas=int(600 * SCALE),
+            seed=2024,
+        )
+        cls.contratos_db = cls.dataset.build_contratos_db(cls.tmp / "contratos" / "gerenciador_uasg.db")
+        cls.atas_db = cls.dataset.build_atas_db(cls.tmp / "atas" / "atas_controle.db")
+        cls.json_paths = cls.dataset.write_json_files(cls.tmp / "jsons")
+        cls.baseline = _load_baseline()
+        cls.meta = {
+            "uasgs": cls.dataset.n_uasgs,
+            "contratos": len(cls.dataset.all_contracts()),
+            "atas": len(cls.dataset.atas()),
+            "scale": SCALE,
+        }
+
+        # --- Model de Contratos apontando para o banco temporário ---
+        import Contratos.model.uasg_model as uasg_model_module
+        with patch.object(uasg_model_module, "get_db_path_from_config", return_value=cls.contratos_db):
+            cls.model = uasg_model_module.UASGModel(str(cls.tmp))
+
+        # --- Model de Atas apontando para o banco temporário ---
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        import atas.model.atas_model as atas_model_module
+
+        engine = create_engine(f"sqlite:///{cls.atas_db}", connect_args={"check_same_thread": False})
+        cls._atas_patches = [
+            patch.object(atas_model_module, "DB_PATH", cls.atas_db),
+            patch.object(atas_model_module, "engine", engine),
+            patch.object(atas_model_module, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine)),
+        ]
+        for p in cls._atas_patches:
+            p.start()
+        cls.atas_engine = engine
+        cls.atas_model = atas_model_module.AtasModel()
+
+    @classmethod
+    def tearDownClass(cls):
+        for p in getattr(cls, "_atas_patches", []):
+            p.stop()
+        if getattr(cls, "atas_engine", None):
+            cls.atas_engine.dispose()
+        from Contratos.model import database
+        if database.engine:
+            database.engine.dispose()
+
+        RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(RESULTS_FILE, "w", encoding="utf-8") as f:
+            json.dump({"meta": cls.meta, "results": cls.results}, f, indent=2, ensure_ascii=False)
+        print(f"\n📊 Resultados em {RESULTS_FILE}")
+        if UPDATE_BASELINE and cls.results:
+            with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+                json.dump({"meta": cls.meta, "median_ms": {k: v["median_ms"] for k, v in cls.results.items()}},
+                          f, indent=2, ensure_ascii=False)
+            print(f"\n📌 Baseline atualizado em {BASELINE_FILE}")
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    # ==================== INFRAESTRUTURA ====================
+    def _bench(self, name, func, setup=None, repeat=REPEAT):
+        """Executa 'func' várias vezes, registra min/mediana e compara com o baseline."""
+        timings = []
+        for _ in range(repeat):
+            args = setup() if setup else ()
+            start = time.perf_counter()
+            func(*args)
+            timings.append((time.perf_counter() - start) * 1000.0)
+
+        median = statistics.median(timings)
+        result = {"median_ms": round(median, 2), "min_ms": round(min(timings), 2), "runs": repeat}
+        base = self.baseline.get("median_ms", {}).get(name)
+        if base:
+            result["baseline_ms"] = base
+            result["ratio"] = round(median / base, 3)
+        type(self).results[name] = result
+        print(f"\n⏱ {name}: mediana {median:.1f} ms (mín {min(timings):.1f} ms)"
+              + (f" | baseline {base:.1f} ms ({median / base:.2f}x)" if base else ""))
+
+        if base and not UPDATE_BASELINE:
+            limit = max(base * (1 + TOLERANCE), base + NOISE_MS)
+            self.assertLessEqual(
+                median, limit,
+                f"{name} regrediu: {median:.1f} ms vs baseline {base:.1f} ms (limite {limit:.1f} ms)"
+            )
+        return median
+
+    def _make_table_controller(self):
+        """Controller mínimo com a mesma tabela (proxy + QStandardItemModel) da MainWindow."""
+        from PyQt6.QtWidgets import QTableView, QWidget
+        from PyQt6.QtGui import QStandardItemModel
+        from utils.utils import MultiColumnFilterProxyModel
+
+        class _View(QWidget):
+            pass
+
+        class _Controller:
+            pass
+
+        view = _View()
+        view.table = QTableView(view)
+        source = QStandardItemModel()
+        proxy = MultiColumnFilterProxyModel()
+        proxy.setSourceModel(source)
+        view.table.setModel(proxy)
+
+        controller = _Controller()
+        controller.view = view
+        controller.model = self.model
+        controller.current_data = []
+        return controller
+
+    # ==================== CONTRATOS ====================
+    def test_load_saved_uasgs(self):
+        data = self.model.load_saved_uasgs()
+        self.assertEqual(sum(len(v) for v in data.values()), self.meta["contratos"])
+        self._bench("load_saved_uasgs", self.model.load_saved_uasgs)
+
+    def test_populate_table(self):
+        from Contratos.controller.controller_table import populate_table
+
+        controller = self._make_table_controller()
+        data = self.dataset.all_contracts()
+        self._bench("populate_table", lambda: populate_table(controller, data))
+        self.assertGreater(controller.view.table.model().sourceModel().rowCount(), 0)
+
+    def test_update_dashboard(self):
+        from PyQt6.QtWidgets import QWidget
+        from Contratos.view.dashboard_tab import create_dashboard_tab
+        from Contratos.controller.dashboard_controller import DashboardController
+
+        view = QWidget()
+        # Mantém a referência da aba: sem ela o Qt destrói os labels do dashboard
+        view.dashboard_tab = create_dashboard_tab(view)
+        dashboard = DashboardController(self.model, view)
+        data = self.dataset.all_contracts()
+        self._bench("update_dashboard", lambda: dashboard.update_dashboard(data))
+        self.assertEqual(view.dashboard_widgets["value_label"]["total_contratos"].text(), str(len(data)))
+
+    def test_get_all_status_data(self):
+        exported = self.model.get_all_status_data()
+        self.assertGreater(len(exported), 0)
+        self._bench("get_all_status_data", self.model.get_all_status_data)
+
+    def test_import_statuses(self):
+        entries = self.dataset.status_entries()
+        # Datas posteriores às já gravadas forçam o caminho completo de atualização
+        for e in entries:
+            e["data_registro"] = "31/12/2099 23:59:59"
+        self._bench("import_statuses", lambda: self.model.import_statuses(entries), repeat=3)
+
+    def test_export_bi_data(self):
+        import Contratos.controller.exp_imp_table_controller as exp_module
+
+        class _Main:
+            pass
+
+        main = _Main()
+        main.model = self.model
+        main.view = None
+        main.get_current_data = lambda: []
+        main.get_loaded_uasgs = lambda: {}
+        ctrl = exp_module.ExpImpTableController(main)
+        out_file = str(self.tmp / "bi.xlsx")
+
+        with patch.object(exp_module.QFileDialog, "getSaveFileName", return_value=(out_file, "")), \
+             patch.object(exp_module.QMessageBox, "information"), \
+             patch.object(exp_module.QMessageBox, "warning"), \
+             patch.object(exp_module.QMessageBox, "critical") as critical:
+            self._bench("export_bi_data", ctrl.export_bi_data, repeat=3)
+            critical.assert_not_called()
+        self.assertTrue(os.path.exists(out_file))
+
+    def test_offline_sub_table_writer(self):
+        """Gravação dos sub-recursos do banco offline (empenhos + itens) com o SubTableWriter."""
+        import sqlite3
+        from types import SimpleNamespace
+        import Contratos.model.offline_db_model as offline_module
+
+        # Replica os empenhos/itens sintéticos até ~300 mil linhas (x SCALE), 100 contratos por checkpoint
+        modelos = {"empenhos": [], "itens": []}
+        for contrato in self.dataset.all_contracts()[:50]:
+            sub = self.dataset.sub_resources(contrato)
+            for table in modelos:
+                modelos[table].extend(sub[table])
+        linhas_por_tabela = int(150_000 * SCALE)
+        por_contrato = 50
+        lotes = []
+        for n in range(linhas_por_tabela // por_contrato):
+            for table, rows in modelos.items():
+                lote = [dict(rows[(n * por_contrato + k) % len(rows)], id=n * por_contrato + k)
+                        for k in range(por_contrato)]
+                lotes.append((table, str(n), lote))
+
+        db_path = str(self.tmp / "offline_writer.db")
+        with patch.object(offline_module, "UASGModel", return_value=SimpleNamespace(db_path=db_path)):
+            controller = offline_module.OfflineDBController()
+        controller._create_tables()
+
+        def gravar():
+            conn = sqlite3.connect(db_path)
+            conn.execute("DELETE FROM empenhos")
+            conn.execute("DELETE FROM itens")
+            conn.commit()
+            writer = offline_module.SubTableWriter(conn)
+            for i, (table, contrato_id, lote) in enumerate(lotes):
+                if i and i % (2 * offline_module.CHECKPOINT_CONTRATOS) == 0:
+                    writer.flush()
+                    conn.commit()
+                controller._save_sub_table_data(conn, table, contrato_id, lote, writer)
+            writer.flush()
+            conn.commit()
+            conn.close()
+            gravar.stats = writer.stats()
+
+        self._bench("offline_sub_table_writer", gravar, repeat=3)
+        print(f"💾 {gravar.stats['linhas']} linhas, {gravar.stats['linhas_por_segundo']} linhas/s")
+        self.assertEqual(gravar.stats["linhas"], 2 * (linhas_por_tabela // por_contrato) * por_contrato)
+
+    # ==================== ATAS ====================
+    def test_atas_get_all(self):
+        self.assertEqual(len(self.atas_model.get_all_atas()), self.meta["atas"])
+        # Mede a carga fria: o snapshot em cache é descartado antes de cada execução
+        self._bench("atas_get_all_atas", self.atas_model.get_all_atas,
+                    setup=lambda: self.atas_model.invalidate_cache() or ())
+
+    def test_atas_export(self):
+        ok, _ = self.atas_model.export_main_data_to_json()
+        self.assertTrue(ok)
+        self._bench("atas_export_main", self.atas_model.export_main_data_to_json)
+        self._bench("atas_export_complementary", self.atas_model.export_complementary_data_to_json)
+
+    def test_atas_import(self):
+        ok, msg = self.atas_model.import_main_data_from_json(str(self.json_paths["atas_principais"]))
+        self.assertTrue(ok, msg)
+        self._bench("atas_import_main",
+                    lambda: self.atas_model.import_main_data_from_json(str(self.json_paths["atas_principais"])),
+                    repeat=3)
+        self._bench("atas_import_complementary",
+                    lambda: self.atas_model.import_complementary_data_from_json(str(self.json_paths["atas_complementares"])),
+                    repeat=3)
+
+
+class TestSyntheticData(unittest.TestCase):
+    """Sanidade do gerador (roda sempre, com massa pequena)."""
+
+    def test_generator_is_deterministic_and_builds_databases(self):
+        import sqlite3
+        from Contratos.tests.synthetic_data import SyntheticDataset
+
+        a = SyntheticDataset(n_uasgs=2, contratos_por_uasg=5, n_atas=4, seed=7)
+        b = SyntheticDataset(n_uasgs=2, contratos_por_uasg=5, n_atas=4, seed=7)
+        self.assertEqual(a.all_contracts(), b.all_contracts())
+        self.assertEqual(a.status_entries(), b.status_entries())
+
+        tmp = Path(tempfile.mkdtemp(prefix="ca360_synth_"))
+        try:
+            db = a.build_contratos_db(tmp / "c.db")
+            atas_db = a.build_atas_db(tmp / "a.db")
+            with sqlite3.connect(db) as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM contratos").fetchone()[0], 10)
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM empenhos").fetchone()[0], 10 * a.empenhos_por_contrato)
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM status_contratos").fetchone()[0], len(a.status_entries()))
+            with sqlite3.connect(atas_db) as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM atas").fetchone()[0], 4)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+# tests/test_change_feed.py
+import unittest
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import importlib
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.model.models import Base
+from Contratos.model.change_feed_model import ChangeFeed, ChangeFeedClient, PAUSAR_SQL, RETOMAR_SQL
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class _AppSession:
+    """Leva as requisições do cliente direto para as rotas /api/sync/changes do app.py, contando as alterações."""
+
+    def __init__(self, app_module):
+        self.app_module = app_module
+        self.recebidas = 0
+        self.enviadas = 0
+
+    def get(self, url, params=None, timeout=None):
+        data = self.app_module.get_sync_changes(**params)
+        self.recebidas += len(data["changes"])
+        return _Response(data)
+
+    def post(self, url, json=None, timeout=None):
+        self.enviadas += len(json["changes"])
+        return _Response(self.app_module.post_sync_changes(self.app_module.ChangeFeedPush(**json)))
+
+
+def _create_db(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO contratos (id, uasg_code, numero) VALUES (?, '787010', ?)",
+                     [(str(i), f"{i:05d}/2024") for i in range(1, 4)])
+    conn.commit()
+    conn.close()
+
+
+class TestChangeFeed(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        sys.modules.pop("app", None)
+        cls.app_module = importlib.import_module("app")
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.modules.pop("app", None)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = {nome: os.path.join(self.tmp.name, f"{nome}.db") for nome in ("servidor", "a", "b")}
+        for path in self.paths.values():
+            _create_db(path)
+        self.feed_original = self.app_module.change_feed
+        self.app_module.change_feed = ChangeFeed(self.paths["servidor"])
+        self.session = _AppSession(self.app_module)
+
+    def tearDown(self):
+        self.app_module.change_feed = self.feed_original
+        self.tmp.cleanup()
+
+    def _client(self, nome, lote=500):
+        return ChangeFeedClient(ChangeFeed(self.paths[nome]), "http://servidor:8000/", session=self.session, lote=lote)
+
+    def _execute(self, nome, sql, params=()):
+        conn = sqlite3.connect(self.paths[nome])
+        try:
+            conn.execute(sql, params)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _query(self, nome, sql, params=()):
+        conn = sqlite3.connect(self.paths[nome])
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _set_status(self, nome, contrato_id, status):
+        self._execute(nome, "INSERT OR REPLACE INTO status_contratos (contrato_id, uasg_code, status) "
+                            "VALUES (?, '787010', ?)", (contrato_id, status))
+
+    def test_install_seeds_existing_rows_and_triggers_log_edits(self):
+        self._execute("a", "INSERT INTO status_contratos (contrato_id, status, data_registro) "
+                           "VALUES ('1', 'EM EXECUÇÃO', '05/03/2024 10:20:30')")
+        # Banco antigo: registro sem UUID
+        self._execute("a", "INSERT INTO registros_status (uuid, contrato_id, texto) VALUES ('', '1', 'antigo')")
+        feed = ChangeFeed(self.paths["a"])
+        feed.install()
+        feed.install()  # idempotente
+
+        pagina = feed.changes_since(0)
+        self.assertEqual(len(pagina["changes"]), 2)
+        status = next(c for c in pagina["changes"] if c["tabela"] == "status_contratos")
+        # data_registro é hora local; no change_log fica em UTC, como nos triggers
+        utc = datetime(2024, 3, 5, 10, 20, 30).astimezone(timezone.utc)
+        self.assertEqual(status["alterado_em"], utc.strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+        self.assertEqual(status["dados"]["status"], "EM EXECUÇÃO")
+        registro = next(c for c in pagina["changes"] if c["tabela"] == "registros_status")
+        self.assertEqual(len(registro["chave"]), 36)
+
+        self._set_status("a", "2", "SEÇÃO CONTRATOS")
+        self._execute("a", "UPDATE links_contratos SET link_ta = 'x' WHERE contrato_id = '3'")  # nada muda
+        self._execute("a", "DELETE FROM registros_status")
+        pagina = feed.changes_since(pagina["ultimo_seq"])
+        self.assertEqual([(c["tabela"], c["operacao"]) for c in pagina["changes"]],
+                         [("status_contratos", "upsert"), ("registros_status", "delete")])
+        self.assertEqual({c["origem"] for c in pagina["changes"]}, {feed.node_id})
+
+        # Alterações entre PAUSAR_SQL e RETOMAR_SQL (limpezas locais) não entram
+        conn = sqlite3.connect(self.paths["a"])
+        conn.execute(PAUSAR_SQL)
+        conn.execute("DELETE FROM status_contratos")
+        conn.execute(RETOMAR_SQL)
+        conn.commit()
+        conn.close()
+        self.assertEqual(feed.changes_since(pagina["ultimo_seq"])["changes"], [])
+
+    def test_two_machines_converge_with_last_writer_wins_and_uuid_merge(self):
+        a, b = self._client("a"), self._client("b")
+        self._set_status("a", "1", "EM EXECUÇÃO")
+        self._execute("a", "INSERT INTO registros_status (uuid, contrato_id, texto) VALUES ('u-a', '1', 'registro A')")
+        self._execute("a", "INSERT INTO links_contratos (contrato_id, link_contrato) VALUES ('1', 'http://a')")
+        a.feed.install()
+        b.feed.install()
+        a.sync()
+        b.sync()
+        a.sync()
+        self.assertEqual(self._query("b", "SELECT status FROM status_contratos WHERE contrato_id = '1'"),
+                         [("EM EXECUÇÃO",)])
+        self.assertEqual(self._query("b", "SELECT link_contrato FROM links_contratos"), [("http://a",)])
+
+        # Os dois editam o mesmo contrato; B edita depois e vence. Registros novos se somam.
+        self._set_status("a", "1", "ALERTA PRAZO")
+        time.sleep(0.01)
+        self._set_status("b", "1", "PORTARIA")
+        self._execute("b", "INSERT INTO registros_status (uuid, contrato_id, texto) VALUES ('u-b', '1', 'registro B')")
+        self._execute("a", "INSERT INTO registros_status (uuid, contrato_id, texto) VALUES ('u-a2', '1', 'registro A2')")
+        # B apaga o registro de A
+        self._execute("b", "DELETE FROM registros_status WHERE uuid = 'u-a'")
+        for _ in range(2):
+            a.sync()
+            b.sync()
+
+        for nome in ("a", "b", "servidor"):
+            self.assertEqual(self._query(nome, "SELECT status FROM status_contratos WHERE contrato_id = '1'"),
+                             [("PORTARIA",)], nome)
+            self.assertEqual(self._query(nome, "SELECT uuid FROM registros_status ORDER BY uuid"),
+                             [("u-a2",), ("u-b",)], nome)
+
+    def test_record_with_existing_text_is_reported_as_ignored(self):
+        a, b = self._client("a"), self._client("b")
+        self._execute("a", "INSERT INTO registros_status (uuid, contrato_id, texto) VALUES ('u-a', '1', 'mesmo texto')")
+        self._execute("b", "INSERT INTO registros_status (uuid, contrato_id, texto) VALUES ('u-b', '1', 'mesmo texto')")
+        a.sync()
+        stats = b.sync()
+        self.assertEqual((stats["aplicadas"], stats["ignoradas"]), (0, 1))
+        self.assertEqual(self._query("b", "SELECT uuid FROM registros_status"), [("u-b",)])
+
+    def test_sync_cost_follows_number_of_edits(self):
+        for i in range(1, 4):
+            self._set_status("a", str(i), "EM EXECUÇÃO")
+        a, b = self._client("a", lote=2), self._client("b", lote=2)
+        a.sync()
+        b.sync()
+        self.assertEqual(self._query("b", "SELECT COUNT(*) FROM status_contratos"), [(3,)])
+
+        # Nada mudou: nenhuma alteração trafega; as próprias alterações não voltam
+        self.session.recebidas = self.session.enviadas = 0
+        stats = a.sync()
+        self.assertEqual((stats["recebidas"], stats["enviadas"]), (0, 0))
+        b.sync()
+        self.assertEqual((self.session.recebidas, self.session.enviadas), (0, 0))
+
+        # Uma edição: uma alteração enviada e uma recebida
+        self._set_status("a", "2", "ENCERRADO")
+        a.sync()
+        stats = b.sync()
+        self.assertEqual((self.session.recebidas, self.session.enviadas), (1, 1))
+        self.assertEqual((stats["recebidas"], stats["aplicadas"]), (1, 1))
+        self.assertEqual(self._query("b", "SELECT status FROM status_contratos WHERE contrato_id = '2'"),
+                         [("ENCERRADO",)])
+
+    def test_server_rejects_changes_from_another_origin(self):
+        with self.assertRaises(self.app_module.HTTPException) as ctx:
+            self.app_module.post_sync_changes(self.app_module.ChangeFeedPush(
+                origem="a", changes=[{"tabela": "status_contratos", "chave": "1", "origem": "b"}]))
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
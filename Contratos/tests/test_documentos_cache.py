@@ -0,0 +1,168 @@
+# tests/test_documentos_cache.py
+import unittest
+import os
+import sys
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.model.documentos_cache_model import DocumentCache, SELECAO_UASG, SELECAO_STATUS
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+
+class _StaticHandler(SimpleHTTPRequestHandler):
+    """Servidor estático com suporte opcional a 'Range' (retomada de downloads)."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        range_header = self.headers.get("Range")
+        if not (self.server.accept_ranges and range_header):
+            return super().do_GET()
+        path = self.translate_path(self.path)
+        with open(path, "rb") as f:
+            content = f.read()
+        start = int(range_header.split("=")[1].split("-")[0])
+        if start >= len(content):
+            self.send_response(416)
+            self.end_headers()
+            return
+        self.send_response(206)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        self.send_header("Content-Length", str(len(content) - start))
+        self.end_headers()
+        self.wfile.write(content[start:])
+
+
+class TestDocumentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = self.tmp.name
+        self.www = os.path.join(base, "www")
+        os.makedirs(self.www)
+        self.files = {
+            "contrato_a.pdf": b"%PDF-1.4 contrato A " * 5000,
+            "copia_de_a.pdf": b"%PDF-1.4 contrato A " * 5000,  # mesmo conteúdo, outra URL
+            "termo_b.pdf": b"%PDF-1.4 termo aditivo B " * 3000,
+        }
+        for name, content in self.files.items():
+            with open(os.path.join(self.www, name), "wb") as f:
+                f.write(content)
+
+        handler = functools.partial(_StaticHandler, directory=self.www)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.requests = []
+        self.server.accept_ranges = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.db_path = os.path.join(base, "db", "gerenciador_uasg.db")
+        os.makedirs(os.path.dirname(self.db_path))
+        self.cache = DocumentCache(self.db_path, max_workers=3)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _doc(self, name, contrato_id="1"):
+        return {"url": f"{self.base_url}/{name}", "contrato_id": contrato_id, "tipo": "Contrato", "descricao": name}
+
+    def test_download_all_dedupes_by_content(self):
+        docs = [self._doc(name, str(i)) for i, name in enumerate(self.files)]
+        stats = self.cache.download_all(docs)
+        self.assertEqual((stats["baixados"], stats["erros"], stats["em_cache"]), (3, 0, 0))
+
+        # Três URLs, dois arquivos distintos no repositório (ao lado do banco)
+        self.assertEqual(self.cache.store_dir, os.path.join(os.path.dirname(self.db_path), "documentos"))
+        objetos = [f for _, _, files in os.walk(self.cache.objects_dir) for f in files]
+        self.assertEqual(len(objetos), 2)
+        info = self.cache.stats()
+        self.assertEqual((info["urls"], info["arquivos"]), (3, 2))
+
+        for name, content in self.files.items():
+            path = self.cache.local_path(f"{self.base_url}/{name}")
+            self.assertTrue(path.endswith(".pdf"))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+        self.assertEqual(list(self.cache.local_paths_for_contract("2")), [f"{self.base_url}/termo_b.pdf"])
+
+        # Segunda passada: tudo vem da cópia local, sem novas requisições
+        self.server.requests.clear()
+        stats = self.cache.download_all(docs)
+        self.assertEqual(stats["em_cache"], 3)
+        self.assertEqual(self.server.requests, [])
+
+    def test_resumes_partial_download(self):
+        doc = self._doc("contrato_a.pdf")
+        content = self.files["contrato_a.pdf"]
+        os.makedirs(self.cache.partial_dir)
+        with open(self.cache._partial_path(doc["url"]), "wb") as f:
+            f.write(content[:40000])
+
+        result = self.cache.download(doc)
+        self.assertEqual(result["status"], "baixado")
+        self.assertEqual(self.server.requests, [("/contrato_a.pdf", "bytes=40000-")])
+        self.assertEqual(result["bytes"], len(content) - 40000)
+        self.assertEqual(result["sha256"], hashlib.sha256(content).hexdigest())
+        self.assertEqual(os.listdir(self.cache.partial_dir), [])
+
+    def test_restarts_when_server_ignores_range(self):
+        self.server.accept_ranges = False
+        doc = self._doc("termo_b.pdf")
+        os.makedirs(self.cache.partial_dir)
+        with open(self.cache._partial_path(doc["url"]), "wb") as f:
+            f.write(b"lixo de uma tentativa anterior")
+
+        result = self.cache.download(doc)
+        with open(result["caminho"], "rb") as f:
+            self.assertEqual(f.read(), self.files["termo_b.pdf"])
+
+    def test_errors_are_reported_and_not_recorded(self):
+        stats = self.cache.download_all([self._doc("inexistente.pdf")])
+        self.assertEqual(stats["erros"], 1)
+        self.assertIn("404", stats["falhas"][0])
+        self.assertEqual(self.cache.stats()["urls"], 0)
+
+    def test_selects_contracts_and_collects_links(self):
+        dataset = SyntheticDataset(n_uasgs=2, contratos_por_uasg=3, seed=5)
+        dataset.build_contratos_db(self.db_path)
+        cache = DocumentCache(self.db_path)
+        uasg = dataset.uasg_codes()[0]
+        ids = cache.select_contracts(SELECAO_UASG, uasg)
+        self.assertEqual(sorted(ids), sorted(c["id"] for c in dataset.contracts_by_uasg()[uasg]))
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO status_contratos (contrato_id, status) VALUES (?, 'PRORROGADO')", (ids[0],))
+        conn.commit()
+        conn.close()
+        self.assertEqual(cache.select_contracts(SELECAO_STATUS, "PRORROGADO"), [ids[0]])
+
+        def fetch_arquivos(contrato_id):
+            if contrato_id == ids[2]:
+                return None, "Erro na API: Status 500"
+            return [
+                {"tipo": "Contrato", "path_arquivo": f"{self.base_url}/contrato_a.pdf"},
+                {"tipo": "Termo Aditivo", "path_arquivo": f"{self.base_url}/{contrato_id}.pdf"},
+                {"tipo": "Outro", "path_arquivo": ""},
+            ], None
+
+        documentos, erros = cache.collect_documents(ids, fetch_arquivos)
+        self.assertEqual([d["url"] for d in documentos], [
+            f"{self.base_url}/contrato_a.pdf", f"{self.base_url}/{ids[0]}.pdf", f"{self.base_url}/{ids[1]}.pdf",
+        ])
+        self.assertEqual(erros, [f"{ids[2]}: Erro na API: Status 500"])
+
+
+if __name__ == "__main__":
+    unittest.main()
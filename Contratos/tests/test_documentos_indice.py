@@ -0,0 +1,131 @@
+# tests/test_documentos_indice.py
+import unittest
+import os
+import sys
+import hashlib
+import sqlite3
+import tempfile
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from docx import Document
+
+from Contratos.model.documentos_cache_model import DocumentCache
+from Contratos.model.documentos_indice_model import DocumentIndex, build_fts_query, PARALLEL_THRESHOLD
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+
+class TestDocumentIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "gerenciador_uasg.db")
+        self.dataset = SyntheticDataset(n_uasgs=1, contratos_por_uasg=4, seed=3)
+        self.dataset.build_contratos_db(self.db_path)
+        self.ids = [c["id"] for c in self.dataset.all_contracts()]
+        self.cache = DocumentCache(self.db_path)
+        self.index = DocumentIndex(self.cache, workers=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _store(self, url, contrato_id, content, ext):
+        """Grava um arquivo na cópia local como se tivesse sido baixado."""
+        sha256 = hashlib.sha256(content).hexdigest()
+        relative = os.path.join("objetos", sha256[:2], sha256 + ext)
+        path = os.path.join(self.cache.store_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        self.cache._record({"url": url, "contrato_id": contrato_id}, sha256, len(content), None, relative)
+
+    def _docx_bytes(self, *paragraphs):
+        path = os.path.join(self.tmp.name, "tmp.docx")
+        document = Document()
+        for text in paragraphs:
+            document.add_paragraph(text)
+        table = document.add_table(rows=1, cols=2)
+        table.rows[0].cells[0].text = "Cláusula de reajuste"
+        table.rows[0].cells[1].text = "IPCA"
+        document.save(path)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_search_ranks_contracts_by_hits(self):
+        a, b, c = self.ids[:3]
+        self._store("http://x/a.txt", a, "Reajuste anual pelo IPCA. O reajuste será aplicado.".encode(), ".txt")
+        self._store("http://x/b.docx", b, self._docx_bytes("Prestação de serviço de manutenção predial."), ".docx")
+        self._store("http://x/c.html", c, "<p>Garantia contratual de 5%</p>".encode("latin-1"), ".html")
+
+        stats = self.index.index_pending()
+        self.assertEqual((stats["documentos"], stats["erros"]), (3, []))
+
+        results = self.index.search("reajuste")
+        self.assertEqual([r["contrato_id"] for r in results], [a, b])
+        self.assertEqual(results[0]["ocorrencias"], 2)
+        self.assertIn("[Reajuste]", results[0]["trecho"])
+        numero = next(x["numero"] for x in self.dataset.all_contracts() if x["id"] == a)
+        self.assertEqual(results[0]["numero"], numero)
+
+        # Sem acento e por prefixo; tags HTML não entram no texto
+        self.assertEqual([r["contrato_id"] for r in self.index.search("prestacao manut*")], [b])
+        self.assertEqual([r["contrato_id"] for r in self.index.search('"garantia contratual"')], [c])
+        self.assertEqual(self.index.search("p"), [])
+
+    def test_incremental_skips_unchanged_and_reindexes_changes(self):
+        a, b = self.ids[:2]
+        self._store("http://x/a.txt", a, b"texto original do contrato", ".txt")
+        self._store("http://x/copia.txt", b, b"texto original do contrato", ".txt")
+        self.assertEqual(self.index.index_pending()["arquivos"], 1)  # mesmo conteúdo, uma extração
+        self.assertEqual(self.index.index_pending()["documentos"], 0)
+        self.assertEqual(len(self.index.search("original")), 2)
+
+        # Arquivo novo para a mesma URL (outro hash): só ele é reindexado
+        self._store("http://x/a.txt", a, b"texto revisado do contrato", ".txt")
+        stats = self.index.index_pending()
+        self.assertEqual(stats["documentos"], 1)
+        self.assertEqual([r["contrato_id"] for r in self.index.search("original")], [b])
+        self.assertEqual([r["contrato_id"] for r in self.index.search("revisado")], [a])
+        self.assertEqual(self.index.stats(), {"indexados": 2, "com_erro": 0, "pendentes": 0})
+
+    def test_large_batches_use_process_pool(self):
+        for i in range(PARALLEL_THRESHOLD + 2):
+            self._store(f"http://x/{i}.txt", self.ids[i % 4], f"documento {i} item{i}".encode(), ".txt")
+        progress = []
+        stats = self.index.index_pending(progress_callback=lambda done, total: progress.append((done, total)))
+        self.assertEqual(stats["documentos"], PARALLEL_THRESHOLD + 2)
+        self.assertEqual(progress[-1], (PARALLEL_THRESHOLD + 2, PARALLEL_THRESHOLD + 2))
+        self.assertEqual(len(self.index.search("item3")), 1)
+
+    def test_cancel_stops_pool_and_keeps_what_was_indexed(self):
+        total = PARALLEL_THRESHOLD + 2
+        for i in range(total):
+            self._store(f"http://x/{i}.txt", self.ids[i % 4], f"documento {i} item{i}".encode(), ".txt")
+        progress = []
+        stats = self.index.index_pending(progress_callback=lambda done, _total: progress.append(done),
+                                         should_cancel=lambda: len(progress) >= 2)
+        self.assertEqual(stats["documentos"], 2)
+        self.assertEqual(self.index.stats()["pendentes"], total - 2)
+
+    def test_unreadable_files_are_recorded_and_not_retried(self):
+        self._store("http://x/quebrado.docx", self.ids[0], b"isto nao e um docx", ".docx")
+        stats = self.index.index_pending()
+        self.assertEqual(len(stats["erros"]), 1)
+        self.assertEqual(self.index.stats()["com_erro"], 1)
+        self.assertEqual(self.index.index_pending()["documentos"], 0)
+
+    def test_build_fts_query_is_safe(self):
+        self.assertEqual(build_fts_query('reajuste "valor global" manut*'), '"reajuste" "valor global" "manut"*')
+        self.assertEqual(build_fts_query('  '), '')
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for text in ('AND OR NOT', 'a"b', 'NEAR(', '*', 'col:valor', '(x'):
+                query = build_fts_query(text)
+                if query:
+                    conn.execute("SELECT * FROM documentos_fts WHERE documentos_fts MATCH ?", (query,)).fetchall()
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_docx_engine.py
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import docx
+
+from utils.docx_engine import (DOCUMENT_TEMPLATES, generate_documents, load_docx_template, output_file_name,
+                               template_path, valor_por_extenso)
+from Contratos.model.documentos_model import contrato_document_jobs
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+
+def _document_text(path):
+    document = docx.Document(path)
+    texts = [p.text for p in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            texts.extend(cell.text for cell in row.cells)
+    return "\n".join(texts)
+
+
+class TestDocxEngine(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dataset = SyntheticDataset(n_uasgs=1, contratos_por_uasg=40, seed=3)
+        cls.db_path = cls.dataset.build_contratos_db(Path(cls.tmp.name) / "gerenciador_uasg.db",
+                                                     with_sub_resources=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_templates_are_compiled_once_with_split_placeholders_merged(self):
+        for key in DOCUMENT_TEMPLATES:
+            compiled = load_docx_template(template_path(key))
+            self.assertIs(load_docx_template(template_path(key)), compiled)
+            self.assertTrue(compiled.variables, key)
+            self.assertTrue(all("<" not in name for name in compiled.variables), key)
+        self.assertIn("valor_total_extenso", load_docx_template(template_path("cp_encaminhamento_agu")).variables)
+
+    def test_single_contract_document(self):
+        contrato = self.dataset.all_contracts()[0]
+        jobs = contrato_document_jobs(self.db_path, [contrato])
+        out_dir = os.path.join(self.tmp.name, "unico")
+        success, _, stats = generate_documents("cp_encaminhamento_agu", jobs, out_dir, workers=1)
+        self.assertTrue(success)
+
+        esperado = output_file_name("cp_encaminhamento_agu", jobs[0][0])
+        self.assertEqual(stats["arquivos"], [os.path.join(out_dir, esperado)])
+        texto = _document_text(stats["arquivos"][0])
+        self.assertIn(contrato["processo"], texto)
+        self.assertIn(valor_por_extenso(contrato["valor_global"]), texto)
+        self.assertNotIn("{{nup}}", texto)
+        # Campos sem origem nos dados ficam visíveis para preenchimento manual
+        self.assertEqual(stats["variaveis_sem_valor"], ["numero_cp"])
+
+    def test_bulk_generation_in_process_pool(self):
+        contratos = self.dataset.all_contracts()
+        jobs = contrato_document_jobs(self.db_path, contratos)
+        out_dir = os.path.join(self.tmp.name, "lote")
+        success, _, stats = generate_documents("nota_tecnica", jobs, out_dir, workers=2)
+        self.assertTrue(success)
+        self.assertEqual(stats["total"], len(contratos))
+        self.assertGreater(stats["por_segundo"], 0)
+        self.assertEqual(sorted(os.listdir(out_dir)),
+                         sorted(output_file_name("nota_tecnica", key) for key, _ in jobs))
+        ultimo = contratos[-1]
+        self.assertIn(ultimo["processo"], _document_text(stats["arquivos"][-1]))
+
+    def test_valor_por_extenso(self):
+        self.assertEqual(valor_por_extenso("1.234,50"), "mil, duzentos e trinta e quatro reais e cinquenta centavos")
+        self.assertEqual(valor_por_extenso(2_000_000), "dois milhões de reais")
+        self.assertEqual(valor_por_extenso("R$ 101,01"), "cento e um reais e um centavo")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+# tests/test_email_outbox.py
+import unittest
+import os
+import sys
+import email
+import email.header
+import socket
+import tempfile
+import time
+import threading
+import socketserver
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.email_outbox import EmailOutbox, SMTPSession, compose_message_file, split_file
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo (no estilo do aiosmtpd) que guarda as mensagens recebidas."""
+
+    def _reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self._reply("220 localhost ESMTP teste")
+        mail_from, rcpts = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 localhost")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "RSET":
+                mail_from, rcpts = None, []
+                self._reply("250 OK")
+            elif verb == "MAIL":
+                mail_from = command[10:]
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpts.append(command[8:].strip("<>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                if server.fail_next > 0:
+                    server.fail_next -= 1
+                    self._reply("451 Tente novamente mais tarde")
+                    continue
+                self._reply("354 Fim com <CRLF>.<CRLF>")
+                data = bytearray()
+                while True:
+                    line = self.rfile.readline()
+                    if line == b".\r\n":
+                        break
+                    data += line[1:] if line.startswith(b"..") else line
+                server.messages.append((mail_from, rcpts, bytes(data)))
+                mail_from, rcpts = None, []
+                self._reply("250 Mensagem aceita")
+            elif verb == "QUIT":
+                self._reply("221 Tchau")
+                return
+            else:
+                self._reply("502 Comando não implementado")
+
+
+class _StandInSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.fail_next = 0
+
+
+class TestEmailOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.server = _StandInSMTPServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.session = SMTPSession("127.0.0.1", self.server.server_address[1], starttls=False, timeout=5)
+        self.now = 1_000_000.0
+        self.outbox = EmailOutbox(os.path.join(self.tmp.name, "outbox"), self.session, "ca360@teste.mil.br",
+                                  base_delay=30, max_delay=600, max_attempts=3, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _file(self, name, size):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        return path
+
+    def test_reuses_session_and_streams_attachments(self):
+        anexo = self._file("relatorio.xlsx", 300_000)
+        for n in range(3):
+            self.outbox.enqueue("destino@teste.mil.br", f"Relatório {n}", "Segue em anexo.", anexo)
+        sent, failed = self.outbox.drain()
+
+        self.assertEqual((len(sent), failed), (3, []))
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.outbox.pending_jobs(), [])
+        # O arquivo original continua no lugar; as cópias da fila foram removidas
+        self.assertTrue(os.path.exists(anexo))
+        self.assertEqual(os.listdir(os.path.join(self.outbox.directory, "anexos")), [])
+
+        mail_from, rcpts, data = self.server.messages[0]
+        self.assertEqual((mail_from, rcpts), ("<ca360@teste.mil.br>", ["destino@teste.mil.br"]))
+        message = email.message_from_bytes(data)
+        subject = str(email.header.make_header(email.header.decode_header(message["Subject"])))
+        self.assertEqual(subject, "Relatório 0")
+        parts = [p for p in message.walk() if p.get_filename()]
+        self.assertEqual(parts[0].get_filename(), "relatorio.xlsx")
+        with open(anexo, "rb") as f:
+            self.assertEqual(parts[0].get_payload(decode=True), f.read())
+
+    def test_queue_survives_failures_with_backoff(self):
+        self.server.fail_next = 2
+        self.outbox.enqueue("destino@teste.mil.br", "Backup", "Corpo")
+
+        self.assertEqual(self.outbox.drain(), ([], []))
+        job = self.outbox.pending_jobs()[0]
+        self.assertEqual((job["attempts"], job["next_attempt"]), (1, self.now + 30))
+
+        # Antes do prazo nada é reenviado; a fila é relida do disco por uma nova instância
+        outbox = EmailOutbox(self.outbox.directory, self.session, "ca360@teste.mil.br",
+                             base_delay=30, max_delay=600, clock=lambda: self.now)
+        self.assertEqual(outbox.drain(), ([], []))
+        self.assertAlmostEqual(outbox.next_due_in(), 30)
+
+        self.now += 30
+        outbox.drain()
+        self.assertEqual(outbox.pending_jobs()[0]["next_attempt"], self.now + 60)
+        self.now += 60
+        sent, _ = outbox.drain()
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(len(self.server.messages), 1)
+
+    def test_reconnects_when_server_drops_session(self):
+        self.outbox.enqueue("destino@teste.mil.br", "Um", "Corpo")
+        self.outbox.drain()
+        # Simula o servidor derrubando a conexão ociosa
+        self.session._server.sock.shutdown(socket.SHUT_RDWR)
+        self.outbox.enqueue("destino@teste.mil.br", "Dois", "Corpo")
+        sent, _ = self.outbox.drain()
+        self.assertEqual([job["subject"] for job in sent], ["Dois"])
+        self.assertEqual(self.session.connections_opened, 2)
+
+    def test_large_attachment_is_split_into_parts(self):
+        backup = self._file("Backup_CA360.zip", 250_000)
+        ids = self.outbox.enqueue("destino@teste.mil.br", "Backup CA 360", "Backup", backup,
+                                  move_attachment=True, max_attachment_bytes=100_000)
+        self.assertEqual(len(ids), 3)
+        self.assertFalse(os.path.exists(backup))
+
+        sent, _ = self.outbox.drain()
+        self.assertEqual([job["subject"] for job in sent],
+                         [f"Backup CA 360 (parte {n}/3)" for n in (1, 2, 3)])
+        received = b""
+        for _, _, data in self.server.messages:
+            part = [p for p in email.message_from_bytes(data).walk() if p.get_filename()][0]
+            received += part.get_payload(decode=True)
+        self.assertEqual(len(received), 250_000)
+
+    def test_enqueue_does_not_wait_for_smtp_round(self):
+        self.outbox.enqueue("destino@teste.mil.br", "Lento", "Corpo")
+        enviando, liberar = threading.Event(), threading.Event()
+        send_file = self.session.send_file
+
+        def send_file_lento(*args):
+            enviando.set()
+            liberar.wait(5)
+            return send_file(*args)
+
+        self.session.send_file = send_file_lento
+        resultado = []
+        drain = threading.Thread(target=lambda: resultado.append(self.outbox.drain()))
+        drain.start()
+        self.assertTrue(enviando.wait(5))
+        # Com o envio em andamento, enfileirar (thread da interface) é imediato
+        inicio = time.monotonic()
+        self.outbox.enqueue("destino@teste.mil.br", "Novo", "Corpo")
+        self.assertLess(time.monotonic() - inicio, 1)
+        liberar.set()
+        drain.join(5)
+        self.assertEqual([job["subject"] for job in resultado[0][0]], ["Lento"])
+        self.assertEqual([job["subject"] for job in self.outbox.pending_jobs()], ["Novo"])
+
+    def test_missing_attachment_fails_only_that_message(self):
+        self.outbox.enqueue("destino@teste.mil.br", "Sem anexo", "Corpo", self._file("a.pdf", 1_000))
+        self.outbox.enqueue("destino@teste.mil.br", "Depois", "Corpo")
+        anexo = self.outbox.pending_jobs()[0]["attachments"][0]
+        os.remove(anexo)
+
+        sent, failed = self.outbox.drain()
+        self.assertEqual([job["subject"] for job in sent], ["Depois"])
+        self.assertEqual([job["subject"] for job in failed], ["Sem anexo"])
+        self.assertIn("Anexo não encontrado", self.outbox.failed_jobs()[0]["last_error"])
+        self.assertEqual(self.outbox.pending_jobs(), [])
+
+    def test_outbox_is_per_machine(self):
+        from Contratos.controller import email_controller
+
+        local = os.path.join(self.tmp.name, "local")
+        with patch.dict(os.environ, {"LOCALAPPDATA": local}):
+            self.assertEqual(email_controller.get_outbox_dir(), Path(local) / "CA360" / "outbox")
+
+    def test_compose_and_split_helpers(self):
+        source = self._file("dados.bin", 10_000)
+        parts = split_file(source, 4_000, os.path.join(self.tmp.name, "partes"))
+        self.assertEqual([os.path.basename(p) for p in parts], ["dados.bin.001", "dados.bin.002", "dados.bin.003"])
+        self.assertEqual([os.path.getsize(p) for p in parts], [4_000, 4_000, 2_000])
+
+        eml = os.path.join(self.tmp.name, "msg.eml")
+        compose_message_file(eml, "a@b.c", ["d@e.f"], "Assunto com acentuação", ".linha com ponto\n", [source])
+        with open(eml, "rb") as f:
+            message = email.message_from_binary_file(f)
+        self.assertIn("acentua", str(email.header.make_header(email.header.decode_header(message["Subject"]))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# tests/test_empenhos_relatorio.py
+import unittest
+import os
+import sys
+import random
+import tempfile
+from datetime import date, datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from openpyxl import load_workbook
+
+from Contratos.model.empenhos_relatorio_model import (
+    PeriodMatcher, assign_empenhos, build_periods, iter_uasg_financials, parse_br_float,
+    write_uasg_financial_workbook,
+)
+from Contratos.tests.synthetic_data import SyntheticDataset, _br_money
+
+
+def _reference(historico, empenhos):
+    """Regra original (laço aninhado) usada como referência."""
+    to_float = lambda v: float(v.replace('.', '').replace(',', '.')) if isinstance(v, str) else 0.0
+    periodos = []
+    for item in sorted(historico, key=lambda x: x['vigencia_inicio']):
+        if item.get("codigo_tipo") in ["50", "55"]:
+            periodos.append({
+                "inicio": datetime.strptime(item['vigencia_inicio'], "%Y-%m-%d").date(),
+                "fim": datetime.strptime(item['vigencia_fim'], "%Y-%m-%d").date(),
+                "empenhos": [],
+            })
+    for empenho in empenhos:
+        data = datetime.strptime(empenho['data_emissao'], "%Y-%m-%d").date()
+        for periodo in periodos:
+            if periodo['inicio'] <= data <= periodo['fim']:
+                periodo['empenhos'].append(empenho)
+                break
+    return [(sum(to_float(e['empenhado']) for e in p['empenhos']),
+             sum(to_float(e['pago']) for e in p['empenhos']),
+             [e['numero'] for e in p['empenhos']]) for p in periodos]
+
+
+class TestEmpenhosRelatorio(unittest.TestCase):
+
+    def test_parse_br_float(self):
+        self.assertEqual(parse_br_float("1.234.567,89"), 1234567.89)
+        self.assertEqual(parse_br_float("R$ 10,50"), 10.5)
+        self.assertEqual(parse_br_float(12), 12.0)
+        self.assertEqual(parse_br_float(None), 0.0)
+        self.assertEqual(parse_br_float(""), 0.0)
+        self.assertEqual(parse_br_float("n/d"), 0.0)
+
+    def test_matcher_agrees_with_nested_loop_including_overlaps(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            base = date(2020, 1, 1)
+            historico = []
+            for i in range(rng.randint(0, 5)):
+                inicio = base + timedelta(days=rng.randint(0, 1500))
+                historico.append({
+                    "codigo_tipo": rng.choice(["50", "55", "60"]), "tipo": "Termo", "numero": str(i),
+                    "vigencia_inicio": inicio.isoformat(),
+                    "vigencia_fim": (inicio + timedelta(days=rng.randint(0, 500))).isoformat(),
+                    "valor_global": _br_money(rng.uniform(100, 10000)),
+                })
+            empenhos = [{
+                "numero": f"NE{j}",
+                "data_emissao": (base + timedelta(days=rng.randint(-30, 2100))).isoformat(),
+                "empenhado": _br_money(rng.uniform(1, 5000)),
+                "pago": _br_money(rng.uniform(1, 5000)),
+            } for j in range(rng.randint(0, 30))]
+
+            report = assign_empenhos(historico, empenhos)
+            got = [(p["total_empenhado"], p["total_pago"], [e["numero"] for e in p["empenhos_detalhados"]])
+                   for p in report]
+            expected = _reference(historico, empenhos)
+            self.assertEqual(len(got), len(expected))
+            for g, e in zip(got, expected):
+                self.assertAlmostEqual(g[0], e[0], places=6)
+                self.assertAlmostEqual(g[1], e[1], places=6)
+                self.assertEqual(g[2], e[2])
+
+    def test_matcher_boundaries(self):
+        periodos = build_periods([
+            {"codigo_tipo": "50", "tipo": "Contrato", "numero": "1",
+             "vigencia_inicio": "2024-01-01", "vigencia_fim": "2024-12-31"},
+            {"codigo_tipo": "55", "tipo": "Termo Aditivo", "numero": "1",
+             "vigencia_inicio": "2025-02-01", "vigencia_fim": "2025-12-31"},
+        ])
+        matcher = PeriodMatcher(periodos)
+        self.assertIsNone(matcher.find(date(2023, 12, 31)))
+        self.assertEqual(matcher.find(date(2024, 1, 1)), 0)
+        self.assertEqual(matcher.find(date(2024, 12, 31)), 0)
+        self.assertIsNone(matcher.find(date(2025, 1, 15)))  # intervalo sem vigência
+        self.assertEqual(matcher.find(date(2025, 12, 31)), 1)
+        self.assertIsNone(matcher.find(date(2026, 1, 1)))
+        self.assertIsNone(matcher.find(None))
+
+    def test_batch_report_for_uasg(self):
+        dataset = SyntheticDataset(n_uasgs=2, contratos_por_uasg=25, seed=11)
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = dataset.build_contratos_db(os.path.join(tmp, "gerenciador_uasg.db"))
+            uasg = dataset.uasg_codes()[1]
+            contratos = list(iter_uasg_financials(db_path, uasg))
+
+            esperados = dataset.contracts_by_uasg()[uasg]
+            self.assertEqual(sorted(c["contrato_id"] for c in contratos), sorted(c["id"] for c in esperados))
+            for contrato in contratos:
+                original = next(c for c in esperados if c["id"] == contrato["contrato_id"])
+                sub = dataset.sub_resources(original)
+                expected = _reference(sub["historico"], sub["empenhos"])
+                self.assertAlmostEqual(contrato["total_pago"], sum(e[1] for e in expected), places=4)
+                self.assertEqual(contrato["excede_valor_global"],
+                                 contrato["total_pago"] > parse_br_float(original["valor_global"]))
+
+            # Força um contrato com pagamentos acima do valor global
+            contratos[0]["total_pago"] = contratos[0]["valor_global"] + 1
+            contratos[0]["excede_valor_global"] = True
+            out = os.path.join(tmp, "financeiro.xlsx")
+            stats = write_uasg_financial_workbook(out, uasg, contratos)
+            self.assertEqual(stats["contratos"], 25)
+            self.assertGreaterEqual(stats["excedentes"], 1)
+
+            workbook = load_workbook(out, read_only=True)
+            resumo = list(workbook[f"Resumo UASG {uasg}"].values)
+            self.assertEqual(resumo[0][-1], "Pago > Valor Global")
+            self.assertEqual(len(resumo), 26)
+            self.assertEqual(resumo[1][-1], "Sim")
+            periodos = list(workbook["Períodos"].values)
+            self.assertEqual(len(periodos) - 1, sum(len(c["periodos"]) for c in contratos))
+            workbook.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+# tests/test_espelho.py
+import unittest
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+import importlib
+import http.server
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.model.espelho_model import MirrorCache, MirrorClient, LIMPAR_APOS_VALIDADES, TIMEOUT_COMPRASNET
+
+
+class _FakeUpstream:
+    """Comprasnet falso em http://127.0.0.1:<porta>/api, com atraso e contagem por caminho."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.respostas = {}
+        self.chamadas = Counter()
+        self.fora_do_ar = False
+        fake = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.chamadas[self.path] += 1
+                time.sleep(fake.delay)
+                corpo = fake.respostas.get(self.path)
+                if fake.fora_do_ar or corpo is None:
+                    self.send_response(503 if fake.fora_do_ar else 404)
+                    self.end_headers()
+                    return
+                conteudo = json.dumps(corpo).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(conteudo)))
+                self.end_headers()
+                self.wfile.write(conteudo)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _FakeRequest:
+    def __init__(self, headers=None):
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+
+
+class _RecordingSession:
+    """requests com registro dos status recebidos (para ver os 304)."""
+
+    def __init__(self):
+        self.status = []
+
+    def get(self, url, **kwargs):
+        response = requests.get(url, **kwargs)
+        self.status.append(response.status_code)
+        return response
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestMirrorCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "gerenciador_uasg.db")
+        self.upstream = _FakeUpstream()
+        self.upstream.respostas["/api/contrato/ug/787010"] = [{"id": 1, "numero": "00001/2024"}]
+        self.upstream.respostas["/api/contrato/1/empenhos"] = [{"id": 10, "empenhado": "100,00"}]
+        self.agora = 1_000_000.0
+
+    def tearDown(self):
+        self.upstream.close()
+        self.tmp.cleanup()
+
+    def _mirror(self, **kwargs):
+        return MirrorCache(self.db_path, base_url=self.upstream.base_url, clock=lambda: self.agora, **kwargs)
+
+    def test_concurrent_clients_share_one_upstream_fetch(self):
+        self.upstream.delay = 0.3
+        mirror = self._mirror()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            entradas = list(executor.map(lambda _: mirror.get("contrato/ug/787010"), range(8)))
+        self.assertEqual(self.upstream.chamadas["/api/contrato/ug/787010"], 1)
+        self.assertEqual(len({e.etag for e in entradas}), 1)
+        self.assertEqual(json.loads(entradas[0].corpo), [{"id": 1, "numero": "00001/2024"}])
+        stats = mirror.stats()
+        self.assertEqual((stats["upstream"], stats["agrupadas"], stats["copias"]), (1, 7, 1))
+
+    def test_serves_cache_then_stale_copy_when_upstream_fails(self):
+        mirror = self._mirror(validade_segundos=60)
+        self.assertEqual(mirror.get("contrato/1/empenhos").origem, "upstream")
+        self.assertEqual(mirror.get("contrato/1/empenhos").origem, "cache")
+        self.assertEqual(self.upstream.chamadas["/api/contrato/1/empenhos"], 1)
+
+        self.agora += 120
+        self.upstream.fora_do_ar = True
+        entrada = mirror.get("contrato/1/empenhos")
+        self.assertEqual(entrada.origem, "vencido")
+        self.assertEqual(json.loads(entrada.corpo), [{"id": 10, "empenhado": "100,00"}])
+        # Sem cópia nenhuma, a falha chega ao cliente
+        with self.assertRaises(requests.RequestException):
+            mirror.get("contrato/ug/787010")
+        with self.assertRaises(ValueError):
+            mirror.get("contrato/1/../../outra-api")
+        # Só os sub-recursos conhecidos do contrato são repassados (e guardados)
+        with self.assertRaises(ValueError):
+            mirror.get("contrato/1/qualquer_coisa")
+
+    def test_refresh_stale_updates_expired_copies(self):
+        mirror = self._mirror(validade_segundos=60)
+        mirror.get("contrato/ug/787010")
+        mirror.get("contrato/1/empenhos")
+        self.assertEqual(mirror.refresh_stale(), {"atualizados": 0, "erros": 0, "removidos": 0})
+
+        self.agora += 120
+        self.upstream.respostas["/api/contrato/1/empenhos"] = []
+        self.assertEqual(mirror.refresh_stale(), {"atualizados": 2, "erros": 0, "removidos": 0})
+        entrada = mirror.get("contrato/1/empenhos")
+        self.assertEqual((entrada.origem, json.loads(entrada.corpo)), ("cache", []))
+
+        # Comprasnet fora do ar por muito tempo: as cópias que não se renovam acabam apagadas
+        self.upstream.fora_do_ar = True
+        self.agora += 120
+        self.assertEqual(mirror.refresh_stale(), {"atualizados": 0, "erros": 2, "removidos": 0})
+        self.agora += LIMPAR_APOS_VALIDADES * 60
+        self.assertEqual(mirror.refresh_stale(), {"atualizados": 0, "erros": 0, "removidos": 2})
+        self.assertEqual(mirror.stats()["copias"], 0)
+
+
+class TestMirrorEndpointsAndClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        sys.modules.pop("app", None)
+        cls.app_module = importlib.import_module("app")
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.modules.pop("app", None)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.upstream = _FakeUpstream()
+        self.upstream.respostas["/api/contrato/ug/787010"] = [{"id": 1, "numero": "00001/2024"}]
+        self.upstream.respostas["/api/contrato/1/historico"] = [{"id": 5, "tipo": "Termo Aditivo"}]
+        self.espelho_original = self.app_module.espelho
+        self.app_module.espelho = MirrorCache(os.path.join(self.tmp.name, "espelho.db"),
+                                              base_url=self.upstream.base_url)
+
+    def tearDown(self):
+        self.app_module.espelho = self.espelho_original
+        self.upstream.close()
+        self.tmp.cleanup()
+
+    def test_endpoint_answers_conditional_get(self):
+        resposta = self.app_module.espelho_contratos_uasg("787010", _FakeRequest())
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(json.loads(resposta.body), [{"id": 1, "numero": "00001/2024"}])
+        self.assertEqual(resposta.headers["x-espelho"], "upstream")
+        etag = resposta.headers["etag"]
+
+        resposta = self.app_module.espelho_contratos_uasg("787010", _FakeRequest({"If-None-Match": etag}))
+        self.assertEqual((resposta.status_code, resposta.body), (304, b""))
+        self.assertEqual(self.upstream.chamadas["/api/contrato/ug/787010"], 1)
+
+        with self.assertRaises(self.app_module.HTTPException) as ctx:
+            self.app_module.espelho_sub_recurso("1", "Empenhos", _FakeRequest())
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.upstream.fora_do_ar = True
+        with self.assertRaises(self.app_module.HTTPException) as ctx:
+            self.app_module.espelho_sub_recurso("1", "empenhos", _FakeRequest())
+        self.assertEqual(ctx.exception.status_code, 502)
+
+    def test_client_uses_mirror_first_and_falls_back_to_public_api(self):
+        import uvicorn
+
+        porta = _free_port()
+        server = uvicorn.Server(uvicorn.Config(self.app_module.app, host="127.0.0.1", port=porta, log_level="warning"))
+        server.install_signal_handlers = lambda: None
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 10
+        while not server.started and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertTrue(server.started)
+
+        session = _RecordingSession()
+        agora = [0.0]
+        cliente = MirrorClient(f"http://127.0.0.1:{porta}", session=session, base_publica=self.upstream.base_url,
+                               pausa_segundos=60, clock=lambda: agora[0])
+        url = f"{self.upstream.base_url}/contrato/1/historico"
+        try:
+            self.assertEqual(cliente.get_json(url), [{"id": 5, "tipo": "Termo Aditivo"}])
+            self.assertEqual(cliente.ultima_origem, "espelho")
+            # Segunda busca: GET condicional, o corpo vem da cópia do cliente
+            self.assertEqual(cliente.get_json(url), [{"id": 5, "tipo": "Termo Aditivo"}])
+            self.assertEqual(session.status, [200, 304])
+            self.assertEqual(self.upstream.chamadas["/api/contrato/1/historico"], 1)
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+        # Espelho fora do ar: vai direto na API pública e evita o espelho durante a pausa
+        self.assertEqual(cliente.get_json(url), [{"id": 5, "tipo": "Termo Aditivo"}])
+        self.assertEqual(cliente.ultima_origem, "publica")
+        tentativas = len(session.status)
+        cliente.get_json(url)
+        self.assertEqual(len(session.status), tentativas + 1)
+        self.assertEqual(self.upstream.chamadas["/api/contrato/1/historico"], 3)
+
+    def test_client_without_mirror_goes_straight_to_public_api(self):
+        cliente = MirrorClient("", base_publica=self.upstream.base_url)
+        self.assertIsNone(cliente.mirror_url_for(f"{self.upstream.base_url}/contrato/ug/787010"))
+        self.assertEqual(cliente.get_json(f"{self.upstream.base_url}/contrato/ug/787010"),
+                         [{"id": 1, "numero": "00001/2024"}])
+        self.assertEqual(cliente.ultima_origem, "publica")
+        with self.assertRaises(requests.HTTPError):
+            cliente.get_json(f"{self.upstream.base_url}/contrato/2/itens")
+
+    def test_slow_mirror_is_awaited_instead_of_skipped(self):
+        # Espelho alcançável mas demorando mais que o tempo de conexão (buscando no comprasnet)
+        espelho = _FakeUpstream(delay=0.5)
+        espelho.respostas["/api/espelho/contrato/1/historico"] = [{"id": 5, "tipo": "Termo Aditivo"}]
+        try:
+            cliente = MirrorClient(espelho.base_url[:-len("/api")], base_publica=self.upstream.base_url,
+                                   timeout_espelho=(0.2, 5))
+            url = f"{self.upstream.base_url}/contrato/1/historico"
+            self.assertEqual(cliente.get_json(url), [{"id": 5, "tipo": "Termo Aditivo"}])
+            self.assertEqual(cliente.ultima_origem, "espelho")
+            self.assertTrue(cliente._espelho_disponivel())
+            self.assertEqual(self.upstream.chamadas["/api/contrato/1/historico"], 0)
+        finally:
+            espelho.close()
+        # Por padrão a leitura espera mais que o espelho espera pelo comprasnet
+        self.assertGreater(MirrorClient().timeout_espelho[1], TIMEOUT_COMPRASNET)
+
+
+if __name__ == "__main__":
+    unittest.main()
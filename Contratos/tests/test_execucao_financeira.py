@@ -0,0 +1,146 @@
+# tests/test_execucao_financeira.py
+import unittest
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+from collections import defaultdict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.model.execucao_financeira_model import ExecucaoFinanceira
+from Contratos.model.empenhos_relatorio_model import parse_br_float
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+
+class TestExecucaoFinanceira(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dataset = SyntheticDataset(n_uasgs=3, contratos_por_uasg=12, empenhos_por_contrato=4, seed=5)
+        self.db_path = str(self.dataset.build_contratos_db(os.path.join(self.tmp.name, "gerenciador_uasg.db")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _expected_by_contract(self):
+        esperado = {}
+        for uasg, contratos in self.dataset.contracts_by_uasg().items():
+            for contrato in contratos:
+                empenhos = self.dataset.sub_resources(contrato)["empenhos"]
+                esperado[(contrato["numero"], uasg)] = (
+                    parse_br_float(contrato["valor_global"]),
+                    sum(parse_br_float(e["empenhado"]) for e in empenhos),
+                    sum(parse_br_float(e["liquidado"]) for e in empenhos),
+                    sum(parse_br_float(e["pago"]) for e in empenhos),
+                )
+        return esperado
+
+    def test_initial_refresh_matches_raw_json(self):
+        execucao = ExecucaoFinanceira(self.db_path)
+        self.assertEqual(execucao.pending_count(), 36)
+        stats = execucao.refresh()
+        self.assertEqual(stats["contratos"], 36)
+        self.assertEqual(execucao.pending_count(), 0)
+
+        colunas, linhas = execucao.summary("contrato")
+        self.assertEqual(colunas[0], "Contrato")
+        esperado = self._expected_by_contract()
+        self.assertEqual(len(linhas), len(esperado))
+        for numero, uasg, _, valor, empenhado, liquidado, pago, pct_emp, pct_pago in linhas:
+            chave = (numero, uasg)
+            self.assertAlmostEqual(valor, esperado[chave][0], places=2)
+            self.assertAlmostEqual(empenhado, esperado[chave][1], places=2)
+            self.assertAlmostEqual(liquidado, esperado[chave][2], places=2)
+            self.assertAlmostEqual(pago, esperado[chave][3], places=2)
+            if valor > 0:
+                self.assertAlmostEqual(pct_pago, round(100 * pago / valor, 1), places=1)
+
+    def test_group_by_uasg_fornecedor_and_year(self):
+        execucao = ExecucaoFinanceira(self.db_path)
+        execucao.refresh()
+        uasg = self.dataset.uasg_codes()[0]
+
+        _, por_uasg = execucao.summary("uasg")
+        self.assertEqual(sorted(r[0] for r in por_uasg), sorted(self.dataset.uasg_codes()))
+        totals = execucao.totals(uasg)
+        esperado_pago = sum(
+            parse_br_float(e["pago"])
+            for c in self.dataset.contracts_by_uasg()[uasg]
+            for e in self.dataset.sub_resources(c)["empenhos"]
+        )
+        self.assertEqual(totals["contratos"], 12)
+        self.assertAlmostEqual(totals["pago"], esperado_pago, places=2)
+
+        _, por_fornecedor = execucao.summary("fornecedor", uasg)
+        self.assertEqual(sum(r[2] for r in por_fornecedor), 12)
+        self.assertAlmostEqual(sum(r[6] for r in por_fornecedor), esperado_pago, places=2)
+
+        anos = defaultdict(float)
+        for contrato in self.dataset.contracts_by_uasg()[uasg]:
+            for empenho in self.dataset.sub_resources(contrato)["empenhos"]:
+                anos[int(empenho["data_emissao"][:4])] += parse_br_float(empenho["empenhado"])
+        _, por_ano = execucao.summary("ano", uasg)
+        self.assertEqual([r[0] for r in por_ano], sorted(anos))
+        for ano, _, empenhado, *_ in por_ano:
+            self.assertAlmostEqual(empenhado, anos[ano], places=2)
+
+    def test_refresh_is_incremental(self):
+        execucao = ExecucaoFinanceira(self.db_path)
+        execucao.refresh()
+        self.assertEqual(execucao.refresh()["contratos"], 0)
+
+        contrato = self.dataset.all_contracts()[0]
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO empenhos (id, contrato_id, raw_json) VALUES (?, ?, ?)", (
+            999999, contrato["id"],
+            json.dumps({"data_emissao": "2030-01-10", "empenhado": "1.000,00", "liquidado": "0,00", "pago": "250,50"}),
+        ))
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(execucao.pending_count(), 1)
+        stats = execucao.refresh()
+        self.assertEqual((stats["contratos"], stats["empenhos"]),
+                         (1, len(self.dataset.sub_resources(contrato)["empenhos"]) + 1))
+        _, por_ano = execucao.summary("ano")
+        self.assertIn((2030, 1, 1000.0, 0.0, 250.5, 0.0, 25.1), por_ano)
+
+        # Remoção do contrato some das tabelas derivadas
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM empenhos WHERE contrato_id = ?", (contrato["id"],))
+        conn.execute("DELETE FROM contratos WHERE id = ?", (contrato["id"],))
+        conn.commit()
+        conn.close()
+        self.assertEqual(execucao.refresh()["contratos"], 0)
+        self.assertEqual(execucao.totals()["contratos"], 35)
+        self.assertNotIn(2030, [r[0] for r in execucao.summary("ano")[1]])
+
+    def test_uses_value_columns_of_offline_schema(self):
+        db_path = os.path.join(self.tmp.name, "offline.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE contratos (id TEXT PRIMARY KEY, uasg_code TEXT, numero TEXT, "
+                     "fornecedor_nome TEXT, fornecedor_cnpj TEXT, valor_global TEXT)")
+        conn.execute("CREATE TABLE empenhos (id INTEGER PRIMARY KEY, contrato_id TEXT, numero TEXT, "
+                     "data_emissao TEXT, empenhado TEXT, liquidado TEXT, pago TEXT, raw_json TEXT)")
+        conn.execute("INSERT INTO contratos VALUES ('1', '787000', '1/2024', 'ACME', '00.000.000/0001-00', '10.000,00')")
+        conn.execute("INSERT INTO empenhos VALUES (1, '1', 'NE1', '2024-03-01', '4.000,00', '3.000,00', '2.500,00', '{}')")
+        conn.commit()
+        conn.close()
+
+        execucao = ExecucaoFinanceira(db_path)
+        execucao.refresh()
+        self.assertEqual(execucao.summary("contrato")[1],
+                         [("1/2024", "787000", "ACME", 10000.0, 4000.0, 3000.0, 2500.0, 40.0, 25.0)])
+
+    def test_requires_offline_tables(self):
+        db_path = os.path.join(self.tmp.name, "vazio.db")
+        sqlite3.connect(db_path).close()
+        with self.assertRaises(RuntimeError):
+            ExecucaoFinanceira(db_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# tests/test_fornecedores.py
+import unittest
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+from collections import defaultdict
+from datetime import date, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.model.fornecedores_model import FornecedoresIndex, normalize_cnpj, format_cnpj
+from Contratos.model.empenhos_relatorio_model import parse_br_float
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+
+class TestFornecedoresIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.today = date(2025, 6, 1)
+        self.dataset = SyntheticDataset(n_uasgs=3, contratos_por_uasg=30, n_atas=10, seed=3, today=self.today)
+        self.db_path = str(self.dataset.build_contratos_db(os.path.join(self.tmp.name, "gerenciador_uasg.db")))
+        self.atas_path = str(self.dataset.build_atas_db(os.path.join(self.tmp.name, "atas_controle.db")))
+
+        # Duas atas do primeiro fornecedor, com o CNPJ gravado só com dígitos
+        self.contrato = self.dataset.all_contracts()[0]
+        self.cnpj = normalize_cnpj(self.contrato["fornecedor"]["cnpj_cpf_idgener"])
+        conn = sqlite3.connect(self.atas_path)
+        conn.execute("UPDATE atas SET cnpj = ?, termino = '2025-06-15' WHERE id IN (1, 2)", (self.cnpj,))
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _expected(self, hoje):
+        esperado = defaultdict(lambda: {"contratos": 0, "ativos": 0, "valor": 0.0, "pago": 0.0, "vencimento": None})
+        for contrato in self.dataset.all_contracts():
+            f = esperado[normalize_cnpj(contrato["fornecedor"]["cnpj_cpf_idgener"])]
+            f["contratos"] += 1
+            f["valor"] += parse_br_float(contrato["valor_global"])
+            f["pago"] += sum(parse_br_float(e["pago"]) for e in self.dataset.sub_resources(contrato)["empenhos"])
+            if contrato["vigencia_fim"] >= hoje:
+                f["ativos"] += 1
+                f["vencimento"] = min(filter(None, [f["vencimento"], contrato["vigencia_fim"]]))
+        return esperado
+
+    def test_normalize_and_format(self):
+        self.assertEqual(normalize_cnpj("12.345.678/0001-90"), "12345678000190")
+        self.assertEqual(normalize_cnpj(None), "")
+        self.assertEqual(format_cnpj("12345678000190"), "12.345.678/0001-90")
+        self.assertEqual(format_cnpj("12345678901"), "123.456.789-01")
+
+    def test_summary_matches_contracts_empenhos_and_atas(self):
+        index = FornecedoresIndex(self.db_path, self.atas_path)
+        stats = index.refresh(today=self.today)
+        esperado = self._expected(self.today.isoformat())
+        self.assertEqual(stats["contratos"], 90)
+        self.assertEqual(stats["fornecedores"], len(esperado))
+
+        for cnpj, exp in esperado.items():
+            f = index.supplier(cnpj)
+            self.assertEqual(f["contratos"], exp["contratos"])
+            self.assertEqual(f["contratos_ativos"], exp["ativos"])
+            self.assertAlmostEqual(f["valor_contratado"], exp["valor"], places=2)
+            self.assertAlmostEqual(f["total_pago"], exp["pago"], places=2)
+            if cnpj != self.cnpj:
+                self.assertEqual(f["proximo_vencimento"], exp["vencimento"])
+
+        f = index.supplier(self.contrato["fornecedor"]["cnpj_cpf_idgener"])
+        self.assertEqual(f["atas"], 2)
+        self.assertEqual(f["proximo_vencimento"], min(filter(None, [esperado[self.cnpj]["vencimento"], "2025-06-15"])))
+        self.assertEqual(len(index.supplier_atas(self.cnpj)), 2)
+        self.assertEqual(len(index.supplier_contracts(self.cnpj)), esperado[self.cnpj]["contratos"])
+
+        # Busca por CNPJ com pontuação parcial e por nome
+        self.assertEqual(index.search(format_cnpj(self.cnpj)[:6])[0]["cnpj"][:5], self.cnpj[:5])
+        nome = self.contrato["fornecedor"]["nome"]
+        self.assertTrue(all(nome.lower()[:5] in r["nome"].lower() for r in index.search(nome[:5])))
+
+    def test_incremental_refresh(self):
+        index = FornecedoresIndex(self.db_path, self.atas_path)
+        index.refresh(today=self.today)
+        self.assertEqual(index.refresh(today=self.today)["fornecedores"], 0)
+
+        # Empenho de outro credor: recalcula o fornecedor do contrato e o credor
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO empenhos (id, contrato_id, raw_json) VALUES (?, ?, ?)", (
+            777777, self.contrato["id"], json.dumps({"credor_cnpj": "99.999.999/0001-99", "pago": "1.500,00"})))
+        conn.commit()
+        conn.close()
+        stats = index.refresh(today=self.today)
+        self.assertEqual((stats["contratos"], stats["fornecedores"]), (1, 2))
+        self.assertEqual(index.supplier("99999999000199")["total_pago"], 1500.0)
+        self.assertEqual(index.supplier("99999999000199")["contratos"], 0)
+
+        # Só os fornecedores com contrato vencendo no intervalo mudam com a data
+        amanha = self.today + timedelta(days=30)
+        vencendo = {normalize_cnpj(c["fornecedor"]["cnpj_cpf_idgener"]) for c in self.dataset.all_contracts()
+                    if self.today.isoformat() <= c["vigencia_fim"] < amanha.isoformat()}
+        vencendo.add(self.cnpj)  # atas vencem em 2025-06-15
+        stats = index.refresh(today=amanha)
+        self.assertEqual(stats["fornecedores"], len(vencendo))
+        esperado = self._expected(amanha.isoformat())
+        for cnpj in vencendo:
+            self.assertEqual(index.supplier(cnpj)["contratos_ativos"], esperado[cnpj]["ativos"])
+
+        # Alteração no banco de atas: relido por completo, só o fornecedor afetado muda
+        conn = sqlite3.connect(self.atas_path)
+        conn.execute("UPDATE atas SET cnpj = '' WHERE id = 2")
+        conn.commit()
+        conn.close()
+        stats = index.refresh(today=amanha)
+        self.assertEqual((stats["atas"], stats["fornecedores"]), (1, 1))
+        self.assertEqual(index.supplier(self.cnpj)["atas"], 1)
+
+        # Sem caminho de atas (atualização do banco offline) as atas indexadas são mantidas
+        FornecedoresIndex(self.db_path).refresh(today=amanha)
+        self.assertEqual(index.supplier(self.cnpj)["atas"], 1)
+
+    def test_requires_offline_tables(self):
+        db_path = os.path.join(self.tmp.name, "vazio.db")
+        sqlite3.connect(db_path).close()
+        with self.assertRaises(RuntimeError):
+            FornecedoresIndex(db_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+# tests/test_hybrid_sync.py
+import unittest
+import os
+import sys
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from unittest.mock import patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication
+
+import Contratos.model.hybrid_sync_model as hybrid_module
+from Contratos.model.hybrid_sync_model import HybridRevalidator, URL_API_SUB_RECURSO
+from Contratos.model.offline_db_model import URL_API_UASG, SubTableWriter, create_offline_tables, save_contract_row
+from Contratos.model.sub_data_prefetch import SubDataPrefetcher
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+
+class _FakeApi:
+    """Responde com cópias das listas cadastradas e conta as chamadas."""
+
+    def __init__(self):
+        self.respostas = {}
+        self.chamadas = []
+        self.falhar = False
+
+    def __call__(self, url):
+        self.chamadas.append(url)
+        if self.falhar:
+            raise ConnectionError("queda simulada")
+        return json.loads(json.dumps(self.respostas[url]))
+
+
+class TestHybridRevalidator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "gerenciador_uasg.db")
+        dataset = SyntheticDataset(n_uasgs=1, contratos_por_uasg=10, seed=47)
+        self.uasg = dataset.uasg_codes()[0]
+        self.contratos = dataset.contracts_by_uasg()[self.uasg]
+        self.contrato = self.contratos[0]
+        self.empenhos = dataset.sub_resources(self.contrato)["empenhos"]
+
+        # Banco local com a UASG e os empenhos do primeiro contrato
+        conn = sqlite3.connect(self.db_path)
+        create_offline_tables(conn)
+        for contrato in self.contratos:
+            save_contract_row(conn, self.uasg, contrato)
+        writer = SubTableWriter(conn)
+        writer.add("empenhos", str(self.contrato["id"]), self.empenhos)
+        writer.flush()
+        conn.execute("CREATE TABLE gravacoes (contrato_id TEXT)")
+        conn.execute("CREATE TRIGGER trg_gravacoes AFTER INSERT ON contratos BEGIN "
+                     "INSERT INTO gravacoes VALUES (NEW.id); END")
+        conn.commit()
+        conn.close()
+
+        self.api = _FakeApi()
+        self.url_uasg = URL_API_UASG.format(uasg=self.uasg)
+        self.url_empenhos = URL_API_SUB_RECURSO.format(contrato_id=self.contrato["id"], data_type="empenhos")
+        self.api.respostas[self.url_uasg] = self.contratos
+        self.api.respostas[self.url_empenhos] = self.empenhos
+        self.agora = 1000.0
+        # As tabelas derivadas têm testes próprios
+        patcher = patch.object(hybrid_module, "refresh_derived_tables")
+        self.refresh_derived = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _revalidator(self, **kwargs):
+        revalidator = HybridRevalidator(self.db_path, fetch_json=self.api, clock=lambda: self.agora, **kwargs)
+        self.addCleanup(revalidator.shutdown)
+        return revalidator
+
+    def _query(self, sql, params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _wait_until(self, condition, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        self.app.processEvents()
+        return condition()
+
+    def test_sync_uasg_writes_only_differences(self):
+        revalidator = self._revalidator()
+        resultado = revalidator.sync_uasg(self.uasg)
+        self.assertEqual((resultado["novos"], resultado["alterados"], resultado["ausentes"]), ([], [], []))
+        self.assertEqual(self._query("SELECT COUNT(*) FROM gravacoes")[0][0], 0)
+
+        # Um contrato muda, um é novo e um sumiu da API
+        lista = [dict(c) for c in self.contratos[:-1]]
+        lista[1]["valor_global"] = "1.234,56"
+        novo = dict(self.contratos[0], id=999001, numero="99999/2025")
+        self.api.respostas[self.url_uasg] = lista + [novo]
+
+        resultado = revalidator.sync_uasg(self.uasg)
+        self.assertEqual(resultado["novos"], ["999001"])
+        self.assertEqual(resultado["alterados"], [str(lista[1]["id"])])
+        # Contratos ausentes da API continuam no banco (status e registros do usuário)
+        self.assertEqual(resultado["ausentes"], [str(self.contratos[-1]["id"])])
+        self.assertEqual(set(resultado["contratos"]), {"999001", str(lista[1]["id"])})
+        gravados = {row[0] for row in self._query("SELECT contrato_id FROM gravacoes")}
+        self.assertEqual(gravados, {"999001", str(lista[1]["id"])})
+        self.assertEqual(self._query("SELECT COUNT(*) FROM contratos")[0][0], len(self.contratos) + 1)
+
+    def test_sync_sub_data_replaces_rows_only_when_changed(self):
+        revalidator = self._revalidator()
+        contrato_id = str(self.contrato["id"])
+        # Mesmos registros em outra ordem: nada muda
+        self.api.respostas[self.url_empenhos] = list(reversed(self.empenhos))
+        self.assertIsNone(revalidator.sync_sub_data(contrato_id, "empenhos"))
+        self.refresh_derived.assert_not_called()
+
+        alterados = [dict(e) for e in self.empenhos[1:]]
+        alterados[0]["pago"] = "0,01"
+        self.api.respostas[self.url_empenhos] = alterados
+        self.assertEqual(revalidator.sync_sub_data(contrato_id, "empenhos"), alterados)
+        rows = self._query("SELECT raw_json FROM empenhos WHERE contrato_id = ? ORDER BY id", (contrato_id,))
+        self.assertEqual(sorted(json.loads(r[0])["id"] for r in rows), sorted(e["id"] for e in alterados))
+        self.assertIn(json.loads(rows[0][0])["pago"], {e["pago"] for e in alterados})
+        self.refresh_derived.assert_called_once()
+
+        with self.assertRaises(ValueError):
+            revalidator.sync_sub_data(contrato_id, "garantias")
+
+    def test_background_revalidation_emits_and_throttles(self):
+        revalidator = self._revalidator()
+        prefetcher = SubDataPrefetcher(lambda cid, dtype: (None, "sem fonte"))
+        self.addCleanup(prefetcher.shutdown)
+        revalidator.sub_data_updated.connect(prefetcher.publish)
+        contrato_id = str(self.contrato["id"])
+        recebidos, threads = [], []
+
+        def ao_chegar(data, error):
+            recebidos.append(data)
+            threads.append(threading.current_thread())
+
+        owner = QCoreApplication.instance()
+        prefetcher.watch(owner, contrato_id, "empenhos", ao_chegar)
+
+        self.api.respostas[self.url_empenhos] = self.empenhos[:1]
+        self.assertIsNotNone(revalidator.revalidate_sub_data(contrato_id, "empenhos"))
+        self.assertTrue(self._wait_until(lambda: recebidos))
+        self.assertEqual(recebidos[0], self.empenhos[:1])
+        self.assertEqual(prefetcher.cached(contrato_id, "empenhos"), self.empenhos[:1])
+        # O diálogo é atualizado na thread da interface
+        self.assertIs(threads[0], threading.main_thread())
+
+        # Dentro do intervalo a API não é consultada de novo
+        chamadas = len(self.api.chamadas)
+        self.assertIsNone(revalidator.revalidate_sub_data(contrato_id, "empenhos"))
+        self.agora += hybrid_module.INTERVALO_REVALIDACAO_SEGUNDOS + 1
+        future = revalidator.revalidate_sub_data(contrato_id, "empenhos")
+        future.result(timeout=3)
+        self.assertEqual(len(self.api.chamadas), chamadas + 1)
+        # Sem mudança, nenhum sinal novo
+        self.app.processEvents()
+        self.assertEqual(len(recebidos), 1)
+
+    def test_failed_revalidation_can_retry(self):
+        revalidator = self._revalidator()
+        falhas, atualizacoes = [], []
+        revalidator.revalidation_failed.connect(lambda chave, msg: falhas.append(chave))
+        revalidator.uasg_updated.connect(lambda uasg, resultado: atualizacoes.append(resultado))
+
+        self.api.falhar = True
+        revalidator.revalidate_uasg(self.uasg).result(timeout=3)
+        self.assertTrue(self._wait_until(lambda: falhas))
+        self.assertEqual(falhas, [f"uasg:{self.uasg}"])
+
+        self.api.falhar = False
+        self.api.respostas[self.url_uasg] = [dict(self.contratos[0], objeto="NOVO OBJETO")] + self.contratos[1:]
+        self.assertIsNotNone(revalidator.revalidate_uasg(self.uasg))
+        self.assertTrue(self._wait_until(lambda: atualizacoes))
+        self.assertEqual(atualizacoes[0]["alterados"], [str(self.contratos[0]["id"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
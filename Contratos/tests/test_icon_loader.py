@@ -0,0 +1,79 @@
+# tests/test_icon_loader.py
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from utils.icon_loader import IconManager, IconPack, build_icon_pack
+
+ICONS_DIR = Path(ROOT_DIR) / "utils" / "icons"
+
+
+class TestIconManager(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # Pacote inexistente: força a leitura da pasta
+        self.manager = IconManager(icons_dir=ICONS_DIR, pack_path=Path(self.tmp.name) / "nao_existe.pack")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeated_requests_hit_cache(self):
+        first = self.manager.get_icon("alert")
+        self.assertFalse(first.isNull())
+        for _ in range(9):
+            self.assertIs(self.manager.get_icon("alert"), first)
+
+        stats = self.manager.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (9, 1))
+        self.assertEqual(stats["hit_rate"], 0.9)
+        self.assertEqual(stats["source"], "disk")
+
+    def test_pixmap_is_cached_per_size(self):
+        small = self.manager.get_pixmap("alert", 16)
+        self.assertIs(self.manager.get_pixmap("alert", 16), small)
+        self.assertEqual(self.manager.get_pixmap("alert", 32).width(), 32)
+        self.assertEqual(self.manager.cache_stats()["pixmaps"], 2)
+
+    def test_missing_icon_returns_empty_and_is_cached(self):
+        icon = self.manager.get_icon("icone_que_nao_existe")
+        self.assertTrue(icon.isNull())
+        self.manager.get_icon("icone_que_nao_existe")
+        self.assertEqual(self.manager.cache_stats()["misses"], 1)
+
+    def test_loads_from_packed_file(self):
+        pack_path = Path(self.tmp.name) / "icons.pack"
+        total = build_icon_pack(ICONS_DIR, pack_path)
+        pack = IconPack(pack_path)
+        try:
+            self.assertEqual(len(pack), total)
+            self.assertEqual(pack.read("alert.png"), (ICONS_DIR / "alert.png").read_bytes())
+        finally:
+            pack.close()
+
+        manager = IconManager(icons_dir=ICONS_DIR, pack_path=pack_path)
+        self.assertFalse(manager.get_icon("alert").isNull())
+        self.assertEqual(manager.cache_stats()["source"], "pack")
+
+    def test_warm_up_decodes_in_background(self):
+        thread = self.manager.warm_up(["alert", "time"])
+        thread.join(timeout=10)
+        self.assertEqual(self.manager.cache_stats()["prewarmed"], 2)
+
+        self.assertFalse(self.manager.get_icon("alert").isNull())
+        self.assertEqual(self.manager.cache_stats()["prewarmed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
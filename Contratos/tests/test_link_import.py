@@ -0,0 +1,143 @@
+# tests/test_link_import.py
+import unittest
+import os
+import sys
+import time
+import tempfile
+from datetime import date
+
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.model.models import Base, Contrato, LinksContrato, StatusContrato
+from Contratos.model.link_import_model import ContractIndex, apply_link_import, plan_link_import
+
+HOJE = date(2025, 6, 1)
+
+
+def _contratos(uasg, quantidade, vigencia_fim="2026-01-01"):
+    return [{"id": f"{uasg}{i:05d}", "numero": f"{i:05d}/2024", "vigencia_fim": vigencia_fim}
+            for i in range(1, quantidade + 1)]
+
+
+class TestLinkImport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.xlsx = os.path.join(self.tmp.name, "links.xlsx")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _planilha(self, linhas):
+        """linhas: (link_contrato, termo_aditivo, portaria); valores (texto, url) viram hyperlink."""
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["portaria", "link_contrato", "outra", "termo_aditivo"])
+        for row_idx, (chave, ta, portaria) in enumerate(linhas, start=2):
+            for coluna, valor in ((2, chave), (4, ta), (1, portaria)):
+                texto, url = valor if isinstance(valor, tuple) else (valor, None)
+                cell = ws.cell(row=row_idx, column=coluna, value=texto)
+                if url:
+                    cell.hyperlink = url
+        wb.save(self.xlsx)
+
+    def test_plan_matches_keys_and_reads_hyperlinks(self):
+        contratos = {"787010": _contratos("787010", 3), "787000": _contratos("787000", 2)}
+        contratos["787000"].append({"id": "vencido", "numero": "00099/2020", "vigencia_fim": "2025-01-01"})
+        self._planilha([
+            (("87010/2024-002", "http://contrato/2"), ("1º TA", "http://ta/2"), "XXX"),
+            ("00001/2024", None, ("Portaria 10", "http://portaria/1")),   # sem UASG: existe nas duas
+            ("87000/2020-099", None, None),                               # vencido há mais de 40 dias
+            ("sem número", None, None),
+            (None, "linha vazia", None),
+        ])
+        plano = plan_link_import(self.xlsx, ContractIndex(contratos, today=HOJE))
+
+        self.assertEqual(plano.summary(), {"encontradas": 2, "contratos": 2, "nao_encontradas": 1,
+                                           "invalidas": 1, "ambiguas": 1})
+        primeiro, segundo = plano.itens
+        self.assertEqual((primeiro.linha, primeiro.contrato_id), (2, "78701000002"))
+        self.assertEqual(primeiro.link_data, {"link_contrato": "http://contrato/2", "link_ta": "http://ta/2",
+                                              "link_portaria": None})
+        self.assertEqual((primeiro.termo_aditivo, primeiro.portaria), ("1º TA", None))
+        # Sem UASG: a primeira UASG carregada, como na busca linha a linha
+        self.assertEqual((segundo.chave, segundo.contrato_id), (("787010", "00001/2024"), "78701000001"))
+        self.assertEqual(segundo.link_data["link_contrato"], "00001/2024")
+        self.assertEqual(segundo.link_data["link_portaria"], "http://portaria/1")
+        self.assertEqual([(f.linha, f.motivo) for f in plano.falhas], [(4, "nao_encontrado"), (5, "invalida")])
+
+        wb = Workbook()
+        wb.active.append(["link_contrato", "portaria"])
+        wb.save(self.xlsx)
+        with self.assertRaises(ValueError):
+            plan_link_import(self.xlsx, ContractIndex(contratos, today=HOJE))
+
+    def test_apply_writes_all_contracts_in_one_session(self):
+        db_path = os.path.join(self.tmp.name, "gerenciador_uasg.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        db.add_all([Contrato(id="78701000001", uasg_code="787010"), Contrato(id="78701000002", uasg_code="787010")])
+        db.add(LinksContrato(contrato_id="78701000001", link_contrato="antigo", link_pncp_espc="http://pncp/1"))
+        db.add(StatusContrato(contrato_id="78701000001", status="EM EXECUÇÃO", portaria_edit="antiga"))
+        db.commit()
+        db.close()
+
+        self._planilha([
+            (("87010/2024-001", "http://contrato/1"), None, ("Portaria 7", "http://portaria/7")),
+            ("87010/2024-002", ("TA 1", "http://ta/1"), None),
+            ("87010/2024-002", ("TA 2", "http://ta/2"), None),   # repetido: a última linha vence
+        ])
+        plano = plan_link_import(self.xlsx, ContractIndex({"787010": _contratos("787010", 2)}, today=HOJE))
+        commits = []
+        db = Session()
+        original_commit = db.commit
+        db.commit = lambda: (commits.append(1), original_commit())
+        self.assertEqual(apply_link_import(db, plano), 2)
+        db.close()
+        self.assertEqual(len(commits), 1)
+
+        db = Session()
+        links = {l.contrato_id: l for l in db.query(LinksContrato)}
+        self.assertEqual(links["78701000001"].link_contrato, "http://contrato/1")
+        self.assertEqual(links["78701000001"].link_portaria, "http://portaria/7")
+        # O que não vem da planilha é mantido
+        self.assertEqual(links["78701000001"].link_pncp_espc, "http://pncp/1")
+        self.assertEqual(links["78701000002"].link_ta, "http://ta/2")
+        status = {s.contrato_id: s for s in db.query(StatusContrato)}
+        self.assertEqual((status["78701000001"].status, status["78701000001"].portaria_edit),
+                         ("EM EXECUÇÃO", "Portaria 7"))
+        self.assertEqual((status["78701000002"].uasg_code, status["78701000002"].termo_aditivo_edit),
+                         ("787010", "TA 2"))
+        db.close()
+        engine.dispose()
+
+    def test_ten_thousand_rows_are_planned_quickly(self):
+        contratos = {"787010": _contratos("787010", 5000), "787000": _contratos("787000", 5000)}
+        linhas = []
+        for i in range(1, 10001):
+            uasg = "87010" if i % 2 else "87000"
+            numero = (i % 5000) + 1
+            chave = (f"{uasg}/2024-{numero:03d}", f"http://contrato/{i}") if i % 10 == 0 else f"{uasg}/2024-{numero:03d}"
+            linhas.append((chave, "TA" if i % 3 == 0 else "XXX", None))
+        linhas.append(("87010/2024-99999", None, None))
+        self._planilha(linhas)
+
+        inicio = time.perf_counter()
+        plano = plan_link_import(self.xlsx, ContractIndex(contratos, today=HOJE))
+        duracao = time.perf_counter() - inicio
+
+        resumo = plano.summary()
+        self.assertEqual((resumo["encontradas"], resumo["nao_encontradas"]), (10000, 1))
+        self.assertEqual(sum(1 for item in plano.itens if item.link_data["link_contrato"].startswith("http")), 1000)
+        self.assertLess(duracao, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# tests/test_mensagem_lote.py
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+from datetime import date, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.tests.synthetic_data import SyntheticDataset
+from Contratos.model.mensagem_lote_model import (
+    generate_batch_messages, iter_contract_contexts, list_templates, list_selection_values, output_file_name,
+    SELECAO_UASG, SELECAO_STATUS, SELECAO_VENCENDO, SAIDA_DOCUMENTO, STATUS_PADRAO,
+)
+from utils.sql_profiler import sql_profiler
+
+
+class TestMensagensEmLote(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.today = date(2026, 1, 15)
+        cls.dataset = SyntheticDataset(n_uasgs=2, contratos_por_uasg=500, seed=7, today=cls.today)
+        cls.db_path = cls.dataset.build_contratos_db(Path(cls.tmp.name) / "gerenciador_uasg.db", with_sub_resources=False)
+        cls.template = Path(cls.tmp.name) / "aviso.txt"
+        cls.template.write_text("Contrato {{numero}} - {{nome}} - {{status}} - vence {{vigencia_fim_formatada}} {{extra}}",
+                                encoding="utf-8")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _out(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_one_file_per_contract_in_one_query(self):
+        uasg = self.dataset.uasg_codes()[0]
+        was_enabled = sql_profiler.enabled
+        sql_profiler.enable(slow_query_ms=10_000)
+        try:
+            with sql_profiler.operation("lote_teste") as op:
+                success, _, stats = generate_batch_messages(self.db_path, str(self.template), self._out("uasg"),
+                                                            selecao=SELECAO_UASG, valor=uasg)
+            self.assertEqual(op.count, 1)
+        finally:
+            if not was_enabled:
+                sql_profiler.disable()
+            sql_profiler.reset()
+
+        self.assertTrue(success)
+        self.assertEqual(stats["total"], 500)
+        self.assertEqual(stats["variaveis_sem_valor"], ["extra"])
+
+        contrato = self.dataset.contracts_by_uasg()[uasg][0]
+        info = {"id": contrato["id"], "uasg": uasg, "numero": contrato["numero"]}
+        file_name = output_file_name(info, "txt")
+        self.assertEqual(file_name, f"{uasg}_{contrato['numero'].replace('/', '-')}_{contrato['id']}.txt")
+        with open(os.path.join(self._out("uasg"), file_name), encoding="utf-8") as f:
+            message = f.read()
+        self.assertTrue(message.startswith(f"Contrato {contrato['numero']} - {contrato['fornecedor']['nome']} - "))
+        self.assertIn("{{extra}}", message)
+        self.assertEqual(len(os.listdir(self._out("uasg"))), 500)
+
+    def test_selection_by_status_and_expiring(self):
+        _, statuses = list_selection_values(self.db_path)
+        self.assertIn(STATUS_PADRAO, statuses)
+        for info, context in iter_contract_contexts(self.db_path, SELECAO_STATUS, "PUBLICADO"):
+            self.assertEqual(context["status"], "PUBLICADO")
+
+        limite = (self.today + timedelta(days=30)).isoformat()
+        esperados = {c["id"] for c in self.dataset.all_contracts() if self.today.isoformat() <= c["vigencia_fim"] <= limite}
+        obtidos = {info["id"] for info, _ in iter_contract_contexts(self.db_path, SELECAO_VENCENDO, 30, today=self.today)}
+        self.assertEqual(obtidos, esperados)
+
+    def test_combined_document_and_throughput(self):
+        success, _, stats = generate_batch_messages(self.db_path, str(self.template), self._out("doc"),
+                                                    saida=SAIDA_DOCUMENTO, formato="md")
+        self.assertTrue(success)
+        self.assertEqual(stats["total"], 1000)
+        # 1.000 mensagens devem sair em poucos segundos
+        self.assertLess(stats["segundos"], 5)
+        with open(os.path.join(self._out("doc"), "aviso_lote.md"), encoding="utf-8") as f:
+            self.assertEqual(f.read().count("## Contrato "), 1000)
+
+    def test_cancel_and_real_templates(self):
+        success, _, stats = generate_batch_messages(self.db_path, str(self.template), self._out("cancel"),
+                                                    should_cancel=lambda: True)
+        self.assertFalse(success)
+        self.assertEqual(stats["total"], 0)
+        self.assertTrue(any(name.startswith("Contratos - ") for name in list_templates()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+# tests/test_offline_build.py
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+import Contratos.model.offline_build_model as build_module
+from Contratos.model.offline_build_model import OfflineBuildJob
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+SUB_TABLES = ("historico", "empenhos", "itens", "arquivos")
+
+
+class _FakeApi:
+    """API sintética para várias UASGs; conta as chamadas e falha nas URLs marcadas."""
+
+    def __init__(self, dataset):
+        self.respostas = {}
+        self.falhar = set()
+        self.chamadas = Counter()
+        self._lock = threading.Lock()
+        for uasg, contratos in dataset.contracts_by_uasg().items():
+            lista = []
+            for contrato in contratos:
+                for table, rows in dataset.sub_resources(contrato).items():
+                    self.respostas[f"api/{table}/{contrato['id']}"] = rows
+                # Sem vigência final o contrato sempre passa pelo filtro de vencidos
+                lista.append(dict(contrato, vigencia_fim=None,
+                                  links={t: f"api/{t}/{contrato['id']}" for t in SUB_TABLES}))
+            self.respostas[build_module.URL_API_UASG.format(uasg=uasg)] = lista
+
+    def __call__(self, url):
+        with self._lock:
+            self.chamadas[url] += 1
+        if url in self.falhar:
+            raise ConnectionError("queda simulada")
+        return self.respostas[url]
+
+    def sub_calls(self):
+        return sum(n for url, n in self.chamadas.items() if url.startswith("api/"))
+
+
+class TestOfflineBuildJob(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "gerenciador_uasg.db")
+        self.dataset = SyntheticDataset(n_uasgs=3, contratos_por_uasg=20, seed=21)
+        self.uasgs = self.dataset.uasg_codes()
+        self.api = _FakeApi(self.dataset)
+        self.agora = datetime(2025, 6, 1, 12, 0, 0)
+        # As tabelas derivadas têm testes próprios
+        patcher = patch.object(build_module, "refresh_derived_tables")
+        self.refresh_derived = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _job(self, **kwargs):
+        return OfflineBuildJob(self.db_path, fetch_json=self.api, clock=lambda: self.agora, **kwargs)
+
+    def _count(self, table):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_builds_all_uasgs_and_skips_fresh_resources(self):
+        progresso = []
+        stats = self._job().run(self.uasgs, progress_callback=lambda feitos, total: progresso.append((feitos, total)))
+        self.assertEqual((stats["uasgs"], stats["contratos"], stats["baixados"], stats["erros"]), (3, 60, 240, 0))
+        self.assertEqual(progresso[-1], (60, 60))
+        self.assertEqual(self._count("contratos"), 60)
+        self.assertEqual(self._count("offline_build_checkpoint"), 240)
+        esperado = sum(len(rows) for url, rows in self.api.respostas.items() if url.startswith("api/empenhos/"))
+        self.assertEqual(self._count("empenhos"), esperado)
+        self.refresh_derived.assert_called_once()
+
+        # Dentro da validade: só as listas das UASGs são consultadas de novo (sem UASGs = todas as salvas)
+        self.agora += timedelta(hours=2)
+        stats = self._job().run()
+        self.assertEqual((stats["uasgs"], stats["baixados"], stats["em_dia"]), (3, 0, 240))
+        self.assertEqual(self.api.sub_calls(), 240)
+
+        # Fora da validade, tudo é baixado de novo
+        self.agora += timedelta(hours=30)
+        self.assertEqual(self._job(validade_horas=24).run(self.uasgs)["baixados"], 240)
+
+    def test_resumes_after_cancel(self):
+        cancelar = threading.Event()
+
+        def progresso(feitos, total):
+            if feitos >= 25:
+                cancelar.set()
+
+        stats = self._job(max_workers=2).run(self.uasgs, progress_callback=progresso, should_cancel=cancelar.is_set)
+        self.assertTrue(stats["cancelado"])
+        self.assertLess(stats["contratos"], 60)
+        self.assertEqual(self._count("offline_build_checkpoint"), stats["baixados"])
+
+        # A retomada baixa só o que faltou: nenhum sub-recurso é buscado duas vezes
+        stats = self._job().run(self.uasgs)
+        self.assertFalse(stats["cancelado"])
+        self.assertEqual(self.api.sub_calls(), 240)
+        self.assertTrue(all(n == 1 for url, n in self.api.chamadas.items() if url.startswith("api/")))
+        self.assertEqual(self._count("offline_build_checkpoint"), 240)
+
+    def test_failed_resource_is_retried_on_next_run(self):
+        contrato = self.dataset.contracts_by_uasg()[self.uasgs[0]][0]
+        self.api.falhar.add(f"api/itens/{contrato['id']}")
+        stats = self._job().run(self.uasgs)
+        self.assertEqual((stats["erros"], stats["baixados"]), (1, 239))
+
+        self.api.falhar.clear()
+        stats = self._job().run(self.uasgs)
+        self.assertEqual((stats["erros"], stats["baixados"], stats["em_dia"]), (0, 1, 239))
+        self.assertEqual(self.api.chamadas[f"api/itens/{contrato['id']}"], 2)
+
+    def test_incremental_refresh_follows_changed_contracts(self):
+        self._job().run(self.uasgs)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE gravacoes (contrato_id TEXT)")
+        conn.execute("CREATE TRIGGER trg_gravacoes AFTER INSERT ON contratos BEGIN "
+                     "INSERT INTO gravacoes VALUES (NEW.id); END")
+        conn.commit()
+        conn.close()
+        empenhos_antes = self._count("empenhos")
+
+        # Dois contratos mudam na lista da UASG; um deles perde um empenho na API
+        lista = self.api.respostas[build_module.URL_API_UASG.format(uasg=self.uasgs[0])]
+        alterados = lista[:2]
+        for i, contrato in enumerate(alterados):
+            lista[i] = dict(contrato, valor_global="999.999,99")
+        antigas = sum(len(self.api.respostas[f"api/{t}/{c['id']}"]) for c in alterados for t in SUB_TABLES)
+        url_empenhos = f"api/empenhos/{alterados[0]['id']}"
+        self.api.respostas[url_empenhos] = self.api.respostas[url_empenhos][1:]
+
+        self.agora += timedelta(hours=1)
+        stats = self._job().run(self.uasgs)
+        self.assertEqual((stats["alterados"], stats["baixados"], stats["em_dia"]), (2, 8, 232))
+        self.assertEqual(stats["removidas"], antigas)
+        self.assertEqual(self._count("empenhos"), empenhos_antes - 1)
+
+        # Só os contratos alterados foram regravados
+        conn = sqlite3.connect(self.db_path)
+        gravados = {row[0] for row in conn.execute("SELECT contrato_id FROM gravacoes")}
+        valor = conn.execute("SELECT valor_global FROM contratos WHERE id = ?", (alterados[1]["id"],)).fetchone()[0]
+        conn.close()
+        self.assertEqual(gravados, {c["id"] for c in alterados})
+        self.assertEqual(valor, "999.999,99")
+
+        # Sem mudanças nada é regravado; a atualização completa baixa tudo
+        stats = self._job().run(self.uasgs)
+        self.assertEqual((stats["alterados"], stats["baixados"]), (0, 0))
+        self.assertEqual(self._job(validade_horas=0).run(self.uasgs)["baixados"], 240)
+
+    def test_unreachable_uasg_does_not_stop_the_others(self):
+        self.api.falhar.add(build_module.URL_API_UASG.format(uasg=self.uasgs[1]))
+        stats = self._job().run(self.uasgs)
+        self.assertEqual((stats["contratos"], stats["erros"]), (40, 1))
+        self.assertIn(self.uasgs[1], stats["falhas"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
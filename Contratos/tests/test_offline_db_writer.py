@@ -0,0 +1,79 @@
+# tests/test_offline_db_writer.py
+import unittest
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+import Contratos.model.offline_db_model as offline_module
+from Contratos.model.offline_db_model import OfflineDBController, SubTableWriter
+
+
+class TestOfflineDBWriter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "gerenciador_uasg.db")
+        with patch.object(offline_module, "UASGModel", return_value=SimpleNamespace(db_path=self.db_path)):
+            self.controller = OfflineDBController()
+        # As tabelas derivadas têm testes próprios
+        self.controller._refresh_derived_tables = lambda: None
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writer_groups_by_columns_and_caches_schema(self):
+        self.controller._create_tables()
+        conn = sqlite3.connect(self.db_path)
+        writer = SubTableWriter(conn)
+        rows = [{"id": 1, "numero": "2024NE1", "pago": "10,00", "extra": "x"},
+                {"id": 2, "numero": "2024NE2"},
+                {"id": 3, "numero": "2024NE3", "pago": "5,00"}]
+        with patch.object(writer, "_table_columns", wraps=writer._table_columns) as colunas:
+            writer.add("empenhos", "10", rows[:2])
+            writer.add("empenhos", "11", rows[2:])
+        self.assertEqual(len(writer._pendentes), 2)
+        writer.flush()
+        conn.commit()
+
+        self.assertEqual(writer.stats()["linhas"], 3)
+        self.assertEqual(len(writer._colunas), 1)
+        self.assertEqual(colunas.call_count, 2)
+        gravados = conn.execute("SELECT id, contrato_id, numero, pago, raw_json FROM empenhos ORDER BY id").fetchall()
+        conn.close()
+        self.assertEqual([g[:4] for g in gravados],
+                         [(1, "10", "2024NE1", "10,00"), (2, "10", "2024NE2", None), (3, "11", "2024NE3", "5,00")])
+        self.assertEqual(json.loads(gravados[0][4]), rows[0])
+
+    def test_replace_removes_rows_missing_from_api(self):
+        self.controller._create_tables()
+        conn = sqlite3.connect(self.db_path)
+        writer = SubTableWriter(conn)
+        writer.add("itens", "10", [{"id": 1}, {"id": 2}, {"id": 3}])
+        writer.add("itens", "11", [{"id": 4}])
+        writer.flush()
+
+        writer.add("itens", "10", [{"id": 2}], replace=True)
+        writer.add("itens", "11", [], replace=True)
+        writer.flush()
+        conn.commit()
+        self.assertEqual([row[0] for row in conn.execute("SELECT id FROM itens")], [2])
+        self.assertEqual(writer.stats()["removidas"], 4)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
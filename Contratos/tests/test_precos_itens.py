@@ -0,0 +1,130 @@
+# tests/test_precos_itens.py
+import unittest
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+from collections import defaultdict
+from statistics import median
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from Contratos.model.precos_itens_model import PrecosItens, price_statistics, is_outlier
+from Contratos.model.empenhos_relatorio_model import parse_br_float
+from Contratos.tests.synthetic_data import SyntheticDataset
+
+
+class TestPrecosItens(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dataset = SyntheticDataset(n_uasgs=3, contratos_por_uasg=20, seed=9)
+        self.db_path = str(self.dataset.build_contratos_db(os.path.join(self.tmp.name, "gerenciador_uasg.db")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _prices_by_catmat(self):
+        precos = defaultdict(list)
+        for contrato in self.dataset.all_contracts():
+            for item in self.dataset.sub_resources(contrato)["itens"]:
+                precos[item["catmatseritem_id"]].append(parse_br_float(item["valorunitario"]))
+        return precos
+
+    def _insert_item(self, item_id, contrato_id, catmat, valor):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO itens (id, contrato_id, raw_json) VALUES (?, ?, ?)", (
+            item_id, contrato_id,
+            json.dumps({"catmatseritem_id": catmat, "descricao_complementar": "Item de teste",
+                        "quantidade": "1", "valorunitario": valor}),
+        ))
+        conn.commit()
+        conn.close()
+
+    def test_price_statistics_and_outlier_fences(self):
+        stats = price_statistics([(10.0, "2024-01-01"), (12.0, "2024-02-01"), (11.0, "2024-03-01"),
+                                  (13.0, "2024-04-01"), (95.0, "2023-01-01")])
+        self.assertEqual((stats["minimo"], stats["mediana"], stats["maximo"]), (10.0, 12.0, 95.0))
+        self.assertEqual(stats["ultimo_preco"], 95.0)  # último da lista (já ordenada por data)
+        self.assertTrue(is_outlier(95.0, stats["limite_inferior"], stats["limite_superior"]))
+        self.assertFalse(is_outlier(12.5, stats["limite_inferior"], stats["limite_superior"]))
+
+        poucos = price_statistics([(10.0, None), (500.0, None)])
+        self.assertIsNone(poucos["limite_superior"])
+        self.assertFalse(is_outlier(500.0, poucos["limite_inferior"], poucos["limite_superior"]))
+
+    def test_index_matches_raw_items(self):
+        precos = PrecosItens(self.db_path)
+        stats = precos.refresh()
+        esperado = self._prices_by_catmat()
+        self.assertEqual(stats["catalogo"], len(esperado))
+        self.assertEqual(stats["itens"], sum(len(v) for v in esperado.values()))
+
+        for catmat, valores in esperado.items():
+            estat = precos.item_statistics(catmat)
+            self.assertEqual(estat["ocorrencias"], len(valores))
+            self.assertAlmostEqual(estat["minimo"], min(valores), places=2)
+            self.assertAlmostEqual(estat["maximo"], max(valores), places=2)
+            self.assertAlmostEqual(estat["mediana"], median(valores), places=2)
+
+        catmat = max(esperado, key=lambda c: len(esperado[c]))
+        historico = precos.price_history(catmat)
+        self.assertEqual(len(historico), len(esperado[catmat]))
+        datas = [h["data_referencia"] for h in historico]
+        self.assertEqual(datas, sorted(datas, reverse=True))
+        self.assertEqual(precos.item_statistics(catmat)["ultimo_preco"], historico[0]["valor_unitario"])
+
+        self.assertEqual(precos.search(catmat[:4])[0]["ocorrencias"],
+                         max(len(esperado[c]) for c in esperado if c.startswith(catmat[:4])))
+        self.assertTrue(precos.search("")[:1])
+
+    def test_refresh_only_recomputes_touched_catalog_items(self):
+        precos = PrecosItens(self.db_path)
+        precos.refresh()
+        self.assertEqual(precos.refresh()["catalogo"], 0)
+
+        contrato = self.dataset.all_contracts()[0]
+        catmats_contrato = {i["catmatseritem_id"] for i in self.dataset.sub_resources(contrato)["itens"]}
+        catmat = sorted(self._prices_by_catmat(), key=lambda c: len(self._prices_by_catmat()[c]))[-1]
+        self._insert_item(99999901, contrato["id"], catmat, "9.999.999,00")
+
+        self.assertEqual(precos.pending_count(), 1)
+        stats = precos.refresh()
+        self.assertEqual(stats["contratos"], 1)
+        self.assertEqual(stats["catalogo"], len(catmats_contrato | {catmat}))
+
+        historico = precos.price_history(catmat)
+        self.assertTrue(next(h for h in historico if h["valor_unitario"] == 9999999.0)["outlier"])
+        estat, outlier = precos.check_price(catmat, "9.999.999,00")
+        self.assertTrue(outlier)
+        self.assertEqual(estat["maximo"], 9999999.0)
+
+        # Itens sem catálogo ou sem preço não entram no índice
+        self._insert_item(99999902, contrato["id"], "", "10,00")
+        self._insert_item(99999903, contrato["id"], "123", "0,00")
+        precos.refresh()
+        self.assertIsNone(precos.item_statistics("123"))
+
+        # Remoção do contrato recalcula as estatísticas dos itens que ele tinha
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM itens WHERE contrato_id = ?", (contrato["id"],))
+        conn.execute("DELETE FROM contratos WHERE id = ?", (contrato["id"],))
+        conn.commit()
+        conn.close()
+        precos.refresh()
+        self.assertNotIn(9999999.0, [h["valor_unitario"] for h in precos.price_history(catmat)])
+        self.assertEqual(precos.item_statistics(catmat)["ocorrencias"], len(self._prices_by_catmat()[catmat])
+                         - sum(1 for i in self.dataset.sub_resources(contrato)["itens"]
+                               if i["catmatseritem_id"] == catmat))
+
+    def test_requires_offline_tables(self):
+        db_path = os.path.join(self.tmp.name, "vazio.db")
+        sqlite3.connect(db_path).close()
+        with self.assertRaises(RuntimeError):
+            PrecosItens(db_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
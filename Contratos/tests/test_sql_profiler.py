@@ -0,0 +1,134 @@
+# tests/test_sql_profiler.py
+import unittest
+import os
+import sys
+import importlib
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine, text
+from utils.sql_profiler import SqlProfiler, sql_profiler
+
+
+class TestSqlProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "teste.db")
+        self.was_enabled = sql_profiler.enabled
+        sql_profiler.enable(slow_query_ms=10_000)
+        sql_profiler.reset()
+
+    def tearDown(self):
+        if not self.was_enabled:
+            sql_profiler.disable()
+        sql_profiler.reset()
+        self.tmp.cleanup()
+
+    def _seed(self, conn):
+        conn.execute("CREATE TABLE status_contratos (contrato_id TEXT PRIMARY KEY, status TEXT)")
+        conn.executemany("INSERT INTO status_contratos VALUES (?, ?)", [(str(i), "SEÇÃO CONTRATOS") for i in range(20)])
+        conn.commit()
+
+    def test_disabled_profiler_returns_plain_connection(self):
+        profiler = SqlProfiler()
+        conn = profiler.connect(self.db_path)
+        try:
+            self.assertIs(type(conn), sqlite3.Connection)
+        finally:
+            conn.close()
+
+    def test_counts_raw_sqlite_queries_per_operation(self):
+        conn = sql_profiler.connect(self.db_path)
+        self._seed(conn)
+        with sql_profiler.operation("carregar_tabela") as stats:
+            cursor = conn.cursor()
+            for i in range(20):
+                cursor.execute("SELECT status FROM status_contratos WHERE contrato_id = ?", (str(i),))
+                cursor.fetchone()
+        conn.close()
+
+        self.assertEqual(stats.count, 20)
+        snapshot = sql_profiler.snapshot()
+        self.assertEqual(snapshot["totals"]["carregar_tabela"]["queries"], 20)
+        top = snapshot["recent_operations"][-1]["top_statements"][0]
+        self.assertEqual(top["count"], 20)
+        # Consultas fora de uma operação vão para o agrupamento "sem_operacao"
+        self.assertGreaterEqual(snapshot["unscoped"]["queries"], 2)
+
+    def test_sqlalchemy_queries_are_counted(self):
+        engine = create_engine(f"sqlite:///{self.db_path}")
+        try:
+            with sql_profiler.operation("orm") as stats:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                    conn.execute(text("SELECT 2"))
+            self.assertEqual(stats.count, 2)
+        finally:
+            engine.dispose()
+
+    def test_nested_operations_accumulate_in_outer(self):
+        conn = sql_profiler.connect(self.db_path)
+        with sql_profiler.operation("externa") as outer:
+            conn.execute("SELECT 1")
+            with sql_profiler.operation("interna"):
+                conn.execute("SELECT 2")
+        conn.close()
+        self.assertEqual(outer.count, 2)
+        self.assertNotIn("interna", sql_profiler.snapshot()["totals"])
+
+    def test_slow_query_log_includes_query_plan(self):
+        conn = sql_profiler.connect(self.db_path)
+        self._seed(conn)
+        sql_profiler.slow_query_ms = 0
+        with sql_profiler.operation("exportar_status"):
+            conn.execute("SELECT * FROM status_contratos WHERE status = ?", ("X",)).fetchall()
+        conn.close()
+
+        slow = sql_profiler.snapshot()["slow_queries"]
+        self.assertTrue(slow)
+        entry = slow[-1]
+        self.assertEqual(entry["operation"], "exportar_status")
+        self.assertTrue(any("SCAN" in line for line in entry["plan"]), entry["plan"])
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    @staticmethod
+    def _load_app(metrics_flag):
+        sys.modules.pop("app", None)
+        with patch.dict(os.environ, {"CA360_METRICS": metrics_flag}):
+            return importlib.import_module("app")
+
+    @staticmethod
+    def _paths(app_module):
+        return {getattr(route, "path", None) for route in app_module.app.routes}
+
+    def test_endpoint_only_exists_when_opted_in(self):
+        was_enabled = sql_profiler.enabled
+        try:
+            self.assertNotIn("/api/metrics/sql", self._paths(self._load_app("")))
+
+            app_module = self._load_app("1")
+            self.assertIn("/api/metrics/sql", self._paths(app_module))
+            self.assertTrue(sql_profiler.enabled)
+
+            class _FakeRequest:
+                def __init__(self, host):
+                    self.client = type("Client", (), {"host": host})()
+
+            self.assertTrue(app_module.get_sql_metrics(_FakeRequest("127.0.0.1"))["enabled"])
+            with self.assertRaises(app_module.HTTPException):
+                app_module.get_sql_metrics(_FakeRequest("192.168.0.50"))
+        finally:
+            sys.modules.pop("app", None)
+            if not was_enabled:
+                sql_profiler.disable()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# tests/test_startup_budget.py
+import unittest
+import subprocess
+import sys
+import os
+import json
+
+# Raiz do projeto (onde está o main.py)
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.startup_tracer import StartupTracer
+
+# Módulos carregados antes da primeira janela aparecer
+STARTUP_MODULES = "main, view.main_shell_view, controller.main_controller"
+
+# Orçamento do custo de import a frio (ms). Pode ser ajustado por ambiente em máquinas lentas.
+IMPORT_BUDGET_MS = float(os.environ.get("CA360_IMPORT_BUDGET_MS", "400"))
+
+# Bibliotecas pesadas que só podem ser carregadas sob demanda (módulos Contratos/Atas)
+HEAVY_MODULES = ("requests", "sqlalchemy", "pandas", "openpyxl", "docx", "fastapi")
+
+
+def _run_cold_import(code):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    env.pop("CA360_STARTUP_TRACE", None)
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+
+def _top_level_import_ms(stderr):
+    """Soma o tempo acumulado dos imports de nível 0 da saída do -X importtime."""
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        # Nível 0 tem um único espaço após o "|"; os aninhados são indentados
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+    return total_us / 1000.0
+
+
+class TestStartupBudget(unittest.TestCase):
+
+    def test_cold_import_within_budget(self):
+        """O custo de import até a janela principal não pode regredir além do orçamento."""
+        # Usa o melhor de 3 execuções para reduzir o ruído do disco/CPU
+        timings = []
+        for _ in range(3):
+            result = _run_cold_import(f"import {STARTUP_MODULES}")
+            self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+            timings.append(_top_level_import_ms(result.stderr))
+        best = min(timings)
+        self.assertLess(
+            best, IMPORT_BUDGET_MS,
+            f"Import a frio levou {best:.1f} ms (orçamento {IMPORT_BUDGET_MS:.0f} ms)"
+        )
+
+    def test_heavy_modules_not_imported_at_startup(self):
+        """requests/sqlalchemy/pandas etc. devem ficar fora do caminho da primeira pintura."""
+        code = (
+            f"import sys, json\nimport {STARTUP_MODULES}\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+        )
+        result = _run_cold_import(code)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(loaded, [], f"Módulos pesados carregados na inicialização: {loaded}")
+
+
+class TestStartupTracer(unittest.TestCase):
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = StartupTracer()
+        with tracer.phase("fase"):
+            pass
+        tracer.mark("marco")
+        self.assertEqual(tracer.to_dict()["phases"], [])
+        self.assertIsNone(tracer.dump(ROOT_DIR))
+
+    def test_flag_is_consumed_from_argv(self):
+        tracer = StartupTracer()
+        argv = ["main.py", "--trace-startup"]
+        try:
+            self.assertTrue(tracer.start_from_env(argv))
+            self.assertEqual(argv, ["main.py"])
+        finally:
+            tracer.stop_import_tracing()
+
+    def test_records_imports_and_phases(self):
+        tracer = StartupTracer()
+        tracer.start()
+        try:
+            with tracer.phase("import_modulo"):
+                sys.modules.pop("colorsys", None)
+                import colorsys  # noqa: F401
+            tracer.mark("first_paint")
+        finally:
+            tracer.stop_import_tracing()
+
+        data = tracer.to_dict()
+        self.assertEqual([p["name"] for p in data["phases"]], ["import_modulo"])
+        self.assertIn("colorsys", [i["module"] for i in data["imports"]])
+        self.assertIsNotNone(data["first_paint_ms"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# tests/test_sub_data_prefetch.py
+import unittest
+import os
+import sys
+import time
+import threading
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication
+
+from Contratos.model.sub_data_prefetch import SubDataPrefetcher, SUB_RESOURCES
+
+
+class _SlowSource:
+    """Simula a API: cada chamada demora 'delay' segundos e é contada."""
+
+    def __init__(self, delay=0.2, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, contrato_id, data_type):
+        with self._lock:
+            self.calls.append((contrato_id, data_type))
+        time.sleep(self.delay)
+        if data_type in self.fail:
+            return None, "Erro na API: Status 500"
+        return [{"contrato_id": contrato_id, "tipo": data_type}], None
+
+
+class TestSubDataPrefetcher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def _wait_until(self, condition, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        self.app.processEvents()
+        return condition()
+
+    def test_prefetch_fetches_all_resources_concurrently(self):
+        source = _SlowSource(delay=0.2)
+        prefetcher = SubDataPrefetcher(source, max_workers=4)
+        inicio = time.monotonic()
+        prefetcher.prefetch("101")
+        self.assertTrue(self._wait_until(lambda: all(prefetcher.cached("101", t) for t in SUB_RESOURCES)))
+        # Quatro buscas de 0,2s em paralelo, não em sequência (0,8s)
+        self.assertLess(time.monotonic() - inicio, 0.6)
+
+        # Já em cache: nem o prefetch nem o get voltam à fonte
+        prefetcher.prefetch("101")
+        self.assertEqual(prefetcher.get("101", "itens"), ([{"contrato_id": "101", "tipo": "itens"}], None))
+        self.assertEqual(len(source.calls), 4)
+        prefetcher.shutdown()
+
+    def test_late_data_arrives_by_signal_and_inflight_is_shared(self):
+        source = _SlowSource(delay=0.2)
+        prefetcher = SubDataPrefetcher(source)
+        received = []
+        prefetcher.data_ready.connect(lambda cid, dtype, data, error: received.append((cid, dtype, error)))
+
+        self.assertIsNone(prefetcher.request("7", "empenhos"))
+        self.assertTrue(prefetcher.is_pending("7", "empenhos"))
+        # Quem precisa do dado na hora aguarda a mesma busca, sem repetir a requisição
+        data, error = prefetcher.get("7", "empenhos")
+        self.assertEqual((data[0]["tipo"], error), ("empenhos", None))
+        self.assertTrue(self._wait_until(lambda: received))
+        self.assertEqual(received, [("7", "empenhos", "")])
+        self.assertEqual(source.calls, [("7", "empenhos")])
+        self.assertIsNotNone(prefetcher.request("7", "empenhos"))
+        prefetcher.shutdown()
+
+    def test_errors_are_not_cached_and_lru_evicts_old_contracts(self):
+        source = _SlowSource(delay=0, fail={"arquivos"})
+        prefetcher = SubDataPrefetcher(source, max_contracts=2)
+        for contrato_id in ("1", "2", "3"):
+            prefetcher.prefetch(contrato_id, ("itens", "arquivos"))
+            self._wait_until(lambda: not prefetcher.is_pending(contrato_id, "arquivos")
+                             and not prefetcher.is_pending(contrato_id, "itens"))
+        self.assertIsNone(prefetcher.cached("1", "itens"))
+        self.assertIsNotNone(prefetcher.cached("3", "itens"))
+        self.assertIsNone(prefetcher.cached("3", "arquivos"))
+        self.assertEqual(prefetcher.get("3", "arquivos"), (None, "Erro na API: Status 500"))
+        prefetcher.shutdown()
+
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        prefetcher = SubDataPrefetcher(_SlowSource(delay=0), ttl_seconds=60, clock=lambda: now[0])
+        prefetcher.get("9", "historico")
+        self.assertIsNotNone(prefetcher.cached("9", "historico"))
+        now[0] = 61
+        self.assertIsNone(prefetcher.cached("9", "historico"))
+        prefetcher.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
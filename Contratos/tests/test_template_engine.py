@@ -0,0 +1,100 @@
+# tests/test_template_engine.py
+import unittest
+import os
+import sys
+import sqlite3
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from utils.template_engine import build_context, compile_template, render_template
+
+
+class TestTemplateEngine(unittest.TestCase):
+
+    def test_compiles_segments_once(self):
+        template = compile_template("Contrato {{numero}} de {{nome}} ({{numero}})")
+        self.assertIs(compile_template("Contrato {{numero}} de {{nome}} ({{numero}})"), template)
+        self.assertEqual(template.variables, ("numero", "nome"))
+        self.assertEqual(len(template.segments), 7)
+
+    def test_renders_and_reports_unknown_variables(self):
+        context = build_context({"numero": "00012/2024", "valor": 1500.5, "fornecedor": {"nome": "X"}},
+                                {"nome": "EMPRESA X"})
+        message, unknown = render_template("Nº {{numero}} - {{nome}} - R$ {{valor}} em {{31JUL2024,}}", context)
+        self.assertEqual(message, "Nº 00012/2024 - EMPRESA X - R$ 1500.5 em {{31JUL2024,}}")
+        self.assertEqual(unknown, ["31JUL2024,"])
+        # Valores não simples (dicts) não entram no contexto
+        self.assertNotIn("fornecedor", context)
+
+    def test_single_pass_does_not_expand_values(self):
+        context = build_context({"a": "{{b}}", "b": "B"})
+        message, _ = render_template("{{a}}|{{b}}", context)
+        self.assertEqual(message, "{{b}}|B")
+
+    def test_real_templates_render(self):
+        template_dir = os.path.join(ROOT_DIR, "utils", "msg", "contratos")
+        context = build_context({"processo": "NUP-1", "nome": "EMPRESA", "cnpj": "00.000.000/0001-00"})
+        for filename in os.listdir(template_dir):
+            with open(os.path.join(template_dir, filename), encoding="utf-8") as f:
+                source = f.read()
+            message, unknown = render_template(source, context)
+            for name in ("processo", "nome", "cnpj"):
+                self.assertNotIn("{{" + name + "}}", message, filename)
+            self.assertEqual(set(unknown), set(compile_template(source).variables) - set(context), filename)
+
+
+class TestMensagemControllerPreview(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from PyQt6.QtWidgets import QApplication
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from Contratos.model.models import Base
+
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        self.connections = 0
+
+        test = self
+
+        class _FakeModel:
+            def _get_db_connection(self):
+                test.connections += 1
+                conn = sqlite3.connect(":memory:")
+                conn.row_factory = sqlite3.Row
+                conn.execute("CREATE TABLE status_contratos (contrato_id TEXT, objeto_editado TEXT)")
+                conn.execute("INSERT INTO status_contratos VALUES ('1', 'OBJETO EDITADO')")
+                return conn
+
+            def _get_db_session(self):
+                return Session()
+
+        from Contratos.controller.mensagem_controller import MensagemController
+        contrato = {"id": "1", "numero": "00012/2024", "objeto": "OBJETO", "fornecedor": {"nome": "EMPRESA X"}}
+        self.controller = MensagemController(contrato, _FakeModel())
+
+    def test_preview_is_debounced_and_context_cached(self):
+        view = self.controller.view
+        for text in ("{", "{{", "{{nome}} / {{objeto_editado}} / {{xyz}}"):
+            view.template_text_edit.setPlainText(text)
+        # Nada renderizado ainda: a atualização aguarda o debounce
+        self.assertTrue(self.controller._preview_timer.isActive())
+        self.assertEqual(view.preview_text_edit.toPlainText(), "")
+
+        self.controller._preview_timer.stop()
+        self.controller._update_preview()
+        self.assertEqual(view.preview_text_edit.toPlainText(), "EMPRESA X / OBJETO EDITADO / {{xyz}}")
+        self.assertIn("{{xyz}}", view.unknown_variables_label.text())
+        # Uma única ida ao banco para montar o contexto (lista de variáveis + pré-visualizações)
+        self.assertEqual(self.connections, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_worker_dialog.py
+import unittest
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QThread
+from PyQt6.QtWidgets import QApplication, QDialog
+
+from utils.worker_dialog import WorkerDialogMixin
+from Contratos.view.mensagem_lote_view import MensagemLoteDialog
+from Contratos.view.documentos_cache_view import DocumentosCacheDialog
+from Contratos.view.documentos_busca_view import DocumentosBuscaDialog
+from Contratos.view.settings_dialog import SettingsDialog
+
+
+class _SlowWorker(QThread):
+    """Trabalha até ser cancelada (ou por no máximo 5s)."""
+
+    def __init__(self):
+        super().__init__()
+        self._cancelled = False
+        self.parou_por_cancelamento = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        limite = time.monotonic() + 5
+        while time.monotonic() < limite:
+            if self._cancelled:
+                self.parou_por_cancelamento = True
+                return
+            time.sleep(0.01)
+
+
+class _Dialog(WorkerDialogMixin, QDialog):
+    pass
+
+
+class TestWorkerDialog(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def _start(self, dialog):
+        worker = dialog.track_worker(_SlowWorker())
+        worker.start()
+        deadline = time.monotonic() + 2
+        while not worker.isRunning() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(dialog.has_running_workers())
+        return worker
+
+    def test_reject_cancels_and_waits_for_running_worker(self):
+        dialog = _Dialog()
+        dialog.show()
+        worker = self._start(dialog)
+        dialog.reject()   # Esc
+        self.assertFalse(worker.isRunning())
+        self.assertTrue(worker.parou_por_cancelamento)
+        self.assertFalse(dialog.has_running_workers())
+
+    def test_close_button_of_real_dialogs_stops_worker(self):
+        for dialog_class in (MensagemLoteDialog, DocumentosCacheDialog, DocumentosBuscaDialog, SettingsDialog):
+            with self.subTest(dialog_class.__name__):
+                dialog = dialog_class()
+                dialog.show()
+                worker = self._start(dialog)
+                dialog.close()    # X
+                self.assertFalse(worker.isRunning())
+                self.assertTrue(worker.parou_por_cancelamento)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# view/abas_detalhes/aditivos_group.py
+
+from PyQt6.QtWidgets import QGroupBox, QVBoxLayout, QLabel
+
+from utils.formatters import format_brl, format_iso_date
+
+
+def create_aditivos_group(self):
+    """
+    Quadro 'TERMOS ADITIVOS' da aba geral: resumo pré-calculado da linha do tempo
+    (banco offline). Retorna None quando não há histórico salvo para o contrato.
+    """
+    from Contratos.model.aditivos_model import AditivosTimeline
+
+    contrato_id = self.data.get("id")
+    try:
+        # A DDL roda uma vez por processo; aqui só o contrato aberto é atualizado, se mudou
+        resumo, eventos = AditivosTimeline(self.model.db_path).details(contrato_id)
+    except Exception as e:
+        print(f"⚠ Linha do tempo de aditivos indisponível: {e}")
+        return None
+    if not resumo:
+        return None
+
+    group = QGroupBox("TERMOS ADITIVOS")
+    layout = QVBoxLayout(group)
+
+    crescimento = format_brl(resumo["crescimento_valor"])
+    if resumo["crescimento_pct"] is not None:
+        crescimento += f" ({resumo['crescimento_pct']:.2f}%)".replace(".", ",")
+    resumo_label = QLabel(
+        f"<b>Aditivos:</b> {resumo['qtd_aditivos']} &nbsp;•&nbsp; "
+        f"<b>Crescimento do valor:</b> {crescimento} &nbsp;•&nbsp; "
+        f"<b>Prorrogação:</b> {resumo['dias_prorrogados']} dias &nbsp;•&nbsp; "
+        f"<b>Último aditivo:</b> {format_iso_date(resumo['ultimo_aditivo']) or '-'}"
+    )
+    resumo_label.setWordWrap(True)
+    layout.addWidget(resumo_label)
+
+    linhas = []
+    for evento in eventos:
+        linha = (f"{format_iso_date(evento['data_assinatura']) or '-'} — {evento['tipo'] or ''} {evento['numero'] or ''}: "
+                 f"vigência até {format_iso_date(evento['vigencia_fim']) or '-'}, valor {format_brl(evento['valor_global'])}")
+        if evento["ordem"] > 0:
+            linha += f" (variação {format_brl(evento['variacao_valor'])}, +{evento['dias_prorrogados']} dias)"
+        linhas.append(linha)
+    eventos_label = QLabel("<br>".join(linhas))
+    eventos_label.setStyleSheet("color: #AAA; font-size: 11px;")
+    eventos_label.setWordWrap(True)
+    layout.addWidget(eventos_label)
+    return group
@@ -95,9 +95,10 @@ def create_empenhos_tab(self):
             filtered_empenhos = [e for e in all_empenhos if e.get("data_emissao", "").startswith(selected_year)]
             display_empenhos(filtered_empenhos)
 
-    def fetch_and_display_empenhos():
-        """Função principal que busca os dados e ativa o filtro."""
-        nonlocal all_empenhos
+    contrato_id = self.data.get("id")
+    prefetcher = self.model.prefetcher
+
+    def show_loading():
         loading_label = QLabel("<b>Buscando dados...</b>")
         loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         display_empenhos([])
@@ -107,11 +108,14 @@ def create_empenhos_tab(self):
         search_button.setEnabled(False)
         search_button.setText("Buscando...")
 
-        contrato_id = self.data.get("id")
-
-        empenhos, error_message = self.model.get_sub_data_for_contract(contrato_id, "empenhos")
-        
-        loading_label.deleteLater()
+    def show_empenhos(empenhos, error_message):
+        """Exibe o resultado (vindo do cache ou da busca em segundo plano) e ativa o filtro."""
+        nonlocal all_empenhos
+        while results_layout.count():
+            child = results_layout.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+        scroll_area.setVisible(True)
         
         if error_message or not empenhos:
             msg = f"<b>Não foi possível carregar:</b><br>{error_message}" if error_message else "<b>Nenhum empenho encontrado.</b>"
@@ -134,7 +138,21 @@ def create_empenhos_tab(self):
         search_button.setEnabled(True)
         search_button.setText("Buscar Empenhos Novamente")
 
+    def fetch_and_display_empenhos():
+        """Busca novamente (ignorando o cache); o resultado chega por sinal."""
+        show_loading()
+        prefetcher.request(contrato_id, "empenhos", force=True)
+
+    prefetcher.watch(self, contrato_id, "empenhos", show_empenhos)
+
     search_button.clicked.connect(fetch_and_display_empenhos)
     year_combo_box.currentTextChanged.connect(on_year_filter_changed)
 
+    # Empenhos já pré-carregados aparecem na hora; se a busca estiver a caminho, mostra o carregando
+    cached_empenhos = prefetcher.cached(contrato_id, "empenhos")
+    if cached_empenhos is not None:
+        show_empenhos(cached_empenhos, "")
+    elif prefetcher.is_pending(contrato_id, "empenhos"):
+        show_loading()
+
     return empenhos_tab
\ No newline at end of file
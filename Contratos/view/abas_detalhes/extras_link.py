@@ -132,7 +132,7 @@ def aba_extras_link(self):
             # Se não está no cache, busca no model
             contrato_id = self.data.get("id")
             self.json_display.setPlainText(f"Buscando dados de '{link_name}'...")
-            json_data, error_message = self.model.get_sub_data_for_contract(contrato_id, link_name)
+            json_data, error_message = self.model.get_sub_data_cached(contrato_id, link_name)
             # Guarda o resultado no cache para futuras consultas
             if not error_message:
                 print(f"💾 Salvando '{link_name}' no cache.")
@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QSize
 from datetime import datetime
 from utils.icon_loader import icon_manager
+from Contratos.view.abas_detalhes.aditivos_group import create_aditivos_group
 
 class ClickableLineEdit(QLineEdit):
     def __init__(self, parent=None):
@@ -152,6 +153,11 @@ def create_general_tab(self):
     
     info_layout.addRow(objeto_label, hbox)
     left_column.addWidget(info_group)
+
+    # Resumo dos termos aditivos (pré-calculado no banco offline)
+    aditivos_group = create_aditivos_group(self)
+    if aditivos_group is not None:
+        left_column.addWidget(aditivos_group)
     
     # Coluna direita - Opções e Gestão
     right_column = QVBoxLayout()
@@ -83,6 +83,13 @@ def create_itens_tab(self):
             line2_layout.addWidget(QLabel(f"<b>Grupo:</b> {item.get('grupo_id', 'N/A')}"))
             line2_layout.addStretch()
             line2_layout.addWidget(QLabel(f"<b>CATMAT/SER:</b> {item.get('catmatseritem_id', 'N/A')}"))
+            catmat = item.get('catmatseritem_id')
+            if catmat:
+                price_button = QPushButton("Histórico de Preços")
+                price_button.setIcon(icon_manager.get_icon("find"))
+                price_button.setToolTip("O que já foi pago por este item em todos os contratos offline")
+                price_button.clicked.connect(lambda _, c=catmat: self.open_item_price_history(c))
+                line2_layout.addWidget(price_button)
             card_layout.addLayout(line2_layout)
 
             # Linha 3: Descrição Complementar
@@ -92,25 +99,29 @@ def create_itens_tab(self):
         
         results_layout.addStretch()
 
-    def fetch_and_display_itens():
-        """Função principal que busca os dados e os exibe."""
+    contrato_id = self.data.get("id")
+    prefetcher = self.model.prefetcher
+
+    def clear_results():
+        while results_layout.count():
+            child = results_layout.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+
+    def show_loading():
+        clear_results()
         loading_label = QLabel("<b>Buscando dados dos itens...</b>")
         loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        display_itens([]) # Limpa a tela
         results_layout.addWidget(loading_label)
         scroll_area.setVisible(True)
-        
         search_button.setEnabled(False)
         search_button.setText("Buscando...")
 
-        contrato_id = self.data.get("id")
-
-        # A chamada de busca é feita através do model, que lida com o modo online/offline
-        itens, error_message = self.model.get_sub_data_for_contract(contrato_id, "itens")
-        
-        loading_label.deleteLater()
-        
+    def show_itens(itens, error_message):
+        """Exibe o resultado (vindo do cache ou da busca em segundo plano)."""
+        scroll_area.setVisible(True)
         if error_message or not itens:
+            clear_results()
             self.itens_report_button.setVisible(False)
             msg = f"<b>Não foi possível carregar:</b><br>{error_message}" if error_message else "<b>Nenhum item encontrado.</b>"
             results_layout.addWidget(QLabel(msg))
@@ -121,6 +132,20 @@ def create_itens_tab(self):
         search_button.setEnabled(True)
         search_button.setText("Buscar Itens Novamente")
 
+    def fetch_and_display_itens():
+        """Busca novamente (ignorando o cache); o resultado chega por sinal."""
+        show_loading()
+        # A busca é feita pelo model (modo online/offline) em segundo plano
+        prefetcher.request(contrato_id, "itens", force=True)
+
+    prefetcher.watch(self, contrato_id, "itens", show_itens)
     search_button.clicked.connect(fetch_and_display_itens)
 
+    # Itens já pré-carregados aparecem na hora; se a busca estiver a caminho, mostra o carregando
+    cached_itens = prefetcher.cached(contrato_id, "itens")
+    if cached_itens is not None:
+        show_itens(cached_itens, "")
+    elif prefetcher.is_pending(contrato_id, "itens"):
+        show_loading()
+
     return itens_tab
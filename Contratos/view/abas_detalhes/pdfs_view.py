@@ -7,6 +7,9 @@ from urllib.parse import quote
 import webbrowser
 from utils.icon_loader import icon_manager
 
+# Downloads avulsos em andamento: a referência continua viva mesmo que o diálogo seja fechado
+_downloads_em_andamento = set()
+
 def create_link_section(title, url, link_text):
     """Cria uma seção de link com título e URL clicável."""
     if not url: return None
@@ -21,6 +24,54 @@ def create_link_section(title, url, link_text):
     layout.addWidget(link_label)
     return frame
 
+def add_local_copy_button(parent_dialog, frame, document_cache, doc, local_path):
+    """
+    Acrescenta à seção do link um botão para abrir a cópia local do documento,
+    ou para baixá-la (em segundo plano) quando ainda não existe.
+    """
+    from Contratos.controller.documentos_cache_controller import DocumentoDownloadWorker, open_local_file
+
+    button = QPushButton()
+    button.setIcon(icon_manager.get_icon("pdf" if local_path else "download-pdf"))
+    button.setText("Abrir cópia local" if local_path else "Baixar cópia local")
+    state = {"path": local_path}
+
+    def on_downloaded(success, message):
+        try:
+            button.isEnabled()
+        except RuntimeError:
+            return  # O diálogo foi fechado durante o download
+        if success:
+            state["path"] = message
+            button.setIcon(icon_manager.get_icon("pdf"))
+            button.setText("Abrir cópia local")
+        else:
+            button.setText("Baixar cópia local")
+            QMessageBox.warning(parent_dialog, "Download", f"Não foi possível baixar o documento:\n{message}")
+        button.setEnabled(True)
+
+    def on_click():
+        if state["path"]:
+            try:
+                open_local_file(state["path"])
+            except Exception as e:
+                QMessageBox.warning(parent_dialog, "Erro ao Abrir", f"Não foi possível abrir o arquivo:\n{e}")
+            return
+        button.setEnabled(False)
+        button.setText("Baixando...")
+        worker = DocumentoDownloadWorker(document_cache, doc, index=parent_dialog.model.document_index)
+        worker.finished.connect(on_downloaded)
+        # wait(): o sinal é emitido no fim de run(), a thread termina em seguida
+        worker.finished.connect(lambda *_: (worker.wait(), _downloads_em_andamento.discard(worker)))
+        _downloads_em_andamento.add(worker)
+        worker.start()
+
+    button.clicked.connect(on_click)
+    row = QHBoxLayout()
+    row.addStretch()
+    row.addWidget(button)
+    frame.layout().addLayout(row)
+
 def create_link_input_row(parent_dialog, label_text, placeholder_text):
     """Cria um QHBoxLayout contendo um QLineEdit e botões de Copiar/Abrir."""
     line_edit = QLineEdit()
@@ -124,32 +175,43 @@ def create_object_tab(self):
     button_hbox.addWidget(files_button)
     main_layout.addLayout(button_hbox)
 
-    def fetch_and_display_file_links():
-        files_button.setText("Buscando...")
-        files_button.setEnabled(False)
+    prefetcher = self.model.prefetcher
 
+    def clear_file_links():
         # Limpa os links antigos da API
         while self.links_container.count():
             child = self.links_container.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
 
-        arquivos, error_message = self.model.get_sub_data_for_contract(contrato_id, "arquivos")
+    def show_file_links(arquivos, error_message, overwrite_contract_link=True):
+        """Exibe os links de arquivos (do cache ou da busca em segundo plano)."""
+        clear_file_links()
         
         if error_message or not arquivos:
             error_label = QLabel(f"<b>{error_message or 'Nenhum arquivo encontrado na API.'}</b>")
             self.links_container.addWidget(error_label)
         else:
+            # Ao exibir do cache, não sobrescreve um link que o usuário já salvou
+            preencher_link = overwrite_contract_link or not self.link_contrato_le.text().strip()
             link_contrato_encontrado = False
+            document_cache = self.model.document_cache
+            local_paths = document_cache.local_paths_for_contract(contrato_id)
             for arquivo in reversed(arquivos):
                 if arquivo.get("tipo") == "Contrato" and arquivo.get("path_arquivo") and not link_contrato_encontrado:
-                    self.link_contrato_le.setText(arquivo["path_arquivo"])
+                    if preencher_link:
+                        self.link_contrato_le.setText(arquivo["path_arquivo"])
                     link_contrato_encontrado = True
                 
                 link_url = arquivo.get("path_arquivo")
                 link_description = arquivo.get("descricao") or arquivo.get("tipo") or "Clique aqui para abrir"
                 section = create_link_section(f"Link para '{arquivo.get('tipo', 'Arquivo')}':", link_url, link_description)
                 if section:
+                    if link_url.startswith(('http://', 'https://')):
+                        doc = {"url": link_url, "contrato_id": contrato_id,
+                               "tipo": arquivo.get("tipo"), "descricao": arquivo.get("descricao")}
+                        local_path = local_paths.get(link_url) or document_cache.local_path(link_url)
+                        add_local_copy_button(self, section, document_cache, doc, local_path)
                     self.links_container.insertWidget(0, section)
             
             if not link_contrato_encontrado:
@@ -158,6 +220,29 @@ def create_object_tab(self):
         files_button.setText("Buscar Links de Arquivos (PDF, etc.)")
         files_button.setEnabled(True)
 
+    busca_manual = False
+
+    def on_file_links_ready(arquivos, error_message):
+        # Só a busca pedida pelo botão substitui o link já preenchido
+        nonlocal busca_manual
+        show_file_links(arquivos, error_message, overwrite_contract_link=busca_manual)
+        busca_manual = False
+
+    def fetch_and_display_file_links():
+        nonlocal busca_manual
+        busca_manual = True
+        files_button.setText("Buscando...")
+        files_button.setEnabled(False)
+        clear_file_links()
+        # A busca roda em segundo plano; o resultado chega por sinal
+        prefetcher.request(contrato_id, "arquivos", force=True)
+
+    prefetcher.watch(self, contrato_id, "arquivos", on_file_links_ready)
     files_button.clicked.connect(fetch_and_display_file_links)
+
+    # Links já pré-carregados aparecem na hora, sem bloquear a abertura da janela
+    cached_arquivos = prefetcher.cached(contrato_id, "arquivos")
+    if cached_arquivos is not None:
+        show_file_links(cached_arquivos, "", overwrite_contract_link=False)
     
     return object_tab
\ No newline at end of file
@@ -28,6 +28,21 @@ def create_dashboard_tab(main_window):
     main_window.refresh_dashboard_button.setIcon(icon_manager.get_icon("refresh"))
     main_window.refresh_dashboard_button.setObjectName("header_button")
     header_layout.addWidget(main_window.refresh_dashboard_button)
+
+    main_window.execucao_button = QPushButton("Execução Financeira")
+    main_window.execucao_button.setIcon(icon_manager.get_icon("graph"))
+    main_window.execucao_button.setObjectName("header_button")
+    header_layout.addWidget(main_window.execucao_button)
+
+    main_window.precos_itens_button = QPushButton("Preços de Itens")
+    main_window.precos_itens_button.setIcon(icon_manager.get_icon("find"))
+    main_window.precos_itens_button.setObjectName("header_button")
+    header_layout.addWidget(main_window.precos_itens_button)
+
+    main_window.fornecedores_button = QPushButton("Fornecedores")
+    main_window.fornecedores_button.setIcon(icon_manager.get_icon("business"))
+    main_window.fornecedores_button.setObjectName("header_button")
+    header_layout.addWidget(main_window.fornecedores_button)
     
     main_layout.addLayout(header_layout)
 
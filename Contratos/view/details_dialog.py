@@ -395,6 +395,16 @@ class DetailsDialog(QDialog):
         if not self.is_manual:  # Só funciona para contratos normais
             itens_controller = ItensController(self.model, self)
             itens_controller.generate_report_to_excel(self.data)
+
+    def open_item_price_history(self, catmatseritem_id):
+        """Abre o histórico de preços do item de catálogo em todos os contratos offline"""
+        from Contratos.controller.precos_itens_controller import PrecosItensController
+        try:
+            precos_controller = PrecosItensController(self.model, self, catmatseritem_id)
+        except RuntimeError as e:
+            QMessageBox.warning(self, "Preços de Itens", f"{e}\n\nCrie o banco offline antes de usar esta consulta.")
+            return
+        precos_controller.show()
     
     # ==================== MÉTODO DE ENVIO DE E-MAIL ====================
     
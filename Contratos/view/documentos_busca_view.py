@@ -0,0 +1,64 @@
+# Contratos/view/documentos_busca_view.py
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+                             QTableWidget, QHeaderView, QProgressBar, QAbstractItemView)
+from utils.icon_loader import icon_manager
+from utils.worker_dialog import WorkerDialogMixin
+
+
+class DocumentosBuscaDialog(WorkerDialogMixin, QDialog):
+    """
+    Busca por texto nos documentos da cópia local; os contratos são listados
+    do que tem mais ocorrências para o que tem menos.
+    """
+    COLUMNS = ["Contrato", "UASG", "Fornecedor", "Ocorrências", "Docs", "Trecho"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Pesquisar nos Documentos")
+        self.resize(900, 520)
+
+        layout = QVBoxLayout(self)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('Ex: reajuste IPCA, "garantia contratual", manuten*')
+        self.search_button = QPushButton("Buscar")
+        self.search_button.setIcon(icon_manager.get_icon("localizar_pdf"))
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.search_button)
+        layout.addLayout(search_layout)
+
+        self.results_table = QTableWidget(0, len(self.COLUMNS))
+        self.results_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.results_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_table.setWordWrap(True)
+        self.results_table.verticalHeader().setVisible(False)
+        header = self.results_table.horizontalHeader()
+        for column in range(len(self.COLUMNS) - 1):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(len(self.COLUMNS) - 1, QHeaderView.ResizeMode.Stretch)
+        self.results_table.setToolTip("Duplo clique abre o documento com mais ocorrências do contrato")
+        layout.addWidget(self.results_table)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        bottom = QHBoxLayout()
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        self.index_button = QPushButton("Atualizar Índice")
+        self.index_button.setIcon(icon_manager.get_icon("database"))
+        bottom.addWidget(self.status_label, 1)
+        bottom.addWidget(self.index_button)
+        layout.addLayout(bottom)
+
+    def set_indexing(self, running):
+        """Trava a busca enquanto o índice está sendo atualizado."""
+        self.index_button.setEnabled(not running)
+        self.search_button.setEnabled(not running)
+        self.progress_bar.setVisible(running)
+        if running:
+            self.progress_bar.setRange(0, 0)
@@ -0,0 +1,78 @@
+# Contratos/view/documentos_cache_view.py
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QComboBox,
+                             QSpinBox, QPushButton, QProgressBar, QStackedWidget)
+from PyQt6.QtCore import Qt
+from utils.icon_loader import icon_manager
+from utils.worker_dialog import WorkerDialogMixin
+
+
+class DocumentosCacheDialog(WorkerDialogMixin, QDialog):
+    """
+    Interface do download em lote dos documentos (PDFs) dos contratos para uso local.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Documentos Locais")
+        self.setMinimumWidth(480)
+
+        layout = QVBoxLayout(self)
+        title = QLabel("<b>Baixar os documentos dos contratos para consulta local</b>")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+
+        self.info_label = QLabel("")
+        self.info_label.setWordWrap(True)
+        self.info_label.setStyleSheet("color: #888; font-size: 11px;")
+        layout.addWidget(self.info_label)
+
+        form = QFormLayout()
+        self.selection_combo = QComboBox()
+        form.addRow("Selecionar:", self.selection_combo)
+
+        self.selection_stack = QStackedWidget()
+        self.uasg_combo = QComboBox()
+        self.status_combo = QComboBox()
+        self.selection_stack.addWidget(self.uasg_combo)
+        self.selection_stack.addWidget(self.status_combo)
+        form.addRow("Valor:", self.selection_stack)
+
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 8)
+        self.workers_spin.setValue(4)
+        self.workers_spin.setToolTip("Quantidade de downloads simultâneos")
+        form.addRow("Downloads simultâneos:", self.workers_spin)
+        layout.addLayout(form)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        buttons = QHBoxLayout()
+        self.open_folder_button = QPushButton("Abrir Pasta")
+        self.open_folder_button.setIcon(icon_manager.get_icon("folder128"))
+        buttons.addWidget(self.open_folder_button)
+        self.search_button = QPushButton("Pesquisar nos Documentos")
+        self.search_button.setIcon(icon_manager.get_icon("localizar_pdf"))
+        buttons.addWidget(self.search_button)
+        buttons.addStretch()
+        self.download_button = QPushButton("Baixar")
+        self.download_button.setIcon(icon_manager.get_icon("download-pdf"))
+        self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.setEnabled(False)
+        buttons.addWidget(self.download_button)
+        buttons.addWidget(self.cancel_button)
+        layout.addLayout(buttons)
+
+        self.selection_combo.currentIndexChanged.connect(self.selection_stack.setCurrentIndex)
+
+    def set_running(self, running):
+        """Trava o formulário enquanto os downloads estão em andamento."""
+        for widget in (self.selection_combo, self.selection_stack, self.workers_spin, self.download_button):
+            widget.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+        self.progress_bar.setVisible(running)
@@ -0,0 +1,55 @@
+# Contratos/view/execucao_financeira_view.py
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton,
+                             QTabWidget, QTableWidget, QHeaderView, QAbstractItemView)
+from utils.icon_loader import icon_manager
+
+
+class ExecucaoFinanceiraDialog(QDialog):
+    """
+    Execução financeira (empenhado, liquidado e pago) por contrato, UASG, fornecedor e ano.
+    """
+    ABAS = [("contrato", "Por Contrato"), ("uasg", "Por UASG"), ("fornecedor", "Por Fornecedor"), ("ano", "Por Ano")]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Execução Financeira")
+        self.resize(1000, 600)
+
+        layout = QVBoxLayout(self)
+
+        header = QHBoxLayout()
+        title = QLabel("Execução Financeira dos Contratos (banco offline)")
+        title.setStyleSheet("font-size: 16px; font-weight: bold; color: #8AB4F7;")
+        header.addWidget(title)
+        header.addStretch()
+        header.addWidget(QLabel("UASG:"))
+        self.uasg_combo = QComboBox()
+        self.uasg_combo.setMinimumWidth(120)
+        header.addWidget(self.uasg_combo)
+        self.refresh_button = QPushButton("Atualizar")
+        self.refresh_button.setIcon(icon_manager.get_icon("refresh"))
+        self.refresh_button.setObjectName("header_button")
+        header.addWidget(self.refresh_button)
+        layout.addLayout(header)
+
+        self.totals_label = QLabel("")
+        self.totals_label.setStyleSheet("font-size: 13px; padding: 4px;")
+        layout.addWidget(self.totals_label)
+
+        self.tabs = QTabWidget()
+        self.tables = {}
+        for key, title in self.ABAS:
+            table = QTableWidget(0, 0)
+            table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+            table.setSortingEnabled(True)
+            table.verticalHeader().setVisible(False)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+            self.tables[key] = table
+            self.tabs.addTab(table, title)
+        layout.addWidget(self.tabs)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #888; font-size: 11px;")
+        layout.addWidget(self.status_label)
@@ -0,0 +1,53 @@
+# Contratos/view/fornecedores_view.py
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+                             QSplitter, QTabWidget)
+from PyQt6.QtCore import Qt
+from utils.icon_loader import icon_manager
+from Contratos.view.precos_itens_view import create_readonly_table
+
+
+class FornecedoresDialog(QDialog):
+    """
+    Fornecedores (por CNPJ) de todas as UASGs, com seus contratos e atas.
+    """
+    FORNECEDORES_HEADERS = ["CNPJ/CPF", "Fornecedor", "UASGs", "Contratos", "Ativos", "Valor Contratado",
+                            "Total Pago", "Atas", "Próximo Vencimento"]
+    CONTRATOS_HEADERS = ["Contrato", "UASG", "Valor Global", "Total Pago", "Vigência Fim"]
+    ATAS_HEADERS = ["Ata", "Empresa", "Valor Global", "Término"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Fornecedores")
+        self.resize(1100, 650)
+
+        layout = QVBoxLayout(self)
+
+        title = QLabel("Fornecedores (todas as UASGs)")
+        title.setStyleSheet("font-size: 16px; font-weight: bold; color: #8AB4F7;")
+        layout.addWidget(title)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Nome ou CNPJ do fornecedor (com ou sem pontuação)...")
+        search_layout.addWidget(self.search_input)
+        self.search_button = QPushButton("Buscar")
+        self.search_button.setIcon(icon_manager.get_icon("find"))
+        search_layout.addWidget(self.search_button)
+        layout.addLayout(search_layout)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.suppliers_table = create_readonly_table(self.FORNECEDORES_HEADERS)
+        splitter.addWidget(self.suppliers_table)
+
+        self.detail_tabs = QTabWidget()
+        self.contracts_table = create_readonly_table(self.CONTRATOS_HEADERS)
+        self.atas_table = create_readonly_table(self.ATAS_HEADERS)
+        self.detail_tabs.addTab(self.contracts_table, "Contratos")
+        self.detail_tabs.addTab(self.atas_table, "Atas")
+        splitter.addWidget(self.detail_tabs)
+        layout.addWidget(splitter)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #888; font-size: 11px;")
+        layout.addWidget(self.status_label)
@@ -223,6 +223,9 @@ class MainWindow(QWidget):
         if mode == "Online":
             self.status_icon_label.setPixmap(icon_manager.get_icon("link").pixmap(60, 60))
             self.status_icon_label.setToolTip("Modo Online: Buscando dados da API pública.")
+        elif mode == "Híbrido":
+            self.status_icon_label.setPixmap(icon_manager.get_icon("synchronize").pixmap(60, 60))
+            self.status_icon_label.setToolTip("Modo Híbrido: Dados locais na hora, atualizados pela API em segundo plano.")
         else: # Offline
             self.status_icon_label.setPixmap(icon_manager.get_icon("database").pixmap(60, 60))
             self.status_icon_label.setToolTip("Modo Offline: Usando dados salvos localmente.")
@@ -232,6 +235,9 @@ class MainWindow(QWidget):
         if mode == "Online":
             self.clear_button.setIcon(icon_manager.get_icon("link"))
             self.clear_button.setToolTip("Limpar Tabela (Modo Online)")
+        elif mode == "Híbrido":
+            self.clear_button.setIcon(icon_manager.get_icon("synchronize"))
+            self.clear_button.setToolTip("Limpar Tabela (Modo Híbrido)")
         else: # Offline
             self.clear_button.setIcon(icon_manager.get_icon("database"))
             self.clear_button.setToolTip("Limpar Tabela (Modo Offline)")
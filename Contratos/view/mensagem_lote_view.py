@@ -0,0 +1,89 @@
+# Contratos/view/mensagem_lote_view.py
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QComboBox,
+                             QSpinBox, QPushButton, QLineEdit, QProgressBar, QStackedWidget)
+from PyQt6.QtCore import Qt
+from utils.icon_loader import icon_manager
+from utils.worker_dialog import WorkerDialogMixin
+
+
+class MensagemLoteDialog(WorkerDialogMixin, QDialog):
+    """
+    Interface da geração de mensagens em lote (um modelo aplicado a vários contratos).
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Mensagens em Lote")
+        self.setMinimumWidth(520)
+
+        layout = QVBoxLayout(self)
+        title = QLabel("<b>Gerar mensagens para vários contratos</b>")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title)
+
+        form = QFormLayout()
+        self.template_combo = QComboBox()
+        form.addRow("Modelo:", self.template_combo)
+
+        # Tipo de seleção + valor correspondente (UASG / Status / Dias)
+        self.selection_combo = QComboBox()
+        form.addRow("Selecionar:", self.selection_combo)
+
+        self.selection_stack = QStackedWidget()
+        self.uasg_combo = QComboBox()
+        self.status_combo = QComboBox()
+        self.dias_spin = QSpinBox()
+        self.dias_spin.setRange(1, 3650)
+        self.dias_spin.setValue(90)
+        self.dias_spin.setSuffix(" dias")
+        self.selection_stack.addWidget(self.uasg_combo)
+        self.selection_stack.addWidget(self.status_combo)
+        self.selection_stack.addWidget(self.dias_spin)
+        form.addRow("Valor:", self.selection_stack)
+
+        self.output_combo = QComboBox()
+        form.addRow("Saída:", self.output_combo)
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("Texto (.txt)", "txt")
+        self.format_combo.addItem("Markdown (.md)", "md")
+        form.addRow("Formato:", self.format_combo)
+
+        folder_layout = QHBoxLayout()
+        self.folder_edit = QLineEdit()
+        self.folder_edit.setReadOnly(True)
+        self.folder_button = QPushButton()
+        self.folder_button.setIcon(icon_manager.get_icon("open-folder"))
+        folder_layout.addWidget(self.folder_edit)
+        folder_layout.addWidget(self.folder_button)
+        form.addRow("Pasta:", folder_layout)
+        layout.addLayout(form)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        self.generate_button = QPushButton("Gerar")
+        self.generate_button.setIcon(icon_manager.get_icon("mensagem"))
+        self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.setEnabled(False)
+        buttons.addWidget(self.generate_button)
+        buttons.addWidget(self.cancel_button)
+        layout.addLayout(buttons)
+
+        self.selection_combo.currentIndexChanged.connect(self.selection_stack.setCurrentIndex)
+
+    def set_running(self, running):
+        """Trava o formulário enquanto a geração está em andamento."""
+        for widget in (self.template_combo, self.selection_combo, self.selection_stack,
+                       self.output_combo, self.format_combo, self.folder_button, self.generate_button):
+            widget.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+        self.progress_bar.setVisible(running)
@@ -59,6 +59,12 @@ class MensagemDialog(QDialog):
         self.preview_text_edit = QTextEdit()
         self.preview_text_edit.setReadOnly(True)
         preview_layout.addWidget(self.preview_text_edit)
+        # Placeholders do modelo que não correspondem a nenhuma variável do contrato
+        self.unknown_variables_label = QLabel()
+        self.unknown_variables_label.setWordWrap(True)
+        self.unknown_variables_label.setStyleSheet("color: #FFA500;")
+        self.unknown_variables_label.setVisible(False)
+        preview_layout.addWidget(self.unknown_variables_label)
 
         text_splitter.addWidget(editor_widget)
         text_splitter.addWidget(preview_widget)
@@ -114,5 +120,8 @@ class MensagemDialog(QDialog):
         bottom_buttons_layout.addWidget(self.save_template_button)
         bottom_buttons_layout.addWidget(self.save_comments_button)
         bottom_buttons_layout.addStretch()
+        self.batch_button = QPushButton("Gerar em Lote")
+        self.batch_button.setToolTip("Aplicar um modelo a vários contratos (por UASG, status ou vencimento)")
+        bottom_buttons_layout.addWidget(self.batch_button)
         self.copy_button = QPushButton("Copiar Mensagem Pronta")
         main_layout.addLayout(bottom_buttons_layout)
\ No newline at end of file
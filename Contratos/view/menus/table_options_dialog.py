@@ -12,7 +12,7 @@ class TableOptionsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Opções de Tabela")
-        self.setFixedSize(350, 280)
+        self.setFixedSize(350, 345)
         
         layout = QVBoxLayout(self)
         layout.setSpacing(15)
@@ -47,5 +47,13 @@ class TableOptionsDialog(QDialog):
         self.btn_export_bi.setIconSize(QSize(24, 24))
         self.btn_export_bi.setMinimumHeight(50)
         layout.addWidget(self.btn_export_bi)
+
+        # Botão 4: Relatório financeiro (empenhos por período) de toda a UASG
+        self.btn_financeiro_uasg = QPushButton("Relatório Financeiro da UASG")
+        self.btn_financeiro_uasg.setIcon(icon_manager.get_icon("excel_down"))
+        self.btn_financeiro_uasg.setIconSize(QSize(24, 24))
+        self.btn_financeiro_uasg.setMinimumHeight(50)
+        self.btn_financeiro_uasg.setToolTip("Empenhado/pago por período de todos os contratos (banco offline)")
+        layout.addWidget(self.btn_financeiro_uasg)
         
         layout.addStretch()
\ No newline at end of file
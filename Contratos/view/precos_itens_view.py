@@ -0,0 +1,65 @@
+# Contratos/view/precos_itens_view.py
+
+from PyQt6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+                             QTableWidget, QHeaderView, QAbstractItemView, QSplitter)
+from PyQt6.QtCore import Qt
+from utils.icon_loader import icon_manager
+
+
+def create_readonly_table(headers):
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+    table.horizontalHeader().setStretchLastSection(True)
+    return table
+
+
+class PrecosItensDialog(QDialog):
+    """
+    Preços praticados por item de catálogo (CATMAT/CATSER) em todos os contratos offline.
+    """
+    CATALOGO_HEADERS = ["CATMAT/SER", "Descrição", "Ocorrências", "Contratos", "UASGs",
+                        "Mínimo", "Mediana", "Máximo", "Último Preço", "Última Data"]
+    HISTORICO_HEADERS = ["Data", "UASG", "Contrato", "Fornecedor", "Quantidade", "Valor Unitário", "Outlier", "Descrição"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Preços de Itens")
+        self.resize(1100, 650)
+
+        layout = QVBoxLayout(self)
+
+        title = QLabel("Histórico de Preços por Item de Catálogo")
+        title.setStyleSheet("font-size: 16px; font-weight: bold; color: #8AB4F7;")
+        layout.addWidget(title)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Código CATMAT/CATSER ou parte da descrição...")
+        search_layout.addWidget(self.search_input)
+        self.search_button = QPushButton("Buscar")
+        self.search_button.setIcon(icon_manager.get_icon("find"))
+        search_layout.addWidget(self.search_button)
+        layout.addLayout(search_layout)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.catalog_table = create_readonly_table(self.CATALOGO_HEADERS)
+        splitter.addWidget(self.catalog_table)
+
+        history_container = QWidget()
+        history_layout = QVBoxLayout(history_container)
+        history_layout.setContentsMargins(0, 0, 0, 0)
+        self.history_label = QLabel("Selecione um item para ver o que já foi pago por ele.")
+        history_layout.addWidget(self.history_label)
+        self.history_table = create_readonly_table(self.HISTORICO_HEADERS)
+        history_layout.addWidget(self.history_table)
+        splitter.addWidget(history_container)
+        layout.addWidget(splitter)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #888; font-size: 11px;")
+        layout.addWidget(self.status_label)
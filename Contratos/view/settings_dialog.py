@@ -6,13 +6,14 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from utils.icon_loader import icon_manager
+from utils.worker_dialog import WorkerDialogMixin
 
 
-class SettingsDialog(QDialog):
+class SettingsDialog(WorkerDialogMixin, QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Configurações")
-        self.setFixedSize(500, 400)
+        self.setFixedSize(600, 440)
         
         self.main_layout = QVBoxLayout(self)
         
@@ -24,6 +25,20 @@ class SettingsDialog(QDialog):
         mode_layout.addWidget(mode_label)
         mode_layout.addWidget(self.mode_button)
         self.main_layout.addLayout(mode_layout)
+
+        # ==================== SERVIDOR ESPELHO (REDE LOCAL) ====================
+        mirror_layout = QHBoxLayout()
+        mirror_label = QLabel("Servidor Espelho:")
+        self.mirror_url_input = QLineEdit()
+        self.mirror_url_input.setPlaceholderText("Ex: http://192.168.0.10:8000 (vazio = direto na API pública)")
+        self.mirror_url_input.setToolTip("Máquina da rede rodando o app.py; se não responder, a API pública é usada")
+        mirror_layout.addWidget(mirror_label)
+        mirror_layout.addWidget(self.mirror_url_input)
+        self.sync_status_button = QPushButton("Sincronizar Status")
+        self.sync_status_button.setIcon(icon_manager.get_icon("synchronize"))
+        self.sync_status_button.setToolTip("Troca com o servidor só os status, registros, links e fiscalizações alterados")
+        mirror_layout.addWidget(self.sync_status_button)
+        self.main_layout.addLayout(mirror_layout)
         
         # ==================== ✅ LOCAL DO BANCO DE DADOS (DARK MODE) ====================
         db_path_group = QGroupBox("Local do Banco de Dados")
@@ -89,7 +104,7 @@ class SettingsDialog(QDialog):
         offline_layout.addWidget(offline_label)
         
         self.offline_uasg_input = QLineEdit()
-        self.offline_uasg_input.setPlaceholderText("Digite a UASG para baixar ou deletar (Ex: 787010)")
+        self.offline_uasg_input.setPlaceholderText("UASG(s) para baixar ou deletar (Ex: 787010, 787000; vazio = todas as salvas)")
         offline_layout.addWidget(self.offline_uasg_input)
         
         offline_buttons_layout = QHBoxLayout()
@@ -102,8 +117,14 @@ class SettingsDialog(QDialog):
         self.delete_db_button.setIcon(icon_manager.get_icon("delete"))
         self.delete_db_button.setObjectName("header_button")  # ✅ Usa o estilo do tema
         
+        self.documents_button = QPushButton("Documentos Locais")
+        self.documents_button.setIcon(icon_manager.get_icon("download-pdf"))
+        self.documents_button.setToolTip("Baixar os PDFs dos contratos para consulta sem internet")
+        self.documents_button.setObjectName("header_button")  # ✅ Usa o estilo do tema
+        
         offline_buttons_layout.addWidget(self.create_db_button)
         offline_buttons_layout.addWidget(self.delete_db_button)
+        offline_buttons_layout.addWidget(self.documents_button)
         offline_layout.addLayout(offline_buttons_layout)
         
         self.main_layout.addWidget(offline_group)
@@ -4,15 +4,27 @@
 
 import sqlite3
 import json
+import time
 from typing import List, Optional
 import os
 import sys
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
 import uvicorn
 
+from utils.sql_profiler import sql_profiler
+from Contratos.model.espelho_model import MirrorCache
+from Contratos.model.change_feed_model import ChangeFeed, LOTE_PADRAO
+
+# Endpoint de métricas SQL é opcional: só existe com CA360_METRICS=1
+METRICS_ENABLED = os.environ.get("CA360_METRICS", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Espelho do comprasnet: validade das cópias e intervalo da atualização agendada (0 = só sob demanda)
+ESPELHO_VALIDADE_MIN = float(os.environ.get("CA360_ESPELHO_VALIDADE_MIN", "15"))
+ESPELHO_ATUALIZAR_MIN = float(os.environ.get("CA360_ESPELHO_ATUALIZAR_MIN", "0"))
+
 # --- 1. Lógica de Caminho Portátil (Seu código) ---
 # Esta função garante que a aplicação encontre seus arquivos,
 # seja rodando como script ou como um executável (PyInstaller).
@@ -45,7 +57,7 @@ print(f"API irá usar o banco de dados em: {DB_PATH}")
 
 def _get_db_connection():
     """Cria e retorna uma conexão com o banco de dados SQLite."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sql_profiler.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -230,6 +242,105 @@ def get_contratos_raw_by_uasg(uasg_code: str):
         raise HTTPException(status_code=404, detail=f"Nenhum contrato encontrado para a UASG {uasg_code}")
     return data
 
+# ------------------------------------------- Espelho do comprasnet (rede local) -----------------------------------------------------------
+# Os clientes trocam https://contratos.comprasnet.gov.br/api/<caminho> por http://<servidor>:8000/api/espelho/<caminho>
+espelho = MirrorCache(DB_PATH, validade_segundos=ESPELHO_VALIDADE_MIN * 60)
+
+def _resposta_espelho(caminho: str, request: Request):
+    """Resposta do espelho com ETag; devolve 304 se o cliente já tiver essa versão."""
+    try:
+        entrada = espelho.get(caminho)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Falha ao consultar o comprasnet: {e}")
+
+    idade = max(0, int(time.time() - entrada.buscado_em))
+    headers = {
+        "ETag": entrada.etag,
+        "Cache-Control": f"max-age={max(0, int(espelho.validade_segundos) - idade)}",
+        "X-Espelho": entrada.origem,
+        "Age": str(idade),
+    }
+    etags_cliente = [e.strip() for e in request.headers.get("if-none-match", "").split(",")]
+    if entrada.etag in etags_cliente or "*" in etags_cliente:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entrada.corpo, media_type="application/json", headers=headers)
+
+@app.get("/api/espelho/contrato/ug/{uasg_code}", tags=["Espelho"],
+         summary="Contratos da UASG (cópia da API pública, atualizada sob demanda)")
+def espelho_contratos_uasg(uasg_code: str, request: Request):
+    return _resposta_espelho(f"contrato/ug/{uasg_code}", request)
+
+@app.get("/api/espelho/contrato/{contrato_id}/{recurso}", tags=["Espelho"],
+         summary="Sub-recurso do contrato (historico, empenhos, itens, arquivos, ...)")
+def espelho_sub_recurso(contrato_id: str, recurso: str, request: Request):
+    return _resposta_espelho(f"contrato/{contrato_id}/{recurso}", request)
+
+@app.get("/api/espelho/status", tags=["Espelho"], summary="Acertos, buscas no comprasnet e cópias guardadas")
+def espelho_status():
+    return espelho.stats()
+
+@app.on_event("startup")
+def _iniciar_atualizacao_espelho():
+    if ESPELHO_ATUALIZAR_MIN > 0:
+        espelho.start_scheduler(ESPELHO_ATUALIZAR_MIN * 60)
+
+@app.on_event("shutdown")
+def _parar_atualizacao_espelho():
+    espelho.stop_scheduler()
+
+# ------------------------------------------- Change feed dos status (sincronização entre máquinas) -----------------------------------------------------------
+# As máquinas enviam as alterações de status/registros/links/fiscalização (POST) e recebem as das outras (GET)
+change_feed = ChangeFeed(DB_PATH)
+
+class ChangeFeedPush(BaseModel):
+    origem: str
+    changes: List[dict]
+
+@app.get("/api/sync/changes", tags=["Sincronização"], summary="Alterações de status com seq maior que 'desde'")
+def get_sync_changes(desde: int = 0, limite: int = LOTE_PADRAO, excluir_origem: Optional[str] = None):
+    """Página do change log; 'mais' indica que há outra página a partir de 'ultimo_seq'."""
+    return change_feed.changes_since(desde, max(1, min(limite, 5000)), excluir_origem=excluir_origem)
+
+@app.post("/api/sync/changes", tags=["Sincronização"], summary="Recebe as alterações de uma máquina")
+def post_sync_changes(payload: ChangeFeedPush):
+    if any(change.get("origem") != payload.origem for change in payload.changes):
+        raise HTTPException(status_code=400, detail="Todas as alterações devem ser da máquina de origem.")
+    try:
+        return change_feed.apply(payload.changes)
+    except (KeyError, TypeError, sqlite3.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Alterações inválidas: {e}")
+
+# ------------------------------------------- Métricas SQL (opcional) -----------------------------------------------------------
+if METRICS_ENABLED:
+    if not sql_profiler.enabled:
+        sql_profiler.enable()
+
+    @app.middleware("http")
+    async def sql_operation_middleware(request: Request, call_next):
+        """Cada requisição vira uma 'operação' no perfil de consultas."""
+        # Rotas síncronas rodam no threadpool, que copia o contexto atual
+        with sql_profiler.operation(f"api {request.method} {request.url.path}"):
+            return await call_next(request)
+
+    def _ensure_local_client(request: Request):
+        host = request.client.host if request.client else ""
+        if host not in ("127.0.0.1", "::1", "localhost", "testclient"):
+            raise HTTPException(status_code=403, detail="Métricas disponíveis apenas localmente.")
+
+    @app.get("/api/metrics/sql", tags=["Métricas"], summary="Contagem e tempo de consultas por operação")
+    def get_sql_metrics(request: Request):
+        """Resumo por operação, operações recentes e log de consultas lentas (com EXPLAIN QUERY PLAN)."""
+        _ensure_local_client(request)
+        return sql_profiler.snapshot()
+
+    @app.delete("/api/metrics/sql", status_code=204, tags=["Métricas"])
+    def reset_sql_metrics(request: Request):
+        _ensure_local_client(request)
+        sql_profiler.reset()
+        return
+
 # --- 6. Ponto de Entrada para Executar o Servidor ---
 
 if __name__ == '__main__':
@@ -240,7 +351,13 @@ if __name__ == '__main__':
 Resumo
 Acesse http://127.0.0.1:8000/api/status para ver seus dados.
 Acesse http://127.0.0.1:8000/api/contratos/raw/{uasg_code} para ver seus dados.
+Como espelho da rede local: uvicorn app:app --host 0.0.0.0 --port 8000 e, nas outras máquinas,
+informe http://<ip-desta-máquina>:8000 em Configurações > Servidor Espelho.
+Acesse http://127.0.0.1:8000/api/espelho/contrato/ug/{uasg_code} para a cópia da API pública (com ETag).
+Com CA360_ESPELHO_ATUALIZAR_MIN=30 as cópias vencidas são atualizadas a cada 30 minutos.
+O mesmo servidor sincroniza os status entre as máquinas (Configurações > Sincronizar Status), via /api/sync/changes.
 Acesse http://127.0.0.1:8000/docs para ver a documentação interativa e testar a API.
+Com CA360_METRICS=1, acesse http://127.0.0.1:8000/api/metrics/sql (somente local) para ver as métricas de SQL.
 O próximo passo para seu portfólio é aprender a publicar (fazer o deploy) essa API em um serviço como a AWS.
 
 """
@@ -13,7 +13,12 @@ import json
 
 from atas.model.atas_model import AtasModel
 from atas.model.atas_model import Base, engine
+from atas.model.atas_table_model import dias_style, status_style
+from atas.model.atas_documentos_model import ATA_DOCUMENTOS, ata_document_jobs
+from utils.docx_engine import DOCUMENT_TEMPLATES
+from utils.docx_worker import run_document_generation
 from utils.icon_loader import icon_manager 
+from utils.sql_profiler import sql_profiler
 from atas.view.ata_details_dialog import AtaDetailsDialog
 from atas.controller.controller_fiscal_ata import save_fiscalizacao_ata
 
@@ -330,12 +335,9 @@ class AtasController:
         font = item.font()
         font.setBold(True)
         item.setFont(font)
-        if isinstance(dias_restantes, int):
-            if dias_restantes < 0: item.setForeground(Qt.GlobalColor.red); item.setIcon(icon_manager.get_icon("head_skull"))
-            elif dias_restantes <= 89: item.setForeground(QBrush(QColor("#FFA500"))); item.setIcon(icon_manager.get_icon("alert"))
-            elif dias_restantes <= 179: item.setForeground(QBrush(QColor("#FFD700"))); item.setIcon(icon_manager.get_icon("mensagem"))
-            else: item.setForeground(QBrush(QColor("#32CD32"))); item.setIcon(icon_manager.get_icon("aproved"))
-        else: item.setForeground(QBrush(QColor("#AAAAAA"))); item.setIcon(icon_manager.get_icon("time"))
+        color, icon_name = dias_style(dias_restantes)
+        item.setForeground(QBrush(color))
+        item.setIcon(icon_manager.get_icon(icon_name))
         return item
 
     def load_initial_data(self):
@@ -343,31 +345,16 @@ class AtasController:
         if not self.model.db_initialized: # Não tenta carregar se o DB não está pronto
             return
         try:
-            atas = self.model.get_all_atas()
-            self.populate_table(atas)
-            self.populate_previsualization_table()
+            with sql_profiler.operation("atas_carregar"):
+                atas = self.model.get_all_atas()
+                self.populate_table(atas)
+                self.populate_previsualization_table()
         except Exception as e:
             QMessageBox.critical(self.view, "Erro", f"Não foi possível carregar os dados:\n{e}")
 
     def _get_status_style(self, status_text):
         """Retorna a cor e a fonte para um determinado status."""
-        status_styles = {
-            "SEÇÃO ATAS": (QColor("#FFFFFF"), QFont.Weight.Bold),
-            "ATA GERADA": (QColor(230, 230, 150), QFont.Weight.Bold),
-            "EMPRESA": (QColor(230, 230, 150), QFont.Weight.Bold),
-            "SIGDEM": (QColor(230, 180, 100), QFont.Weight.Bold),
-            "ASSINADO": (QColor(230, 180, 100), QFont.Weight.Bold),
-            "PUBLICADO": (QColor(135, 206, 250), QFont.Weight.Bold),
-            "PORTARIA": (QColor(230, 230, 150), QFont.Weight.Bold),
-            "PORT. MARINHA": (QColor(135, 206, 250), QFont.Weight.Bold), # NOVO STATUS
-            "ALERTA PRAZO": (QColor(255, 160, 160), QFont.Weight.Bold),
-            "NOTA TÉCNICA": (QColor(255, 160, 160), QFont.Weight.Bold),
-            "AGU": (QColor(255, 160, 160), QFont.Weight.Bold),
-            "PRORROGADO": (QColor(135, 206, 250), QFont.Weight.Bold),
-            "SIGAD" : (QColor(135, 206, 250), QFont.Weight.Bold),
-            "PLANILHA" : (QColor(50, 205, 50), QFont.Weight.Bold) # Novo STATUS
-        }
-        color, weight = status_styles.get(status_text, (QColor("#FFFFFF"), QFont.Weight.Normal))
+        color, weight = status_style(status_text)
         return QBrush(color), weight
 
     def import_data(self):
@@ -401,7 +388,7 @@ class AtasController:
         
         source_model = self.view.proxy_model.sourceModel()
         
-        pareceres_to_delete = [source_model.item(self.view.proxy_model.mapToSource(idx).row(), 6).text() for idx in selected_indexes]
+        pareceres_to_delete = [source_model.parecer_at(self.view.proxy_model.mapToSource(idx).row()) for idx in selected_indexes]
         
         for parecer in pareceres_to_delete:
             self.model.delete_ata(parecer)
@@ -426,50 +413,8 @@ class AtasController:
         return item
 
     def populate_table(self, atas: list):
-        model = self.view.table_model
-        model.clear()
-        #headers = ["Dias", "Número", "Ano", "Empresa", "Ata", "Objeto", "Status"]
-        headers = ["Dias", "Início", "Vencimento", "Pregão", "Ano", "Empresa", "Ata", "Objeto", "Status"]
-        model.setHorizontalHeaderLabels(headers)
-        today = date.today()
-        for ata in atas:
-            dias_restantes = "N/A"
-            termino_formatado = "N/A"
-            if ata.termino:
-                if ata.termino == "2000-01-01":
-                    dias_restantes = "AD"
-                    termino_formatado = "01/01/2000"
-                else:
-                    termino_date = self._parse_date_string(ata.termino)
-                    if termino_date:
-                        dias_restantes = (termino_date - today).days
-                        termino_formatado = termino_date.strftime("%d/%m/%Y")
-
-            vigencia_inicio = "N/A"
-            if getattr(ata, "celebracao", None):
-                inicio_date = self._parse_date_string(ata.celebracao)
-                if inicio_date:
-                    vigencia_inicio = inicio_date.strftime("%d/%m/%Y")
-
-            status_text = ata.status_info.status if ata.status_info else "SEÇÃO ATAS"
-            status_item = self._create_centered_item(status_text)
-            brush, weight = self._get_status_style(status_text)
-            status_item.setForeground(brush)
-            font = status_item.font()
-            font.setWeight(weight)
-            status_item.setFont(font)
-
-            model.appendRow([
-                self._create_dias_item(dias_restantes),         # 0 – Dias
-                self._create_centered_item(vigencia_inicio),    # 1 – Vigência Início
-                self._create_centered_item(termino_formatado),  # 2 – Vencimento
-                self._create_centered_item(ata.numero),         # 3 – Pregão
-                self._create_centered_item(ata.ano),            # 4 – Ano
-                self._create_centered_item(ata.empresa),        # 5 – Empresa
-                self._create_centered_item(ata.contrato_ata_parecer),  # 6 – Ata
-                self._create_centered_item(ata.objeto),         # 7 – Objeto
-                status_item                                      # 8 – Status
-            ])
+        # Um único reset do model; a formatação das células acontece sob demanda
+        self.view.table_model.set_atas(atas)
 
         # Configura as colunas
         header = self.view.table_view.horizontalHeader()
@@ -486,33 +431,59 @@ class AtasController:
     def show_details_on_double_click(self, index):
         source_index = self.view.proxy_model.mapToSource(index)
         row = source_index.row()
-        source_model = self.view.proxy_model.sourceModel()
-        
-        # Coluna 6 é onde o número da Ata (Parecer) está guardado
-        parecer_item = source_model.item(row, 6)
-        if not parecer_item: return
+        parecer = self.view.proxy_model.sourceModel().parecer_at(row)
+        if not parecer: return
         
-        ata_data = self.model.get_ata_by_parecer(parecer_item.text())
+        ata_data = self.model.get_ata_by_parecer(parecer)
         if ata_data:
             self.show_ata_details(ata_data)
         else:
-            QMessageBox.warning(self.view, "Erro", f"A ata '{parecer_item.text()}' não foi encontrada no banco de dados!")
+            QMessageBox.warning(self.view, "Erro", f"A ata '{parecer}' não foi encontrada no banco de dados!")
 
     def show_context_menu(self, position):
         index = self.view.table_view.indexAt(position)
         if not index.isValid(): return
         source_index = self.view.proxy_model.mapToSource(index)
-        parecer = self.view.proxy_model.sourceModel().item(source_index.row(), 6).text()
+        parecer = self.view.proxy_model.sourceModel().parecer_at(source_index.row())
         if not parecer: return
         
         menu = QMenu(self.view)
         ver_mais_action = menu.addAction(icon_manager.get_icon("init"), "Ver/Editar Detalhes")
         ver_mais_action.triggered.connect(lambda: self.show_details_on_double_click(index))
+
+        # Documentos .docx: para a ata clicada ou para todas as linhas selecionadas
+        pareceres = self._selected_pareceres() or [parecer]
+        rotulo = "Gerar Documento" if len(pareceres) == 1 else f"Gerar Documentos ({len(pareceres)} atas)"
+        documentos_menu = menu.addMenu(icon_manager.get_icon("word"), rotulo)
+        for template_key in ATA_DOCUMENTOS:
+            action = documentos_menu.addAction(DOCUMENT_TEMPLATES[template_key][1])
+            action.triggered.connect(lambda _=False, key=template_key: self.generate_documents(key, pareceres))
         menu.addSeparator()
         excluir_action = menu.addAction(icon_manager.get_icon("delete"), "Excluir esta ata")
         excluir_action.triggered.connect(lambda: self.delete_ata_by_parecer(parecer))
         menu.exec(self.view.table_view.mapToGlobal(position))
 
+    def _selected_pareceres(self):
+        """Pareceres das linhas selecionadas na tabela principal (na ordem exibida)."""
+        selection = self.view.table_view.selectionModel()
+        if selection is None:
+            return []
+        rows = sorted({index.row() for index in selection.selectedRows()})
+        table_model = self.view.proxy_model.sourceModel()
+        pareceres = []
+        for row in rows:
+            source_index = self.view.proxy_model.mapToSource(self.view.proxy_model.index(row, 0))
+            parecer = table_model.parecer_at(source_index.row())
+            if parecer:
+                pareceres.append(parecer)
+        return pareceres
+
+    def generate_documents(self, template_key, pareceres):
+        """Gera o documento .docx escolhido para uma ou várias atas."""
+        wanted = set(pareceres)
+        atas = [ata for ata in self.model.get_all_atas() if ata.contrato_ata_parecer in wanted]
+        run_document_generation(self.view, template_key, ata_document_jobs(atas))
+
     def update_ata_from_dialog(self, dialog):
         """Pega TODOS os dados da janela (Geral e Fiscal) e salva no banco."""
 
@@ -547,77 +518,20 @@ class AtasController:
     def update_table_row(self, parecer_value: str):
         """
         Atualiza dinamicamente uma única linha na tabela principal após a edição.
+        O model localiza a linha pelo índice de pareceres e emite dataChanged só para ela.
         """
         try:
-            # 1. Obter o modelo da tabela
-            model = self.view.table_model
-            
-            # 2. Obter os novos dados atualizados do banco
             updated_ata = self.model.get_ata_by_parecer(parecer_value)
             if not updated_ata:
                 print(f"Erro: Ata {parecer_value} não encontrada no banco. Recarregando tabela.")
                 self.load_initial_data()
                 return
 
-            # 3. Encontrar a linha (row) que precisa ser atualizada
-            # A coluna "Ata" (ID) é a [6]
-            column_to_check = 6 
-            row_to_update = -1
-            
-            for row in range(model.rowCount()):
-                item = model.item(row, column_to_check)
-                if item and item.text() == parecer_value:
-                    row_to_update = row
-                    break
-            
-            if row_to_update == -1:
+            if not self.view.table_model.update_ata(updated_ata):
                 print(f"Erro: Ata {parecer_value} não encontrada na tabela. Recarregando tabela.")
                 self.load_initial_data() # Segurança: se não achar, recarrega tudo
                 return
 
-            # 4. Preparar os dados formatados (lógica copiada do 'populate_table')
-            
-            # Col 0: Dias e Col 1: Vencimento
-            dias_restantes = "N/A"
-            termino_formatado = "N/A"
-            
-            if updated_ata.termino:
-                if updated_ata.termino == "2000-01-01":
-                    dias_restantes = "AD"
-                    termino_formatado = "01/01/2000"
-                else:
-                    termino_date = self._parse_date_string(updated_ata.termino)
-                    if termino_date:
-                        dias_restantes = (termino_date - date.today()).days
-                        termino_formatado = termino_date.strftime("%d/%m/%Y")
-            
-            vigencia_inicio = "N/A"
-            if getattr(updated_ata, "celebracao", None):
-                inicio_date = self._parse_date_string(updated_ata.celebracao)
-                if inicio_date:
-                    vigencia_inicio = inicio_date.strftime("%d/%m/%Y")
-            
-            # Col 8: Status
-            status_text = updated_ata.status # O AtaData já trata o "SEÇÃO ATAS"
-            status_item = self._create_centered_item(status_text)
-            brush, weight = self._get_status_style(status_text)
-            status_item.setForeground(brush)
-            font = status_item.font()
-            font.setWeight(weight)
-            status_item.setFont(font)
-            
-            # 5. Atualizar CADA CÉLULA daquela linha
-            model.setItem(row_to_update, 0, self._create_dias_item(dias_restantes))
-            model.setItem(row_to_update, 1, self._create_centered_item(vigencia_inicio))
-            model.setItem(row_to_update, 2, self._create_centered_item(termino_formatado))
-            model.setItem(row_to_update, 3, self._create_centered_item(updated_ata.numero))
-            model.setItem(row_to_update, 4, self._create_centered_item(updated_ata.ano))
-            model.setItem(row_to_update, 5, self._create_centered_item(updated_ata.empresa))
-            model.setItem(row_to_update, 6, self._create_centered_item(updated_ata.contrato_ata_parecer)) # A própria ID
-            model.setItem(row_to_update, 7, self._create_centered_item(updated_ata.objeto))
-            model.setItem(row_to_update, 8, status_item)
-            
-            # 6. Log de sucesso (o que você já estava vendo)
             print(f"✅ Linha da ata {parecer_value} atualizada na tabela.")
         
         except Exception as e:
@@ -719,16 +633,16 @@ class AtasController:
 
                 # Pega os links e valores, garantindo que não sejam None
                 parecer_val = ata.contrato_ata_parecer or ""
-                has_parecer_link = bool(ata.links and ata.links.serie_ata_link)
-                parecer_link = ata.links.serie_ata_link if has_parecer_link else ""
+                has_parecer_link = bool(ata.serie_ata_link)
+                parecer_link = ata.serie_ata_link if has_parecer_link else ""
 
                 termo_val = ata.termo_aditivo or ""
-                has_ta_link = bool(ata.links and ata.links.ta_link)
-                ta_link = ata.links.ta_link if has_ta_link else ""
+                has_ta_link = bool(ata.ta_link)
+                ta_link = ata.ta_link if has_ta_link else ""
 
                 portaria_val = ata.portaria_fiscalizacao or ""
-                has_portaria_link = bool(ata.links and ata.links.portaria_link)
-                portaria_link = ata.links.portaria_link if has_portaria_link else ""
+                has_portaria_link = bool(ata.portaria_link)
+                portaria_link = ata.portaria_link if has_portaria_link else ""
 
                 data_celebracao_excel = self._parse_date_string(ata.celebracao)
                 data_termino_excel = self._parse_date_string(ata.termino)
@@ -840,8 +754,8 @@ class AtasController:
             # Inserção dos dados solicitados
             for ata in atas:
                 # Extração segura dos links
-                link_ata = ata.links.serie_ata_link if ata.links and getattr(ata.links, 'serie_ata_link', None) else "Sem link"
-                link_portaria = ata.links.portaria_link if ata.links and getattr(ata.links, 'portaria_link', None) else "Sem link"
+                link_ata = ata.serie_ata_link or "Sem link"
+                link_portaria = ata.portaria_link or "Sem link"
 
                 # Formatação de datas para o Excel reconhecer (YYYY-MM-DD)
                 # O BI lida melhor com formatos padronizados.
@@ -854,7 +768,7 @@ class AtasController:
                     ata.empresa or "",
                     ata.contrato_ata_parecer or "", 
                     ata.objeto or "",
-                    ata.status_info.status or "", 
+                    ata.status or "", 
                     celebracao,
                     termino,
                     ata.termo_aditivo or "", 
@@ -980,7 +894,7 @@ class AtasController:
             # Guarda o parecer como identificador único
             parecer_item.setData(ata.contrato_ata_parecer, Qt.ItemDataRole.UserRole)
 
-            status_text = ata.status_info.status if ata.status_info else "SEÇÃO ATAS"
+            status_text = ata.status
             status_item = self._create_centered_item(status_text)
             brush, weight = self._get_status_style(status_text)
             status_item.setForeground(brush)
@@ -88,6 +88,7 @@ def _save_fiscalizacao_to_db(model, parecer_value: str, data: Dict[str, str]):
         record.data_atualizacao = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
         
         db.commit()
+        model.invalidate_cache()
     except Exception:
         db.rollback()
         raise
@@ -0,0 +1,45 @@
+# atas/model/atas_documentos_model.py
+"""
+Mapeamento dos placeholders dos modelos .docx (utils/template) para os campos da ata.
+"""
+from datetime import datetime
+
+from utils.docx_engine import apply_field_map, formatar_valor, valor_por_extenso
+
+# Modelos que fazem sentido para uma ata
+ATA_DOCUMENTOS = ("ata", "autuacao", "checklist", "nota_tecnica", "cp_encaminhamento_agu")
+
+_CAMPOS_SIMPLES = ("setor", "modalidade", "numero", "ano", "empresa", "contrato_ata_parecer", "objeto",
+                   "celebracao", "termino", "observacoes", "portaria_fiscalizacao", "termo_aditivo", "nup",
+                   "cnpj", "status")
+
+ATA_FIELD_MAP = {
+    "nup": lambda a: a.nup,
+    "objeto": lambda a: a.objeto,
+    "objeto_completo": lambda a: a.objeto,
+    "tipo": lambda a: a.modalidade,
+    "numero": lambda a: a.numero,
+    "ano": lambda a: a.ano,
+    "num_pregao": lambda a: a.numero,
+    "ano_pregao": lambda a: a.ano,
+    "organizacao": lambda a: a.setor,
+    "cabecalho": lambda a: f"ATA DE REGISTRO DE PREÇOS Nº {a.contrato_ata_parecer}",
+    "valor_total": lambda a: formatar_valor(a.valor_global),
+    "valor_total_extenso": lambda a: valor_por_extenso(a.valor_global),
+    "hoje": lambda a: datetime.now().strftime("%d/%m/%Y"),
+}
+
+
+def ata_document_context(ata):
+    """Contexto do documento: campos da ata (AtaData ou objeto do ORM) + placeholders mapeados."""
+    base = {}
+    for campo in _CAMPOS_SIMPLES:
+        value = getattr(ata, campo, None)
+        if isinstance(value, (str, int, float)) and value != "":
+            base[campo] = str(value)
+    return apply_field_map(ATA_FIELD_MAP, ata, base)
+
+
+def ata_document_jobs(atas):
+    """[(chave, contexto)] com a chave sendo o número do parecer da ata."""
+    return [(ata.contrato_ata_parecer, ata_document_context(ata)) for ata in atas]
@@ -4,12 +4,14 @@ import os
 import json
 import pandas as pd
 from pathlib import Path
-from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey, inspect
-from sqlalchemy.orm import sessionmaker, declarative_base, relationship, joinedload
+from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey, inspect, case
+from sqlalchemy.orm import sessionmaker, declarative_base, relationship, selectinload
 from datetime import datetime
 import sqlite3
 import uuid as uuid_pkg
 
+from utils.sql_profiler import sql_profiler
+
 # Define o caminho base
 try:
     base_dir = Path(os.environ.get("_MEIPASS", Path.cwd()))
@@ -132,49 +134,87 @@ class Ata(Base):
     registros = relationship("RegistroAta", back_populates="ata", cascade="all, delete-orphan")
     fiscalizacao_info = relationship("FiscalizacaoAta", uselist=False, back_populates="ata", cascade="all, delete-orphan")
 
+DEFAULT_STATUS = "SEÇÃO ATAS"
+
+# Vencimento normalizado para ordenação no SQL: datas ISO (AAAA-MM-DD) ordenam como texto;
+# vazias ou fora do padrão vão para o início (mesmo efeito do antigo datetime.min)
+TERMINO_ORDEM = case((Ata.termino.op("GLOB")("[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*"), Ata.termino), else_="")
+
+_FISCAL_FIELDS = (
+    "gestor", "gestor_substituto", "fiscal_tecnico", "fiscal_tec_substituto",
+    "fiscal_administrativo", "fiscal_admin_substituto", "observacoes", "data_criacao", "data_atualizacao",
+)
+
+# Colunas lidas em lote pelo snapshot (uma linha por ata, já com status e links)
+_ATA_ROW_COLUMNS = (
+    Ata.id, Ata.setor, Ata.modalidade, Ata.numero, Ata.ano, Ata.empresa, Ata.contrato_ata_parecer,
+    Ata.objeto, Ata.celebracao, Ata.termino, Ata.observacoes, Ata.portaria_fiscalizacao,
+    Ata.termo_aditivo, Ata.nup, Ata.cnpj, Ata.valor_global,
+    StatusAta.ata_parecer, StatusAta.status,
+    LinksAta.ata_parecer, LinksAta.serie_ata_link, LinksAta.portaria_link, LinksAta.ta_link,
+    LinksAta.portal_licitacoes_link,
+)
+
+
+def _fiscalizacao_dict(values):
+    return {field: value or "" for field, value in zip(_FISCAL_FIELDS, values)}
+
+
 class AtaData:
-    def __init__(self, ata_db_object):
-        self.id = ata_db_object.id
-        self.setor = ata_db_object.setor
-        self.modalidade = ata_db_object.modalidade
-        self.numero = ata_db_object.numero
-        self.ano = ata_db_object.ano
-        self.empresa = ata_db_object.empresa
-        self.contrato_ata_parecer = ata_db_object.contrato_ata_parecer
-        self.objeto = ata_db_object.objeto
-        self.celebracao = ata_db_object.celebracao
-        self.termino = ata_db_object.termino
-        self.observacoes = ata_db_object.observacoes
-        self.portaria_fiscalizacao = ata_db_object.portaria_fiscalizacao
-        self.termo_aditivo = ata_db_object.termo_aditivo
-        self.nup = ata_db_object.nup
-        self.cnpj = getattr(ata_db_object, 'cnpj', '') or ""
-        self.valor_global = getattr(ata_db_object, 'valor_global', '') or ""
-        self.status = ata_db_object.status_info.status if ata_db_object.status_info else "SEÇÃO ATAS"
-        self.registros = [reg.texto for reg in ata_db_object.registros] if ata_db_object.registros else []
-        self.serie_ata_link = ata_db_object.links.serie_ata_link if ata_db_object.links else ""
-        self.portaria_link = ata_db_object.links.portaria_link if ata_db_object.links else ""
-        self.ta_link = ata_db_object.links.ta_link if ata_db_object.links else ""
-        self.portal_licitacoes_link = ata_db_object.links.portal_licitacoes_link if ata_db_object.links else ""
-
-        self.fiscalizacao = None
-        if ata_db_object.fiscalizacao_info:
-            f = ata_db_object.fiscalizacao_info
-            self.fiscalizacao = {
-                "gestor": f.gestor or "",
-                "gestor_substituto": f.gestor_substituto or "",
-                "fiscal_tecnico": f.fiscal_tecnico or "",
-                "fiscal_tec_substituto": f.fiscal_tec_substituto or "",
-                "fiscal_administrativo": f.fiscal_administrativo or "",
-                "fiscal_admin_substituto": f.fiscal_admin_substituto or "",
-                "observacoes": f.observacoes or "",
-                "data_criacao": f.data_criacao or "",
-                "data_atualizacao": f.data_atualizacao or ""
-            }
+    """Dados de uma ata já desacoplados da sessão (tabelas, relatórios e diálogos)."""
+
+    __slots__ = (
+        "id", "setor", "modalidade", "numero", "ano", "empresa", "contrato_ata_parecer", "objeto",
+        "celebracao", "termino", "observacoes", "portaria_fiscalizacao", "termo_aditivo", "nup",
+        "cnpj", "valor_global", "status", "registros", "serie_ata_link", "portaria_link", "ta_link",
+        "portal_licitacoes_link", "fiscalizacao",
+    )
+
+    @classmethod
+    def from_row(cls, row, registros=None, fiscalizacao=None):
+        """Monta a ata a partir de uma linha de _ATA_ROW_COLUMNS."""
+        self = cls.__new__(cls)
+        (self.id, self.setor, self.modalidade, self.numero, self.ano, self.empresa,
+         self.contrato_ata_parecer, self.objeto, self.celebracao, self.termino, self.observacoes,
+         self.portaria_fiscalizacao, self.termo_aditivo, self.nup, cnpj, valor_global,
+         status_key, status, links_key, serie_ata_link, portaria_link, ta_link, portal_link) = row
+
+        self.cnpj = cnpj or ""
+        self.valor_global = valor_global or ""
+        self.status = status if status_key is not None else DEFAULT_STATUS
+        self.registros = registros or []
+
+        has_links = links_key is not None
+        self.serie_ata_link = serie_ata_link if has_links else ""
+        self.portaria_link = portaria_link if has_links else ""
+        self.ta_link = ta_link if has_links else ""
+        self.portal_licitacoes_link = portal_link if has_links else ""
+        self.fiscalizacao = fiscalizacao
+        return self
+
+    @classmethod
+    def from_orm(cls, ata_db_object):
+        """Monta a ata a partir do objeto ORM (relacionamentos devem estar carregados)."""
+        status_info, links, fiscal = ata_db_object.status_info, ata_db_object.links, ata_db_object.fiscalizacao_info
+        row = tuple(getattr(ata_db_object, column.key) for column in _ATA_ROW_COLUMNS[:16]) + (
+            status_info.ata_parecer if status_info else None,
+            status_info.status if status_info else None,
+            links.ata_parecer if links else None,
+            links.serie_ata_link if links else None,
+            links.portaria_link if links else None,
+            links.ta_link if links else None,
+            links.portal_licitacoes_link if links else None,
+        )
+        registros = [reg.texto for reg in ata_db_object.registros]
+        fiscalizacao = _fiscalizacao_dict(getattr(fiscal, f) for f in _FISCAL_FIELDS) if fiscal else None
+        return cls.from_row(row, registros, fiscalizacao)
 
 class AtasModel:
     def __init__(self):
         self.db_initialized = False # Flag para indicar se o DB foi inicializado com sucesso
+        # Snapshot das atas compartilhado por tabela, pré-visualização e relatórios
+        self._snapshot = None
+        self._snapshot_key = None
         self._initialize_db()
 
     def _initialize_db(self):
@@ -226,6 +266,56 @@ class AtasModel:
     def get_current_db_path(self):
         return DB_PATH
 
+    # ==================== SNAPSHOT (CACHE DE LEITURA) ====================
+    def invalidate_cache(self):
+        """Descarta o snapshot das atas (chamado após qualquer escrita)."""
+        self._snapshot = None
+        self._snapshot_key = None
+
+    def _snapshot_fingerprint(self):
+        # Escritas de outros processos/usuários (DB em pasta compartilhada) mudam mtime/tamanho do arquivo
+        try:
+            stat = os.stat(DB_PATH)
+            return (str(DB_PATH), stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _load_snapshot(self, session):
+        """Lê todas as atas em 3 consultas (atas+status+links, registros, fiscalização)."""
+        rows = (
+            session.query(*_ATA_ROW_COLUMNS)
+            .outerjoin(StatusAta, StatusAta.ata_parecer == Ata.contrato_ata_parecer)
+            .outerjoin(LinksAta, LinksAta.ata_parecer == Ata.contrato_ata_parecer)
+            .order_by(TERMINO_ORDEM, Ata.id)
+            .all()
+        )
+
+        registros = {}
+        for parecer, texto in session.query(RegistroAta.ata_parecer, RegistroAta.texto).order_by(RegistroAta.id):
+            registros.setdefault(parecer, []).append(texto)
+
+        fiscal_columns = [getattr(FiscalizacaoAta, f) for f in _FISCAL_FIELDS]
+        fiscalizacoes = {
+            row[0]: _fiscalizacao_dict(row[1:])
+            for row in session.query(FiscalizacaoAta.ata_parecer, *fiscal_columns)
+        }
+
+        return tuple(
+            AtaData.from_row(row, registros.get(row[6]), fiscalizacoes.get(row[6]))
+            for row in rows
+        )
+
+    def _get_snapshot(self):
+        fingerprint = self._snapshot_fingerprint()
+        if self._snapshot is None or fingerprint != self._snapshot_key:
+            session = self._get_session()
+            try:
+                self._snapshot = self._load_snapshot(session)
+                self._snapshot_key = fingerprint
+            finally:
+                session.close()
+        return self._snapshot
+
     def change_database_path(self, new_folder_path: str):
         global engine, SessionLocal, DB_PATH, DATABASE_URL
 
@@ -241,6 +331,7 @@ class AtasModel:
             engine.dispose()
 
             DB_PATH = new_path_obj
+            self.invalidate_cache()
             DATABASE_URL = f"sqlite:///{DB_PATH}"
 
             engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
@@ -263,7 +354,7 @@ class AtasModel:
     def export_main_data_to_json(self):
         """Exporta os dados principais (tabela 'atas') direto via sqlite3, compatível com bancos antigos."""
         try:
-            conn = sqlite3.connect(DB_PATH)
+            conn = sql_profiler.connect(DB_PATH)
             cursor = conn.cursor()
 
             # --- Obtém colunas disponíveis no banco ---
@@ -293,7 +384,7 @@ class AtasModel:
     def export_complementary_data_to_json(self):
         """Exporta as tabelas complementares via sqlite3 (status_atas, registros_atas e links_ata)."""
         try:
-            conn = sqlite3.connect(DB_PATH)
+            conn = sql_profiler.connect(DB_PATH)
             cursor = conn.cursor()
             data = {}
 
@@ -368,6 +459,7 @@ class AtasModel:
                 session.add(new_ata)
 
             session.commit()
+            self.invalidate_cache()
             return True, f"{len(data)} atas principais importadas com sucesso."
         except Exception as e:
             session.rollback()
@@ -444,6 +536,7 @@ class AtasModel:
                     print(f"Aviso: Ata '{record['ata_parecer']}' não encontrada para fiscalização. Ignorando.")
 
             session.commit()
+            self.invalidate_cache()
             return True, f"{imported_count} dados complementares importados com sucesso."
         except Exception as e:
             session.rollback()
@@ -453,28 +546,23 @@ class AtasModel:
             session.close()
 
     def get_all_atas(self):
-        session = self._get_session() 
+        """Retorna todas as atas (AtaData) ordenadas pelo vencimento."""
         try:
-            atas = session.query(Ata).options(
-                joinedload(Ata.links), 
-                joinedload(Ata.status_info)
-            ).all()
-            atas_ordenadas = sorted(
-                atas, 
-                key=lambda x: datetime.strptime(x.termino, '%Y-%m-%d') if x.termino else datetime.min
-            )
-            return atas_ordenadas
+            return list(self._get_snapshot())
         except Exception as e:
             print(f"Erro ao carregar atas: {e}")
             return []
-        finally:
-            session.close()
 
     def get_ata_by_parecer(self, parecer_value):
         session = self._get_session() 
         try:
-            ata = session.query(Ata).filter(Ata.contrato_ata_parecer == parecer_value).first()
-            return AtaData(ata) if ata else None
+            ata = session.query(Ata).options(
+                selectinload(Ata.status_info),
+                selectinload(Ata.links),
+                selectinload(Ata.registros),
+                selectinload(Ata.fiscalizacao_info),
+            ).filter(Ata.contrato_ata_parecer == parecer_value).first()
+            return AtaData.from_orm(ata) if ata else None
         finally:
             session.close()
 
@@ -486,6 +574,7 @@ class AtasModel:
             nova_ata = Ata(**filtered_data)
             session.add(nova_ata)
             session.commit()
+            self.invalidate_cache()
             return True
         except Exception as e:
             print(f"Erro ao adicionar ata: {e}")
@@ -501,6 +590,7 @@ class AtasModel:
             if ata:
                 session.delete(ata)
                 session.commit()
+                self.invalidate_cache()
                 return True
             return False
         finally:
@@ -547,6 +637,7 @@ class AtasModel:
                         session.add(RegistroAta(ata_parecer=parecer_value, texto=texto))
 
                 session.commit()
+                self.invalidate_cache()
                 return True
             return False
         except Exception as e:
@@ -582,6 +673,7 @@ class AtasModel:
                     ata_obj = Ata(**valid_record)
                     session.add(ata_obj)
                 session.commit()
+                self.invalidate_cache()
                 return True, f"{len(df)} registros importados com sucesso."
             except Exception as e:
                 session.rollback()
@@ -592,20 +684,12 @@ class AtasModel:
             return False, f"Erro ao ler o arquivo: {e}"
 
     def get_atas_with_status_not_default(self):
-        session = self._get_session() 
+        """Atas com status diferente do padrão, na mesma ordem do snapshot."""
         try:
-            atas_com_status = session.query(Ata).join(Ata.status_info).filter(
-                StatusAta.status != 'SEÇÃO ATAS'
-            ).options(
-                joinedload(Ata.status_info)
-            ).all()
-            atas_ordenadas = sorted(
-                atas_com_status,
-                key=lambda x: datetime.strptime(x.termino, '%Y-%m-%d') if x.termino else datetime.min
-            )
-            return atas_ordenadas
+            return [
+                ata for ata in self._get_snapshot()
+                if ata.status is not None and ata.status != DEFAULT_STATUS
+            ]
         except Exception as e:
             print(f"Erro ao buscar atas com status: {e}")
             return []
-        finally:
-            session.close()
@@ -0,0 +1,191 @@
+# atas/model/atas_table_model.py
+from datetime import date, datetime
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtGui import QBrush, QColor, QFont
+
+from utils.icon_loader import icon_manager
+
+DEFAULT_STATUS = "SEÇÃO ATAS"
+DATA_ADMINISTRATIVA = "2000-01-01"  # Atas sem vencimento ("AD")
+
+HEADERS = ["Dias", "Início", "Vencimento", "Pregão", "Ano", "Empresa", "Ata", "Objeto", "Status"]
+COL_DIAS, COL_INICIO, COL_VENCIMENTO, COL_PREGAO, COL_ANO, COL_EMPRESA, COL_PARECER, COL_OBJETO, COL_STATUS = range(9)
+
+STATUS_STYLES = {
+    "SEÇÃO ATAS": (QColor("#FFFFFF"), QFont.Weight.Bold),
+    "ATA GERADA": (QColor(230, 230, 150), QFont.Weight.Bold),
+    "EMPRESA": (QColor(230, 230, 150), QFont.Weight.Bold),
+    "SIGDEM": (QColor(230, 180, 100), QFont.Weight.Bold),
+    "ASSINADO": (QColor(230, 180, 100), QFont.Weight.Bold),
+    "PUBLICADO": (QColor(135, 206, 250), QFont.Weight.Bold),
+    "PORTARIA": (QColor(230, 230, 150), QFont.Weight.Bold),
+    "PORT. MARINHA": (QColor(135, 206, 250), QFont.Weight.Bold), # NOVO STATUS
+    "ALERTA PRAZO": (QColor(255, 160, 160), QFont.Weight.Bold),
+    "NOTA TÉCNICA": (QColor(255, 160, 160), QFont.Weight.Bold),
+    "AGU": (QColor(255, 160, 160), QFont.Weight.Bold),
+    "PRORROGADO": (QColor(135, 206, 250), QFont.Weight.Bold),
+    "SIGAD" : (QColor(135, 206, 250), QFont.Weight.Bold),
+    "PLANILHA" : (QColor(50, 205, 50), QFont.Weight.Bold) # Novo STATUS
+}
+
+
+def status_style(status_text):
+    """Retorna a cor e o peso da fonte para um determinado status."""
+    return STATUS_STYLES.get(status_text, (QColor("#FFFFFF"), QFont.Weight.Normal))
+
+
+def dias_style(dias_restantes):
+    """Retorna (cor, nome do ícone) da coluna 'Dias' conforme o prazo restante."""
+    if isinstance(dias_restantes, int):
+        if dias_restantes < 0: return QColor(Qt.GlobalColor.red), "head_skull"
+        if dias_restantes <= 89: return QColor("#FFA500"), "alert"
+        if dias_restantes <= 179: return QColor("#FFD700"), "mensagem"
+        return QColor("#32CD32"), "aproved"
+    return QColor("#AAAAAA"), "time"
+
+
+def _parse_date_string(date_string):
+    if not date_string: return None
+    try:
+        return datetime.strptime(date_string, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        return None
+
+
+def _status_of(ata):
+    """Aceita tanto o objeto ORM (status_info) quanto o AtaData (status)."""
+    if hasattr(ata, "status_info"):
+        return ata.status_info.status if ata.status_info else DEFAULT_STATUS
+    return getattr(ata, "status", None) or DEFAULT_STATUS
+
+
+class AtasTableModel(QAbstractTableModel):
+    """
+    Model colunar da tabela principal de atas.
+    Guarda só os valores crus de cada coluna; datas e prazos são formatados
+    sob demanda (na primeira vez que a linha é exibida) e ficam em cache.
+    Mantém o índice 'contrato_ata_parecer -> linha' para atualizações O(1).
+    """
+
+    # Colunas cruas guardadas por linha (na ordem de _RAW_FIELDS)
+    _RAW_FIELDS = ("celebracao", "termino", "numero", "ano", "empresa", "contrato_ata_parecer", "objeto")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns = {field: [] for field in self._RAW_FIELDS}
+        self._status = []
+        self._formatted = []          # cache por linha: (dias, inicio, vencimento) ou None
+        self._row_by_parecer = {}
+        self._today = date.today()
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    # ==================== CARGA ====================
+    def set_atas(self, atas):
+        """Substitui todo o conteúdo da tabela (um único reset do model)."""
+        self.beginResetModel()
+        self._today = date.today()
+        self._columns = {field: [getattr(ata, field, None) for ata in atas] for field in self._RAW_FIELDS}
+        self._status = [_status_of(ata) for ata in atas]
+        self._formatted = [None] * len(self._status)
+        self._row_by_parecer = {}
+        for row, parecer in enumerate(self._columns["contrato_ata_parecer"]):
+            # Em caso de parecer repetido, mantém a primeira linha (mesmo comportamento da busca linear)
+            self._row_by_parecer.setdefault(parecer, row)
+        self.endResetModel()
+
+    def update_ata(self, ata):
+        """
+        Atualiza a linha da ata (localizada pelo parecer) e emite dataChanged só para ela.
+        Retorna False se a ata não estiver na tabela.
+        """
+        row = self._row_by_parecer.get(ata.contrato_ata_parecer)
+        if row is None:
+            return False
+        for field in self._RAW_FIELDS:
+            self._columns[field][row] = getattr(ata, field, None)
+        self._status[row] = _status_of(ata)
+        self._formatted[row] = None
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(HEADERS) - 1))
+        return True
+
+    def row_for_parecer(self, parecer):
+        return self._row_by_parecer.get(parecer, -1)
+
+    def parecer_at(self, row):
+        if 0 <= row < len(self._status):
+            return self._columns["contrato_ata_parecer"][row]
+        return None
+
+    # ==================== FORMATAÇÃO ====================
+    def _format_row(self, row):
+        cached = self._formatted[row]
+        if cached is not None:
+            return cached
+
+        dias_restantes, termino_formatado = "N/A", "N/A"
+        termino = self._columns["termino"][row]
+        if termino:
+            if termino == DATA_ADMINISTRATIVA:
+                dias_restantes, termino_formatado = "AD", "01/01/2000"
+            else:
+                termino_date = _parse_date_string(termino)
+                if termino_date:
+                    dias_restantes = (termino_date - self._today).days
+                    termino_formatado = termino_date.strftime("%d/%m/%Y")
+
+        vigencia_inicio = "N/A"
+        inicio_date = _parse_date_string(self._columns["celebracao"][row])
+        if inicio_date:
+            vigencia_inicio = inicio_date.strftime("%d/%m/%Y")
+
+        cached = self._formatted[row] = (dias_restantes, vigencia_inicio, termino_formatado)
+        return cached
+
+    def _display(self, row, column):
+        if column == COL_DIAS: return str(self._format_row(row)[0])
+        if column == COL_INICIO: return self._format_row(row)[1]
+        if column == COL_VENCIMENTO: return self._format_row(row)[2]
+        if column == COL_STATUS: return self._status[row]
+        field = self._RAW_FIELDS[column - 1]
+        value = self._columns[field][row]
+        return str(value)
+
+    # ==================== QAbstractTableModel ====================
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._status)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display(row, column)
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if column == COL_DIAS:
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QBrush(dias_style(self._format_row(row)[0])[0])
+            if role == Qt.ItemDataRole.DecorationRole:
+                return icon_manager.get_icon(dias_style(self._format_row(row)[0])[1])
+            if role == Qt.ItemDataRole.FontRole:
+                return self._bold_font
+        elif column == COL_STATUS:
+            color, weight = status_style(self._status[row])
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QBrush(color)
+            if role == Qt.ItemDataRole.FontRole:
+                font = QFont()
+                font.setWeight(weight)
+                return font
+        return None
@@ -5,6 +5,7 @@ from PyQt6.QtGui import QStandardItemModel
 from PyQt6.QtCore import Qt
 from utils.icon_loader import icon_manager
 from utils.utils import MultiColumnFilterProxyModel, setup_search_bar
+from atas.model.atas_table_model import AtasTableModel
 
 class AtasView(QWidget):
     def __init__(self, parent=None):
@@ -95,7 +96,7 @@ class AtasView(QWidget):
         table_layout.addLayout(toolbar_layout)
         self.table_view = QTableView()
         self.table_view.setStyleSheet("QTableView::item:selected { background-color: rgba(163, 213, 255, 0.4); }")
-        self.table_model = QStandardItemModel()
+        self.table_model = AtasTableModel()
         self.proxy_model = MultiColumnFilterProxyModel()
         self.proxy_model.setSourceModel(self.table_model)
         self.table_view.setModel(self.proxy_model)
@@ -201,14 +201,12 @@ class BackupModel:
 
     def perform_online_backup(self, email_dest, backup_contratos, backup_atas):
         """
-        Compacta os bancos de dados selecionados e os envia por e-mail.
+        Compacta os bancos de dados selecionados e os coloca na caixa de saída de e-mail.
         """
         db_contratos, db_atas = self.get_db_paths()
         today_str = datetime.now().strftime("%d-%m-%Y")
         zip_filename = f"Backup_CA360_{today_str}.zip"
         zip_path = Path(zip_filename)
-        # Limite de 25MB (em bytes)
-        MAX_SIZE = 25 * 1024 * 1024
         try:
             # 1. Criar o arquivo Zip
             with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
@@ -219,23 +217,27 @@ class BackupModel:
                     # Adiciona ao zip com a estrutura de pasta "Atas/"
                     zf.write(db_atas, arcname=f"Atas/atas_controle.db")
 
-            # 2. Verificar se algo foi adicionado e o tamanho do arquivo
+            # 2. Verificar se algo foi adicionado
             if not zip_path.exists() or zip_path.stat().st_size == 0:
                 return False, "Nenhum arquivo de banco de dados foi encontrado para o backup."
+            size_mb = zip_path.stat().st_size / (1024 * 1024)
 
-            if zip_path.stat().st_size > MAX_SIZE:
-                return False, (f"Erro: O arquivo de backup ({zip_path.stat().st_size // (1024*1024)}MB) "
-                               f"excede o limite de 25MB para envio por e-mail.")
-
-            # 3. Enviar o e-mail usando o EmailController existente
+            # 3. Colocar na caixa de saída; o envio segue em segundo plano, com novas tentativas.
+            #    Acima de 25MB o zip é dividido em partes (.001, .002, ...), uma por e-mail.
             email_controller = EmailController()
             subject = f"Backup CA 360 - {today_str}"
             body = "Backup dos bancos de dados (Contratos e/ou Atas) do sistema CA 360 em anexo."
-            success, message = email_controller.send_email(email_dest, subject, body, str(zip_path))
-            return success, message
+            success, message, job_ids = email_controller.queue_email(
+                email_dest, subject, body, str(zip_path), move_attachment=True
+            )
+            if not success:
+                return False, message
+            partes = f" em {len(job_ids)} partes" if len(job_ids) > 1 else ""
+            return True, (f"Backup ({size_mb:.1f}MB) colocado na fila de envio{partes} para {email_dest}.\n"
+                          "O envio continua em segundo plano e é repetido automaticamente em caso de falha.")
         except Exception as e:
             return False, f"Erro ao criar ou enviar o backup online: {e}"
         finally:
-            # 4. Limpar o arquivo .zip temporário
+            # 4. Limpar o arquivo .zip temporário (se ainda não foi movido para a fila)
             if zip_path.exists():
                 os.remove(zip_path)
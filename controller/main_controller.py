@@ -6,6 +6,8 @@ import time
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from PyQt6.QtCore import Qt, QTimer
 
+from utils.startup_tracer import startup_tracer
+
 class MainController:
     def __init__(self, view, base_dir):
         self.view = view
@@ -60,6 +62,9 @@ class MainController:
             loader()
             elapsed = time.perf_counter() - start_time
             logging.info("%s executado em %.2fs", loader.__name__, elapsed)
+            if startup_tracer.enabled:
+                # Módulos carregados sob demanda entram na mesma linha do tempo
+                startup_tracer.dump(self.base_dir)
             return True
         except KeyboardInterrupt:
             logging.warning("Inicialização interrompida por KeyboardInterrupt em %s", loader.__name__)
@@ -98,9 +103,11 @@ class MainController:
 
     def _load_contratos_module(self):
         """Carrega Contratos após a janela renderizar."""
-        from Contratos.controller.uasg_controller import UASGController
+        with startup_tracer.phase("contratos.import"):
+            from Contratos.controller.uasg_controller import UASGController
 
-        self.contratos_controller = UASGController(self.base_dir, self.view)
+        with startup_tracer.phase("contratos.UASGController"):
+            self.contratos_controller = UASGController(self.base_dir, self.view)
         self._contratos_index = self.view.stacked_widget.addWidget(self.contratos_controller.view)
         self._contratos_ready = True
         self._contratos_failed = False
@@ -108,13 +115,17 @@ class MainController:
 
     def _load_atas_module(self):
         """Carrega Atas de forma independente para manter responsividade."""
-        from atas.model.atas_model import AtasModel
-        from atas.view.atas_view import AtasView
-        from atas.controller.atas_controller import AtasController
-
-        self.atas_model = AtasModel()
-        self.atas_view = AtasView()
-        self.atas_controller = AtasController(self.atas_model, self.atas_view)
+        with startup_tracer.phase("atas.import"):
+            from atas.model.atas_model import AtasModel
+            from atas.view.atas_view import AtasView
+            from atas.controller.atas_controller import AtasController
+
+        with startup_tracer.phase("atas.AtasModel"):
+            self.atas_model = AtasModel()
+        with startup_tracer.phase("atas.AtasView"):
+            self.atas_view = AtasView()
+        with startup_tracer.phase("atas.AtasController"):
+            self.atas_controller = AtasController(self.atas_model, self.atas_view)
         self._atas_index = self.view.stacked_widget.addWidget(self.atas_view)
         self._atas_ready = True
         self._atas_failed = False
@@ -14,6 +14,11 @@
 import sys
 import os
 import logging
+
+# O rastreador precisa ser ativado antes dos demais imports para medi-los
+from utils.startup_tracer import startup_tracer
+startup_tracer.start_from_env()
+
 from PyQt6.QtWidgets import QApplication
 from utils.utils import resource_path
 
@@ -46,7 +51,12 @@ def setup_logging(base_dir):
 
 def setup_application():
     """Inicializa e executa a aplicação com a nova estrutura."""
-    app = QApplication(sys.argv)
+    with startup_tracer.phase("QApplication"):
+        app = QApplication(sys.argv)
+
+    # Decodifica os ícones mais usados em segundo plano enquanto a janela é montada
+    from utils.icon_loader import icon_manager
+    icon_manager.warm_up()
 
     if getattr(sys, 'frozen', False):
         base_dir = os.path.dirname(sys.executable)
@@ -61,31 +71,54 @@ def setup_application():
 
     # Importações tardias reduzem o custo de bootstrap do Python e evitam
     # travamentos longos durante import em ambientes como VSCode.
-    from view.main_shell_view import MainShellView
-    from controller.main_controller import MainController
+    with startup_tracer.phase("import_shell"):
+        from view.main_shell_view import MainShellView
+        from controller.main_controller import MainController
 
     # Carrega o estilo antes de criar a janela
     style_path = resource_path("utils/css/style.qss")
-    try:
-        with open(style_path, "r", encoding="utf-8") as f:
-            app.setStyleSheet(f.read())
-            #print(f"🎨 Estilo carregado de: {style_path}")
-    except FileNotFoundError:
-        print(f"AVISO: Arquivo de estilo não encontrado em '{style_path}'.")
+    with startup_tracer.phase("stylesheet"):
+        try:
+            with open(style_path, "r", encoding="utf-8") as f:
+                app.setStyleSheet(f.read())
+                #print(f"🎨 Estilo carregado de: {style_path}")
+        except FileNotFoundError:
+            print(f"AVISO: Arquivo de estilo não encontrado em '{style_path}'.")
 
     # 1. Cria a janela principal (Shell)
-    main_view = MainShellView()
+    with startup_tracer.phase("MainShellView"):
+        main_view = MainShellView()
     
     # 2. Cria o controlador principal, que gerencia os módulos
-    main_controller = MainController(main_view, base_dir)
+    with startup_tracer.phase("MainController"):
+        main_controller = MainController(main_view, base_dir)
     
     # 3. Inicia a aplicação
-    main_controller.run()
+    if startup_tracer.enabled:
+        def _dump_startup_trace():
+            startup_tracer.mark("icon_cache", **icon_manager.cache_stats())
+            trace_path = startup_tracer.dump(base_dir)
+            logging.info("Linha do tempo de inicialização gravada em %s", trace_path)
+        startup_tracer.watch_first_paint(main_view, on_painted=_dump_startup_trace)
+
+    with startup_tracer.phase("show"):
+        main_controller.run()
+
+    # E-mails que ficaram na caixa de saída são retomados depois que a janela abre
+    from PyQt6.QtCore import QTimer
+
+    def _resume_outbox():
+        from Contratos.controller.email_controller import resume_pending_outbox
+        resume_pending_outbox()
+    QTimer.singleShot(3000, _resume_outbox)
     
     sys.exit(app.exec())
     logging.info("Aplicação finalizada.")
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos da geração de documentos no executável (PyInstaller)
+    import multiprocessing
+    multiprocessing.freeze_support()
     logging.basicConfig(level=logging.INFO)
     try:
         setup_application()
@@ -0,0 +1,28 @@
+# scripts/build_icon_pack.py
+import sys
+import os
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.icon_loader import build_icon_pack, ICON_PACK_NAME
+
+
+def main():
+    """Gera utils/icons.pack a partir de utils/icons (rodar antes de empacotar o executável)."""
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    icons_dir = os.path.join(root, 'utils', 'icons')
+    output_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(root, 'utils', ICON_PACK_NAME)
+
+    if not os.path.isdir(icons_dir):
+        print(f"❌ Pasta de ícones não encontrada em: {icons_dir}")
+        return 1
+
+    total = build_icon_pack(icons_dir, output_path)
+    size_kb = os.path.getsize(output_path) / 1024
+    print(f"✅ {total} ícones empacotados em {output_path} ({size_kb:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+# utils/docx_engine.py
+"""
+Geração de documentos .docx a partir dos modelos de utils/template.
+
+Cada modelo é preparado uma única vez: os placeholders {{variavel}} que o Word
+quebra em vários trechos (runs) são reunidos com o python-docx, e as partes XML
+que contêm placeholders são compiladas pelo mesmo motor das mensagens
+(utils.template_engine). Gerar um documento passa a ser só substituir texto nas
+partes compiladas e regravar o zip — sem abrir o python-docx por documento —
+o que permite distribuir lotes grandes entre processos.
+"""
+import io
+import os
+import re
+import time
+import zipfile
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from utils.template_engine import PLACEHOLDER_RE, compile_template
+
+TEMPLATE_DIR = "utils/template"
+
+# Chave -> (arquivo, nome exibido)
+DOCUMENT_TEMPLATES = {
+    "ata": ("template_ata.docx", "Ata de Registro de Preços"),
+    "autuacao": ("template_autuacao.docx", "Termo de Autuação"),
+    "checklist": ("template_checklist.docx", "Lista de Verificação"),
+    "nota_tecnica": ("template_nota_tecnica.docx", "Nota Técnica"),
+    "cp_encaminhamento_agu": ("template_cp_encaminhamento_agu.docx", "CP de Encaminhamento à AGU"),
+}
+
+# Abaixo disso o custo de subir os processos não compensa
+PARALLEL_THRESHOLD = 24
+
+_XML_PART_RE = re.compile(r"word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$")
+_LINE_BREAK = '</w:t><w:br/><w:t xml:space="preserve">'
+
+
+def template_path(key):
+    """Caminho absoluto do modelo (respeita o empacotamento do PyInstaller)."""
+    from utils.utils import resource_path
+    return resource_path(os.path.join(TEMPLATE_DIR, DOCUMENT_TEMPLATES[key][0]))
+
+
+# ==================================== Preparação do modelo ====================================
+
+def _merge_split_placeholders(paragraph):
+    """Junta no primeiro run os placeholders que o Word dividiu entre vários runs."""
+    runs = paragraph.runs
+    if len(runs) < 2:
+        return
+    texts = [run.text for run in runs]
+    full = "".join(texts)
+    if "{{" not in full:
+        return
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text)
+
+    def run_at(char_index):
+        for i in range(len(runs) - 1, -1, -1):
+            if offsets[i] <= char_index and (texts[i] or i == 0):
+                return i
+        return 0
+
+    # De trás para frente: editar um placeholder não desloca os anteriores
+    for match in reversed(list(PLACEHOLDER_RE.finditer(full))):
+        first, last = run_at(match.start()), run_at(match.end() - 1)
+        if first == last:
+            continue
+        texts[first] = texts[first][:match.start() - offsets[first]] + match.group(0)
+        for i in range(first + 1, last):
+            texts[i] = ""
+        texts[last] = texts[last][match.end() - offsets[last]:]
+        for i in range(first, last + 1):
+            runs[i].text = texts[i]
+
+
+def _iter_paragraphs(container):
+    for paragraph in container.paragraphs:
+        yield paragraph
+    for table in getattr(container, "tables", []):
+        for row in table.rows:
+            for cell in row.cells:
+                yield from _iter_paragraphs(cell)
+
+
+def _normalized_docx_bytes(path):
+    import docx  # python-docx só é necessário na preparação do modelo
+
+    document = docx.Document(path)
+    containers = [document]
+    for section in document.sections:
+        containers.extend([section.header, section.footer, section.first_page_header,
+                           section.first_page_footer, section.even_page_header, section.even_page_footer])
+    for container in containers:
+        for paragraph in _iter_paragraphs(container):
+            _merge_split_placeholders(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class CompiledDocx:
+    """Modelo preparado: partes do zip sem placeholders (bytes) e partes XML compiladas."""
+
+    __slots__ = ("path", "entries", "variables")
+
+    def __init__(self, path, docx_bytes):
+        self.path = path
+        entries = []
+        variables = []
+        with zipfile.ZipFile(io.BytesIO(docx_bytes)) as zf:
+            for info in zf.infolist():
+                data = zf.read(info.filename)
+                if _XML_PART_RE.match(info.filename) and b"{{" in data:
+                    template = compile_template(data.decode("utf-8"))
+                    entries.append((info.filename, template))
+                    variables.extend(v for v in template.variables if v not in variables)
+                else:
+                    entries.append((info.filename, data))
+        self.entries = tuple(entries)
+        # Só nomes "limpos" (o que sobrar com marcação XML não é placeholder de verdade)
+        self.variables = tuple(v for v in variables if "<" not in v)
+
+    def render(self, context, out_path):
+        """Grava o documento preenchido. Retorna as variáveis sem valor no contexto."""
+        escaped = {key: _docx_escape(value) for key, value in context.items()}
+        tmp_path = out_path + ".tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, content in self.entries:
+                if isinstance(content, bytes):
+                    zf.writestr(name, content)
+                else:
+                    zf.writestr(name, content.render(escaped).encode("utf-8"))
+        os.replace(tmp_path, out_path)
+        return [name for name in self.variables if name not in context]
+
+
+def _docx_escape(value):
+    text = str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text.replace("\r\n", "\n").replace("\n", _LINE_BREAK)
+
+
+@lru_cache(maxsize=16)
+def _load_compiled(path, mtime_ns):
+    return CompiledDocx(path, _normalized_docx_bytes(path))
+
+
+def load_docx_template(path):
+    """Modelo compilado (em cache; recarrega se o arquivo for alterado)."""
+    path = os.path.abspath(path)
+    return _load_compiled(path, os.stat(path).st_mtime_ns)
+
+
+# ==================================== Valores ====================================
+
+_UNIDADES = ["zero", "um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito", "nove", "dez",
+             "onze", "doze", "treze", "quatorze", "quinze", "dezesseis", "dezessete", "dezoito", "dezenove"]
+_DEZENAS = ["", "", "vinte", "trinta", "quarenta", "cinquenta", "sessenta", "setenta", "oitenta", "noventa"]
+_CENTENAS = ["", "cento", "duzentos", "trezentos", "quatrocentos", "quinhentos", "seiscentos",
+             "setecentos", "oitocentos", "novecentos"]
+_ESCALAS = [("", ""), ("mil", "mil"), ("milhão", "milhões"), ("bilhão", "bilhões")]
+
+
+def parse_valor(value):
+    """Converte '1.234,56', 'R$ 1.234,56' ou 1234.56 em float (None se não for número)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = re.sub(r"[^0-9,.-]", "", str(value or ""))
+    if not text:
+        return None
+    if "," in text:
+        text = text.replace(".", "").replace(",", ".")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def formatar_valor(value):
+    """1234.5 -> 'R$ 1.234,50'."""
+    numero = parse_valor(value)
+    if numero is None:
+        return ""
+    return "R$ " + f"{numero:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _extenso_ate_mil(n):
+    if n == 100:
+        return "cem"
+    partes = []
+    if n >= 100:
+        partes.append(_CENTENAS[n // 100])
+        n %= 100
+    if n >= 20:
+        partes.append(_DEZENAS[n // 10])
+        n %= 10
+    if n or not partes:
+        partes.append(_UNIDADES[n])
+    return " e ".join(partes)
+
+
+def _inteiro_por_extenso(n):
+    if n == 0:
+        return "zero"
+    grupos = []
+    while n:
+        grupos.append(n % 1000)
+        n //= 1000
+    partes = []
+    for escala in range(len(grupos) - 1, -1, -1):
+        grupo = grupos[escala]
+        if not grupo:
+            continue
+        singular, plural = _ESCALAS[escala]
+        if escala == 1 and grupo == 1:
+            texto = "mil"
+        else:
+            texto = _extenso_ate_mil(grupo)
+            if escala:
+                texto += " " + (singular if grupo == 1 else plural)
+        partes.append((grupo, texto))
+    # "e" antes do último grupo quando ele é menor que 100 ou centena redonda
+    resultado = partes[0][1]
+    for grupo, texto in partes[1:]:
+        conector = " e " if grupo < 100 or grupo % 100 == 0 else ", "
+        resultado += conector + texto
+    return resultado
+
+
+def valor_por_extenso(value):
+    """1234.5 -> 'mil, duzentos e trinta e quatro reais e cinquenta centavos'."""
+    numero = parse_valor(value)
+    if numero is None:
+        return ""
+    centavos_total = int(round(abs(numero) * 100))
+    reais, centavos = divmod(centavos_total, 100)
+    partes = []
+    if reais:
+        texto = _inteiro_por_extenso(reais)
+        milhoes = reais >= 1_000_000 and reais % 1_000_000 == 0
+        partes.append(f"{texto} {'de ' if milhoes else ''}{'real' if reais == 1 else 'reais'}")
+    if centavos:
+        partes.append(f"{_inteiro_por_extenso(centavos)} {'centavo' if centavos == 1 else 'centavos'}")
+    return " e ".join(partes) or "zero reais"
+
+
+# ==================================== Mapeamento e nomes ====================================
+
+def apply_field_map(field_map, source, base=None):
+    """
+    Monta o contexto de um documento a partir de {placeholder: função(fonte)}.
+    Valores vazios/None não entram (o placeholder fica visível para o usuário preencher).
+    """
+    context = dict(base or {})
+    for placeholder, getter in field_map.items():
+        try:
+            value = getter(source)
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+            value = None
+        if value not in (None, ""):
+            context[placeholder] = str(value)
+    return context
+
+
+def output_file_name(template_key, record_key, extension="docx"):
+    """Nome determinístico: <modelo>_<chave do registro>.docx."""
+    slug = re.sub(r"[^0-9A-Za-z]+", "-", str(record_key)).strip("-") or "sem-chave"
+    return f"{template_key}_{slug}.{extension}"
+
+
+# ==================================== Geração (individual e em lote) ====================================
+
+def render_document(path, context, out_path):
+    """Gera um único documento. Retorna as variáveis sem valor."""
+    return load_docx_template(path).render(context, out_path)
+
+
+def _render_job(job):
+    # Executado nos processos do pool: cada processo compila o modelo uma vez (cache local)
+    path, context, out_path = job
+    return render_document(path, context, out_path)
+
+
+def generate_documents(template_key, jobs, output_dir, workers=None, progress_callback=None,
+                       should_cancel=None, path=None):
+    """
+    Gera um documento por item de jobs [(chave_do_registro, contexto), ...].
+    Lotes grandes são distribuídos em um pool de processos.
+    Retorna (success, mensagem, estatisticas).
+    """
+    inicio = time.perf_counter()
+    path = path or template_path(template_key)
+    try:
+        compiled = load_docx_template(path)  # valida o modelo antes de distribuir o trabalho
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        return False, f"Não foi possível carregar o modelo: {e}", {}
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [(path, context, os.path.join(output_dir, output_file_name(template_key, key)))
+             for key, context in jobs]
+    workers = workers if workers is not None else min(os.cpu_count() or 1, 8)
+    total = 0
+    unknown = set()
+    try:
+        if len(tasks) >= PARALLEL_THRESHOLD and workers > 1:
+            # 'spawn' em todas as plataformas: o processo principal tem threads do Qt
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                for missing in executor.map(_render_job, tasks, chunksize=chunksize):
+                    unknown.update(missing)
+                    total += 1
+                    if progress_callback:
+                        progress_callback(total)
+                    if should_cancel and should_cancel():
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        break
+        else:
+            for task in tasks:
+                if should_cancel and should_cancel():
+                    break
+                unknown.update(compiled.render(task[1], task[2]))
+                total += 1
+                if progress_callback:
+                    progress_callback(total)
+    except (OSError, RuntimeError) as e:
+        return False, f"Erro ao gerar documentos: {e}", {"total": total}
+
+    elapsed = time.perf_counter() - inicio
+    stats = {
+        "total": total,
+        "segundos": round(elapsed, 3),
+        "por_segundo": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "variaveis_sem_valor": sorted(unknown),
+        "arquivos": [task[2] for task in tasks[:total]],
+    }
+    if total == 0:
+        return False, "Nenhum documento gerado.", stats
+    return True, f"{total} documento(s) gerado(s) em {elapsed:.1f}s ({stats['por_segundo']}/s) em:\n{output_dir}", stats
@@ -0,0 +1,90 @@
+# utils/docx_worker.py
+"""Execução da geração de documentos .docx pela interface (usado por Atas e Contratos)."""
+import os
+
+from PyQt6.QtCore import QThread, pyqtSignal, QUrl, Qt
+from PyQt6.QtGui import QDesktopServices
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+
+from utils.docx_engine import DOCUMENT_TEMPLATES, generate_documents
+
+
+class DocxWorker(QThread):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool, str) # Sinais: Sucesso (True/False), Mensagem
+
+    def __init__(self, template_key, jobs, output_dir):
+        super().__init__()
+        self.template_key = template_key
+        self.jobs = jobs
+        self.output_dir = output_dir
+        self.stats = {}
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            success, message, self.stats = generate_documents(
+                self.template_key, self.jobs, self.output_dir,
+                progress_callback=self.progress.emit, should_cancel=lambda: self._cancelled,
+            )
+            self.finished.emit(success, message)
+        except Exception as e:
+            self.finished.emit(False, f"Erro interno na geração de documentos: {str(e)}")
+
+
+def _missing_variables_note(stats):
+    missing = stats.get("variaveis_sem_valor") or []
+    if not missing:
+        return ""
+    return "\n\nCampos a preencher manualmente: " + ", ".join("{{" + v + "}}" for v in missing)
+
+
+def run_document_generation(parent, template_key, jobs):
+    """
+    Pergunta a pasta de saída e gera os documentos. Um único documento é gerado
+    na hora e aberto; lotes rodam em segundo plano com barra de progresso.
+    """
+    if not jobs:
+        QMessageBox.warning(parent, "Gerar Documento", "Nenhum registro selecionado.")
+        return
+    nome_modelo = DOCUMENT_TEMPLATES[template_key][1]
+    output_dir = QFileDialog.getExistingDirectory(parent, f"Pasta para salvar: {nome_modelo}",
+                                                  os.path.expanduser("~"))
+    if not output_dir:
+        return
+
+    if len(jobs) == 1:
+        success, message, stats = generate_documents(template_key, jobs, output_dir)
+        if not success:
+            QMessageBox.critical(parent, "Erro", message)
+            return
+        QDesktopServices.openUrl(QUrl.fromLocalFile(stats["arquivos"][0]))
+        missing = _missing_variables_note(stats)
+        if missing:
+            QMessageBox.information(parent, nome_modelo, f"Documento gerado:\n{stats['arquivos'][0]}{missing}")
+        return
+
+    progress = QProgressDialog(f"Gerando {nome_modelo}...", "Cancelar", 0, len(jobs), parent)
+    progress.setWindowTitle("Documentos em Lote")
+    progress.setWindowModality(Qt.WindowModality.WindowModal)
+    progress.setMinimumDuration(0)
+
+    worker = DocxWorker(template_key, jobs, output_dir)
+    # Mantém a referência enquanto a thread roda
+    parent._docx_worker = worker
+
+    def _on_finished(success, message):
+        progress.close()
+        if success:
+            QMessageBox.information(parent, "Documentos em Lote", message + _missing_variables_note(worker.stats))
+        else:
+            QMessageBox.warning(parent, "Documentos em Lote", message)
+        parent._docx_worker = None
+
+    worker.progress.connect(progress.setValue)
+    worker.finished.connect(_on_finished)
+    progress.canceled.connect(worker.cancel)
+    worker.start()
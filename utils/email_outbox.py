@@ -0,0 +1,432 @@
+# utils/email_outbox.py
+"""
+Envio de e-mails com sessão SMTP reaproveitada e caixa de saída em disco.
+
+- SMTPSession: mantém a conexão (STARTTLS + login feitos uma vez) e reconecta
+  só quando o servidor derruba a sessão.
+- compose_message_file: monta a mensagem MIME direto em um arquivo; os anexos
+  são codificados em base64 em blocos, sem carregar o arquivo inteiro na memória.
+- EmailOutbox: fila persistente (um JSON por mensagem em <pasta>/pendentes),
+  com novas tentativas em backoff exponencial. Anexos acima do limite do
+  provedor (25 MB) são divididos em partes (.001, .002, ...) e cada parte
+  vira uma mensagem.
+"""
+import os
+import io
+import json
+import time
+import uuid
+import base64
+import shutil
+import smtplib
+import threading
+import email.policy
+from datetime import datetime
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.header import Header
+from email.utils import formatdate, make_msgid
+
+# Limite de tamanho de mensagem do Gmail (e da maioria dos provedores)
+MAX_MESSAGE_BYTES = 25 * 1024 * 1024
+# Base64 aumenta o anexo em ~4/3; sobra margem para cabeçalhos e corpo
+MAX_ATTACHMENT_PART_BYTES = (MAX_MESSAGE_BYTES * 3) // 4 - 256 * 1024
+
+_B64_CHUNK = 57 * 1024          # múltiplo de 57 -> linhas base64 completas de 76 caracteres
+_COPY_CHUNK = 1024 * 1024
+_SEND_BUFFER = 64 * 1024
+
+
+# ==================================== Montagem da mensagem ====================================
+
+def compose_message_file(out_path, sender, recipients, subject, body, attachments=()):
+    """
+    Grava a mensagem completa (cabeçalhos + corpo + anexos em base64) em out_path,
+    com finais de linha CRLF. Retorna o tamanho em bytes.
+    """
+    msg = MIMEMultipart()
+    msg['From'] = sender or ""
+    msg['To'] = ", ".join(recipients)
+    msg['Subject'] = Header(subject or "", 'utf-8')
+    msg['Date'] = formatdate(localtime=True)
+    msg['Message-ID'] = make_msgid()
+    msg.attach(MIMEText(body or "", 'plain', 'utf-8'))
+
+    # Cada anexo entra como um marcador no esqueleto e é substituído pelo conteúdo ao gravar
+    markers = {}
+    for path in attachments:
+        marker = f"@@ANEXO-{uuid.uuid4().hex}@@"
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(marker)
+        part['Content-Transfer-Encoding'] = 'base64'
+        filename = os.path.basename(path)
+        if not filename.isascii():
+            filename = ('utf-8', '', filename)
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        msg.attach(part)
+        markers[marker.encode("ascii")] = path
+
+    skeleton = msg.as_bytes(policy=email.policy.compat32.clone(linesep="\r\n"))
+    with open(out_path, "wb") as out:
+        for line in io.BytesIO(skeleton):
+            path = markers.get(line.strip())
+            if path is None:
+                out.write(line)
+                continue
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(_B64_CHUNK)
+                    if not chunk:
+                        break
+                    out.write(base64.encodebytes(chunk).replace(b"\n", b"\r\n"))
+        if not skeleton.endswith(b"\r\n"):
+            out.write(b"\r\n")
+    return os.path.getsize(out_path)
+
+
+def split_file(path, part_size, out_dir):
+    """Divide o arquivo em partes <nome>.001, <nome>.002, ... (juntar com 7-Zip ou 'copy /b')."""
+    os.makedirs(out_dir, exist_ok=True)
+    base_name = os.path.basename(path)
+    parts = []
+    with open(path, "rb") as src:
+        index = 0
+        while True:
+            written = 0
+            part_path = os.path.join(out_dir, f"{base_name}.{index + 1:03d}")
+            with open(part_path, "wb") as dst:
+                while written < part_size:
+                    chunk = src.read(min(_COPY_CHUNK, part_size - written))
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    written += len(chunk)
+            if written == 0:
+                os.remove(part_path)
+                break
+            parts.append(part_path)
+            index += 1
+    return parts
+
+
+# ==================================== Sessão SMTP ====================================
+
+class SMTPSession:
+    """Conexão SMTP reaproveitada entre envios (thread-safe)."""
+
+    def __init__(self, host, port, username=None, password=None, starttls=True, timeout=60):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._server = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if self.starttls:
+            server.starttls()
+            server.ehlo()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        self.connections_opened += 1
+        return server
+
+    def _alive_server(self):
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop()
+        self._server = self._connect()
+        return self._server
+
+    def _drop(self):
+        if self._server is not None:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+        self._server = None
+
+    def send_file(self, sender, recipients, message_path):
+        """Envia uma mensagem já montada em disco, transmitindo-a em blocos."""
+        with self._lock:
+            server = self._alive_server()
+            try:
+                _transmit(server, sender, recipients, message_path)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # Recusa do servidor: a sessão continua válida, só a transação é descartada
+                try:
+                    server.rset()
+                except (smtplib.SMTPException, OSError):
+                    self._drop()
+                raise
+            except (smtplib.SMTPException, OSError):
+                self._drop()
+                raise
+
+    def close(self):
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except Exception:
+                    pass
+            self._drop()
+
+
+def _transmit(server, sender, recipients, message_path):
+    """MAIL/RCPT/DATA com o corpo lido do arquivo (com 'dot-stuffing' linha a linha)."""
+    code, resp = server.mail(sender or "")
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, resp, sender)
+    refused = {}
+    for rcpt in recipients:
+        code, resp = server.rcpt(rcpt)
+        if code not in (250, 251):
+            refused[rcpt] = (code, resp)
+    if len(refused) == len(recipients):
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, resp = server.docmd("DATA")
+    if code != 354:
+        raise smtplib.SMTPDataError(code, resp)
+
+    buffer = bytearray()
+    with open(message_path, "rb") as f:
+        for line in f:
+            if line.startswith(b"."):
+                buffer += b"."
+            buffer += line
+            if len(buffer) >= _SEND_BUFFER:
+                server.send(bytes(buffer))
+                buffer.clear()
+    buffer += b".\r\n"
+    server.send(bytes(buffer))
+
+    code, resp = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_smtp_session(host, port, username=None, password=None, starttls=True):
+    """Sessão compartilhada por (servidor, porta, usuário)."""
+    key = (host, int(port), username or "")
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or session.password != password or session.starttls != starttls:
+            session = SMTPSession(host, int(port), username, password, starttls)
+            _sessions[key] = session
+        return session
+
+
+def close_smtp_sessions():
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+# ==================================== Caixa de saída ====================================
+
+class EmailOutbox:
+    """
+    Fila persistente de e-mails. Cada mensagem pendente é um JSON em <pasta>/pendentes
+    e seus anexos ficam em <pasta>/anexos/<id>; a fila sobrevive a reinícios do programa.
+    """
+
+    def __init__(self, directory, session, sender, max_attempts=8, base_delay=30, max_delay=3600,
+                 clock=time.time):
+        self.directory = str(directory)
+        self.session = session
+        self.sender = sender
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.wakeup = threading.Event()
+        self._lock = threading.Lock()        # arquivos da fila (rápido; enqueue não espera o SMTP)
+        self._drain_lock = threading.Lock()  # uma rodada de envio por vez
+        for sub in ("pendentes", "anexos", "falhas", "spool"):
+            os.makedirs(os.path.join(self.directory, sub), exist_ok=True)
+
+    # ---------------------------------- arquivos ----------------------------------
+    def _job_path(self, job_id, folder="pendentes"):
+        return os.path.join(self.directory, folder, f"{job_id}.json")
+
+    def _write_job(self, job, folder="pendentes"):
+        path = self._job_path(job["id"], folder)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _read_job(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Item da caixa de saída ilegível ({path}): {e}")
+            return None
+
+    def pending_jobs(self):
+        """Mensagens pendentes, na ordem em que foram enfileiradas."""
+        folder = os.path.join(self.directory, "pendentes")
+        jobs = [self._read_job(os.path.join(folder, name))
+                for name in sorted(os.listdir(folder)) if name.endswith(".json")]
+        return [job for job in jobs if job]
+
+    def failed_jobs(self):
+        folder = os.path.join(self.directory, "falhas")
+        return [job for job in (self._read_job(os.path.join(folder, name))
+                                for name in sorted(os.listdir(folder)) if name.endswith(".json")) if job]
+
+    # ---------------------------------- enfileirar ----------------------------------
+    def enqueue(self, recipients, subject, body, file_path=None, move_attachment=False,
+                max_attachment_bytes=MAX_ATTACHMENT_PART_BYTES):
+        """
+        Coloca o e-mail na fila. Anexos maiores que max_attachment_bytes são divididos
+        e cada parte é enviada em uma mensagem própria. Retorna a lista de ids.
+        """
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        group = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+
+        attachments = [None]
+        if file_path:
+            staging = os.path.join(self.directory, "anexos", group)
+            os.makedirs(staging, exist_ok=True)
+            if os.path.getsize(file_path) > max_attachment_bytes:
+                attachments = split_file(file_path, max_attachment_bytes, staging)
+                if move_attachment:
+                    os.remove(file_path)
+            else:
+                staged = os.path.join(staging, os.path.basename(file_path))
+                if move_attachment:
+                    shutil.move(file_path, staged)
+                else:
+                    shutil.copyfile(file_path, staged)
+                attachments = [staged]
+
+        total = len(attachments)
+        job_ids = []
+        with self._lock:
+            for index, attachment in enumerate(attachments, start=1):
+                job = {
+                    "id": f"{group}-{index:03d}",
+                    "grupo": group,
+                    "to": list(recipients),
+                    "subject": subject if total == 1 else f"{subject} (parte {index}/{total})",
+                    "body": body if total == 1 else (
+                        f"{body}\n\nParte {index} de {total}. Salve todas as partes na mesma pasta e "
+                        f"abra a primeira (.001) com o 7-Zip, ou junte-as com 'copy /b'."),
+                    "attachments": [attachment] if attachment else [],
+                    "attempts": 0,
+                    "next_attempt": 0,
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "last_error": "",
+                }
+                self._write_job(job)
+                job_ids.append(job["id"])
+        self.wakeup.set()
+        return job_ids
+
+    # ---------------------------------- envio ----------------------------------
+    def next_due_in(self):
+        """Segundos até a próxima mensagem vencer (None se a fila está vazia)."""
+        jobs = self.pending_jobs()
+        if not jobs:
+            return None
+        return max(0.0, min(job["next_attempt"] for job in jobs) - self.clock())
+
+    def _backoff(self, attempts):
+        return min(self.base_delay * (2 ** (attempts - 1)), self.max_delay)
+
+    def _finish(self, job):
+        os.remove(self._job_path(job["id"]))
+        staging = os.path.join(self.directory, "anexos", job["grupo"])
+        for path in job["attachments"]:
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.isdir(staging) and not os.listdir(staging):
+            os.rmdir(staging)
+
+    def _record_failure(self, job, error, now, permanent):
+        """Conta a tentativa: volta para a fila com backoff ou vai para 'falhas'. True se descartada."""
+        with self._lock:
+            job["attempts"] += 1
+            job["last_error"] = str(error)
+            if permanent or job["attempts"] >= self.max_attempts:
+                self._write_job(job, "falhas")
+                os.remove(self._job_path(job["id"]))
+                print(f"❌ E-mail '{job['subject']}' descartado após {job['attempts']} tentativa(s): {error}")
+                return True
+            job["next_attempt"] = now + self._backoff(job["attempts"])
+            self._write_job(job)
+            print(f"⚠️ Falha ao enviar '{job['subject']}' (tentativa {job['attempts']}): {error}")
+            return False
+
+    def drain(self):
+        """
+        Envia as mensagens vencidas pela sessão compartilhada.
+        Retorna (enviadas, falhas_definitivas) como listas de jobs.
+
+        A lista de mensagens vencidas é lida sob o lock, mas a montagem e o envio
+        acontecem fora dele: enqueue() (chamado na thread da interface) não fica
+        esperando o SMTP.
+        """
+        sent, failed = [], []
+        with self._drain_lock:
+            with self._lock:
+                now = self.clock()
+                due = [job for job in self.pending_jobs() if job["next_attempt"] <= now]
+
+            for job in due:
+                missing = [path for path in job["attachments"] if not os.path.isfile(path)]
+                if missing:
+                    # Anexo sumiu: tentar de novo não resolve, e o servidor não tem culpa
+                    self._record_failure(job, f"Anexo não encontrado: {missing[0]}", now, permanent=True)
+                    failed.append(job)
+                    continue
+
+                spool_path = os.path.join(self.directory, "spool", f"{job['id']}.eml")
+                try:
+                    try:
+                        compose_message_file(spool_path, self.sender, job["to"], job["subject"], job["body"],
+                                             job["attachments"])
+                    except OSError as e:
+                        # Erro local (disco, anexo ilegível): só esta mensagem espera a próxima rodada
+                        if self._record_failure(job, e, now, permanent=False):
+                            failed.append(job)
+                        continue
+                    self.session.send_file(self.sender, job["to"], spool_path)
+                except (smtplib.SMTPException, OSError) as e:
+                    permanent = isinstance(e, smtplib.SMTPRecipientsRefused) or (
+                        isinstance(e, smtplib.SMTPResponseException) and 500 <= e.smtp_code < 600)
+                    if self._record_failure(job, e, now, permanent):
+                        failed.append(job)
+                    if isinstance(e, (OSError, smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+                        # Servidor fora do ar: as demais mensagens esperam a próxima rodada
+                        break
+                    continue
+                finally:
+                    if os.path.exists(spool_path):
+                        os.remove(spool_path)
+                with self._lock:
+                    self._finish(job)
+                sent.append(job)
+                print(f"✅ E-mail '{job['subject']}' enviado para {', '.join(job['to'])}")
+        return sent, failed
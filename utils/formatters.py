@@ -0,0 +1,12 @@
+# utils/formatters.py
+"""Formatação de valores para exibição, usada pelas views e pelos controllers."""
+
+
+def format_brl(valor):
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def format_iso_date(iso_date):
+    if not iso_date or len(iso_date) < 10:
+        return iso_date or ""
+    return f"{iso_date[8:10]}/{iso_date[5:7]}/{iso_date[:4]}"
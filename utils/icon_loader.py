@@ -1,47 +1,267 @@
 import sys
+import json
+import mmap
+import struct
+import threading
 from pathlib import Path
-from PyQt6.QtGui import QIcon
+from PyQt6.QtGui import QIcon, QPixmap, QImage
+
+# ==================== PACOTE DE ÍCONES ====================
+# Arquivo único gerado por 'scripts/build_icon_pack.py':
+#   MAGIC (8 bytes) | tamanho do índice (uint32 LE) | índice JSON | bytes dos arquivos
+# O índice mapeia "nome.ext" -> [offset, tamanho] relativo ao início dos dados.
+ICON_PACK_NAME = "icons.pack"
+ICON_PACK_MAGIC = b"CA360ICO"
+_HEADER = struct.Struct("<8sI")
+
+# Ícones usados na janela principal e na tabela de contratos (aquecidos em segundo plano)
+COMMON_ICONS = (
+    "head_skull", "alert", "mensagem", "aproved", "time",
+    "init", "database", "table", "search", "magnifying-glass",
+    "copy", "delete", "edit", "close", "refresh", "link",
+    "exportar", "importar", "concluido", "registrar_status",
+)
+
+
+def _base_dir():
+    # Se estiver rodando como executável (PyInstaller)
+    if hasattr(sys, '_MEIPASS'):
+        return Path(sys._MEIPASS)
+    return Path(__file__).parent.parent  # Volta uma pasta (projeto/)
+
+
+def build_icon_pack(icons_dir, output_path):
+    """Empacota todos os .png/.ico de 'icons_dir' em um único arquivo. Retorna a quantidade de ícones."""
+    icons_dir = Path(icons_dir)
+    files = sorted(p for p in icons_dir.iterdir() if p.suffix.lower() in (".png", ".ico"))
+
+    index, blobs, offset = {}, [], 0
+    for path in files:
+        data = path.read_bytes()
+        index[path.name] = [offset, len(data)]
+        blobs.append(data)
+        offset += len(data)
+
+    index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+    with open(output_path, "wb") as f:
+        f.write(_HEADER.pack(ICON_PACK_MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        for data in blobs:
+            f.write(data)
+    return len(files)
+
+
+class IconPack:
+    """Leitura de um pacote de ícones via mmap (um único arquivo aberto para todos os ícones)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, index_size = _HEADER.unpack_from(self._mm, 0)
+            if magic != ICON_PACK_MAGIC:
+                raise ValueError(f"Arquivo não é um pacote de ícones: {self.path}")
+            start = _HEADER.size
+            self._index = json.loads(self._mm[start:start + index_size].decode("utf-8"))
+            self._data_start = start + index_size
+        except Exception:
+            self._file.close()
+            raise
+
+    def __contains__(self, filename):
+        return filename in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def read(self, filename):
+        entry = self._index.get(filename)
+        if entry is None:
+            return None
+        offset, size = entry
+        start = self._data_start + offset
+        return self._mm[start:start + size]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
 
 class IconManager:
-    def __init__(self):
-        self.icons_dir = self._find_icons_dir()
+    def __init__(self, icons_dir=None, pack_path=None):
+        # A pasta e o pacote são resolvidos só no primeiro uso (nada de I/O no import)
+        self._icons_dir = Path(icons_dir) if icons_dir else None
+        self._pack_path = Path(pack_path) if pack_path else None
+        self._pack = None
+        self._pack_checked = False
+
+        self._lock = threading.Lock()
+        self._icons = {}      # (nome, ext) -> QIcon
+        self._pixmaps = {}    # (nome, ext, largura, altura) -> QPixmap
+        self._images = {}     # (nome, ext) -> QImage decodificada pelo aquecimento
+        self._hits = 0
+        self._misses = 0
+        self._warmup_thread = None
+
+    # ==================== LOCALIZAÇÃO ====================
+    @property
+    def icons_dir(self):
+        if self._icons_dir is None:
+            self._icons_dir = self._find_icons_dir()
+        return self._icons_dir
 
     def _find_icons_dir(self):
         """Encontra a pasta de ícones, mesmo no executável ou desenvolvimento."""
-        # Se estiver rodando como executável (PyInstaller)
-        if hasattr(sys, '_MEIPASS'):
-            base_dir = Path(sys._MEIPASS)
-        else:
-            base_dir = Path(__file__).parent.parent  # Volta uma pasta (projeto/)
-        
+        base_dir = _base_dir()
+
         # Procura a pasta 'icons' em lugares comuns
         possible_paths = [
             base_dir / "icons",
             base_dir / "utils" / "icons",
             base_dir / "resources" / "icons",
         ]
-        
+
         for path in possible_paths:
             if path.exists():
                 return path
-        
+
         raise FileNotFoundError("Pasta 'icons' não encontrada!")
 
+    def _get_pack(self):
+        """Abre o pacote de ícones se existir (ao lado da pasta 'icons')."""
+        if not self._pack_checked:
+            with self._lock:
+                if not self._pack_checked:
+                    path = self._pack_path or self.icons_dir.parent / ICON_PACK_NAME
+                    if path.exists():
+                        try:
+                            self._pack = IconPack(path)
+                        except (OSError, ValueError, struct.error) as e:
+                            print(f"[AVISO] Pacote de ícones inválido, usando a pasta: {e}")
+                    self._pack_checked = True
+        return self._pack
+
+    # ==================== CARREGAMENTO ====================
+    def _load_image(self, filename):
+        """Lê e decodifica o ícone (pacote ou disco). Seguro para threads."""
+        pack = self._get_pack()
+        if pack is not None and filename in pack:
+            image = QImage()
+            image.loadFromData(pack.read(filename))
+            return image
+        path = self.icons_dir / filename
+        if not path.exists():
+            return None
+        return QImage(str(path))
+
+    def _count(self, hit):
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+
+    def _get(self, icon_name, ext):
+        key = (icon_name, ext)
+        icon = self._icons.get(key)
+        if icon is not None:
+            self._count(True)
+            return icon
+
+        self._count(False)
+        path = self.icons_dir / f"{icon_name}.{ext}"
+        if ext == "ico" and path.exists():
+            # .ico pode ter várias resoluções; o QIcon por caminho preserva todas
+            icon = self._icons[key] = QIcon(str(path))
+            return icon
+
+        with self._lock:
+            image = self._images.pop(key, None)
+        if image is None:
+            image = self._load_image(path.name)
+
+        if image is None or image.isNull():
+            print(f"[AVISO] Ícone não encontrado: {path}")
+            icon = QIcon()  # Ícone vazio (não quebra o programa)
+        else:
+            icon = QIcon(QPixmap.fromImage(image))
+        # Ícones ausentes também ficam no cache para avisar uma única vez
+        self._icons[key] = icon
+        return icon
+
     def get_icon(self, icon_name):
         """Retorna um QIcon pelo nome do arquivo (sem extensão)."""
-        icon_path = self.icons_dir / f"{icon_name}.png"
-        if not icon_path.exists():
-            print(f"[AVISO] Ícone não encontrado: {icon_path}")
-            return QIcon()  # Ícone vazio (não quebra o programa)
-        return QIcon(str(icon_path))
-    
+        return self._get(icon_name, "png")
+
     def got_ico(self, icon_name):
         """Retorna um QIcon pelo nome do arquivo (sem extensão)."""
-        icon_path = self.icons_dir / f"{icon_name}.ico"
-        if not icon_path.exists():
-            print(f"[AVISO] Ícone não encontrado: {icon_path}")
-            return QIcon()  # Ícone vazio (não quebra o programa)
-        return QIcon(str(icon_path))
+        return self._get(icon_name, "ico")
+
+    def get_pixmap(self, icon_name, width=24, height=None):
+        """Retorna um QPixmap do ícone no tamanho pedido (cacheado por nome e tamanho)."""
+        height = height or width
+        key = (icon_name, "png", width, height)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._count(True)
+            return pixmap
+
+        pixmap = self.get_icon(icon_name).pixmap(width, height)
+        self._pixmaps[key] = pixmap
+        return pixmap
+
+    # ==================== AQUECIMENTO ====================
+    def warm_up(self, icon_names=COMMON_ICONS, ext="png"):
+        """
+        Decodifica os ícones mais usados em uma thread de segundo plano.
+        Só QImage é criada fora da thread da GUI; QIcon/QPixmap nascem no primeiro get_icon.
+        """
+        if self._warmup_thread is not None and self._warmup_thread.is_alive():
+            return self._warmup_thread
+
+        names = list(icon_names)
+
+        def _run():
+            for name in names:
+                key = (name, ext)
+                if key in self._icons or key in self._images:
+                    continue
+                try:
+                    image = self._load_image(f"{name}.{ext}")
+                except Exception as e:
+                    print(f"[AVISO] Falha ao pré-carregar ícone '{name}': {e}")
+                    continue
+                if image is not None and not image.isNull():
+                    with self._lock:
+                        self._images.setdefault(key, image)
+
+        self._warmup_thread = threading.Thread(target=_run, name="icon-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    # ==================== ESTATÍSTICAS ====================
+    def cache_stats(self):
+        """Retorna acertos/falhas do cache e a origem dos ícones."""
+        total = self._hits + self._misses
+        pack = self._pack if self._pack_checked else None
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 3) if total else 0.0,
+            "icons": len(self._icons),
+            "pixmaps": len(self._pixmaps),
+            "prewarmed": len(self._images),
+            "source": "pack" if pack is not None else "disk",
+        }
+
+    def clear_cache(self):
+        """Descarta os ícones em memória e zera as estatísticas."""
+        with self._lock:
+            self._icons.clear()
+            self._pixmaps.clear()
+            self._images.clear()
+            self._hits = 0
+            self._misses = 0
 
 # Cria uma instância global para usar em todo o projeto
-icon_manager = IconManager()
\ No newline at end of file
+icon_manager = IconManager()
@@ -0,0 +1,306 @@
+# utils/sql_profiler.py
+# Instrumentação de consultas SQL (SQLAlchemy + sqlite3) por ação do usuário.
+#
+# Ativação: variável de ambiente CA360_SQL_PROFILE=1 (ou sql_profiler.enable()).
+# Desativado, o custo é zero: nenhum listener é registrado e connect() devolve
+# uma conexão sqlite3 comum.
+#
+# Uso:
+#   from utils.sql_profiler import sql_profiler
+#
+#   with sql_profiler.operation("carregar_tabela"):
+#       ...  # todas as queries feitas aqui (ORM ou sqlite3) contam para esta ação
+#
+#   conn = sql_profiler.connect(db_path)   # no lugar de sqlite3.connect(db_path)
+#
+# Ao sair de cada operação é registrado um resumo (quantidade, tempo total,
+# consultas mais repetidas). Consultas acima de CA360_SLOW_QUERY_MS (padrão 50 ms)
+# vão para o log de lentas junto com o EXPLAIN QUERY PLAN.
+
+import os
+import re
+import time
+import logging
+import sqlite3
+import threading
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+ENV_VAR = "CA360_SQL_PROFILE"
+SLOW_ENV_VAR = "CA360_SLOW_QUERY_MS"
+DEFAULT_OPERATION = "sem_operacao"
+
+logger = logging.getLogger("sql_profiler")
+
+_current_operation = ContextVar("sql_operation", default=None)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def _normalize_sql(statement):
+    """Reduz a consulta a uma 'assinatura' (sem literais) para agrupar repetições."""
+    statement = _WHITESPACE_RE.sub(" ", statement or "").strip()
+    return _LITERAL_RE.sub("?", statement)[:300]
+
+
+class _OperationStats:
+    """Acumulador de uma execução de operação (ex.: um clique em 'carregar tabela')."""
+
+    __slots__ = ("label", "started_at", "count", "total_ms", "slow", "by_statement")
+
+    def __init__(self, label):
+        self.label = label
+        self.started_at = time.perf_counter()
+        self.count = 0
+        self.total_ms = 0.0
+        self.slow = 0
+        self.by_statement = defaultdict(lambda: [0, 0.0])
+
+    def add(self, statement, elapsed_ms, is_slow):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if is_slow:
+            self.slow += 1
+        entry = self.by_statement[_normalize_sql(statement)]
+        entry[0] += 1
+        entry[1] += elapsed_ms
+
+    def summary(self, top=5):
+        wall_ms = (time.perf_counter() - self.started_at) * 1000.0
+        top_statements = sorted(self.by_statement.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        return {
+            "operation": self.label,
+            "queries": self.count,
+            "sql_ms": round(self.total_ms, 2),
+            "wall_ms": round(wall_ms, 2),
+            "slow_queries": self.slow,
+            "distinct_statements": len(self.by_statement),
+            "top_statements": [
+                {"sql": sql, "count": c, "total_ms": round(ms, 2)}
+                for sql, (c, ms) in top_statements
+            ],
+        }
+
+
+class SqlProfiler:
+    """Coleta contagem/tempo das consultas por operação e mantém o log de lentas."""
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_ms = float(os.environ.get(SLOW_ENV_VAR, "50"))
+        self._lock = threading.Lock()
+        self._sqlalchemy_hooked = False
+        self._explaining = threading.local()
+        self.reset()
+
+    # ==================== ATIVAÇÃO ====================
+    def enable(self, slow_query_ms=None):
+        if slow_query_ms is not None:
+            self.slow_query_ms = float(slow_query_ms)
+        self.enabled = True
+        self._install_sqlalchemy_hooks()
+        print(f"🔍 Instrumentação SQL ativa (consultas lentas > {self.slow_query_ms:.0f} ms)")
+
+    def disable(self):
+        self.enabled = False
+        self._remove_sqlalchemy_hooks()
+
+    def reset(self):
+        with self._lock:
+            self._totals = defaultdict(lambda: {"runs": 0, "queries": 0, "sql_ms": 0.0, "slow_queries": 0})
+            self._recent = deque(maxlen=50)
+            self._slow_log = deque(maxlen=100)
+            self._unscoped = None
+
+    # ==================== OPERAÇÕES (RÓTULO DE CONTEXTO) ====================
+    @contextmanager
+    def operation(self, label):
+        """Agrupa as consultas feitas dentro do bloco sob o rótulo informado."""
+        if not self.enabled:
+            yield None
+            return
+        # Operações aninhadas acumulam na operação mais externa
+        if _current_operation.get() is not None:
+            yield _current_operation.get()
+            return
+        stats = _OperationStats(label)
+        token = _current_operation.set(stats)
+        try:
+            yield stats
+        finally:
+            _current_operation.reset(token)
+            self._finish_operation(stats)
+
+    def current_operation(self):
+        """Rótulo da operação em andamento (ou None)."""
+        stats = _current_operation.get()
+        return stats.label if stats else None
+
+    def _finish_operation(self, stats):
+        summary = stats.summary()
+        summary["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            total = self._totals[stats.label]
+            total["runs"] += 1
+            total["queries"] += stats.count
+            total["sql_ms"] = round(total["sql_ms"] + stats.total_ms, 2)
+            total["slow_queries"] += stats.slow
+            self._recent.append(summary)
+
+        logger.info(
+            "📊 [%s] %d consultas (%d distintas) em %.1f ms de SQL / %.1f ms totais, %d lentas",
+            stats.label, stats.count, summary["distinct_statements"],
+            summary["sql_ms"], summary["wall_ms"], stats.slow,
+        )
+        for item in summary["top_statements"][:3]:
+            if item["count"] > 1:
+                logger.info("    %dx %.1f ms  %s", item["count"], item["total_ms"], item["sql"][:120])
+
+    def _record(self, statement, parameters, elapsed_ms, explain_conn=None):
+        is_slow = elapsed_ms >= self.slow_query_ms
+        stats = _current_operation.get()
+        if stats is None:
+            with self._lock:
+                if self._unscoped is None:
+                    self._unscoped = _OperationStats(DEFAULT_OPERATION)
+                self._unscoped.add(statement, elapsed_ms, is_slow)
+        else:
+            stats.add(statement, elapsed_ms, is_slow)
+
+        if is_slow:
+            plan = self._explain(explain_conn, statement, parameters)
+            entry = {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "operation": stats.label if stats else DEFAULT_OPERATION,
+                "elapsed_ms": round(elapsed_ms, 2),
+                "sql": _WHITESPACE_RE.sub(" ", statement).strip()[:1000],
+                "plan": plan,
+            }
+            with self._lock:
+                self._slow_log.append(entry)
+            logger.warning(
+                "🐢 Consulta lenta (%.1f ms) em [%s]: %s\n    Plano: %s",
+                elapsed_ms, entry["operation"], entry["sql"][:200], " | ".join(plan) or "n/d",
+            )
+
+    def _explain(self, conn, statement, parameters):
+        """Executa EXPLAIN QUERY PLAN na mesma conexão (somente para DML/SELECT)."""
+        if conn is None:
+            return []
+        head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        if head not in ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE", "WITH"):
+            return []
+        if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+            parameters = parameters[0]  # executemany: usa o primeiro conjunto
+        self._explaining.active = True
+        try:
+            rows = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+            return [str(row[-1]) for row in rows]
+        except Exception as e:
+            return [f"(EXPLAIN indisponível: {e})"]
+        finally:
+            self._explaining.active = False
+
+    def _record_raw(self, conn, sql, parameters, start):
+        """Chamado pelos cursores sqlite3 instrumentados."""
+        if getattr(self._explaining, "active", False) or not self.enabled:
+            return
+        self._record(sql, parameters, (time.perf_counter() - start) * 1000.0, explain_conn=conn)
+
+    # ==================== SQLALCHEMY ====================
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_sqlprof_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_sqlprof_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000.0
+        if not self.enabled:
+            return
+        dbapi_conn = getattr(cursor, "connection", None)
+        self._record(statement, parameters, elapsed_ms, explain_conn=dbapi_conn)
+
+    def _install_sqlalchemy_hooks(self):
+        if self._sqlalchemy_hooked:
+            return
+        try:
+            from sqlalchemy import event
+            from sqlalchemy.engine import Engine
+        except ImportError:
+            return
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        self._sqlalchemy_hooked = True
+
+    def _remove_sqlalchemy_hooks(self):
+        if not self._sqlalchemy_hooked:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+        self._sqlalchemy_hooked = False
+
+    # ==================== SQLITE3 ====================
+    def connect(self, database, **kwargs):
+        """Substituto de sqlite3.connect que instrumenta a conexão quando ativo."""
+        if not self.enabled:
+            return sqlite3.connect(database, **kwargs)
+        kwargs["factory"] = ProfiledConnection
+        return sqlite3.connect(database, **kwargs)
+
+    # ==================== RELATÓRIO ====================
+    def snapshot(self):
+        """Dados agregados para o endpoint de métricas ou para depuração."""
+        with self._lock:
+            unscoped = self._unscoped.summary() if self._unscoped else None
+            return {
+                "enabled": self.enabled,
+                "slow_query_ms": self.slow_query_ms,
+                "totals": {label: dict(v) for label, v in self._totals.items()},
+                "recent_operations": list(self._recent),
+                "unscoped": unscoped,
+                "slow_queries": list(self._slow_log),
+            }
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor sqlite3 que mede execute/executemany."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            sql_profiler._record_raw(self.connection, sql, parameters, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            sql_profiler._record_raw(self.connection, sql, seq_of_parameters, start)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Conexão sqlite3 cujos cursores (inclusive os implícitos) são instrumentados."""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# Instância global, no mesmo estilo do icon_manager
+sql_profiler = SqlProfiler()
+
+if os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on"):
+    sql_profiler.enable()
@@ -0,0 +1,244 @@
+# utils/startup_tracer.py
+# Rastreador da linha do tempo de inicialização (imports, fases e primeiro paint).
+#
+# Ativação:
+#   - Variável de ambiente CA360_STARTUP_TRACE=1
+#   - ou argumento de linha de comando --trace-startup
+#
+# Com o rastreador ativo, o main.py grava em logs/startup_trace_<data>.json
+# um JSON com:
+#   - imports: tempo próprio e acumulado de cada módulo (equivalente ao -X importtime)
+#   - phases: intervalos nomeados (criação do QApplication, da MainShellView, do MainController...)
+#   - marks: instantes pontuais (ex.: first_paint)
+#
+# Este módulo NÃO importa Qt nem nada pesado no topo, para poder ser o primeiro
+# import do main.py sem distorcer a medição.
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+ENV_VAR = "CA360_STARTUP_TRACE"
+CLI_FLAG = "--trace-startup"
+
+
+class _TimedLoader:
+    """Envolve o loader real para cronometrar a execução do módulo."""
+
+    def __init__(self, loader, tracer):
+        self._loader = loader
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._tracer._begin_import(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._tracer._end_import(module.__name__)
+
+
+class _ImportTimingFinder:
+    """Finder colocado no início do sys.meta_path que apenas delega e cronometra."""
+
+    def __init__(self, tracer):
+        self._tracer = tracer
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        # Evita recursão: durante a busca delegada este finder fica "invisível"
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.busy = False
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._tracer)
+        return spec
+
+
+class StartupTracer:
+    """Coleta a linha do tempo de inicialização. Sem custo quando desativado."""
+
+    def __init__(self):
+        self.enabled = False
+        self._t0 = time.perf_counter()
+        self._started_at = datetime.now()
+        self._finder = None
+        self._import_stack = []
+        self._imports = []
+        self._phases = []
+        self._marks = []
+        self._lock = threading.Lock()
+        self._dumped_path = None
+
+    # ==================== ATIVAÇÃO ====================
+    @staticmethod
+    def requested(argv=None):
+        """Indica se o rastreamento foi pedido via env ou argumento de linha de comando."""
+        argv = sys.argv if argv is None else argv
+        if CLI_FLAG in argv:
+            return True
+        return os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+    def start(self, trace_imports=True):
+        """Ativa a coleta. A referência de tempo passa a ser este instante."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._t0 = time.perf_counter()
+        self._started_at = datetime.now()
+        if trace_imports:
+            self._finder = _ImportTimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def start_from_env(self, argv=None):
+        """Ativa o rastreador se solicitado e remove o flag do argv (o Qt não o conhece)."""
+        argv = sys.argv if argv is None else argv
+        if not self.requested(argv):
+            return False
+        while CLI_FLAG in argv:
+            argv.remove(CLI_FLAG)
+        self.start()
+        return True
+
+    def stop_import_tracing(self):
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    # ==================== COLETA ====================
+    def _now_ms(self):
+        return (time.perf_counter() - self._t0) * 1000.0
+
+    def _begin_import(self, name):
+        # Imports feitos por threads auxiliares não entram na pilha principal
+        if threading.current_thread() is not threading.main_thread():
+            return
+        # [nome, inicio_ms, tempo_dos_filhos_ms]
+        self._import_stack.append([name, self._now_ms(), 0.0])
+
+    def _end_import(self, name):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if not self._import_stack or self._import_stack[-1][0] != name:
+            return
+        _, start, children = self._import_stack.pop()
+        cumulative = self._now_ms() - start
+        if self._import_stack:
+            self._import_stack[-1][2] += cumulative
+        self._imports.append({
+            "module": name,
+            "start_ms": round(start, 3),
+            "self_ms": round(cumulative - children, 3),
+            "cumulative_ms": round(cumulative, 3),
+            "depth": len(self._import_stack),
+        })
+
+    def mark(self, name, **extra):
+        """Registra um instante pontual na linha do tempo."""
+        if not self.enabled:
+            return
+        entry = {"name": name, "at_ms": round(self._now_ms(), 3)}
+        if extra:
+            entry.update(extra)
+        with self._lock:
+            self._marks.append(entry)
+
+    @contextmanager
+    def phase(self, name):
+        """Cronometra um bloco nomeado (ex.: construção de um controller)."""
+        if not self.enabled:
+            yield
+            return
+        start = self._now_ms()
+        error = None
+        try:
+            yield
+        except BaseException as exc:
+            error = repr(exc)
+            raise
+        finally:
+            end = self._now_ms()
+            entry = {
+                "name": name,
+                "start_ms": round(start, 3),
+                "end_ms": round(end, 3),
+                "duration_ms": round(end - start, 3),
+            }
+            if error:
+                entry["error"] = error
+            with self._lock:
+                self._phases.append(entry)
+
+    def watch_first_paint(self, widget, on_painted=None):
+        """Registra o instante do primeiro QEvent.Paint recebido pelo widget."""
+        if not self.enabled:
+            return
+        from PyQt6.QtCore import QObject, QEvent
+
+        tracer = self
+
+        class _FirstPaintFilter(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Type.Paint:
+                    obj.removeEventFilter(self)
+                    tracer.mark("first_paint")
+                    if on_painted:
+                        on_painted()
+                return False
+
+        self._paint_filter = _FirstPaintFilter(widget)
+        widget.installEventFilter(self._paint_filter)
+
+    # ==================== RESULTADO ====================
+    def to_dict(self):
+        imports = sorted(self._imports, key=lambda i: i["start_ms"])
+        top_level = [i for i in imports if i["depth"] == 0]
+        first_paint = next((m["at_ms"] for m in self._marks if m["name"] == "first_paint"), None)
+        return {
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "first_paint_ms": first_paint,
+            "import_total_ms": round(sum(i["cumulative_ms"] for i in top_level), 3),
+            "slowest_imports": sorted(imports, key=lambda i: i["self_ms"], reverse=True)[:25],
+            "phases": list(self._phases),
+            "marks": list(self._marks),
+            "imports": imports,
+        }
+
+    def dump(self, base_dir):
+        """Grava a linha do tempo em logs/startup_trace_<data>.json e retorna o caminho."""
+        if not self.enabled:
+            return None
+        log_dir = os.path.join(base_dir, "logs")
+        os.makedirs(log_dir, exist_ok=True)
+        path = os.path.join(log_dir, f"startup_trace_{self._started_at:%Y%m%d_%H%M%S}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        self._dumped_path = path
+        return path
+
+
+# Instância global, no mesmo estilo do icon_manager
+startup_tracer = StartupTracer()
@@ -0,0 +1,78 @@
+# utils/template_engine.py
+"""
+Motor de templates das mensagens ({{variavel}}).
+
+O texto é analisado uma única vez em uma lista de segmentos (literal / variável);
+a renderização percorre essa lista em uma passada, independente de quantas
+variáveis existam no contexto. Placeholders sem valor no contexto são mantidos
+como estão (ex.: {{26JUL2024,}} que o usuário preenche à mão) e informados em
+'unknown'.
+"""
+import re
+from functools import lru_cache
+
+PLACEHOLDER_RE = re.compile(r"\{\{(.*?)\}\}", re.DOTALL)
+
+
+class CompiledTemplate:
+    """Template já analisado: segmentos (é_variável, texto) e nomes das variáveis usadas."""
+
+    __slots__ = ("source", "segments", "variables")
+
+    def __init__(self, source):
+        self.source = source
+        segments = []
+        variables = []
+        last = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            if match.start() > last:
+                segments.append((False, source[last:match.start()]))
+            name = match.group(1)
+            segments.append((True, name))
+            if name not in variables:
+                variables.append(name)
+            last = match.end()
+        if last < len(source):
+            segments.append((False, source[last:]))
+        self.segments = tuple(segments)
+        self.variables = tuple(variables)
+
+    def render(self, context):
+        """Substitui as variáveis conhecidas em uma única passada."""
+        parts = []
+        for is_var, text in self.segments:
+            if is_var:
+                value = context.get(text)
+                parts.append("{{" + text + "}}" if value is None else value)
+            else:
+                parts.append(text)
+        return "".join(parts)
+
+    def unknown_variables(self, context):
+        """Variáveis usadas no template que não existem no contexto (na ordem em que aparecem)."""
+        return [name for name in self.variables if name not in context]
+
+
+@lru_cache(maxsize=64)
+def compile_template(source):
+    """Analisa o template (resultado em cache pelo próprio texto)."""
+    return CompiledTemplate(source)
+
+
+def build_context(*sources, **extra):
+    """
+    Junta dicionários em um contexto de renderização.
+    Só entram valores simples (str/int/float), já convertidos para texto.
+    """
+    context = {}
+    for source in sources + (extra,):
+        for key, value in source.items():
+            if isinstance(value, (str, int, float)):
+                context[key] = str(value)
+    return context
+
+
+def render_template(source, context):
+    """Atalho: compila (com cache) e renderiza. Retorna (mensagem, variáveis_desconhecidas)."""
+    template = compile_template(source)
+    return template.render(context), template.unknown_variables(context)
@@ -0,0 +1,48 @@
+# utils/worker_dialog.py
+"""
+Diálogos que rodam QThreads em segundo plano.
+
+Os controllers desses diálogos costumam ser temporários (criados, exec() e
+descartados), e são eles que guardam a referência da thread. Se o diálogo
+fechar no meio do trabalho, a thread seria destruída ainda rodando ("QThread:
+Destroyed while thread is still running") e o programa abortaria. O mixin
+mantém as threads registradas vivas junto com o diálogo e, ao fechar (X, Esc,
+botão Fechar), cancela e espera cada uma terminar.
+"""
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication
+
+
+class WorkerDialogMixin:
+    """Mixin para QDialog: use como 'class MeuDialogo(WorkerDialogMixin, QDialog)'."""
+
+    def track_worker(self, worker):
+        """Registra a thread para ser cancelada e aguardada quando o diálogo fechar."""
+        workers = self.__dict__.setdefault("_tracked_workers", [])
+        workers[:] = [w for w in workers if w.isRunning()]
+        workers.append(worker)
+        return worker
+
+    def has_running_workers(self):
+        return any(w.isRunning() for w in self.__dict__.get("_tracked_workers", []))
+
+    def stop_workers(self):
+        """Cancela (se a thread tiver cancel()) e espera todas as threads registradas."""
+        workers = self.__dict__.get("_tracked_workers", [])
+        running = [w for w in workers if w.isRunning()]
+        if not running:
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            for worker in running:
+                if hasattr(worker, "cancel"):
+                    worker.cancel()
+            for worker in running:
+                worker.wait()
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def done(self, result):
+        # reject() (Esc), accept() e o X (closeEvent -> reject) passam por aqui
+        self.stop_workers()
+        super().done(result)
@@ -6,7 +6,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QIcon
-from Contratos.model.uasg_model import resource_path
+from utils.utils import resource_path
 from utils.icon_loader import icon_manager
 import os
 # Importe o novo InfoDialog (não é estritamente necessário aqui, mas bom para referência)